@@ -14,16 +14,10 @@ Recipes:
 import os, sys, re, hashlib, unicodedata, cv2, numpy as np
 import fitz  # PyMuPDF
 
-# ── EasyOCR singleton ──────────────────────────────────────────────────
+# ── EasyOCR (resident OCR model server when running, else in-process) ──
 
-_easyocr_reader = None
-
-def _get_reader():
-    global _easyocr_reader
-    if _easyocr_reader is None:
-        import easyocr
-        _easyocr_reader = easyocr.Reader(['ja', 'en'], gpu=False, verbose=False)
-    return _easyocr_reader
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+from common.ocr_server import easyocr_readtext
 
 
 # ── PDF → image ────────────────────────────────────────────────────────
@@ -119,8 +113,7 @@ if TOOLS_DIR not in sys.path:
 
 def run_ocr_on_image(img_path):
     """Run EasyOCR on image, return (raw_text, avg_confidence, detections)."""
-    reader = _get_reader()
-    results = reader.readtext(str(img_path))
+    results = easyocr_readtext(str(img_path))
     if not results:
         return "", 0.0, []
     texts = [r[1] for r in results]
@@ -9,16 +9,10 @@ higher-resolution sub-images.
 import os, sys, re, hashlib, unicodedata, cv2, numpy as np
 import fitz  # PyMuPDF
 
-# ── EasyOCR singleton ──────────────────────────────────────────────────
+# ── EasyOCR (resident OCR model server when running, else in-process) ──
 
-_easyocr_reader = None
-
-def _get_reader():
-    global _easyocr_reader
-    if _easyocr_reader is None:
-        import easyocr
-        _easyocr_reader = easyocr.Reader(['ja', 'en'], gpu=False, verbose=False)
-    return _easyocr_reader
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+from common.ocr_server import easyocr_readtext
 
 
 # ── PDF → image ────────────────────────────────────────────────────────
@@ -77,8 +71,7 @@ def ocr_tile(tile_img, x_offset, y_offset, pdf_path, tile_idx):
     """Run EasyOCR on a tile, adjust bbox coordinates to global space."""
     img_path = _save_temp(tile_img, f"t{tile_idx}", pdf_path)
     try:
-        reader = _get_reader()
-        results = reader.readtext(str(img_path))
+        results = easyocr_readtext(str(img_path))
     finally:
         try:
             os.remove(img_path)
@@ -214,8 +207,7 @@ def process_pdf(pdf_path):
     # Also run full-page OCR for comparison
     full_img_path = _save_temp(img, "full", pdf_path)
     try:
-        reader = _get_reader()
-        full_results = reader.readtext(str(full_img_path))
+        full_results = easyocr_readtext(str(full_img_path))
     finally:
         try:
             os.remove(full_img_path)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/bench_vlm_ocr.py (executor: 並行エンジン・並列上限・レート制限・再開)"""
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools import bench_vlm_ocr as bench
+
+
+class _FakeEngine:
+    """指定時間待って固定値を返すエンジン。同時実行数の最大値を記録する。"""
+
+    delay = 0.05
+    fail_on: set = set()
+    calls: list
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self):
+        pass
+
+    def extract(self, pdf_path, prompt=None):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            cls.calls.append(Path(pdf_path).name)
+        try:
+            time.sleep(cls.delay)
+            if Path(pdf_path).name in cls.fail_on:
+                raise RuntimeError("boom")
+            return {"vendor_name": "株式会社テスト", "issue_date": "20260401", "amount": 1000,
+                    "invoice_number": "T1234567890123", "_tokens": {"input": 1, "output": 2}}
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+def _engine(name: str, **attrs):
+    return type(f"Fake_{name}", (_FakeEngine,), {"name": name, "calls": [], "active": 0, "peak": 0,
+                                                   "lock": threading.Lock(), **attrs})
+
+
+class _BrokenEngine:
+    name = "broken"
+
+    def __init__(self):
+        raise RuntimeError("no GPU")
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    pdf_root = tmp_path / "pdfs"
+    (pdf_root / "sub").mkdir(parents=True)
+    golden = []
+    for i in range(12):
+        name = f"doc{i:02d}.pdf"
+        (pdf_root / ("sub" if i % 2 else "") / name).write_bytes(b"%PDF-1.4")
+        golden.append({"id": i + 1, "filename": name})
+    golden.append({"id": 99, "filename": "missing.pdf"})
+    golden_path = tmp_path / "golden.json"
+    golden_path.write_text(json.dumps(golden), encoding="utf-8")
+
+    monkeypatch.setattr(bench, "RESULTS_DIR", tmp_path / "results")
+    monkeypatch.setitem(bench.CATEGORY_CONFIG, "invoice", {
+        **bench.CATEGORY_CONFIG["invoice"], "golden_path": golden_path, "pdf_dirs": [pdf_root],
+    })
+    engines = {"api": _engine("api"), "gpu": _engine("gpu"), "broken": _BrokenEngine}
+    monkeypatch.setattr(bench, "ENGINE_CLASSES", engines)
+    monkeypatch.setattr(bench, "ENGINE_CONCURRENCY", {"api": 4, "gpu": 1})
+    monkeypatch.setattr(bench, "ENGINE_RATE_LIMIT", {})
+    return engines, pdf_root
+
+
+def _rows(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestExecutor:
+    def test_engines_run_in_parallel_with_caps(self, env):
+        engines, _ = env
+        t0 = time.perf_counter()
+        results = bench.run_benchmark(["api", "gpu", "broken"])
+        wall = time.perf_counter() - t0
+
+        assert set(results) == {"api", "gpu"}
+        assert engines["api"].peak == 4
+        assert engines["gpu"].peak == 1
+        # gpu は 12 件 × 0.05s 直列。api はその間に並行で終わる
+        assert wall < 12 * 0.05 * 2 * 0.8
+        for name in ("api", "gpu"):
+            rows = results[name]
+            assert [r["id"] for r in rows] == list(range(1, 13)) + [99]
+            assert rows[-1]["error"] == "pdf_not_found"
+            assert rows[0]["vendor"] == "株式会社テスト" and rows[0]["tokens"] == {"input": 1, "output": 2}
+
+    def test_single_writer_output(self, env):
+        engines, _ = env
+        engines["api"].fail_on = {"doc03.pdf"}
+        bench.run_benchmark(["api"])
+
+        [out] = list(bench.RESULTS_DIR.glob("results_api_invoice_*.jsonl"))
+        rows = _rows(out)
+        assert sorted(r["id"] for r in rows) == list(range(1, 13))  # pdf_not_found は書かない
+        assert [r["error"] for r in rows if r.get("error")] == ["boom"]
+
+    def test_resume_skips_recorded_ids(self, env):
+        engines, _ = env
+        bench.RESULTS_DIR.mkdir()
+        out = bench.RESULTS_DIR / "results_api_invoice_20260101_000000.jsonl"
+        out.write_text(
+            "".join(json.dumps({"id": i, "filename": f"doc{i - 1:02d}.pdf", "vendor": "old"}) + "\n"
+                    for i in (1, 2, 3))
+            + '{"id": 4, "filen',  # 中断時の書きかけ行
+            encoding="utf-8",
+        )
+
+        results = bench.run_benchmark(["api"], resume=True)
+
+        assert sorted(engines["api"].calls) == [f"doc{i:02d}.pdf" for i in range(3, 12)]
+        assert [r["vendor"] for r in results["api"][:4]] == ["old", "old", "old", "株式会社テスト"]
+        assert list(bench.RESULTS_DIR.glob("*.jsonl")) == [out]
+        assert sorted(r["id"] for r in bench.load_recorded_rows(out).values()) == list(range(1, 13))
+
+
+class TestHelpers:
+    def test_pdf_index_matches_find_pdf(self, env):
+        _, pdf_root = env
+        index = bench.build_pdf_index([pdf_root])
+        for i in range(12):
+            name = f"doc{i:02d}.pdf"
+            assert index[name] == bench.find_pdf(name, [pdf_root])
+        assert "missing.pdf" not in index
+
+    def test_rate_limiter_spacing(self):
+        now = [0.0]
+        slept = []
+
+        def sleep(sec):
+            slept.append(round(sec, 6))
+
+        limiter = bench.RateLimiter(4.0, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.acquire()
+        now[0] = 2.0
+        limiter.acquire()
+
+        assert slept == [0.25, 0.5]
+
+    def test_parse_engine_map(self):
+        assert bench._parse_engine_map("gpt54=8, paddlevl = 1,bad") == {"gpt54": "8", "paddlevl": "1"}
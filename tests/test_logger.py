@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/common/logger.py"""
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.common import logger as log_mod
+
+
+@pytest.fixture(autouse=True)
+def _restore_global_logger(monkeypatch):
+    monkeypatch.setattr(log_mod, "_logger", None)
+    yield
+    log_mod.shutdown_logger()
+
+
+def _only_file(log_dir):
+    files = list(log_dir.iterdir())
+    assert len(files) == 1
+    return files[0]
+
+
+class TestSetupLogger:
+    def test_log_dir_argument(self, tmp_path):
+        logger = log_mod.setup_logger("t_sync", console_output=False, log_dir=tmp_path)
+        logger.info("hello")
+
+        text = _only_file(tmp_path).read_text(encoding="utf-8")
+        assert "[INFO] hello" in text
+        assert log_mod.get_logger() is logger
+
+    def test_log_dir_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(log_mod.LOG_DIR_ENV, str(tmp_path / "env"))
+        log_mod.setup_logger("t_env", console_output=False).info("x")
+
+        assert _only_file(tmp_path / "env").name.startswith("t_env_")
+
+    def test_invalid_overflow(self, tmp_path):
+        with pytest.raises(ValueError):
+            log_mod.setup_logger("t_bad", console_output=False, log_dir=tmp_path, overflow="spill")
+
+
+class TestAsyncLogger:
+    def test_records_from_threads_are_written_by_writer(self, tmp_path):
+        logger = log_mod.setup_logger("t_async", console_output=False, log_dir=tmp_path, async_mode=True)
+        writer = log_mod._writers["t_async"]
+
+        def work(i):
+            for k in range(50):
+                logger.info("w%d-%d", i, k)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        log_mod.shutdown_logger("t_async")
+
+        lines = _only_file(tmp_path).read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1 + 200  # ログ開始 + 本文
+        assert writer.batches < 200  # flush はバッチ単位
+        assert logger.handlers == []  # 停止後はキューへ積まない
+
+    def test_json_lines_carry_stage_duration(self, tmp_path):
+        log_mod.setup_logger("t_json", console_output=False, log_dir=tmp_path, async_mode=True, json_lines=True)
+        with log_mod.LogContext("OCR"):
+            pass
+        with pytest.raises(RuntimeError):
+            with log_mod.LogContext("回転補正"):
+                raise RuntimeError("boom")
+        log_mod.shutdown_logger()
+
+        path = _only_file(tmp_path)
+        assert path.suffix == ".jsonl"
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        stages = {r["stage"]: r for r in records if "stage" in r}
+        assert set(stages) == {"OCR", "回転補正"}
+        assert stages["OCR"]["duration_ms"] >= 0
+        assert stages["回転補正"]["level"] == "ERROR"
+        failed = stages["回転補正"]
+        assert "RuntimeError: boom" in failed["exc"]  # 例外のトレースバックは exc に残る
+        assert "Traceback" not in failed["message"]
+
+    def test_text_lines_keep_traceback(self, tmp_path):
+        logger = log_mod.setup_logger("t_exc", console_output=False, log_dir=tmp_path, async_mode=True)
+        try:
+            raise ValueError("bad %s")
+        except ValueError:
+            logger.exception("failed %d", 3)
+        log_mod.shutdown_logger()
+
+        text = _only_file(tmp_path).read_text(encoding="utf-8")
+        assert "[ERROR] failed 3\nTraceback" in text
+        assert "ValueError: bad %s" in text
+
+    def test_stop_unregisters_atexit(self, tmp_path, monkeypatch):
+        registered = []
+        monkeypatch.setattr(log_mod.atexit, "register", registered.append)
+        monkeypatch.setattr(log_mod.atexit, "unregister", registered.remove)
+        log_mod.setup_logger("t_atexit", console_output=False, log_dir=tmp_path, async_mode=True)
+        log_mod.setup_logger("t_atexit", console_output=False, log_dir=tmp_path, async_mode=True)
+        assert len(registered) == 1  # 前の書き込みスレッドの分は外れている
+        log_mod.shutdown_logger()
+        assert registered == []
+
+    def test_env_enables_async(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(log_mod.LOG_ASYNC_ENV, "1")
+        logger = log_mod.setup_logger("t_async_env", console_output=False, log_dir=tmp_path)
+
+        assert isinstance(logger.handlers[0], log_mod._BoundedQueueHandler)
+
+    def test_drop_policy_counts_and_reports(self, tmp_path):
+        handler = log_mod._BoundedQueueHandler(queue.Queue(maxsize=1), overflow="drop")
+        record = logging.LogRecord("x", logging.INFO, __file__, 0, "m", None, None)
+        handler.enqueue(record)
+        handler.enqueue(record)
+        assert handler.dropped == 1
+
+        logger = log_mod.setup_logger("t_drop", console_output=False, log_dir=tmp_path, async_mode=True)
+        log_mod._writers["t_drop"].queue_handler.dropped = 3
+        logger.info("last")
+        log_mod.shutdown_logger("t_drop")
+
+        assert "3 件を破棄しました" in _only_file(tmp_path).read_text(encoding="utf-8")
+
+    def test_resetup_flushes_previous_writer(self, tmp_path):
+        logger = log_mod.setup_logger("t_again", console_output=False, log_dir=tmp_path, async_mode=True)
+        logger.info("first")
+        log_mod.setup_logger("t_again", console_output=False, log_dir=tmp_path, async_mode=True)
+        log_mod.shutdown_logger()
+
+        text = _only_file(tmp_path).read_text(encoding="utf-8")
+        assert "first" in text
+        assert text.count("ログ開始") == 2
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/main_44_rk10.py cmd_run_all（一括登録セッション）"""
+import http.server
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+
+# パスを通す（main_44_rk10 は tools/ 直下のモジュールを import する）
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+pytest.importorskip("fitz")
+
+import common.logger as common_logger  # noqa: E402
+import main_44_rk10 as rk  # noqa: E402
+import rakuraku_upload  # noqa: E402
+from common.spans import span  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def work(tmp_path, monkeypatch):
+    """work/output を tmp に向け、ロガーを差し替える。"""
+    monkeypatch.setattr(common_logger, "_logger", logging.getLogger("test_main_44_rk10"))
+    monkeypatch.setattr(rk, "DATA_JSON_PATH", tmp_path / "data.json")
+    monkeypatch.setattr(rk, "RESULT_JSON_PATH", tmp_path / "result.json")
+    monkeypatch.setattr(rk, "RUN_ALL_JOURNAL_PATH", tmp_path / "run_all_journal.jsonl")
+    return tmp_path
+
+
+def _write_data(work: Path, items: list[dict]) -> None:
+    (work / "data.json").write_text(json.dumps({"data": items}, ensure_ascii=False), encoding="utf-8")
+
+
+def _item(work: Path, i: int, *, content: bytes | None = b"%PDF-1.4 fake", **fields) -> dict:
+    pdf = work / "output" / f"vendor{i}_202603_{1000 + i}.pdf"
+    if content is not None:
+        pdf.parent.mkdir(exist_ok=True)
+        pdf.write_bytes(content + str(i).encode())
+    item = {
+        "_index": i,
+        "_pdf_path": str(pdf),
+        "_pdf_name": pdf.name,
+        "vendor_name": f"取引先{i}",
+        "issue_date": "20260331",
+        "amount": 1000 + i,
+        "invoice_number": f"T{1234567890123 + i}",
+    }
+    item.update(fields)
+    return item
+
+
+class FakeUploader:
+    """RakurakuUploader の代わり（ブラウザなし）。"""
+
+    instances: list["FakeUploader"] = []
+    fail_names: set[str] = set()
+    delay = 0.05
+
+    def __init__(self, config, explicit_waits=False):
+        self.explicit_waits = explicit_waits
+        self.page = None
+        self.starts = 0
+        self.logins = 0
+        self.closes = 0
+        self.registered: list[tuple[str, float, float]] = []
+        FakeUploader.instances.append(self)
+
+    def start_browser(self, headless=False):
+        self.starts += 1
+        self.page = object()
+
+    def login(self):
+        self.logins += 1
+
+    def register(self, data, dry_run=False):
+        t0 = time.perf_counter()
+        with span("upload"):
+            time.sleep(self.delay)
+        with span("submit"):
+            if Path(data.pdf_path).name in self.fail_names:
+                raise RuntimeError("確定ボタンが見つかりません")
+        self.registered.append((Path(data.pdf_path).name, t0, time.perf_counter()))
+        return True
+
+    def close_browser(self):
+        self.closes += 1
+
+
+@pytest.fixture
+def fake_uploader(monkeypatch):
+    FakeUploader.instances = []
+    FakeUploader.fail_names = set()
+    monkeypatch.setattr(rk, "RakurakuUploader", FakeUploader)
+    return FakeUploader
+
+
+# ---------------------------------------------------------------------------
+# prepare_entry
+# ---------------------------------------------------------------------------
+
+class TestPrepareEntry:
+    def test_valid_entry(self, work):
+        prepared = rk.prepare_entry(_item(work, 1))
+
+        assert prepared.error == ""
+        assert prepared.warnings == []
+        assert len(prepared.sha256) == 64
+        assert prepared.receipt.amount == 1001
+        assert prepared.receipt.trading_date == "20260331"
+
+    def test_missing_and_non_pdf_files_are_errors(self, work):
+        missing = rk.prepare_entry(_item(work, 1, content=None))
+        not_pdf = rk.prepare_entry(_item(work, 2, content=b"<html>"))
+
+        assert missing.error.startswith("ファイルが存在しません")
+        assert not_pdf.error.startswith("PDFではありません")
+        assert missing.receipt is None and not_pdf.receipt is None
+
+    def test_field_problems_are_warnings(self, work):
+        prepared = rk.prepare_entry(
+            _item(work, 1, vendor_name="", issue_date="2026/3/1", amount=0, invoice_number="1234")
+        )
+
+        assert prepared.error == ""
+        assert len(prepared.warnings) == 4
+        assert prepared.receipt is not None
+
+
+# ---------------------------------------------------------------------------
+# cmd_run_all
+# ---------------------------------------------------------------------------
+
+class TestRunAll:
+    def test_one_login_prefetch_and_timings(self, work, fake_uploader, monkeypatch):
+        items = [_item(work, i) for i in range(4)]
+        _write_data(work, items)
+        prepared_at: dict[str, tuple[float, int]] = {}
+        real_prepare = rk.prepare_entry
+
+        def recording_prepare(item):
+            prepared_at[item["_pdf_name"]] = (time.perf_counter(), threading.get_ident())
+            return real_prepare(item)
+
+        monkeypatch.setattr(rk, "prepare_entry", recording_prepare)
+
+        rc = rk.cmd_run_all({}, headless=True)
+
+        assert rc == 0
+        uploader = fake_uploader.instances[0]
+        assert uploader.explicit_waits
+        assert (uploader.starts, uploader.logins, uploader.closes) == (1, 1, 1)
+        # 次の件の準備は、前の件の登録が終わる前に別スレッドで始まっている
+        for (name, _, end), nxt in zip(uploader.registered, items[1:]):
+            started, thread_id = prepared_at[nxt["_pdf_name"]]
+            assert started < end, name
+            assert thread_id != threading.get_ident()
+
+        result = json.loads((work / "result.json").read_text(encoding="utf-8"))
+        assert result["summary"] == {"total": 4, "success": 4, "failed": 0, "resumed": 0}
+        timings = [r["timings_ms"] for r in result["results"]]
+        assert "login" in timings[0] and "login" not in timings[1]
+        for t in timings:
+            assert {"prepare", "upload", "submit", "total"} <= set(t)
+            assert t["upload"] >= 40
+
+    def test_rerun_skips_submitted_entries(self, work, fake_uploader):
+        items = [_item(work, i) for i in range(4)]
+        _write_data(work, items)
+        fake_uploader.fail_names = {items[2]["_pdf_name"]}
+
+        assert rk.cmd_run_all({}) == 1
+        first = fake_uploader.instances[0]
+        assert [r[0] for r in first.registered] == [items[i]["_pdf_name"] for i in (0, 1, 3)]
+        assert first.starts == 2  # 失敗後はブラウザを起動し直す
+
+        fake_uploader.fail_names = set()
+        assert rk.cmd_run_all({}) == 0
+        second = fake_uploader.instances[1]
+        assert [r[0] for r in second.registered] == [items[2]["_pdf_name"]]
+
+        result = json.loads((work / "result.json").read_text(encoding="utf-8"))
+        assert result["summary"] == {"total": 4, "success": 4, "failed": 0, "resumed": 3}
+        assert [r["pdf_name"] for r in result["results"]] == [i["_pdf_name"] for i in items]
+        assert [bool(r.get("resumed")) for r in result["results"]] == [True, True, False, True]
+
+    def test_changed_file_is_submitted_again(self, work, fake_uploader):
+        items = [_item(work, 0)]
+        _write_data(work, items)
+        assert rk.cmd_run_all({}) == 0
+
+        Path(items[0]["_pdf_path"]).write_bytes(b"%PDF-1.4 rescanned")
+        assert rk.cmd_run_all({}) == 0
+        assert len(fake_uploader.instances[1].registered) == 1
+
+    def test_no_resume_and_dry_run_ignore_checkpoint(self, work, fake_uploader):
+        _write_data(work, [_item(work, 0)])
+        assert rk.cmd_run_all({}) == 0
+        assert rk.cmd_run_all({}, resume=False) == 0
+        assert len(fake_uploader.instances[1].registered) == 1
+
+        (work / "run_all_journal.jsonl").unlink()
+        assert rk.cmd_run_all({}, dry_run=True) == 0
+        assert not (work / "run_all_journal.jsonl").exists()
+
+    def test_bad_files_do_not_start_browser(self, work, fake_uploader):
+        _write_data(work, [_item(work, 0, content=None), _item(work, 1, content=b"GIF89a")])
+
+        assert rk.cmd_run_all({}) == 1
+        assert fake_uploader.instances[0].starts == 0
+        result = json.loads((work / "result.json").read_text(encoding="utf-8"))
+        assert [r["status"] for r in result["results"]] == ["エラー", "エラー"]
+
+
+# ---------------------------------------------------------------------------
+# Mock form server（実ブラウザ。Chromium が起動できなければ skip）
+# ---------------------------------------------------------------------------
+
+_FORM_HTML = """<html><body>
+<form id="f" method="post" action="/sapEbookFile/register" enctype="application/x-www-form-urlencoded">
+  <input type="file" id="file">
+  <div id="ocr" style="display:none">
+    <input name="supplierName(0)"><input name="saimokuKingaku(0_1)">
+    <input name="tradingDateYear(0)"><input name="tradingDateMonth(0)"><input name="tradingDateDay(0)">
+    <input name="invoiceBusinessNumber(0)">
+  </div>
+  <button type="button" class="accesskeyOk" onclick="confirmSlip()">確定</button>
+</form>
+<div id="dlg" style="display:none"><button type="button" onclick="document.getElementById('f').submit()">OK</button></div>
+<script>
+document.getElementById('file').addEventListener('change', () => {
+  fetch('/ocr').then(() => setTimeout(() => {
+    document.getElementById('ocr').style.display = 'block';
+  }, 300));
+});
+function confirmSlip() {
+  if (!document.querySelector("[name='invoiceBusinessNumber(0)']").value) {
+    document.getElementById('dlg').style.display = 'block';
+  } else {
+    document.getElementById('f').submit();
+  }
+}
+</script></body></html>"""
+
+
+class _FormHandler(http.server.BaseHTTPRequestHandler):
+    logins = 0
+    registered: list[dict] = []
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _html(self, body: str) -> None:
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, cookie: bool = False) -> None:
+        self.send_response(302)
+        if cookie:
+            self.send_header("Set-Cookie", "sid=ok; Path=/")
+        self.send_header("Location", location)
+        self.end_headers()
+
+    def do_GET(self) -> None:  # noqa: N802
+        logged_in = "sid=ok" in (self.headers.get("Cookie") or "")
+        if self.path == "/":
+            return self._html(
+                '<form method="post" action="/login"><input name="loginId">'
+                '<input type="password" name="password"><button type="submit">ログイン</button></form>'
+            )
+        if not logged_in:
+            return self._redirect("/")
+        if self.path == "/mainView":
+            return self._html("<html><body>トップ</body></html>")
+        if self.path == "/sapEbookFile/initializeView":
+            return self._html(_FORM_HTML)
+        if self.path == "/ocr":
+            return self._html("ok")
+        self.send_error(404)
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if self.path == "/login":
+            type(self).logins += 1
+            return self._redirect("/mainView", cookie=True)
+        if self.path == "/sapEbookFile/register":
+            type(self).registered.append({k: v[0] for k, v in form.items()})
+            return self._html("<html><body>登録完了</body></html>")
+        self.send_error(404)
+
+
+@pytest.fixture
+def form_server():
+    _FormHandler.logins = 0
+    _FormHandler.registered = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FormHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestMockFormServer:
+    def test_batch_against_local_form(self, work, form_server, monkeypatch):
+        if not rakuraku_upload.PLAYWRIGHT_AVAILABLE:
+            pytest.skip("playwright not installed")
+        probe = rakuraku_upload.RakurakuUploader({})
+        try:
+            probe.start_browser(headless=True)
+        except Exception as e:
+            pytest.skip(f"chromium unavailable: {e}")
+        finally:
+            try:
+                probe.close_browser()
+            except Exception:
+                pass
+
+        monkeypatch.setattr(
+            rakuraku_upload.RakurakuUploader, "_get_credentials", lambda self: ("user", "pass")
+        )
+        items = [_item(work, 0), _item(work, 1, invoice_number="")]
+        _write_data(work, items)
+
+        rc = rk.cmd_run_all({"RAKURAKU_URL": form_server, "RAKURAKU_READY_TIMEOUT_MS": 5000}, headless=True)
+
+        assert rc == 0
+        assert _FormHandler.logins == 1
+        assert [r["supplierName(0)"] for r in _FormHandler.registered] == ["取引先0", "取引先1"]
+        assert [r["saimokuKingaku(0_1)"] for r in _FormHandler.registered] == ["1000", "1001"]
+        result = json.loads((work / "result.json").read_text(encoding="utf-8"))
+        assert all(r["timings_ms"]["total"] < 20000 for r in result["results"])
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/mcp-land-registry (http_pool / price_store / server.py)"""
+import asyncio
+import os
+import sys
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools", "mcp-land-registry"))
+
+import http_pool  # noqa: E402
+import price_store  # noqa: E402
+
+URL = "https://upstream.test/api"
+
+
+class _Upstream:
+    """httpx.MockTransport の相手。呼び出しを記録し、少し待ってから応答する。"""
+
+    def __init__(self, delay: float = 0.02, status: int = 200):
+        self.calls: list[httpx.Request] = []
+        self.delay = delay
+        self.status = status
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        await asyncio.sleep(self.delay)
+        return httpx.Response(self.status, json={"path": request.url.path, "n": len(self.calls),
+                                                 "q": dict(request.url.params)})
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pool(upstream, **kwargs) -> "http_pool.CachedHttpClient":
+    return http_pool.CachedHttpClient(transport=httpx.MockTransport(upstream), **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# CachedHttpClient
+# ---------------------------------------------------------------------------
+
+class TestCoalescing:
+    def test_concurrent_identical_gets_share_one_call(self):
+        upstream = _Upstream()
+
+        async def run():
+            pool = _pool(upstream)
+            try:
+                return await asyncio.gather(*[pool.get_json(URL, params={"city": "23210"}) for _ in range(10)])
+            finally:
+                await pool.aclose()
+
+        results = asyncio.run(run())
+        assert len(upstream.calls) == 1
+        assert all(r == results[0] for r in results)
+
+    def test_different_params_or_headers_are_separate(self):
+        upstream = _Upstream()
+
+        async def run():
+            pool = _pool(upstream)
+            try:
+                await asyncio.gather(
+                    pool.get_json(URL, params={"year": "2024", "city": "1"}),
+                    pool.get_json(URL, params={"city": "1", "year": "2024"}),  # 順不同は同一
+                    pool.get_json(URL, params={"year": "2023", "city": "1"}),
+                    pool.get_json(URL, params={"year": "2024", "city": "1"}, headers={"X-User-Id": "b"}),
+                )
+            finally:
+                await pool.aclose()
+
+        asyncio.run(run())
+        assert len(upstream.calls) == 3
+
+    def test_error_reaches_every_waiter_and_is_not_cached(self):
+        upstream = _Upstream(status=503)
+
+        async def run():
+            pool = _pool(upstream)
+            try:
+                first = await asyncio.gather(*[pool.get_json(URL, ttl=60) for _ in range(3)], return_exceptions=True)
+                upstream.status = 200
+                second = await pool.get_json(URL, ttl=60)
+                return first, second
+            finally:
+                await pool.aclose()
+
+        first, second = asyncio.run(run())
+        assert all(isinstance(e, httpx.HTTPStatusError) for e in first)
+        assert second["n"] == 2
+        assert len(upstream.calls) == 2
+
+    def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        upstream = _Upstream(delay=0.05)
+
+        async def run():
+            pool = _pool(upstream)
+            try:
+                a = asyncio.ensure_future(pool.get_json(URL))
+                b = asyncio.ensure_future(pool.get_json(URL))
+                await asyncio.sleep(0.01)
+                a.cancel()
+                return await b, a.cancelled()
+            finally:
+                await pool.aclose()
+
+        data, cancelled = asyncio.run(run())
+        assert cancelled
+        assert data["n"] == 1
+        assert len(upstream.calls) == 1
+
+
+class TestTtlCache:
+    def test_hit_until_expiry(self):
+        upstream = _Upstream(delay=0)
+        clock = _Clock()
+
+        async def run():
+            pool = _pool(upstream, clock=clock)
+            try:
+                a = await pool.get_json(URL, ttl=60)
+                clock.now += 59
+                b = await pool.get_json(URL, ttl=60)
+                clock.now += 2
+                c = await pool.get_json(URL, ttl=60)
+                return a, b, c
+            finally:
+                await pool.aclose()
+
+        a, b, c = asyncio.run(run())
+        assert a is b
+        assert c["n"] == 2
+
+    def test_ttl_zero_does_not_cache(self):
+        upstream = _Upstream(delay=0)
+
+        async def run():
+            pool = _pool(upstream)
+            try:
+                await pool.get_json(URL)
+                await pool.get_json(URL)
+            finally:
+                await pool.aclose()
+
+        asyncio.run(run())
+        assert len(upstream.calls) == 2
+
+    def test_lru_bound(self):
+        upstream = _Upstream(delay=0)
+
+        async def run():
+            pool = _pool(upstream, max_entries=2)
+            try:
+                for path in ("a", "b", "a", "c", "a", "b"):
+                    await pool.get_json(f"{URL}/{path}", ttl=60)
+            finally:
+                await pool.aclose()
+
+        asyncio.run(run())
+        # a は直近で使われたので残り、b は c の追加で追い出される
+        assert [r.url.path for r in upstream.calls] == ["/api/a", "/api/b", "/api/c", "/api/b"]
+
+    def test_invalidate_drops_cache_and_inflight_result(self):
+        upstream = _Upstream(delay=0.03)
+
+        async def run():
+            pool = _pool(upstream)
+            try:
+                await pool.get_json(f"{URL}/lands/1", ttl=60)
+                assert pool.invalidate(URL) == 1
+                slow = asyncio.ensure_future(pool.get_json(f"{URL}/lands/1", ttl=60))
+                await asyncio.sleep(0.01)
+                pool.invalidate(URL)  # 取得中に更新があった
+                await slow
+                return await pool.get_json(f"{URL}/lands/1", ttl=60)
+            finally:
+                await pool.aclose()
+
+        latest = asyncio.run(run())
+        assert latest["n"] == 3
+
+    def test_request_is_never_cached(self):
+        upstream = _Upstream(delay=0)
+
+        async def run():
+            pool = _pool(upstream)
+            try:
+                for _ in range(2):
+                    resp = await pool.request("POST", URL, json={"a": 1})
+                    assert resp.status_code == 200
+            finally:
+                await pool.aclose()
+
+        asyncio.run(run())
+        assert len(upstream.calls) == 2
+
+
+# ---------------------------------------------------------------------------
+# MarketPriceStore
+# ---------------------------------------------------------------------------
+
+DISTRICTS = ["一里山町", "今川町", "今岡町", "一ツ木町", "井ケ谷町", None]
+
+
+def _mlit_items(rng, n: int) -> list:
+    items = []
+    for _ in range(n):
+        item = {
+            "Type": rng.choice(["宅地(土地)", "宅地(土地と建物)", "中古マンション等", "宅地(土地)"]),
+            "TradePrice": str(rng.choice([0, rng.randrange(1, 500) * 100000])),
+            "Area": rng.choice([str(rng.randint(50, 600)), "0", "2000㎡以上"]),
+            "CityPlanning": rng.choice(["第一種住居地域", "市街化調整区域"]),
+            "Period": f"2024年第{rng.randint(1, 4)}四半期",
+        }
+        d = rng.choice(DISTRICTS)
+        if d is not None:
+            item["DistrictName"] = d
+        items.append(item)
+    return items
+
+
+def _reference_stats(items: list, district):
+    """旧 lookup_market_price の集計（取り込み前の Python 実装）。"""
+    lands = [i for i in items if "宅地(土地)" in i.get("Type", "")]
+    if district:
+        lands = [i for i in lands if district in i.get("DistrictName", "")]
+    tsubo, prices, areas = [], [], []
+    for item in lands:
+        p = int(item.get("TradePrice", 0))
+        try:
+            a = float(item.get("Area", 0))
+        except ValueError:
+            a = 0.0
+        if p > 0 and a > 0:
+            prices.append(p)
+            areas.append(a)
+            tsubo.append(p / (a / 3.30579))
+    return lands, tsubo, prices, areas
+
+
+class TestPriceStore:
+    def test_matches_python_aggregation(self):
+        import random
+
+        rng = random.Random(44)
+        store = price_store.MarketPriceStore(":memory:")
+        for year in (2023, 2024):
+            items = _mlit_items(rng, 300)
+            store.load("23210", year, items)
+            for district in [None, "", "町", "一", "今川", "井ケ谷町", "存在しない"]:
+                lands, tsubo, prices, areas = _reference_stats(items, district)
+                stats = store.stats("23210", year, district)
+                latest = store.latest("23210", year, district)
+                assert [t.trade_price for t in latest] == [int(i["TradePrice"]) for i in lands[:5]]
+                assert [t.district_name for t in latest] == [i.get("DistrictName") for i in lands[:5]]
+                if not lands:
+                    assert stats is None
+                    continue
+                assert stats.n_rows == len(lands)
+                assert stats.n_priced == len(tsubo)
+                if tsubo:
+                    assert abs(stats.avg_tsubo - int(sum(tsubo) / len(tsubo))) <= 1
+                    assert (stats.min_tsubo, stats.max_tsubo) == (int(min(tsubo)), int(max(tsubo)))
+                    assert stats.avg_price == int(sum(prices) / len(prices))
+                    assert abs(stats.avg_area - int(sum(areas) / len(areas))) <= 1
+        store.close()
+
+    def test_refresh_replaces_only_that_partition(self):
+        clock = _Clock()
+        store = price_store.MarketPriceStore(":memory:", max_age_s=100, clock=clock)
+        row = {"Type": "宅地(土地)", "TradePrice": "10000000", "Area": "100", "DistrictName": "今川町"}
+        store.load("23210", 2024, [row, row])
+        store.load("23212", 2024, [row])
+
+        clock.now += 99
+        assert store.is_fresh("23210", 2024)
+        clock.now += 2
+        assert not store.is_fresh("23210", 2024)
+
+        store.load("23210", 2024, [row])
+        assert store.stats("23210", 2024).n_rows == 1
+        assert store.stats("23212", 2024).n_rows == 1
+        assert store.is_fresh("23210", 2024) and not store.is_fresh("23212", 2024)
+        assert not store.has("23210", 2020)
+        store.close()
+
+    def test_only_unpriced_rows(self):
+        store = price_store.MarketPriceStore(":memory:")
+        store.load("23210", 2024, [{"Type": "宅地(土地)", "TradePrice": "0", "Area": "100"}])
+        stats = store.stats("23210", 2024)
+        assert (stats.n_rows, stats.n_priced) == (1, 0)
+        assert store.latest("23210", 2024)[0].district_name is None
+        store.close()
+
+
+# ---------------------------------------------------------------------------
+# server.py（mcp 未導入ならスキップ）
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def server(monkeypatch):
+    pytest.importorskip("mcp")
+    import server as srv
+
+    upstream = _Upstream(delay=0.01)
+
+    async def handler(request):
+        if request.url.host == "www.reinfolib.mlit.go.jp":
+            upstream.calls.append(request)
+            return httpx.Response(200, json={"data": [
+                {"Type": "宅地(土地)", "TradePrice": "30000000", "Area": "200", "DistrictName": "一里山町"},
+            ]})
+        if request.method == "GET":
+            return await upstream(request)
+        upstream.calls.append(request)
+        return httpx.Response(200, json={"request_id": "R1", "status": "submitted"})
+
+    monkeypatch.setattr(srv, "_http", _pool(handler))
+    monkeypatch.setattr(srv, "_prices", price_store.MarketPriceStore(":memory:"))
+    srv.upstream = upstream
+    yield srv
+    srv._prices.close()
+
+
+class TestServer:
+    def test_packet_fetch_is_coalesced_and_cached(self, server):
+        async def run():
+            await asyncio.gather(server._gather_property_data("L1"), server._gather_property_data("L1"))
+            await server._gather_property_data("L1")
+            await server.submit_for_approval("R1")
+            await server._gather_property_data("L1")
+
+        asyncio.run(run())
+        gets = [r for r in server.upstream.calls if r.method == "GET"]
+        assert len(gets) == 10  # 5 エンドポイント × (初回 + 更新後)
+
+    def test_market_price_is_cached(self, server):
+        async def run():
+            a = await server.lookup_market_price("刈谷市", year=2024)
+            b = await server.lookup_market_price("刈谷市", year=2024)
+            return a, b
+
+        a, b = asyncio.run(run())
+        assert a == b and "取引件数: 1件" in a
+        assert len(server.upstream.calls) == 1
+
+    def test_market_price_falls_back_to_stored_data(self, server):
+        async def run():
+            first = await server.lookup_market_price("刈谷市", district="一里山", year=2024)
+            server._prices.max_age_s = 0  # 取り直し対象にする
+            server._http = _pool(lambda request: httpx.Response(503))
+            second = await server.lookup_market_price("刈谷市", district="一里山", year=2024)
+            third = await server.lookup_market_price("安城市", year=2024)
+            await server._http.aclose()
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+        assert first == second
+        assert third == "ERROR: API returned 503"
+
+    def test_market_price_falls_back_on_timeout_and_bad_body(self, server):
+        def timeout(request):
+            raise httpx.ConnectTimeout("timed out", request=request)
+
+        async def run():
+            first = await server.lookup_market_price("刈谷市", year=2024)
+            server._prices.max_age_s = 0
+            server._http = _pool(timeout)
+            second = await server.lookup_market_price("刈谷市", year=2024)
+            third = await server.lookup_market_price("安城市", year=2024)
+            await server._http.aclose()
+            server._http = _pool(lambda request: httpx.Response(200, text="<html>maintenance</html>"))
+            fourth = await server.lookup_market_price("刈谷市", year=2024)
+            await server._http.aclose()
+            return first, second, third, fourth
+
+        first, second, third, fourth = asyncio.run(run())
+        assert first == second == fourth
+        assert third == "ERROR: API request failed (ConnectTimeout)"
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/ocr_recipe_engine.py (メモリ上のレシピ・並行実行・早期打ち切り・取引先別の優先順)"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+tools_dir = Path(__file__).resolve().parents[1] / "tools"
+if str(tools_dir) not in sys.path:
+    sys.path.insert(0, str(tools_dir))
+
+pytest.importorskip("cv2")
+
+import ocr_recipe_engine as eng  # noqa: E402
+
+FULL_TEXT = "株式会社テスト商事 御中\n請求金額 ¥12,800\n2026年4月1日"
+PARTIAL_TEXT = "請求金額 ¥12,800"
+
+
+def _tagging_recipe(code: int):
+    # 画像をレシピ固有の値で塗る（偽 OCR がどのレシピの画像か分かるように）
+    return lambda img: np.full_like(img, code)
+
+
+class FakeOcr:
+    """レシピごとに決めたテキスト・信頼度・遅延を返す。同時実行数の最大値を記録する。"""
+
+    def __init__(self, plan: dict[int, tuple[str, float, float]]):
+        self.plan = plan
+        self.calls: list[int] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, image):
+        code = int(image.flat[0])
+        with self._lock:
+            self.calls.append(code)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            text, conf, delay = self.plan[code]
+            time.sleep(delay)
+            if text is None:
+                raise RuntimeError("ocr failed")
+            return [([[0, 0], [1, 0], [1, 1], [0, 1]], line, conf) for line in text.split("\n")]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+RECIPE_CODES = {"original": 1, "sauvola": 2, "otsu": 3, "denoise": 4, "dilate": 5, "clahe": 6}
+
+
+def _engine(plan, *, threshold=0.85, workers=3, priors=None):
+    ocr = FakeOcr(plan)
+    recipes = {name: _tagging_recipe(code) for name, code in RECIPE_CODES.items()}
+    engine = eng.MultiRecipeEngine(
+        ocr_fn=ocr, recipes=recipes, threshold=threshold, workers=workers,
+        priors=priors or eng.RecipePriors(None),
+    )
+    return engine, ocr
+
+
+IMG = np.zeros((8, 8, 3), dtype=np.uint8)
+
+
+class TestEngine:
+    def test_matches_serial_best_when_no_early_stop(self):
+        plan = {
+            1: (PARTIAL_TEXT, 0.5, 0.01),
+            2: ("", 0.0, 0.0),
+            3: (FULL_TEXT, 0.6, 0.02),
+            4: (None, 0.0, 0.0),
+            5: (FULL_TEXT, 0.7, 0.005),
+            6: (PARTIAL_TEXT, 0.9, 0.0),
+        }
+        engine, ocr = _engine(plan, threshold=2.0)
+        outcome = engine.run(IMG)
+
+        serial = {}
+        for name, code in RECIPE_CODES.items():
+            text, conf, _ = plan[code]
+            if text is None:
+                continue
+            serial[name] = eng.score_result(text, conf, eng.extract_fields(text))
+        assert outcome.recipe == max(serial, key=serial.get) == "dilate"
+        assert outcome.scores == {k: round(v, 4) for k, v in serial.items()}
+        assert sorted(outcome.tried) == sorted(RECIPE_CODES)
+        assert outcome.fields == {"amount": 12800, "issue_date": "20260401", "vendor_name": "株式会社テスト商事 御中"}
+        assert not outcome.stopped_early
+        assert ocr.peak == 1  # OCR は既定で 1 件ずつ
+
+    def test_stops_early_once_threshold_cleared(self):
+        plan = {code: (PARTIAL_TEXT, 0.5, 0.05) for code in RECIPE_CODES.values()}
+        plan[1] = (FULL_TEXT, 0.99, 0.0)  # 最初のレシピで十分
+        engine, ocr = _engine(plan, threshold=0.5, workers=2)
+        outcome = engine.run(IMG)
+
+        assert outcome.recipe == "original" and outcome.stopped_early
+        assert len(ocr.calls) <= 3  # 打ち切り後は投入しない
+        assert "clahe" not in outcome.tried
+
+    def test_serialized_model_gets_no_ocr_after_early_stop(self):
+        """モデルがロックで直列な場合: 前処理だけ重なり、打ち切り後のレシピは OCR に来ない。"""
+        model_lock = threading.Lock()
+        prep_active = {"now": 0, "peak": 0}
+        prep_lock = threading.Lock()
+        ocr_calls: list[int] = []
+
+        def slow_recipe(code):
+            def recipe(img):
+                with prep_lock:
+                    prep_active["now"] += 1
+                    prep_active["peak"] = max(prep_active["peak"], prep_active["now"])
+                time.sleep(0.01 if code == 1 else 0.15)  # original の前処理だけ速い
+                with prep_lock:
+                    prep_active["now"] -= 1
+                return np.full_like(img, code)
+            return recipe
+
+        def locked_ocr(image):
+            code = int(image.flat[0])
+            assert model_lock.acquire(blocking=False), "OCR が同時に呼ばれた"
+            try:
+                ocr_calls.append(code)
+                time.sleep(0.01)
+                text, conf = (FULL_TEXT, 0.99) if code == 1 else (PARTIAL_TEXT, 0.3)
+                return [([[0, 0], [1, 0], [1, 1], [0, 1]], line, conf) for line in text.split("\n")]
+            finally:
+                model_lock.release()
+
+        engine = eng.MultiRecipeEngine(
+            ocr_fn=locked_ocr,
+            recipes={name: slow_recipe(code) for name, code in RECIPE_CODES.items()},
+            threshold=0.5, workers=3, priors=eng.RecipePriors(None),
+        )
+        outcome = engine.run(IMG)
+        time.sleep(0.3)  # 取り残されたワーカーの前処理が終わるのを待つ
+
+        assert outcome.recipe == "original" and outcome.stopped_early
+        assert prep_active["peak"] > 1
+        assert ocr_calls == [1]  # 前処理中だった他のレシピは OCR しない
+
+    def test_all_recipes_fail(self):
+        engine, _ = _engine({code: (None, 0.0, 0.0) for code in RECIPE_CODES.values()})
+        outcome = engine.run(IMG)
+        assert outcome.recipe == "none" and outcome.score == 0.0
+        assert len(outcome.tried) == 6
+
+
+class TestPriors:
+    def test_vendor_winner_is_tried_first_and_persisted(self, tmp_path):
+        path = tmp_path / "priors.json"
+        plan = {code: (PARTIAL_TEXT, 0.3, 0.0) for code in RECIPE_CODES.values()}
+        plan[6] = (FULL_TEXT, 0.99, 0.0)  # clahe だけ通る取引先
+        engine, _ = _engine(plan, threshold=0.5, workers=1, priors=eng.RecipePriors(path))
+
+        first = engine.run(IMG, vendor_hint="テスト商事")
+        assert first.recipe == "clahe" and first.tried[0] == "original"
+        engine.priors.save()
+
+        engine2, ocr2 = _engine(plan, threshold=0.5, workers=1, priors=eng.RecipePriors(path))
+        second = engine2.run(IMG, vendor_hint="テスト 商事")
+        assert second.tried == ["clahe"] and second.stopped_early
+        assert ocr2.calls == [6]
+
+        other = eng.RecipePriors(path).order("別の会社", list(RECIPE_CODES))
+        assert other[0] == "clahe"  # 取引先の記録が無ければ全体の勝ち数順
+
+    def test_corrupt_priors_file_is_ignored(self, tmp_path):
+        path = tmp_path / "priors.json"
+        path.write_text("{oops", encoding="utf-8")
+        assert eng.RecipePriors(path).order("x", ["a", "b"]) == ["a", "b"]
+
+
+class TestRecipes:
+    @pytest.mark.parametrize("name", list(eng.RECIPES))
+    def test_recipe_keeps_shape_and_input(self, name):
+        rng = np.random.default_rng(49)
+        img = rng.integers(0, 256, size=(64, 48, 3), dtype=np.uint8)
+        before = img.copy()
+        out = eng.RECIPES[name](img)
+        assert out.shape == img.shape and out.dtype == np.uint8
+        assert np.array_equal(img, before)
+
+    def test_vendor_from_filename(self):
+        assert eng.vendor_from_filename("東京電力_20260401_請求書.pdf") == "東京電力"
+        assert eng.vendor_from_filename("scan001.pdf") is None
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/common/ocr_server.py (常駐モデル・バッチ・クライアント・プロセス内フォールバック)"""
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.common import ocr_server
+
+
+class FakeReader:
+    """EasyOCR Reader の代わり。numpy のスカラを返す（送信時に素の値へ直す確認用）。"""
+
+    def __init__(self, languages, gpu):
+        self.languages = languages
+        self.calls = 0
+
+    def readtext(self, image, detail=1):
+        self.calls += 1
+        time.sleep(0.005)
+        label = f"shape={image.shape}" if isinstance(image, np.ndarray) else f"path={image}"
+        if "bad" in label:
+            raise ValueError("unreadable")
+        if not detail:
+            return [label]
+        return [(np.array([[0, 0], [10, 0], [10, 5], [0, 5]]), label, np.float64(0.9))]
+
+
+class FakeAnalyzer:
+    def __init__(self, lite_mode, gpu):
+        self.lite_mode = lite_mode
+
+    def __call__(self, image):
+        class _Result:
+            def model_dump(self_inner):
+                return {"paragraphs": [{"contents": "請求書"}], "tables": [{"cells": [{"contents": "1,000円"}]}]}
+
+        return _Result(), None, None
+
+
+def _pool(loads: list) -> ocr_server.ModelPool:
+    def easy(languages, gpu):
+        loads.append(("easyocr", languages, gpu))
+        return FakeReader(languages, gpu)
+
+    def yomi(lite_mode, gpu):
+        loads.append(("yomitoku", lite_mode, gpu))
+        return FakeAnalyzer(lite_mode, gpu)
+
+    return ocr_server.ModelPool(loaders={"easyocr": easy, "yomitoku": yomi})
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    loads: list = []
+    srv = ocr_server.OcrModelServer(pool=_pool(loads), batch_window_s=0.05, max_batch=8).start()
+    info = srv.write_info(tmp_path / "server.json")
+    monkeypatch.setenv("OCR_MODEL_SERVER_INFO", str(info))
+    monkeypatch.delenv("OCR_MODEL_SERVER", raising=False)
+    local_loads: list = []
+    monkeypatch.setattr(ocr_server, "_LOCAL_POOL", _pool(local_loads))
+    ocr_server.reset_client()
+    yield srv, loads, local_loads
+    ocr_server.reset_client()
+    srv.close()
+
+
+class TestServer:
+    def test_readtext_through_server(self, server):
+        srv, loads, local_loads = server
+        img = np.zeros((20, 30, 3), dtype=np.uint8)
+
+        detailed = ocr_server.easyocr_readtext(img)
+        lines = ocr_server.easyocr_readtext("page.png", detail=0)
+
+        assert detailed == [([[0, 0], [10, 0], [10, 5], [0, 5]], "shape=(20, 30, 3)", 0.9)]
+        assert lines == ["path=page.png"]
+        assert loads == [("easyocr", ("ja", "en"), False)]
+        assert local_loads == []
+
+    def test_concurrent_requests_share_one_model_and_batch(self, server):
+        srv, loads, _ = server
+        results: dict[int, list] = {}
+
+        def worker(i):
+            results[i] = ocr_server.easyocr_readtext(f"p{i}.png", detail=0)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == {i: [f"path=p{i}.png"] for i in range(12)}
+        assert len(loads) == 1
+        assert sum(srv.batch_sizes) == 12 and max(srv.batch_sizes) > 1
+        assert max(srv.batch_sizes) <= 8
+
+    def test_item_error_does_not_fail_batch(self, server):
+        with pytest.raises(RuntimeError, match="unreadable"):
+            ocr_server.easyocr_readtext("bad.png")
+        assert ocr_server.easyocr_readtext("ok.png", detail=0) == ["path=ok.png"]
+
+    def test_batch_call_is_one_request_in_input_order(self, server):
+        srv, loads, local_loads = server
+        images = [np.zeros((4 + i, 4, 3), dtype=np.uint8) for i in range(10)]
+        results = ocr_server.easyocr_readtext_batch(images)
+
+        assert [r[0][1] for r in results] == [f"shape=({4 + i}, 4, 3)" for i in range(10)]
+        assert sorted(srv.batch_sizes, reverse=True) == [8, 2]  # max_batch ずつ
+        assert len(loads) == 1 and local_loads == []
+
+    def test_batch_return_exceptions(self, server):
+        out = ocr_server.easyocr_readtext_batch(["a.png", "bad.png", "c.png"], detail=0, return_exceptions=True)
+        assert out[0] == ["path=a.png"] and out[2] == ["path=c.png"]
+        assert isinstance(out[1], RuntimeError) and "unreadable" in str(out[1])
+        with pytest.raises(RuntimeError, match="unreadable"):
+            ocr_server.easyocr_readtext_batch(["a.png", "bad.png"], detail=0)
+
+    def test_yomitoku_result_is_attribute_accessible(self, server):
+        result = ocr_server.yomitoku_analyze(np.zeros((4, 4, 3), dtype=np.uint8), lite_mode=True)
+        assert result.paragraphs[0].contents == "請求書"
+        assert result.tables[0].cells[0].contents == "1,000円"
+
+    def test_wrong_authkey_is_rejected(self, server, tmp_path):
+        srv, _, _ = server
+        client = ocr_server.OcrClient(srv.address, b"wrong" * 4)
+        assert client.ping() is False
+        assert ocr_server.OcrClient(srv.address, srv.authkey).ping() is True
+
+
+class TestFallback:
+    def test_no_server_runs_in_process(self, tmp_path, monkeypatch):
+        local_loads: list = []
+        monkeypatch.setattr(ocr_server, "_LOCAL_POOL", _pool(local_loads))
+        monkeypatch.setenv("OCR_MODEL_SERVER_INFO", str(tmp_path / "missing.json"))
+        ocr_server.reset_client()
+
+        assert ocr_server.easyocr_readtext("a.png", detail=0) == ["path=a.png"]
+        assert ocr_server.easyocr_readtext("b.png", detail=0) == ["path=b.png"]
+        assert local_loads == [("easyocr", ("ja", "en"), False)]  # プロセス内でも 1 回だけ読む
+
+    def test_batch_without_server(self, tmp_path, monkeypatch):
+        local_loads: list = []
+        monkeypatch.setattr(ocr_server, "_LOCAL_POOL", _pool(local_loads))
+        monkeypatch.setenv("OCR_MODEL_SERVER_INFO", str(tmp_path / "missing.json"))
+        ocr_server.reset_client()
+
+        out = ocr_server.easyocr_readtext_batch(["a.png", "bad.png"], detail=0, return_exceptions=True)
+        assert out[0] == ["path=a.png"] and isinstance(out[1], ValueError)
+        assert len(local_loads) == 1
+
+    def test_server_gone_falls_back(self, server):
+        srv, _, local_loads = server
+        assert ocr_server.easyocr_readtext("a.png", detail=0) == ["path=a.png"]
+        srv.close()
+        time.sleep(0.05)
+
+        assert ocr_server.easyocr_readtext("b.png", detail=0) == ["path=b.png"]
+        assert local_loads == [("easyocr", ("ja", "en"), False)]
+
+    def test_model_missing_on_server_falls_back(self, tmp_path, monkeypatch):
+        srv = ocr_server.OcrModelServer(pool=ocr_server.ModelPool(loaders={})).start()
+        try:
+            monkeypatch.setenv("OCR_MODEL_SERVER_INFO", str(srv.write_info(tmp_path / "server.json")))
+            local_loads: list = []
+            monkeypatch.setattr(ocr_server, "_LOCAL_POOL", _pool(local_loads))
+            ocr_server.reset_client()
+
+            assert ocr_server.easyocr_readtext("a.png", detail=0) == ["path=a.png"]
+            assert local_loads == [("easyocr", ("ja", "en"), False)]
+        finally:
+            ocr_server.reset_client()
+            srv.close()
+
+    def test_disabled_by_env(self, server, monkeypatch):
+        _, loads, local_loads = server
+        monkeypatch.setenv("OCR_MODEL_SERVER", "off")
+        ocr_server.easyocr_readtext("a.png", detail=0)
+        assert loads == [] and len(local_loads) == 1
+
+    def test_info_file_format(self, server, tmp_path):
+        srv, _, _ = server
+        info = json.loads((tmp_path / "server.json").read_text(encoding="utf-8"))
+        assert (info["host"], info["port"]) == tuple(srv.address)
+        assert bytes.fromhex(info["authkey"]) == srv.authkey
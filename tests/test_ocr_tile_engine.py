@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/ocr_tile_engine.py (メモリ上のタイル・一括認識・格子バケットでの重複除去・低信頼タイルの再分割)"""
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+tools_dir = Path(__file__).resolve().parents[1] / "tools"
+if str(tools_dir) not in sys.path:
+    sys.path.insert(0, str(tools_dir))
+
+pytest.importorskip("cv2")
+
+import ocr_tile_engine as tile  # noqa: E402
+
+
+def _reference_merge(all_detections, radius=20):
+    """scratchpad/method4_tile_ocr.py の総当たり版（比較用にそのまま写したもの）"""
+    if not all_detections:
+        return []
+
+    def center(bbox):
+        xs = [p[0] for p in bbox]
+        ys = [p[1] for p in bbox]
+        return sum(xs) / len(xs), sum(ys) / len(ys)
+
+    all_detections = sorted(all_detections, key=lambda d: (center(d[0])[1], center(d[0])[0]))
+    merged = []
+    used = set()
+    for i, (bbox_i, text_i, conf_i) in enumerate(all_detections):
+        if i in used:
+            continue
+        cx_i, cy_i = center(bbox_i)
+        best_idx = i
+        for j in range(i + 1, len(all_detections)):
+            if j in used:
+                continue
+            cx_j, cy_j = center(all_detections[j][0])
+            if abs(cx_i - cx_j) < radius and abs(cy_i - cy_j) < radius:
+                if all_detections[j][2] > all_detections[best_idx][2]:
+                    used.add(best_idx)
+                    best_idx = j
+                else:
+                    used.add(j)
+        merged.append(all_detections[best_idx])
+        used.add(best_idx)
+    return merged
+
+
+def _box(x, y, w=12, h=8):
+    return [[x, y], [x + w, y], [x + w, y + h], [x, y + h]]
+
+
+class FakeBatchOcr:
+    """タイルの左上画素に埋めた値から検出を返す。呼び出しごとの画像枚数を記録する。"""
+
+    def __init__(self, conf_for):
+        self.conf_for = conf_for
+        self.batches: list[list[tuple]] = []
+
+    def __call__(self, images):
+        self.batches.append([im.shape for im in images])
+        out = []
+        for im in images:
+            h, w = im.shape[:2]
+            conf = self.conf_for(im)
+            if conf is None:
+                out.append(RuntimeError("ocr failed"))
+            elif conf == 0:
+                out.append([])
+            else:
+                out.append([(_box(w // 2 - 6, h // 2 - 4), f"{w}x{h}", conf)])
+        return out
+
+
+def _page(low_region=None, h=900, w=1200):
+    # 既定は高信頼（値 200）。low_region=(x1, y1, x2, y2) は低信頼（値 50）
+    img = np.full((h, w, 3), 200, dtype=np.uint8)
+    if low_region:
+        x1, y1, x2, y2 = low_region
+        img[y1:y2, x1:x2] = 50
+    return img
+
+
+def _conf_by_pixel(im):
+    return 0.3 if im[0, 0, 0] == 50 else 0.95
+
+
+class TestSplitTiles:
+    def test_covers_page_with_overlap(self):
+        tiles = tile.split_tiles(1200, 900, 3, 3, 0.10)
+        assert len(tiles) == 9
+        assert tiles[0] == tile.Tile(0, 0, 440, 330)
+        assert tiles[4] == tile.Tile(360, 270, 480, 360)
+        covered = np.zeros((900, 1200), dtype=bool)
+        for t in tiles:
+            covered[t.y:t.y + t.h, t.x:t.x + t.w] = True
+        assert covered.all()
+
+    def test_view_is_not_a_copy(self):
+        img = _page()
+        v = tile.split_tiles(1200, 900)[4].view(img)
+        assert np.shares_memory(v, img)
+
+
+class TestMerge:
+    def test_matches_quadratic_reference(self):
+        rng = random.Random(50)
+        for _ in range(40):
+            dets = []
+            for k in range(rng.randint(0, 120)):
+                x, y = rng.uniform(0, 300), rng.uniform(0, 300)
+                conf = rng.choice([0.5, 0.7, 0.9, rng.random()])
+                dets.append((_box(x, y), f"t{k}", conf))
+            assert tile.merge_detections(dets) == _reference_merge(dets)
+
+    def test_overlap_duplicates_keep_higher_confidence(self):
+        dets = [(_box(100, 100), "請求書", 0.6), (_box(105, 103), "請求書", 0.9), (_box(300, 100), "合計", 0.8)]
+        merged = tile.merge_detections(dets)
+        assert [(d[1], d[2]) for d in merged] == [("請求書", 0.9), ("合計", 0.8)]
+
+
+class TestEngine:
+    def test_single_batch_with_page_coordinates(self):
+        ocr = FakeBatchOcr(_conf_by_pixel)
+        result = tile.TileOcrEngine(batch_ocr_fn=ocr).run(_page())
+
+        assert len(ocr.batches) == 1 and len(ocr.batches[0]) == 10  # 9 タイル + 全ページ
+        assert result.ocr_calls == 1 and result.subdivided == 0
+        centers = sorted(tile._center(d[0]) for d in result.detections)
+        assert centers[0] == (220.0, 165.0)  # タイル (0, 0, 440, 330) の中央
+        assert len(result.detections) == 9
+        assert result.full_text == "1200x900" and result.full_confidence == 0.95
+
+    def test_only_low_confidence_tile_is_subdivided(self):
+        # 右下タイル（x >= 760, y >= 570）だけ低信頼。細かくすれば読める想定
+        ocr = FakeBatchOcr(lambda im: 0.3 if im[0, 0, 0] == 50 and im.shape[0] > 200 else 0.95)
+        engine = tile.TileOcrEngine(batch_ocr_fn=ocr, max_depth=1, min_tile_px=100)
+        result = engine.run(_page(low_region=(760, 570, 1200, 900)))
+
+        assert result.ocr_calls == 2 and result.subdivided == 1
+        assert len(ocr.batches[1]) == 4  # 低信頼の 1 タイルだけ 2x2
+        assert result.tiles_recognized == 13
+        assert all(d[2] == 0.95 for d in result.detections)
+
+    def test_subdivision_kept_only_if_it_helps(self):
+        ocr = FakeBatchOcr(_conf_by_pixel)
+        engine = tile.TileOcrEngine(batch_ocr_fn=ocr, min_tile_px=100)
+        result = engine.run(_page(low_region=(760, 570, 1200, 900)))  # 子タイルも低信頼のまま
+
+        assert result.ocr_calls == 2 and result.subdivided == 0
+        assert sum(1 for d in result.detections if d[2] == 0.3) == 1
+
+    def test_blank_and_failed_tiles_are_not_subdivided(self):
+        def conf(im):
+            v = im[0, 0, 0]
+            return None if v == 10 else 0 if v == 50 else 0.95
+
+        img = _page(low_region=(0, 0, 10, 10))  # 左上タイルは余白
+        img[570:, 760:] = 10  # 右下タイルは認識失敗
+        ocr = FakeBatchOcr(conf)
+        result = tile.TileOcrEngine(batch_ocr_fn=ocr, min_tile_px=100).run(img)
+        assert result.ocr_calls == 1 and len(result.detections) == 7
+
+    def test_min_tile_size_stops_subdivision(self):
+        ocr = FakeBatchOcr(lambda im: 0.3)
+        result = tile.TileOcrEngine(batch_ocr_fn=ocr, max_depth=3, min_tile_px=400).run(_page())
+        assert result.ocr_calls == 1
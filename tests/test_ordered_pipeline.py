@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/common/ordered_pipeline.py"""
+import os
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.common.ordered_pipeline import OrderedPipeline, PipelineCancelled
+
+
+def _slow_square(x: int, delay: float) -> int:
+    time.sleep(delay)
+    return x * x
+
+
+class TestOrderedPipeline:
+    def test_results_follow_submission_order(self):
+        rng = random.Random(30)
+        with OrderedPipeline(workers=4, max_queued=3) as pipe:
+            tickets = [pipe.submit(_slow_square, i, rng.uniform(0, 0.01)) for i in range(30)]
+            got = [t.result() for t in tickets]
+
+        assert got == [i * i for i in range(30)]
+        st = pipe.stats()
+        assert st.submitted == st.completed == 30
+        assert st.max_depth["queued"] <= 3 + 1  # +1: 投入待ちの 1 件
+        assert st.max_depth["running"] <= 4
+
+    def test_backpressure_blocks_producer(self):
+        gate = threading.Event()
+        with OrderedPipeline(workers=1, max_queued=1) as pipe:
+            first = pipe.submit(gate.wait)
+            pipe.submit(lambda: None)  # キューを埋める
+
+            timer = threading.Timer(0.2, gate.set)
+            timer.start()
+            t0 = time.perf_counter()
+            pipe.submit(lambda: None)  # gate が開くまでブロック
+            waited = time.perf_counter() - t0
+            first.result()
+
+        assert waited >= 0.15
+        assert pipe.stats().producer_blocked >= 1
+        assert pipe.stats().producer_blocked_seconds >= 0.15
+
+    def test_worker_exception_is_reraised_in_order(self):
+        def boom() -> None:
+            raise ValueError("bad pdf")
+
+        with OrderedPipeline(workers=2) as pipe:
+            ok = pipe.submit(lambda: "ok")
+            bad = pipe.submit(boom)
+            assert ok.result() == "ok"
+            with pytest.raises(ValueError, match="bad pdf"):
+                bad.result()
+
+        assert pipe.stats().failed == 1
+
+    def test_inline_mode_runs_in_caller_thread(self):
+        caller = threading.get_ident()
+        with OrderedPipeline(workers=0) as pipe:
+            t = pipe.submit(threading.get_ident)
+            assert t.done()
+            assert t.result() == caller
+
+    def test_close_with_cancel_drops_pending(self):
+        gate = threading.Event()
+        pipe = OrderedPipeline(workers=1, max_queued=4)
+        running = pipe.submit(gate.wait)
+        pending = [pipe.submit(lambda: None) for _ in range(3)]
+        time.sleep(0.05)
+        threading.Timer(0.05, gate.set).start()
+
+        st = pipe.close(cancel_pending=True)
+
+        assert running.result() is True
+        assert st.cancelled == 3
+        for t in pending:
+            with pytest.raises(PipelineCancelled):
+                t.result()
+
+    def test_awaiting_merge_depth_tracks_untaken_results(self):
+        with OrderedPipeline(workers=2) as pipe:
+            tickets = [pipe.submit(lambda i=i: i) for i in range(5)]
+            while not all(t.done() for t in tickets):
+                time.sleep(0.001)
+            assert pipe.stats().max_depth["awaiting_merge"] == 5
+            [t.result() for t in tickets]
+
+        assert "awaiting_merge_depth(max=5" in pipe.stats().summary()
@@ -2,6 +2,7 @@ import importlib.util
 import sys
 import unittest
 from pathlib import Path
+from unittest import mock
 
 
 def _load_module() -> object:
@@ -65,3 +66,26 @@ class TestExtractInvoiceFields(unittest.TestCase):
         self.assertEqual(fields.vendor, "キョーワ株式会社")
         self.assertEqual(fields.issue_date, "20260125")
         self.assertEqual(fields.amount, 285_758)
+
+
+class TestEasyocrFallback(unittest.TestCase):
+    def test_model_unavailable_is_raised_once(self) -> None:
+        calls = []
+
+        def readtext(*args, **kwargs):
+            calls.append(args)
+            raise MODULE.ModelUnavailable("easyocr が利用できません。")  # type: ignore[attr-defined]
+
+        with mock.patch.multiple(
+            MODULE,
+            _EASYOCR_AVAILABLE=True,
+            _PYMUPDF_AVAILABLE=True,
+            _render_pdf_first_page_png=lambda *a, **k: None,
+            _preprocess_png_for_ocr=lambda p: p,
+            easyocr_readtext=readtext,
+        ):
+            with self.assertRaises(MODULE.ModelUnavailable):  # type: ignore[attr-defined]
+                MODULE._extract_pdf_text_easyocr_ocr(Path("a.pdf"), run_dir=Path("."))  # type: ignore[attr-defined]
+
+        # The 300 dpi attempt is skipped: it would fail the same way.
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,254 @@
+import importlib.util
+import re
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+
+def _load_module() -> object:
+    repo_root = Path(__file__).resolve().parents[1]
+    module_path = repo_root / "tools" / "outlook_save_pdf_and_batch_print.py"
+    spec = importlib.util.spec_from_file_location(
+        "outlook_save_pdf_and_batch_print", module_path
+    )
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"failed to load module: {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses (and other stdlib pieces) may look up the module in sys.modules.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)  # type: ignore[call-arg]
+    return module
+
+
+MODULE = _load_module()
+
+
+# ---------------------------------------------------------------------------
+# Fake Outlook COM object model (Items / MailItem / Folder)
+# ---------------------------------------------------------------------------
+
+class ComCallCounter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+
+class FakeAttachments:
+    def __init__(self, count: int) -> None:
+        self.Count = count
+
+
+class FakeItem:
+    """MailItem-like object. Each property read counts as one cross-process call."""
+
+    def __init__(
+        self,
+        counter: ComCallCounter,
+        *,
+        entry_id: str,
+        received: datetime,
+        unread: bool = True,
+        message_class: str = "IPM.Note",
+        attachments: int = 1,
+    ) -> None:
+        self._counter = counter
+        self._props = {
+            "EntryID": entry_id,
+            "ReceivedTime": received,
+            "UnRead": unread,
+            "MessageClass": message_class,
+            "Class": 43 if message_class.startswith("IPM.Note") else 46,
+            "Attachments": FakeAttachments(attachments),
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        props = self.__dict__.get("_props", {})
+        if name in props:
+            self.__dict__["_counter"].calls += 1
+            return props[name]
+        raise AttributeError(name)
+
+
+_CLAUSE_RE = re.compile(r'^"(?P<prop>[^"]+)"\s*(?P<op>>=|=|LIKE)\s*(?P<value>.+)$')
+
+
+def _dasl_predicate(clause: str):
+    m = _CLAUSE_RE.match(clause.strip())
+    if m is None:
+        raise ValueError(f"unsupported DASL clause: {clause}")
+    prop, op, value = m.group("prop"), m.group("op"), m.group("value").strip("'")
+    if prop.endswith("0x001A001F") and op == "LIKE":
+        prefix = value.rstrip("%")
+        return lambda it: it._props["MessageClass"].startswith(prefix)
+    if prop == "urn:schemas:httpmail:datereceived" and op == ">=":
+        since = datetime.strptime(value, "%Y/%m/%d %H:%M").replace(tzinfo=timezone.utc)
+        return lambda it: it._props["ReceivedTime"].astimezone(timezone.utc) >= since
+    if prop == "urn:schemas:httpmail:read" and op == "=":
+        return lambda it: (not it._props["UnRead"]) == bool(int(value))
+    if prop == "urn:schemas:httpmail:hasattachment" and op == "=":
+        return lambda it: (it._props["Attachments"].Count > 0) == bool(int(value))
+    raise ValueError(f"unsupported DASL clause: {clause}")
+
+
+class FakeItems:
+    """Outlook Items collection: 1-based Item(i), Sort, Restrict, GetFirst/GetNext."""
+
+    def __init__(self, counter: ComCallCounter, items: list[FakeItem], *, restrict_error: bool = False) -> None:
+        self._counter = counter
+        self._items = list(items)
+        self._cursor = 0
+        self._restrict_error = restrict_error
+
+    @property
+    def Count(self) -> int:  # noqa: N802
+        self._counter.calls += 1
+        return len(self._items)
+
+    def Item(self, i: int) -> FakeItem:  # noqa: N802
+        self._counter.calls += 1
+        return self._items[i - 1]
+
+    def Sort(self, prop: str, descending: bool = False) -> None:  # noqa: N802
+        self._counter.calls += 1
+        assert prop == "[ReceivedTime]"
+        self._items.sort(key=lambda it: it._props["ReceivedTime"], reverse=descending)
+
+    def Restrict(self, flt: str) -> "FakeItems":  # noqa: N802
+        self._counter.calls += 1
+        if self._restrict_error:
+            raise RuntimeError("The condition is not valid.")
+        assert flt.startswith("@SQL=")
+        preds = [_dasl_predicate(c) for c in flt[len("@SQL="):].split(" AND ")]
+        kept = [it for it in self._items if all(p(it) for p in preds)]
+        return FakeItems(self._counter, kept)
+
+    def GetFirst(self) -> FakeItem | None:  # noqa: N802
+        self._counter.calls += 1
+        self._cursor = 0
+        return self._items[0] if self._items else None
+
+    def GetNext(self) -> FakeItem | None:  # noqa: N802
+        self._counter.calls += 1
+        self._cursor += 1
+        return self._items[self._cursor] if self._cursor < len(self._items) else None
+
+
+class FakeFolder:
+    def __init__(self, items: list[FakeItem], *, restrict_error: bool = False) -> None:
+        self.counter = ComCallCounter()
+        for it in items:
+            it.__dict__["_counter"] = self.counter
+        self._items = items
+        self._restrict_error = restrict_error
+
+    @property
+    def Items(self) -> FakeItems:  # noqa: N802
+        # Outlook returns a fresh collection on every access.
+        self.counter.calls += 1
+        return FakeItems(self.counter, self._items, restrict_error=self._restrict_error)
+
+
+def _build_inbox(n: int, *, now: datetime) -> list[FakeItem]:
+    counter = ComCallCounter()
+    items = []
+    for i in range(n):
+        items.append(
+            FakeItem(
+                counter,
+                entry_id=f"E{i:04d}",
+                received=now - timedelta(hours=i),
+                unread=(i % 3 != 0),
+                message_class="IPM.Schedule.Meeting.Request" if i % 17 == 0 else "IPM.Note",
+                attachments=0 if i % 5 == 0 else 1,
+            )
+        )
+    return items
+
+
+def _ids(items: list[Any]) -> list[str]:
+    return [it._props["EntryID"] for it in items]
+
+
+class TestBuildMailRestrictFilter(unittest.TestCase):
+    def test_filter_contains_requested_clauses(self) -> None:
+        since = datetime(2026, 3, 1, 9, 30, tzinfo=timezone(timedelta(hours=9)))
+        flt = MODULE._build_mail_restrict_filter(  # type: ignore[attr-defined]
+            received_since=since, unread_only=True, require_attachments=True
+        )
+        self.assertTrue(flt.startswith("@SQL="))
+        self.assertIn("\"urn:schemas:httpmail:datereceived\" >= '2026/03/01 00:30'", flt)
+        self.assertIn('"urn:schemas:httpmail:read" = 0', flt)
+        self.assertIn('"urn:schemas:httpmail:hasattachment" = 1', flt)
+
+    def test_attachments_not_required_by_default(self) -> None:
+        flt = MODULE._build_mail_restrict_filter(received_since=None, unread_only=False)  # type: ignore[attr-defined]
+        self.assertNotIn("hasattachment", flt)
+        self.assertNotIn("datereceived", flt)
+
+
+class TestIterMailItems(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_path = Path(self._tmp.name) / "run.log"
+        self.now = datetime(2026, 3, 31, 12, 0, 0)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_restrict_matches_full_scan(self) -> None:
+        # Arrange
+        cutoff = self.now - timedelta(days=3)
+        restricted_folder = FakeFolder(_build_inbox(400, now=self.now))
+        scan_folder = FakeFolder(_build_inbox(400, now=self.now))
+
+        for unread_only in (True, False):
+            for max_messages in (5, 40, 1000):
+                # Act
+                got = MODULE._iter_mail_items(  # type: ignore[attr-defined]
+                    restricted_folder, unread_only, max_messages, received_since=cutoff
+                )
+                expected = MODULE._iter_mail_items(  # type: ignore[attr-defined]
+                    scan_folder, unread_only, max_messages, received_since=cutoff, use_restrict=False
+                )
+
+                # Assert
+                self.assertEqual(_ids(got), _ids(expected), (unread_only, max_messages))
+
+    def test_restrict_uses_far_fewer_com_calls(self) -> None:
+        cutoff = self.now - timedelta(days=2)
+        restricted_folder = FakeFolder(_build_inbox(1000, now=self.now))
+        scan_folder = FakeFolder(_build_inbox(1000, now=self.now))
+
+        MODULE._iter_mail_items(restricted_folder, True, 200, received_since=cutoff)  # type: ignore[attr-defined]
+        MODULE._iter_mail_items(  # type: ignore[attr-defined]
+            scan_folder, True, 200, received_since=cutoff, use_restrict=False
+        )
+
+        self.assertLess(restricted_folder.counter.calls * 5, scan_folder.counter.calls)
+
+    def test_paging_stops_at_max_messages(self) -> None:
+        folder = FakeFolder(_build_inbox(300, now=self.now))
+
+        got = MODULE._iter_mail_items(folder, False, 10)  # type: ignore[attr-defined]
+
+        self.assertEqual(len(got), 10)
+        received = [it._props["ReceivedTime"] for it in got]
+        self.assertEqual(received, sorted(received, reverse=True))
+        self.assertLess(folder.counter.calls, 40)
+
+    def test_falls_back_to_scan_when_restrict_fails(self) -> None:
+        cutoff = self.now - timedelta(days=1)
+        folder = FakeFolder(_build_inbox(60, now=self.now), restrict_error=True)
+        expected_folder = FakeFolder(_build_inbox(60, now=self.now))
+
+        got = MODULE._iter_mail_items(  # type: ignore[attr-defined]
+            folder, True, 50, received_since=cutoff, log_path=self.log_path
+        )
+        expected = MODULE._iter_mail_items(  # type: ignore[attr-defined]
+            expected_folder, True, 50, received_since=cutoff, use_restrict=False
+        )
+
+        self.assertEqual(_ids(got), _ids(expected))
+        self.assertIn("fallback to full scan", self.log_path.read_text(encoding="utf-8"))
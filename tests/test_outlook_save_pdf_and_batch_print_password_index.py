@@ -0,0 +1,171 @@
+import importlib.util
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+def _load_module() -> object:
+    repo_root = Path(__file__).resolve().parents[1]
+    module_path = repo_root / "tools" / "outlook_save_pdf_and_batch_print.py"
+    spec = importlib.util.spec_from_file_location(
+        "outlook_save_pdf_and_batch_print", module_path
+    )
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"failed to load module: {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses (and other stdlib pieces) may look up the module in sys.modules.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)  # type: ignore[call-arg]
+    return module
+
+
+MODULE = _load_module()
+
+
+def _linear_candidates(target_time, target_sender, notes):
+    """Reference implementation: the original three full scans."""
+    addr = MODULE._extract_email_address(target_sender)  # type: ignore[attr-defined]
+    domain = MODULE._extract_email_domain(target_sender)  # type: ignore[attr-defined]
+    stages = [
+        (30, lambda n: addr and MODULE._extract_email_address(n.sender) == addr),  # type: ignore[attr-defined]
+        (180, lambda n: domain and MODULE._extract_email_domain(n.sender) == domain),  # type: ignore[attr-defined]
+        (600, lambda n: True),
+    ]
+    for window_s, match in stages:
+        scored = [
+            (abs((n.received_time - target_time).total_seconds()), n.password)
+            for n in notes
+            if match(n) and abs((n.received_time - target_time).total_seconds()) <= window_s
+        ]
+        if scored:
+            return MODULE._deduplicate_passwords(scored)  # type: ignore[attr-defined]
+    return []
+
+
+class TestPasswordNoteIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_path = Path(self._tmp.name) / "run.log"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_index_matches_linear_scan(self) -> None:
+        # Arrange
+        rng = random.Random(20260418)
+        base = datetime(2026, 3, 31, 9, 0, 0)
+        senders = [
+            "経理 <billing@vendor-a.co.jp>",
+            "noreply@vendor-a.co.jp",
+            "Info <info@vendor-b.jp>",
+            "hennge@hennge-mail.example",
+            "",
+        ]
+        notes = [
+            MODULE.PasswordNote(  # type: ignore[attr-defined]
+                received_time=base + timedelta(seconds=rng.randint(0, 3600)),
+                subject="パスワードのお知らせ",
+                password=f"pw{rng.randint(0, 40)}",
+                sender=rng.choice(senders),
+            )
+            for _ in range(300)
+        ]
+        index = MODULE.PasswordNoteIndex(notes)  # type: ignore[attr-defined]
+
+        for _ in range(200):
+            target_time = base + timedelta(seconds=rng.randint(-600, 4200))
+            target_sender = rng.choice(senders + ["other@unknown.example"])
+
+            # Act
+            got = MODULE._candidate_passwords_with_fallback(  # type: ignore[attr-defined]
+                target_time=target_time,
+                target_sender=target_sender,
+                notes=index,
+                log_path=self.log_path,
+            )
+
+            # Assert
+            self.assertEqual(got, _linear_candidates(target_time, target_sender, notes))
+
+    def test_plain_sequence_is_accepted(self) -> None:
+        # Arrange
+        t = datetime(2026, 3, 31, 9, 0, 0)
+        notes = [
+            MODULE.PasswordNote(  # type: ignore[attr-defined]
+                received_time=t + timedelta(seconds=10),
+                subject="pw",
+                password="secret",
+                sender="a@example.com",
+            )
+        ]
+
+        # Act
+        got = MODULE._candidate_passwords_with_fallback(  # type: ignore[attr-defined]
+            target_time=t, target_sender="A <a@example.com>", notes=notes, log_path=self.log_path
+        )
+
+        # Assert
+        self.assertEqual(got, ["secret"])
+
+
+class TestFindPdfPassword(unittest.TestCase):
+    def setUp(self) -> None:
+        if not MODULE._PYPDF_AVAILABLE:  # type: ignore[attr-defined]
+            self.skipTest("pypdf not installed")
+        from pypdf import PdfReader, PdfWriter
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        writer = PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        writer.encrypt("right-pw", algorithm="RC4-128")
+        self.encrypted = self.tmp / "invoice.pdf"
+        with self.encrypted.open("wb") as f:
+            writer.write(f)
+        self.PdfReader = PdfReader
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_returns_matching_candidate(self) -> None:
+        reader = self.PdfReader(str(self.encrypted))
+        got = MODULE._find_pdf_password(  # type: ignore[attr-defined]
+            reader, ["a", "b", "right-pw", "c"], max_workers=3
+        )
+        self.assertEqual(got, "right-pw")
+        self.assertEqual(len(reader.pages), 1)
+
+    def test_returns_none_when_no_match(self) -> None:
+        reader = self.PdfReader(str(self.encrypted))
+        got = MODULE._find_pdf_password(reader, ["a", "b"])  # type: ignore[attr-defined]
+        self.assertIsNone(got)
+
+    def test_decrypt_if_needed_writes_decrypted_copy(self) -> None:
+        # Arrange
+        t = datetime(2026, 3, 31, 9, 0, 0)
+        index = MODULE.PasswordNoteIndex([  # type: ignore[attr-defined]
+            MODULE.PasswordNote(t, "pw", "wrong", "x@vendor.jp"),  # type: ignore[attr-defined]
+            MODULE.PasswordNote(t + timedelta(seconds=5), "pw", "right-pw", "x@vendor.jp"),  # type: ignore[attr-defined]
+        ])
+        unresolved: list[str] = []
+
+        # Act
+        primary, decrypted = MODULE._decrypt_pdf_if_needed(  # type: ignore[attr-defined]
+            pdf_path=self.encrypted,
+            was_encrypted=True,
+            cfg=MODULE.ToolConfig(enable_pdf_decryption=True),  # type: ignore[attr-defined]
+            received_dt=t,
+            sender="x@vendor.jp",
+            password_notes=index,
+            log_path=self.tmp / "run.log",
+            unresolved=unresolved,
+        )
+
+        # Assert
+        self.assertEqual(unresolved, [])
+        self.assertIsNotNone(decrypted)
+        self.assertEqual(primary, decrypted)
+        self.assertFalse(self.PdfReader(str(primary)).is_encrypted)
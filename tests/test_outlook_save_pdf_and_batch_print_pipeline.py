@@ -0,0 +1,287 @@
+import contextlib
+import importlib.util
+import io
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+
+def _load_module() -> object:
+    repo_root = Path(__file__).resolve().parents[1]
+    module_path = repo_root / "tools" / "outlook_save_pdf_and_batch_print.py"
+    spec = importlib.util.spec_from_file_location(
+        "outlook_save_pdf_and_batch_print", module_path
+    )
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"failed to load module: {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses (and other stdlib pieces) may look up the module in sys.modules.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)  # type: ignore[call-arg]
+    return module
+
+
+MODULE = _load_module()
+
+
+class FakeAttachment:
+    def __init__(self, name: str, com_thread: list[int]) -> None:
+        self.FileName = name
+        self._com_thread = com_thread
+
+    def SaveAsFile(self, path: str) -> None:  # noqa: N802
+        self._com_thread.append(threading.get_ident())
+        Path(path).write_bytes(b"%PDF-1.4 fake")
+
+
+class FakeAttachments:
+    def __init__(self, names: list[str], com_thread: list[int]) -> None:
+        self._atts = [FakeAttachment(n, com_thread) for n in names]
+        self.Count = len(self._atts)
+
+    def Item(self, j: int) -> FakeAttachment:  # noqa: N802
+        return self._atts[j - 1]
+
+
+class FakeMail:
+    def __init__(self, i: int, received: datetime, com_thread: list[int]) -> None:
+        self.EntryID = f"E{i:03d}"
+        self.Subject = f"請求書 {i}"
+        self.SenderEmailAddress = f"billing{i}@vendor.example"
+        self.SenderName = "Vendor"
+        self.ReceivedTime = received
+        self.Body = ""
+        self.UnRead = True
+        self.saved = 0
+        self.Attachments = FakeAttachments(
+            [f"inv_{i}_{k}.pdf" for k in range(1 + i % 3)], com_thread
+        )
+
+    def Save(self) -> None:  # noqa: N802
+        self.saved += 1
+
+
+class TestPostProcessPipeline(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _run(self, workers: int) -> tuple[dict[str, Any], list[FakeMail], set[int], list[int]]:
+        root = self.tmp / f"w{workers}"
+        save_dir = root / "save"
+        save_dir.mkdir(parents=True)
+        artifact_dir = root / "artifacts"
+        cfg = {
+            "artifact_dir": str(artifact_dir),
+            "save_dir": str(save_dir),
+            "outlook": {
+                "folder_path": "\\\\Store\\受信トレイ",
+                "unread_only": False,
+                "received_within_days": None,
+                "mark_as_read_on_success": True,
+            },
+            "merge": {"enabled": False},
+            "post_process": {"workers": workers, "max_queued": 2},
+            "mail": {"send_success": False, "error_to": ["ops@example.com"]},
+        }
+        config_path = root / "tool_config.json"
+        config_path.write_text(json.dumps(cfg, ensure_ascii=False), encoding="utf-8")
+        com_thread: list[int] = []
+        now = datetime(2026, 3, 31, 12, 0, 0)
+        mails = [FakeMail(i, now - timedelta(minutes=i), com_thread) for i in range(12)]
+        worker_threads: set[int] = set()
+        rng = random.Random(workers)
+        lock = threading.Lock()
+
+        def fake_process(**kwargs: Any) -> Any:
+            with lock:
+                worker_threads.add(threading.get_ident())
+                delay = rng.uniform(0, 0.01)
+            time.sleep(delay)  # finish out of order
+            name = kwargs["attachment_name"]
+            if name == "inv_4_1.pdf":
+                kwargs["unresolved"].append(f"decrypt failed: {name}")
+            return MODULE.SavedAttachment(  # type: ignore[attr-defined]
+                message_entry_id=kwargs["entry_id"],
+                message_subject=kwargs["subject"],
+                sender=kwargs["sender"],
+                received_time=kwargs["received_time_s"],
+                attachment_name=name,
+                saved_path=str(save_dir / name),
+                original_saved_path=str(kwargs["pdf_path"]),
+                vendor="Vendor",
+                issue_date="20260331",
+                amount=1000,
+                invoice_no=None,
+                project=None,
+                sha256="x",
+                was_encrypted=False,
+                decrypted_path=None,
+                encrypted_original_path=None,
+            )
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(mock.patch.object(MODULE, "_now_run_id", lambda: "20260331_120000"))
+            stack.enter_context(mock.patch.object(MODULE, "_outlook_namespace", lambda profile_name=None: object()))
+            stack.enter_context(mock.patch.object(MODULE, "_resolve_outlook_folder", lambda mapi, path: object()))
+            stack.enter_context(mock.patch.object(MODULE, "_iter_mail_items", lambda *a, **k: list(mails)))
+            stack.enter_context(mock.patch.object(MODULE, "_process_saved_pdf_file", fake_process))
+            stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+            rc = MODULE.main(  # type: ignore[attr-defined]
+                ["--config", str(config_path), "--execute", "--dry-run-mail"]
+            )
+        self.assertEqual(rc, 2)  # one unresolved attachment -> andon
+        run_dir = artifact_dir / "run_20260331_120000"
+        report = json.loads((run_dir / "report.json").read_text(encoding="utf-8"))
+        report["_log"] = (run_dir / "run.log").read_text(encoding="utf-8")
+        return report, mails, worker_threads, com_thread
+
+    def test_parallel_report_matches_inline(self) -> None:
+        # Act
+        inline, inline_mails, _, _ = self._run(workers=0)
+        parallel, parallel_mails, worker_threads, com_thread = self._run(workers=4)
+
+        # Assert: same rows/unresolved in the same order
+        def names(report: dict[str, Any]) -> list[str]:
+            return [r["attachment_name"] for r in report["saved_attachments"]]
+
+        self.assertEqual(names(parallel), names(inline))
+        self.assertEqual(len(names(parallel)), sum(1 + i % 3 for i in range(12)))
+        self.assertEqual(parallel["unresolved"], inline["unresolved"])
+
+        # Only the mail with the unresolved attachment stays unread.
+        self.assertEqual([m.UnRead for m in parallel_mails], [m.UnRead for m in inline_mails])
+        self.assertTrue(parallel_mails[4].UnRead)
+        self.assertFalse(parallel_mails[5].UnRead)
+
+        # COM stays on one thread; post-processing ran elsewhere.
+        self.assertEqual(len(set(com_thread)), 1)
+        self.assertNotIn(com_thread[0], worker_threads)
+        self.assertIn("post-process pipeline: workers=4 max_queued=2", parallel["_log"])
+
+
+class TestWebDownloadDoesNotBlockMailLoop(unittest.TestCase):
+    def test_url_only_mails_download_in_background(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            save_dir = root / "save"
+            save_dir.mkdir()
+            artifact_dir = root / "artifacts"
+            cfg = {
+                "artifact_dir": str(artifact_dir),
+                "save_dir": str(save_dir),
+                "outlook": {"folder_path": "\\\\Store\\受信トレイ", "unread_only": False},
+                "merge": {"enabled": False},
+                "post_process": {"workers": 2},
+                "mail": {"send_success": False, "error_to": ["ops@example.com"]},
+                "enable_web_download": True,
+                "web_download": {"enabled": True, "workers": 3, "vendors": []},
+            }
+            config_path = root / "tool_config.json"
+            config_path.write_text(json.dumps(cfg, ensure_ascii=False), encoding="utf-8")
+
+            com_thread: list[int] = []
+            now = datetime(2026, 3, 31, 12, 0, 0)
+            mails = [FakeMail(i, now - timedelta(minutes=i), com_thread) for i in range(6)]
+            for m in mails[:4]:  # URL-only mails: 0 = no PDF, others = 1 PDF each
+                m.Attachments = FakeAttachments([], com_thread)
+                m.Body = f"https://portal.example/{m.EntryID}"
+
+            submitted: list[str] = []
+            loop_done = threading.Event()
+            futures: list[tuple[Any, str, Path]] = []
+
+            def fake_submit(**kwargs: Any) -> Future:
+                submitted.append(kwargs["subject"])
+                fut: Future = Future()
+                futures.append((fut, kwargs["subject"], kwargs["download_dir"]))
+                return fut
+
+            def finish_downloads() -> None:
+                # Nothing finishes until the COM loop has reached the last mail.
+                loop_done.wait(5)
+                for fut, subject, download_dir in reversed(futures):  # out of order
+                    result = MODULE.WebDownloadResult()  # type: ignore[attr-defined]
+                    if not subject.endswith(" 0"):
+                        download_dir.mkdir(parents=True, exist_ok=True)
+                        pdf = download_dir / f"web_{subject[-1]}.pdf"
+                        pdf.write_bytes(b"%PDF-1.4 fake")
+                        result.pdfs.append(pdf)
+                    fut.set_result(result)
+
+            def fake_process(**kwargs: Any) -> Any:
+                return MODULE.SavedAttachment(  # type: ignore[attr-defined]
+                    message_entry_id=kwargs["entry_id"],
+                    message_subject=kwargs["subject"],
+                    sender=kwargs["sender"],
+                    received_time=kwargs["received_time_s"],
+                    attachment_name=kwargs["attachment_name"],
+                    saved_path=str(save_dir / kwargs["attachment_name"]),
+                    original_saved_path=str(kwargs["pdf_path"]),
+                    vendor="Vendor",
+                    issue_date="20260331",
+                    amount=1000,
+                    invoice_no=None,
+                    project=None,
+                    sha256="x",
+                    was_encrypted=False,
+                    decrypted_path=None,
+                    encrypted_original_path=None,
+                )
+
+            finisher = threading.Thread(target=finish_downloads)
+            finisher.start()
+            with contextlib.ExitStack() as stack:
+                stack.enter_context(mock.patch.object(MODULE, "_now_run_id", lambda: "20260331_120000"))
+                stack.enter_context(mock.patch.object(MODULE, "_outlook_namespace", lambda profile_name=None: object()))
+                stack.enter_context(mock.patch.object(MODULE, "_resolve_outlook_folder", lambda mapi, path: object()))
+                stack.enter_context(mock.patch.object(MODULE, "_iter_mail_items", lambda *a, **k: list(mails)))
+                stack.enter_context(mock.patch.object(MODULE, "_process_saved_pdf_file", fake_process))
+                stack.enter_context(mock.patch.object(MODULE, "_WEB_DOWNLOAD_AVAILABLE", True))
+                stack.enter_context(mock.patch.object(MODULE, "submit_web_download", fake_submit, create=True))
+                stack.enter_context(mock.patch.object(MODULE, "cleanup_web_sessions", lambda: None, create=True))
+                stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                orig_save = FakeAttachment.SaveAsFile
+
+                def save_and_release(att: FakeAttachment, path: str) -> None:
+                    orig_save(att, path)
+                    if att.FileName.startswith("inv_5_"):
+                        loop_done.set()
+
+                stack.enter_context(mock.patch.object(FakeAttachment, "SaveAsFile", save_and_release))
+                rc = MODULE.main(  # type: ignore[attr-defined]
+                    ["--config", str(config_path), "--execute", "--dry-run-mail"]
+                )
+            finisher.join(5)
+
+            self.assertEqual(rc, 0)
+            self.assertEqual(submitted, [f"請求書 {i}" for i in range(4)])
+            run_dir = artifact_dir / "run_20260331_120000"
+            report = json.loads((run_dir / "report.json").read_text(encoding="utf-8"))
+            names = [r["attachment_name"] for r in report["saved_attachments"]]
+            # Mail order is kept even though downloads finished in reverse.
+            self.assertEqual(
+                names,
+                ["web_1.pdf", "web_2.pdf", "web_3.pdf"]
+                + [f"inv_4_{k}.pdf" for k in range(2)]
+                + [f"inv_5_{k}.pdf" for k in range(3)],
+            )
+            self.assertEqual(
+                [t["message_entry_id"] for t in report["url_only_tasks"]], ["E000"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
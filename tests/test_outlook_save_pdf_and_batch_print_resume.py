@@ -0,0 +1,288 @@
+import contextlib
+import importlib.util
+import io
+import json
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+
+def _load_module() -> object:
+    repo_root = Path(__file__).resolve().parents[1]
+    module_path = repo_root / "tools" / "outlook_save_pdf_and_batch_print.py"
+    spec = importlib.util.spec_from_file_location(
+        "outlook_save_pdf_and_batch_print", module_path
+    )
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"failed to load module: {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses (and other stdlib pieces) may look up the module in sys.modules.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)  # type: ignore[call-arg]
+    return module
+
+
+MODULE = _load_module()
+RUN_ID = "20260331_120000"
+
+
+class FakeAttachment:
+    def __init__(self, name: str) -> None:
+        self.FileName = name
+
+    def SaveAsFile(self, path: str) -> None:  # noqa: N802
+        Path(path).write_bytes(b"%PDF-1.4 fake")
+
+
+class FakeAttachments:
+    def __init__(self, names: list[str]) -> None:
+        self._atts = [FakeAttachment(n) for n in names]
+        self.Count = len(self._atts)
+        self.broken: set[int] = set()  # 1-based items whose COM access fails
+
+    def Item(self, j: int) -> FakeAttachment:  # noqa: N802
+        if j in self.broken:
+            raise OSError("simulated COM error")
+        return self._atts[j - 1]
+
+
+class FakeMail:
+    def __init__(self, i: int, received: datetime, names: list[str] | None = None) -> None:
+        self.EntryID = f"E{i:03d}"
+        self.Subject = f"請求書 {i}"
+        self.SenderEmailAddress = f"billing{i}@vendor.example"
+        self.SenderName = "Vendor"
+        self.ReceivedTime = received
+        self.Body = ""
+        self.Attachments = FakeAttachments(names or [f"inv_{i}_a.pdf", f"inv_{i}_b.pdf"])
+
+
+class TestResumeFromJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.save_dir = self.tmp / "save"
+        self.save_dir.mkdir()
+        self.artifact_dir = self.tmp / "artifacts"
+        cfg = {
+            "artifact_dir": str(self.artifact_dir),
+            "save_dir": str(self.save_dir),
+            "outlook": {
+                "folder_path": "\\\\Store\\受信トレイ",
+                "unread_only": False,
+                "received_within_days": None,
+            },
+            "merge": {"enabled": False},
+            # One worker keeps the simulated crash point deterministic.
+            "post_process": {"workers": 1},
+            "mail": {"send_success": False, "error_to": ["ops@example.com"]},
+        }
+        self.config_path = self.tmp / "tool_config.json"
+        self.config_path.write_text(json.dumps(cfg, ensure_ascii=False), encoding="utf-8")
+        now = datetime(2026, 3, 31, 12, 0, 0)
+        self.mails = [FakeMail(i, now - timedelta(minutes=i)) for i in range(5)]
+        self.processed: list[str] = []
+        self.processed_paths: list[str] = []
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _fake_process(self, crash_after: int | None):
+        def _process(**kwargs: Any) -> Any:
+            if crash_after is not None and len(self.processed) >= crash_after:
+                raise RuntimeError("simulated COM timeout")
+            self.processed.append(f"{kwargs['entry_id']}::{kwargs['attachment_name']}")
+            self.processed_paths.append(str(kwargs["pdf_path"]))
+            journal = kwargs.get("journal")
+            if journal is not None:
+                journal.append(
+                    "attachment",
+                    entry_id=kwargs["entry_id"],
+                    attachment_name=kwargs["attachment_name"],
+                    state="extracted",
+                    complete=True,
+                )
+            final = self.save_dir / Path(kwargs["pdf_path"]).name
+            return MODULE.SavedAttachment(  # type: ignore[attr-defined]
+                message_entry_id=kwargs["entry_id"],
+                message_subject=kwargs["subject"],
+                sender=kwargs["sender"],
+                received_time=kwargs["received_time_s"],
+                attachment_name=kwargs["attachment_name"],
+                saved_path=str(final),
+                original_saved_path=str(kwargs["pdf_path"]),
+                vendor="Vendor",
+                issue_date="20260331",
+                amount=1000,
+                invoice_no=None,
+                project=None,
+                sha256="x",
+                was_encrypted=False,
+                decrypted_path=None,
+                encrypted_original_path=None,
+            )
+
+        return _process
+
+    def _run(self, argv: list[str], crash_after: int | None) -> int:
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(mock.patch.object(MODULE, "_now_run_id", lambda: RUN_ID))
+            stack.enter_context(mock.patch.object(MODULE, "_outlook_namespace", lambda profile_name=None: object()))
+            stack.enter_context(mock.patch.object(MODULE, "_resolve_outlook_folder", lambda mapi, path: object()))
+            stack.enter_context(
+                mock.patch.object(MODULE, "_iter_mail_items", lambda *a, **k: list(self.mails))
+            )
+            stack.enter_context(
+                mock.patch.object(MODULE, "_process_saved_pdf_file", self._fake_process(crash_after))
+            )
+            stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+            return MODULE.main(  # type: ignore[attr-defined]
+                ["--config", str(self.config_path), "--execute", "--dry-run-mail", *argv]
+            )
+
+    def test_resume_skips_completed_work_and_rebuilds_report(self) -> None:
+        # Arrange: crash while processing the 6th attachment (3rd mail, 2nd attachment)
+        rc = self._run([], crash_after=5)
+        self.assertEqual(rc, 1)
+        self.assertEqual(len(self.processed), 5)
+        first_run = list(self.processed)
+
+        # Act
+        rc = self._run(["--resume", RUN_ID], crash_after=None)
+
+        # Assert
+        self.assertEqual(rc, 0)
+        resumed = self.processed[len(first_run):]
+        self.assertEqual(len(resumed), 5)  # 10 attachments total, 5 done before the crash
+        self.assertNotIn("E000::inv_0_a.pdf", resumed)
+        self.assertNotIn("E002::inv_2_a.pdf", resumed)  # routed before the crash in a partial mail
+        self.assertIn("E002::inv_2_b.pdf", resumed)
+
+        report = json.loads((self.artifact_dir / f"run_{RUN_ID}" / "report.json").read_text(encoding="utf-8"))
+        names = [r["attachment_name"] for r in report["saved_attachments"]]
+        self.assertEqual(len(names), 10)
+        self.assertEqual(len(set(names)), 10)
+        self.assertEqual(names[:4], ["inv_0_a.pdf", "inv_0_b.pdf", "inv_1_a.pdf", "inv_1_b.pdf"])
+
+    def test_resume_with_duplicate_attachment_names(self) -> None:
+        # Arrange: every mail carries two attachments both named 請求書.pdf
+        now = datetime(2026, 3, 31, 12, 0, 0)
+        self.mails = [FakeMail(i, now - timedelta(minutes=i), ["請求書.pdf", "請求書.pdf"]) for i in range(3)]
+        rc = self._run([], crash_after=3)  # crash on the 2nd attachment of the 2nd mail
+        self.assertEqual(rc, 1)
+        first_paths = list(self.processed_paths)
+
+        # Act
+        rc = self._run(["--resume", RUN_ID], crash_after=None)
+
+        # Assert: only the unrouted twin is processed again, and each twin keeps its own row
+        self.assertEqual(rc, 0)
+        self.assertEqual(len(self.processed_paths) - len(first_paths), 3)
+        report = json.loads((self.artifact_dir / f"run_{RUN_ID}" / "report.json").read_text(encoding="utf-8"))
+        originals = [r["original_saved_path"] for r in report["saved_attachments"]]
+        self.assertEqual(len(originals), 6)
+        self.assertEqual(len(set(originals)), 6)
+
+    def test_resume_when_an_earlier_attachment_failed_first(self) -> None:
+        # Arrange: a.pdf cannot be read in the first run, so b.pdf takes position 0
+        now = datetime(2026, 3, 31, 12, 0, 0)
+        mail = FakeMail(0, now, ["a.pdf", "b.pdf", "c.pdf"])
+        mail.Attachments.broken.add(1)
+        self.mails = [mail]
+        rc = self._run([], crash_after=1)  # b.pdf routed, crash on c.pdf
+        self.assertEqual(rc, 1)
+        self.assertEqual(self.processed, ["E000::b.pdf"])
+
+        # Act: a.pdf is readable now, so every position shifts by one
+        mail.Attachments.broken.clear()
+        rc = self._run(["--resume", RUN_ID], crash_after=None)
+
+        # Assert: a.pdf is not given b.pdf's routed row
+        self.assertEqual(rc, 0)
+        self.assertIn("E000::a.pdf", self.processed[1:])
+        report = json.loads((self.artifact_dir / f"run_{RUN_ID}" / "report.json").read_text(encoding="utf-8"))
+        rows = report["saved_attachments"]
+        self.assertEqual([r["attachment_name"] for r in rows], ["a.pdf", "b.pdf", "c.pdf"])
+        for r in rows:
+            self.assertIn(f"__{Path(r['attachment_name']).stem}", Path(r["original_saved_path"]).name)
+
+    def test_resume_requires_existing_journal(self) -> None:
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            self._run(["--resume", "19990101_000000"], crash_after=None)
+
+
+class TestLoadResumeState(unittest.TestCase):
+    def _row(self, entry_id: str, name: str) -> dict[str, Any]:
+        return {
+            "message_entry_id": entry_id,
+            "message_subject": "s",
+            "sender": "a@b",
+            "received_time": "2026-03-31 12:00:00",
+            "attachment_name": name,
+            "saved_path": f"/save/{name}",
+            "original_saved_path": f"/tmp/{name}",
+            "vendor": None,
+            "issue_date": None,
+            "amount": None,
+            "invoice_no": None,
+            "project": None,
+            "sha256": "x",
+            "was_encrypted": False,
+            "decrypted_path": None,
+            "encrypted_original_path": None,
+            "route_subdir": None,
+            "route_reason": None,
+            "processing_status": "saved",
+        }
+
+    def test_completed_and_partial_messages(self) -> None:
+        events = [
+            {"event": "run", "state": "started", "started_at": "2026-03-31T12:00:00"},
+            {"event": "message", "entry_id": "A", "state": "started"},
+            {"event": "attachment", "entry_id": "A", "attachment_index": 0, "attachment_name": "a.pdf",
+             "state": "routed", "row": self._row("A", "a.pdf"), "unresolved": []},
+            {"event": "message", "entry_id": "A", "state": "done", "unresolved": ["u1"],
+             "url_only_tasks": [{"message_entry_id": "A", "subject": "s", "sender": "x",
+                                 "received_time": "t", "urls": ["https://x/***masked***"]}]},
+            {"event": "message", "entry_id": "B", "state": "started"},
+            {"event": "attachment", "entry_id": "B", "attachment_index": 0, "attachment_name": "b.pdf",
+             "state": "routed", "row": self._row("B", "b.pdf"), "unresolved": ["u2"]},
+        ]
+
+        state = MODULE._load_resume_state(events)  # type: ignore[attr-defined]
+
+        self.assertEqual(state.started_at, datetime(2026, 3, 31, 12, 0, 0))
+        self.assertEqual(state.completed_messages, {"A"})
+        self.assertEqual([r.attachment_name for r in state.saved_rows], ["a.pdf"])
+        self.assertEqual(state.unresolved, ["u1"])
+        self.assertEqual(state.url_only_tasks[0].urls, ("https://x/***masked***",))
+        name, row, unresolved = state.routed_attachments[("B", 0)]
+        self.assertEqual(name, "b.pdf")
+        self.assertEqual(row.saved_path, "/save/b.pdf")
+        self.assertEqual(unresolved, ["u2"])
+
+    def test_same_name_attachments_are_kept_apart(self) -> None:
+        def routed(entry_id: str, index: int, saved: str) -> dict[str, Any]:
+            row = {**self._row(entry_id, "請求書.pdf"), "saved_path": saved}
+            return {"event": "attachment", "entry_id": entry_id, "attachment_index": index,
+                    "attachment_name": "請求書.pdf", "state": "routed", "row": row, "unresolved": []}
+
+        events = [
+            # Completed mail: workers finished the twins out of order.
+            routed("A", 1, "/save/A_second.pdf"),
+            routed("A", 0, "/save/A_first.pdf"),
+            {"event": "message", "entry_id": "A", "state": "done"},
+            # Partial mail: both twins routed before the crash.
+            routed("B", 0, "/save/B_first.pdf"),
+            routed("B", 1, "/save/B_second.pdf"),
+        ]
+
+        state = MODULE._load_resume_state(events)  # type: ignore[attr-defined]
+
+        self.assertEqual([r.saved_path for r in state.saved_rows], ["/save/A_first.pdf", "/save/A_second.pdf"])
+        self.assertEqual(state.routed_attachments[("B", 0)][1].saved_path, "/save/B_first.pdf")
+        self.assertEqual(state.routed_attachments[("B", 1)][1].saved_path, "/save/B_second.pdf")
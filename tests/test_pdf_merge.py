@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/common/pdf_merge.py"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+fitz = pytest.importorskip("fitz")
+
+from tools.common.pdf_merge import chunk_output_path, merge_pdfs_streaming, plan_chunks
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def _make_pdf(path: Path, pages: int, label: str) -> Path:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{label} page {i + 1}")
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+@pytest.fixture
+def invoices(tmp_path: Path) -> list[Path]:
+    return [
+        _make_pdf(tmp_path / "a.pdf", 2, "A"),
+        _make_pdf(tmp_path / "b.pdf", 1, "B"),
+        _make_pdf(tmp_path / "c.pdf", 3, "C"),
+    ]
+
+
+def _page_texts(path: Path) -> list[str]:
+    with fitz.open(str(path)) as doc:
+        return [page.get_text().strip() for page in doc]
+
+
+# ---------------------------------------------------------------------------
+# plan_chunks / chunk_output_path
+# ---------------------------------------------------------------------------
+
+class TestPlanChunks:
+    def test_no_limits_single_chunk(self):
+        assert plan_chunks([2, 1, 3], [10, 10, 10]) == [[0, 1, 2]]
+
+    def test_page_limit_keeps_documents_whole(self):
+        assert plan_chunks([2, 1, 3], [0, 0, 0], max_pages_per_chunk=3) == [[0, 1], [2]]
+
+    def test_oversized_document_gets_own_chunk(self):
+        assert plan_chunks([5, 1], [0, 0], max_pages_per_chunk=2) == [[0], [1]]
+
+    def test_byte_limit(self):
+        assert plan_chunks([1, 1, 1], [60, 60, 30], max_bytes_per_chunk=100) == [[0], [1, 2]]
+
+
+class TestChunkOutputPath:
+    def test_single_chunk_keeps_name(self, tmp_path):
+        assert chunk_output_path(tmp_path / "merged.pdf", 1, 1) == tmp_path / "merged.pdf"
+
+    def test_numbered_chunks(self, tmp_path):
+        assert chunk_output_path(tmp_path / "merged.pdf", 2, 3) == tmp_path / "merged_002.pdf"
+
+
+# ---------------------------------------------------------------------------
+# merge_pdfs_streaming
+# ---------------------------------------------------------------------------
+
+class TestMergePdfsStreaming:
+    def test_merges_in_order(self, tmp_path, invoices):
+        res = merge_pdfs_streaming(invoices, tmp_path / "out" / "merged.pdf")
+
+        assert res.output_paths == (tmp_path / "out" / "merged.pdf",)
+        assert _page_texts(res.output_paths[0]) == [
+            "A page 1", "A page 2", "B page 1", "C page 1", "C page 2", "C page 3",
+        ]
+        assert res.stats.engine == "pymupdf"
+        assert res.stats.input_docs == 3
+        assert res.stats.pages == 6
+        assert res.stats.chunks == 1
+        assert res.stats.pages_per_sec > 0
+
+    def test_splits_by_page_cap(self, tmp_path, invoices):
+        res = merge_pdfs_streaming(invoices, tmp_path / "merged.pdf", max_pages_per_chunk=3)
+
+        assert [p.name for p in res.output_paths] == ["merged_001.pdf", "merged_002.pdf"]
+        assert _page_texts(res.output_paths[0]) == ["A page 1", "A page 2", "B page 1"]
+        assert len(_page_texts(res.output_paths[1])) == 3
+        assert res.stats.chunks == 2
+
+    def test_pypdf_engine_matches_pages(self, tmp_path, invoices):
+        pytest.importorskip("pypdf")
+        res = merge_pdfs_streaming(invoices, tmp_path / "merged.pdf", engine="pypdf")
+
+        assert res.stats.engine == "pypdf"
+        assert len(_page_texts(res.output_paths[0])) == 6
+
+    def test_unreadable_input_is_skipped(self, tmp_path, invoices):
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+        res = merge_pdfs_streaming([invoices[0], broken], tmp_path / "merged.pdf")
+
+        assert res.stats.pages == 2
+        assert [Path(p).name for p, _ in res.skipped] == ["broken.pdf"]
+
+    def test_dedupe_shrinks_repeated_resources(self, tmp_path):
+        # 同一画像を含む請求書を複数結合 → 画像ストリームは 1 つに統合される
+        pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+        pix.set_rect(pix.irect, (200, 30, 30))
+        png = pix.tobytes("png")
+        paths = []
+        for i in range(4):
+            doc = fitz.open()
+            page = doc.new_page()
+            page.insert_image(fitz.Rect(0, 0, 100, 100), stream=png)
+            p = tmp_path / f"logo_{i}.pdf"
+            doc.save(str(p))
+            doc.close()
+            paths.append(p)
+
+        plain = merge_pdfs_streaming(paths, tmp_path / "plain.pdf", dedupe_resources=False)
+        deduped = merge_pdfs_streaming(paths, tmp_path / "dedup.pdf", dedupe_resources=True)
+
+        assert deduped.stats.output_bytes < plain.stats.output_bytes
+
+    def test_invalid_limit_raises(self, tmp_path, invoices):
+        with pytest.raises(ValueError):
+            merge_pdfs_streaming(invoices, tmp_path / "merged.pdf", max_pages_per_chunk=0)
+
+    def test_no_readable_input_raises(self, tmp_path):
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"not a pdf")
+        with pytest.raises(ValueError):
+            merge_pdfs_streaming([broken], tmp_path / "merged.pdf")
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Tests for PDFOCRProcessor.run_ocr_batch (tools/pdf_ocr.py)"""
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+pytest.importorskip("fitz")
+pytest.importorskip("cv2")
+pytest.importorskip("PIL")
+
+import common.logger as common_logger
+from tools.pdf_ocr import PDFOCRProcessor
+
+# ocr_folder.js の代わり: input/ を全件処理し、起動ごとの入力一覧を記録する
+STUB_OCR_FOLDER_JS = r"""
+const fs = require("fs");
+const path = require("path");
+const names = fs.readdirSync("input").filter((n) => n.toLowerCase().endsWith(".pdf")).sort();
+fs.appendFileSync("calls.jsonl", JSON.stringify({ start: Date.now() / 1000, inputs: names }) + "\n");
+for (const name of names) {
+  const src = path.join("input", name);
+  if (name.includes("bad")) {
+    fs.renameSync(src, path.join("error", name));
+    continue;
+  }
+  const stem = name.slice(0, -4);
+  fs.writeFileSync(path.join("output", stem + "_ocr.pdf"), fs.readFileSync(src));
+  fs.unlinkSync(src);
+}
+setTimeout(() => {}, 800);  // ジョブ実行時間の模擬
+"""
+
+
+@pytest.fixture
+def ocr_ja_dir(tmp_path, monkeypatch):
+    if shutil.which("node") is None:
+        pytest.skip("node is not installed")
+    root = tmp_path / "OCR-JA"
+    for sub in ("input", "output", "archive", "error"):
+        (root / sub).mkdir(parents=True)
+    (root / "ocr_folder.js").write_text(STUB_OCR_FOLDER_JS, encoding="utf-8")
+    monkeypatch.setattr(PDFOCRProcessor, "OCR_JA_DIR", root)
+    # 既定ロガーは C:\ProgramData 配下にファイルを作るため差し替える
+    monkeypatch.setattr(common_logger, "_logger", logging.getLogger("test_pdf_ocr_batch"))
+    return root
+
+
+def _calls(root: Path) -> list:
+    p = root / "calls.jsonl"
+    return [json.loads(line) for line in p.read_text(encoding="utf-8").splitlines()] if p.exists() else []
+
+
+def _make_pdfs(tmp_path: Path, names: list) -> list:
+    src = tmp_path / "src"
+    src.mkdir(exist_ok=True)
+    paths = []
+    for name in names:
+        p = src / name
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(f"%PDF-1.4 {name}".encode())
+        paths.append(p)
+    return paths
+
+
+class TestRunOcrBatch:
+    def test_single_job_maps_outputs_and_errors(self, ocr_ja_dir, tmp_path, monkeypatch):
+        pdfs = _make_pdfs(tmp_path, ["a.pdf", "bad_scan.pdf", "c.pdf"])
+        monkeypatch.setattr(PDFOCRProcessor, "fix_rotation", lambda self, p: p)
+        processor = PDFOCRProcessor()
+
+        results = processor.run_ocr_batch(pdfs)
+
+        assert list(results) == pdfs
+        assert results[pdfs[0]] == ocr_ja_dir / "output" / "a_ocr.pdf"
+        assert results[pdfs[1]] is None
+        assert results[pdfs[2]] == ocr_ja_dir / "output" / "c_ocr.pdf"
+        assert (ocr_ja_dir / "error" / "bad_scan.pdf").exists()
+        calls = _calls(ocr_ja_dir)
+        assert len(calls) == 1
+        assert calls[0]["inputs"] == ["a.pdf", "bad_scan.pdf", "c.pdf"]
+        # 元ファイルはそのまま残る
+        assert all(p.exists() for p in pdfs)
+
+    def test_duplicate_names_are_staged_separately(self, ocr_ja_dir, tmp_path, monkeypatch):
+        pdfs = _make_pdfs(tmp_path, ["x/scan.pdf", "y/scan.pdf"])
+        monkeypatch.setattr(PDFOCRProcessor, "fix_rotation", lambda self, p: p)
+        processor = PDFOCRProcessor()
+
+        results = processor.run_ocr_batch(pdfs)
+
+        assert results[pdfs[0]] != results[pdfs[1]]
+        assert results[pdfs[0]].read_bytes() == b"%PDF-1.4 x/scan.pdf"
+        assert results[pdfs[1]].read_bytes() == b"%PDF-1.4 y/scan.pdf"
+
+    def test_stale_output_is_not_reported(self, ocr_ja_dir, tmp_path, monkeypatch):
+        pdfs = _make_pdfs(tmp_path, ["bad_old.pdf"])
+        stale = ocr_ja_dir / "output" / "bad_old_ocr.pdf"
+        stale.write_bytes(b"old")
+        os.utime(stale, (time.time() - 3600, time.time() - 3600))
+        monkeypatch.setattr(PDFOCRProcessor, "fix_rotation", lambda self, p: p)
+
+        results = PDFOCRProcessor().run_ocr_batch(pdfs)
+
+        assert results[pdfs[0]] is None
+
+    def test_rotation_overlaps_running_job(self, ocr_ja_dir, tmp_path, monkeypatch):
+        pdfs = _make_pdfs(tmp_path, [f"p{i}.pdf" for i in range(4)])
+        rotated_at = {}
+        lock = threading.Lock()
+
+        def slow_fix_rotation(self, pdf_path):
+            time.sleep(0.2)
+            out = pdf_path.parent / f"_rotated_{pdf_path.name}"
+            shutil.copy2(pdf_path, out)
+            with lock:
+                rotated_at[pdf_path.name] = time.time()
+            return out
+
+        monkeypatch.setattr(PDFOCRProcessor, "fix_rotation", slow_fix_rotation)
+        processor = PDFOCRProcessor()
+
+        results = processor.run_ocr_batch(pdfs, batch_size=2)
+
+        assert all(v is not None for v in results.values())
+        calls = _calls(ocr_ja_dir)
+        assert [c["inputs"] for c in calls] == [["p0.pdf", "p1.pdf"], ["p2.pdf", "p3.pdf"]]
+        # 2つ目のバッチの回転補正は1回目のジョブ実行中（0.8秒）に終わっている
+        assert calls[0]["start"] < rotated_at["p2.pdf"] < calls[0]["start"] + 0.7
+        # 一時の _rotated_ ファイルは残さない
+        assert not list((tmp_path / "src").glob("_rotated_*"))
+
+    def test_invalid_batch_size(self, ocr_ja_dir, tmp_path):
+        with pytest.raises(ValueError):
+            PDFOCRProcessor().run_ocr_batch(_make_pdfs(tmp_path, ["a.pdf"]), batch_size=0)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/pdf_transcribe_to_docx.py"""
+import os
+import random
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+fitz = pytest.importorskip("fitz")
+pytest.importorskip("docx")
+
+from tools import pdf_transcribe_to_docx as t2d
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def _make_pdf(path: Path, pages: int) -> Path:
+    """ルビ付きの行（小さいかな + 直下の大きい漢字）を含む PDF。"""
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        if i % 4 == 3:
+            continue  # 空ページ（改ページだけ残る）
+        page.insert_text((72, 60), "しょるい", fontname="japan", fontsize=5)
+        page.insert_text((72, 72), f"書類 {i + 1}", fontname="japan", fontsize=12)
+        page.insert_text((72, 120), f"page {i + 1} total 1000", fontsize=11)
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def _span(span_id: int, rng: random.Random) -> "t2d.TextSpan":
+    x0 = rng.uniform(0, 500)
+    y0 = rng.uniform(0, 700)
+    size = rng.choice([5.0, 6.0, 10.0, 10.5, 12.0])
+    w = rng.choice([0.0, size, size * rng.uniform(1, 12), rng.uniform(100, 400)])
+    return t2d.TextSpan(
+        span_id=span_id,
+        text=rng.choice(["ふりがな", "カナ", "漢字", "ABC", " ", "かな漢"]),
+        size=size,
+        x0=x0,
+        y0=y0,
+        x1=x0 + w,
+        y1=y0 + size * rng.uniform(0.8, 1.3),
+        block_id=0,
+        line_id=0,
+    )
+
+
+def _ruby_ids_bruteforce(spans: list) -> set[int]:
+    """索引なしの全件比較（_detect_ruby_span_ids と同じ判定条件）。"""
+    out: set[int] = set()
+    for s in spans:
+        t = s.text.strip()
+        if not t or not t2d._has_kana(t) or t2d._has_kanji(t):
+            continue
+        y_max = s.y1 + max(8.0, s.height * 2.2)
+        for b in spans:
+            if b.span_id == s.span_id or not (s.y0 <= b.y0 <= y_max):
+                continue
+            if b.y0 - s.y1 < -max(1.0, s.height * 0.35):
+                continue
+            if b.size < max(s.size * 1.18, s.size + 1.0):
+                continue
+            if t2d._overlap_ratio(s, b) >= 0.35:
+                out.add(s.span_id)
+                break
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Ruby detection
+# ---------------------------------------------------------------------------
+
+class TestRubyDetection:
+    def test_grid_matches_bruteforce(self):
+        rng = random.Random(36)
+        for trial in range(60):
+            spans = [_span(i + 1, rng) for i in range(rng.randint(0, 120))]
+            assert t2d._detect_ruby_span_ids(spans) == _ruby_ids_bruteforce(spans), trial
+
+    def test_ruby_above_base_is_removed(self):
+        ruby = t2d.TextSpan(1, "かんじ", 5.0, 100.0, 90.0, 115.0, 95.0, 0, 0)
+        base = t2d.TextSpan(2, "漢字", 12.0, 100.0, 96.0, 124.0, 108.0, 1, 0)
+        far = t2d.TextSpan(3, "かな", 5.0, 300.0, 90.0, 310.0, 95.0, 2, 0)
+        assert t2d._detect_ruby_span_ids([ruby, base, far]) == {1}
+
+
+# ---------------------------------------------------------------------------
+# Parallel extraction / DOCX output
+# ---------------------------------------------------------------------------
+
+class TestParallel:
+    def test_page_workers_match_serial(self, tmp_path):
+        pdf = _make_pdf(tmp_path / "R3sample.pdf", 9)
+
+        serial = t2d.extract_pdf_page_lines(pdf)
+        parallel = t2d.extract_pdf_page_lines(pdf, workers=3)
+
+        assert parallel == serial
+        assert len(serial) == 9
+        assert serial[3] == []
+        assert not any("しょるい" in line for page in serial for line in page)
+
+    def test_docx_bytes_match_serial(self, tmp_path):
+        pdf = _make_pdf(tmp_path / "a.pdf", 6)
+
+        t2d.transcribe_pdf_to_docx(pdf, tmp_path / "serial.docx")
+        time.sleep(2.1)  # zip のタイムスタンプ分解能（2 秒）をまたぐ
+        t2d.transcribe_pdf_to_docx(pdf, tmp_path / "parallel.docx", workers=2)
+
+        assert (tmp_path / "parallel.docx").read_bytes() == (tmp_path / "serial.docx").read_bytes()
+        with zipfile.ZipFile(tmp_path / "serial.docx") as zf:
+            assert "word/document.xml" in zf.namelist()
+
+    def test_main_document_level_workers(self, tmp_path, capsys):
+        src = tmp_path / "in"
+        (src / "sub").mkdir(parents=True)
+        for name in ("a.pdf", "b.pdf", "sub/c.pdf"):
+            _make_pdf(src / name, 2)
+        (src / "broken.pdf").write_bytes(b"not a pdf")
+
+        rc_serial = t2d.main(["--input-root", str(src), "--output-root", str(tmp_path / "s")])
+        rc_parallel = t2d.main(
+            ["--input-root", str(src), "--output-root", str(tmp_path / "p"), "--workers", "3"]
+        )
+
+        assert rc_serial == rc_parallel == 1
+        for rel in ("a.docx", "b.docx", "sub/c.docx"):
+            assert (tmp_path / "p" / rel).read_bytes() == (tmp_path / "s" / rel).read_bytes()
+        out = capsys.readouterr()
+        assert out.out.count("Done. OK=3 Skipped=0 Failed=1") == 2
+        assert [ln.startswith("ERROR: failed:") and "broken.pdf" in ln for ln in out.err.splitlines()] == [True, True]
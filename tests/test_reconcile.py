@@ -1,4 +1,6 @@
 """Tests for reconcile.py and reconcile_gate.py."""
+import random
+
 import pytest
 import pandas as pd
 from decimal import Decimal
@@ -61,6 +63,131 @@ class TestReconcileInvoiceLevel:
         assert res['per_row_match_rate'] == 1.0
 
 
+def _cells(series):
+    # Decimal('332') == Decimal('332.000'); compare sign, digits and exponent instead
+    return [v.as_tuple() if isinstance(v, Decimal) else v for v in series.tolist()]
+
+
+def _assert_engines_agree(df, mode, tolerance=Decimal('1')):
+    ref = reconcile_invoice(df, mode=mode, tolerance=tolerance, engine='decimal')
+    vec = reconcile_invoice(df, mode=mode, tolerance=tolerance, engine='vectorized')
+    assert vec['engine'] == 'vectorized'
+    assert list(vec['rows'].columns) == list(ref['rows'].columns)
+    cols = ['unit_price', 'discount', 'tax_rate', 'extracted_row_total', 'expected_total', 'delta', 'flag']
+    if mode == 'invoice_level':
+        cols.append('net')
+    for c in cols:
+        assert _cells(vec['rows'][c]) == _cells(ref['rows'][c]), c
+    for k in ['per_row_match_rate', 'invoice_total_extracted', 'invoice_total_expected', 'total_EM']:
+        assert vec[k] == ref[k], k
+
+
+def _random_invoice(rng):
+    rows = []
+    for _ in range(rng.randint(1, 12)):
+        kind = rng.random()
+        if kind < 0.4:
+            unit = str(rng.choice([-3, -2, -1, 1, 2, 3, 4, 5, 7, 10, 11, 13]))
+        elif kind < 0.7:
+            unit = f"¥{rng.randint(-50, 5000):,}"
+        elif kind < 0.9:
+            unit = f"{rng.randint(0, 999)}.{rng.randint(0, 99):02d}"
+        else:
+            unit = rng.choice(['-0', '0.000', '-0.50', '166.000', '1.'])
+        rows.append({
+            'qty': rng.choice([1, 2, 3, '1', '2.5', 1.5, None, 0, '2.00', '-0']),
+            'unit_price': unit,
+            'discount': rng.choice(['0', '0', '10', '1.5', None, '￥100', '-0', '0.0', '10.00']),
+            'tax_rate': rng.choice(['0.10', '0.08', '0.1', '0', '0.05', '0.125', '0.333', '-0.0']),
+            'extracted_row_total': rng.choice([str(rng.randint(-10, 6000)), '-0', '0.00', '332.0']),
+        })
+    return pd.DataFrame(rows)
+
+
+def _large_invoice(lines, seed=0):
+    """多明細の OCR 抽出結果（通貨記号・桁区切り・少数の読み違いを含む）"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(lines):
+        qty = rng.choice([1, 1, 2, 3, 5, 10, 12, 20, 2.5])
+        unit = rng.choice([rng.randint(50, 99_999), round(rng.uniform(10, 5000), 2)])
+        discount = rng.choice([0, 0, 0, 100, 500])
+        rate = rng.choice(['0.10', '0.10', '0.08'])
+        net = Decimal(str(qty)) * Decimal(str(unit)) - discount
+        total = int((net * (1 + Decimal(rate))).to_integral_value())
+        if rng.random() < 0.02:
+            total += rng.choice([-10, -1, 1, 100])
+        rows.append({
+            'qty': qty,
+            'unit_price': f"¥{unit:,}",
+            'discount': str(discount),
+            'tax_rate': rate,
+            'extracted_row_total': f"{total:,}",
+        })
+    return pd.DataFrame(rows)
+
+
+class TestVectorizedEngine:
+    @pytest.mark.parametrize('seed', range(4))
+    def test_matches_decimal_on_random_invoices(self, seed):
+        rng = random.Random(seed)
+        for _ in range(40):
+            df = _random_invoice(rng)
+            tolerance = rng.choice([Decimal('1'), Decimal('0.5'), 2, '0'])
+            for mode in ('per_line', 'invoice_level'):
+                _assert_engines_agree(df, mode, tolerance)
+
+    @pytest.mark.parametrize('nets,rate', [
+        # exactly tied remainders whose 28-digit Decimal quotients differ
+        (['4', '1', '-2'], '0.333'),
+        (['1', '4', '-2'], '0.333'),
+        # exact halves that the Decimal quotient rounds down
+        (['5', '1'], '0.5'),
+        (['5', '1', '1', '1', '-2'], '0.5'),
+        (['7', '-1', '1'], '0.5'),
+    ])
+    def test_matches_decimal_on_ties_and_halves(self, nets, rate):
+        df = pd.DataFrame({
+            'qty': [1] * len(nets), 'unit_price': nets, 'discount': ['0'] * len(nets),
+            'tax_rate': [rate] * len(nets), 'extracted_row_total': ['0'] * len(nets),
+        })
+        _assert_engines_agree(df, 'invoice_level')
+
+    @pytest.mark.parametrize('mode', ['per_line', 'invoice_level'])
+    def test_matches_decimal_on_large_invoice(self, mode):
+        _assert_engines_agree(_large_invoice(3_000, seed=33), mode)
+
+    @pytest.mark.parametrize('mode', ['per_line', 'invoice_level'])
+    def test_keeps_decimal_exponents(self, mode):
+        df = pd.DataFrame([
+            {'qty': 2, 'unit_price': '166', 'discount': '0', 'tax_rate': '0.10', 'extracted_row_total': '365'},
+            {'qty': 2, 'unit_price': '1.50', 'discount': '0.000', 'tax_rate': '0.08', 'extracted_row_total': '3'},
+            {'qty': 1, 'unit_price': '-0', 'discount': '0', 'tax_rate': '0.10', 'extracted_row_total': '-0'},
+        ])
+        _assert_engines_agree(df, mode)
+        vec = reconcile_invoice(df, mode=mode, engine='vectorized')
+        assert str(vec['rows']['unit_price'][0]) == '166'
+        assert str(vec['rows']['unit_price'][1]) == '1.50'
+
+    def test_non_range_index(self):
+        df = _large_invoice(20, seed=1)
+        df.index = [f'r{i}' for i in range(20)]
+        _assert_engines_agree(df, 'invoice_level')
+
+    def test_auto_falls_back_to_decimal(self):
+        df = pd.DataFrame([{'qty': 1, 'unit_price': '1E+3', 'discount': '0', 'tax_rate': '0.10',
+                            'extracted_row_total': '1100'}])
+        res = reconcile_invoice(df)
+        assert res['engine'] == 'decimal'
+        assert res['total_EM'] == 1
+        with pytest.raises(ValueError):
+            reconcile_invoice(df, engine='vectorized')
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            reconcile_invoice(_large_invoice(1, seed=0), engine='numba')
+
+
 class TestReconcileGate:
     def test_pass(self):
         data = [
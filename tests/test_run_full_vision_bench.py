@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/run_full_vision_bench.py (プロバイダ別ワーカープール・適応並列・再開・集計)"""
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+tools_dir = Path(__file__).resolve().parents[1] / "tools"
+if str(tools_dir) not in sys.path:
+    sys.path.insert(0, str(tools_dir))
+
+import run_full_vision_bench as bench  # noqa: E402
+from vision_ocr import VisionOcrResult  # noqa: E402
+
+
+class FakeProvider:
+    """latency 秒かかる extract。同時 capacity 件を超えると 429 を返し、fail_on は常に失敗。"""
+
+    def __init__(self, latency: float = 0.02, capacity: int = 100, fail_on: frozenset = frozenset()):
+        self.latency = latency
+        self.capacity = capacity
+        self.fail_on = fail_on
+        self.calls: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, pdf_path, *, provider, timeout_s, sender_hint=None, subject_hint=None):
+        name = Path(pdf_path).name
+        with self._lock:
+            self.calls.append(name)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            over = self.active > self.capacity
+        try:
+            time.sleep(self.latency)
+            if over:
+                return VisionOcrResult(error=f"{provider}: RateLimitError: Error code: 429", provider="none")
+            if name in self.fail_on:
+                return VisionOcrResult(error=f"{provider}: ValueError: unreadable", provider="none")
+            return VisionOcrResult(vendor="株式会社テスト", amount="1000", provider=provider,
+                                   elapsed_s=self.latency, confidence="high")
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _golden(n: int) -> list[dict]:
+    return [{"id": i, "filename": f"doc{i:03d}.pdf"} for i in range(1, n + 1)]
+
+
+def _rows(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestRunBench:
+    def test_multi_provider_summary(self, tmp_path):
+        fake = FakeProvider(latency=0.02, fail_on=frozenset({"doc004.pdf", "doc008.pdf"}))
+        output = tmp_path / "out.jsonl"
+        summaries = bench.run_bench(
+            _golden(40), ["alpha", "beta"], output,
+            pdf_dir=tmp_path, timeout_s=1.0, context_map={}, extract_fn=fake, workers=4, max_workers=4,
+        )
+
+        assert set(summaries) == {"alpha", "beta"}
+        for provider, summary in summaries.items():
+            rows = _rows(tmp_path / f"out_{provider}.jsonl")
+            assert sorted(r["id"] for r in rows) == list(range(1, 41))
+            assert summary["docs"] == 40
+            assert summary["errors"] == 2 and summary["error_rate"] == 0.05
+            assert summary["p50_elapsed_s"] == summary["p95_elapsed_s"] == 0.02
+            assert summary["docs_per_min"] > 0
+            assert summary["peak_concurrency"] <= 4
+        assert fake.peak > 4  # 2 プロバイダが並行に走る
+
+    def test_backs_off_on_rate_limit(self, tmp_path):
+        fake = FakeProvider(latency=0.02, capacity=2)
+        output = tmp_path / "out.jsonl"
+        summary = bench.run_bench(
+            _golden(30), ["alpha"], output,
+            pdf_dir=tmp_path, timeout_s=1.0, context_map={}, extract_fn=fake,
+            workers=8, max_workers=8, cooldown_s=0.01, rate_limit_retries=10,
+        )["alpha"]
+
+        rows = _rows(output)
+        assert sorted(r["id"] for r in rows) == list(range(1, 31))
+        assert not any(r["error"] for r in rows)  # 取り直しで全件成功
+        assert summary["rate_limited"] > 0
+        assert summary["final_concurrency"] < 8
+        assert max(r["attempts"] for r in rows) > 1
+
+    def test_resume_retries_rate_limited_rows_only(self, tmp_path):
+        output = tmp_path / "out.jsonl"
+        output.write_text(
+            json.dumps({"id": 1, "filename": "doc001.pdf", "error": None}) + "\n"
+            + json.dumps({"id": 2, "filename": "doc002.pdf", "error": "x: ValueError: unreadable"}) + "\n"
+            + json.dumps({"id": 3, "filename": "doc003.pdf", "error": "x: RateLimitError: 429"}) + "\n"
+            + '{"id": 4, "filen',  # 中断時の書きかけ行
+            encoding="utf-8",
+        )
+        fake = FakeProvider(latency=0.0)
+        bench.run_bench(_golden(5), ["alpha"], output, pdf_dir=tmp_path, timeout_s=1.0,
+                        context_map={}, extract_fn=fake)
+
+        assert sorted(fake.calls) == ["doc003.pdf", "doc004.pdf", "doc005.pdf"]
+        latest = bench.load_jsonl_rows(output)
+        assert sorted(latest) == [1, 2, 3, 4, 5]
+        assert latest[3]["error"] is None
+        assert bench.load_completed_ids(output) == {1, 2, 3, 4, 5}
+
+
+class TestAdaptiveConcurrency:
+    def test_halves_once_per_burst_and_recovers(self):
+        limiter = bench.AdaptiveConcurrency(8, maximum=8, cooldown_s=0.0)
+        epochs = [limiter.acquire() for _ in range(8)]
+        for epoch in epochs:
+            limiter.release(epoch, rate_limited=True)
+        assert limiter.limit == 4
+        assert limiter.rate_limited == 8
+
+        for _ in range(4):
+            limiter.release(limiter.acquire(), rate_limited=False)
+        assert limiter.limit == 5
+
+    def test_is_rate_limited(self):
+        assert bench.is_rate_limited("gemini: ClientError: 429 RESOURCE_EXHAUSTED")
+        assert bench.is_rate_limited("All providers failed: openai: RateLimitError: Rate limit reached")
+        assert not bench.is_rate_limited("openai: ValueError: bad json")
+        assert not bench.is_rate_limited(None)
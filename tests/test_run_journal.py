@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/common/run_journal.py"""
+import os
+import sys
+from pathlib import Path
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.common.run_journal import RunJournal
+
+
+class TestRunJournal:
+    def test_append_and_load(self, tmp_path: Path):
+        journal = RunJournal(tmp_path / "run" / "progress_journal.jsonl")
+        journal.append("message", entry_id="E1", state="started")
+        journal.append("message", entry_id="E1", state="done", unresolved=["x"])
+
+        events = RunJournal.load(journal.path)
+        assert [e["seq"] for e in events] == [1, 2]
+        assert events[1]["state"] == "done"
+        assert events[1]["unresolved"] == ["x"]
+
+    def test_truncated_last_line_is_ignored(self, tmp_path: Path):
+        path = tmp_path / "progress_journal.jsonl"
+        journal = RunJournal(path)
+        journal.append("run", state="started")
+        with path.open("a", encoding="utf-8") as f:
+            f.write('{"seq": 2, "event": "mess')
+
+        assert [e["event"] for e in RunJournal.load(path)] == ["run"]
+
+    def test_reopen_continues_sequence(self, tmp_path: Path):
+        path = tmp_path / "progress_journal.jsonl"
+        RunJournal(path).append("run", state="started")
+        RunJournal(path).append("run", state="resumed")
+
+        assert [e["seq"] for e in RunJournal.load(path)] == [1, 2]
+
+    def test_missing_file_loads_empty(self, tmp_path: Path):
+        assert RunJournal.load(tmp_path / "none.jsonl") == []
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/score_ocr_bench.py (結果行の索引・差分スコアリング)"""
+import json
+import random
+import sys
+from pathlib import Path
+
+tools_dir = Path(__file__).resolve().parents[1] / "tools"
+if str(tools_dir) not in sys.path:
+    sys.path.insert(0, str(tools_dir))
+
+import score_ocr_bench as sob  # noqa: E402
+
+
+def _find_result_linear(results: list[dict], golden_filename: str) -> dict:
+    """旧 score_all 内の _find_result（全結果行の線形走査）。"""
+    result_by_filename: dict[str, dict] = {}
+    for r in results:
+        fname = r.get("filename", "")
+        if fname:
+            result_by_filename[fname] = r
+    if golden_filename in result_by_filename:
+        return result_by_filename[golden_filename]
+    for rfname, rdata in result_by_filename.items():
+        if golden_filename.startswith(rfname) or rfname.startswith(golden_filename):
+            return rdata
+    for rfname, rdata in result_by_filename.items():
+        if golden_filename[:30] in rfname or rfname[:30] in golden_filename:
+            return rdata
+    return {}
+
+
+def _random_names(rng: random.Random, n: int) -> list[str]:
+    parts = ["請求書", "株式会社", "御中", "2026年4月分", "INV", "_", "-", "001", "0042", "見積", "(1)"]
+    return ["".join(rng.choice(parts) for _ in range(rng.randint(1, 12))) + ".pdf" for _ in range(n)]
+
+
+def _mutate(rng: random.Random, name: str) -> str:
+    kind = rng.random()
+    if kind < 0.3:
+        return name[: rng.randint(1, len(name))]  # markdown 表で切り詰め
+    if kind < 0.5:
+        return name + rng.choice(["", "_v2", ".pdf"])
+    if kind < 0.65:
+        start = rng.randint(0, max(0, len(name) - 10))
+        return name[start:start + rng.randint(5, 40)]
+    if kind < 0.75:
+        return "prefix_" + name
+    return name
+
+
+class TestResultIndex:
+    def test_matches_linear_scan(self):
+        rng = random.Random(46)
+        for trial in range(30):
+            golden_names = _random_names(rng, 60)
+            results = [
+                {"id": str(i), "filename": _mutate(rng, rng.choice(golden_names)), "vendor": f"v{i}"}
+                for i in range(rng.randint(0, 80))
+            ]
+            results += [{"id": "x", "filename": ""}, {"id": "y"}]
+            index = sob.ResultIndex(results)
+            for g in golden_names + _random_names(rng, 10) + [""]:
+                assert index.find(g) == _find_result_linear(results, g), (trial, g)
+
+    def test_no_named_result_rows(self):
+        index = sob.ResultIndex([{"id": "x", "filename": ""}, {"id": "y"}])
+        for g in ["", None, "請求書.pdf"]:
+            assert index.find(g) == {}
+        assert sob.ResultIndex([]).find("") == _find_result_linear([], "") == {}
+
+    def test_nfc_normalized(self):
+        nfd = "ﾃｽﾄ_ガス料金.pdf".replace("ガ", "ガ")
+        index = sob.ResultIndex([{"filename": nfd, "vendor": "A"}])
+        assert index.find("ﾃｽﾄ_ガス料金.pdf")["vendor"] == "A"
+
+
+def _golden(n: int) -> list[dict]:
+    return [
+        {"id": i, "filename": f"doc_{i:04d}_請求書.pdf", "vendor": "株式会社テスト",
+         "issue_date": "20260401", "amount": str(1000 + i)}
+        for i in range(1, n + 1)
+    ]
+
+
+def _results(golden: list[dict]) -> list[dict]:
+    return [
+        {"id": str(g["id"]), "filename": g["filename"], "vendor": "株式会社テスト",
+         "date": "2026/04/01", "amount": g["amount"]}
+        for g in golden
+    ]
+
+
+class TestIncremental:
+    def test_matches_score_all_and_skips_unchanged(self, tmp_path):
+        golden = _golden(40)
+        results = _results(golden)
+        snap = tmp_path / "score_snapshot.json"
+
+        first, deltas, rescored = sob.score_incremental(golden, results, snap)
+        assert first == sob.score_all(golden, results)
+        assert (deltas, rescored) == ([], 40)
+
+        again, deltas, rescored = sob.score_incremental(golden, results, snap)
+        assert again == first
+        assert (deltas, rescored) == ([], 0)
+
+    def test_emits_per_field_deltas(self, tmp_path):
+        golden = _golden(10)
+        results = _results(golden)
+        snap = tmp_path / "score_snapshot.json"
+        sob.score_incremental(golden, results, snap)
+
+        results[2] = {**results[2], "amount": "999999"}
+        results[5] = {**results[5], "date": None}
+        scored, deltas, rescored = sob.score_incremental(golden, results, snap)
+
+        assert rescored == 2
+        assert {(d["id"], d["field"], d["before"], d["after"]) for d in deltas} == {
+            ("3", "amount_ok", True, False),
+            ("3", "amount_approx", True, False),
+            ("6", "date_ok", True, False),
+        }
+        assert scored == sob.score_all(golden, results)
+        report = sob.generate_report(scored, "test", "golden.json", deltas)
+        assert "## Changes since last score" in report
+        assert "- amount_ok: +0 / -1 (1 changed)" in report
+
+    def test_scorer_change_rescores_everything(self, tmp_path, monkeypatch):
+        golden = _golden(5)
+        snap = tmp_path / "score_snapshot.json"
+        sob.score_incremental(golden, _results(golden), snap)
+
+        monkeypatch.setattr(sob, "_scorer_fingerprint", lambda: "other")
+        _, _, rescored = sob.score_incremental(golden, _results(golden), snap)
+        assert rescored == 5
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path):
+        golden = _golden(3)
+        snap = tmp_path / "score_snapshot.json"
+        snap.write_text("{broken", encoding="utf-8")
+        _, _, rescored = sob.score_incremental(golden, _results(golden), snap)
+        assert rescored == 3
+        assert json.loads(snap.read_text(encoding="utf-8"))["entries"]
@@ -5,10 +5,14 @@ Covers:
 - get_handoff_summary() parses handoff.md correctly
 - generate_briefing() returns a non-empty string
 - --compact mode stays within 20 lines
+- collect_sections() runs collectors concurrently, caches by input key and
+  honours --max-latency
 """
 from __future__ import annotations
 
+import json
 import sys
+import time
 from pathlib import Path
 
 import pytest
@@ -25,6 +29,7 @@ from tools.session_briefing import (
     get_stale_decisions,
     get_wiki_health,
 )
+import tools.session_briefing as sb
 
 
 # ---------------------------------------------------------------------------
@@ -200,3 +205,114 @@ def test_get_wiki_health_has_required_keys():
     result = get_wiki_health()
     for key in ("critical", "warnings", "avg_trust_score", "total_files"):
         assert key in result, f"Missing key: {key}"
+
+
+# ---------------------------------------------------------------------------
+# collect_sections (concurrency / cache / --max-latency)
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def slow_collectors(monkeypatch):
+    """各コレクタを 0.3 秒かかるフェイクに差し替え、呼び出し回数を数える。"""
+    calls: dict[str, int] = {}
+    delays = {name: 0.3 for name in sb._collectors()}
+
+    def fake(name, value):
+        def run(*args, **kwargs):
+            calls[name] = calls.get(name, 0) + 1
+            time.sleep(delays[name])
+            return value
+        return run
+
+    monkeypatch.setattr(sb, "get_recent_failures", fake("recent_failures", []))
+    monkeypatch.setattr(sb, "get_recent_runs_summary", fake("run_summary", {"by_pipeline": {}}))
+    monkeypatch.setattr(
+        sb, "get_wiki_health",
+        fake("wiki_health", {"critical": [], "warnings": [], "avg_trust_score": 90.0, "total_files": 1}),
+    )
+    monkeypatch.setattr(
+        sb, "get_git_status",
+        fake("git_status", {"branch": "main", "modified_files": [], "untracked_files": [], "recent_commits": []}),
+    )
+    monkeypatch.setattr(
+        sb, "get_handoff_summary",
+        fake("handoff", {"pending_high": ["x"], "pending_mid": [], "last_updated": "2026-01-01", "found": True}),
+    )
+    monkeypatch.setattr(sb, "get_stale_decisions", fake("stale_decisions", []))
+    return calls, delays
+
+
+def test_collectors_run_concurrently(slow_collectors, tmp_path):
+    calls, _ = slow_collectors
+    t0 = time.monotonic()
+    data, pending, failed = sb.collect_sections(cache_path=None)
+    elapsed = time.monotonic() - t0
+
+    assert pending == [] and failed == {}
+    assert elapsed < 0.3 * 6 / 2
+    assert data["handoff"]["pending_high"] == ["x"]
+    assert all(n == 1 for n in calls.values()) and len(calls) == 6
+
+
+def test_cache_skips_unchanged_collectors(slow_collectors, tmp_path, monkeypatch):
+    calls, _ = slow_collectors
+    handoff = tmp_path / "handoff.md"
+    handoff.write_text("# Handoff — 2026-01-01\n", encoding="utf-8")
+    monkeypatch.setattr(sb, "HANDOFF_PATH", handoff)
+    cache_path = tmp_path / "briefing.json"
+
+    first, _, _ = sb.collect_sections(cache_path=cache_path)
+    second, _, _ = sb.collect_sections(cache_path=cache_path)
+
+    assert second == first
+    assert calls["handoff"] == 1
+    assert calls["git_status"] == 2  # working tree state is never cached
+
+    handoff.write_text("# Handoff — 2026-02-01\n(changed)\n", encoding="utf-8")
+    sb.collect_sections(cache_path=cache_path)
+    assert calls["handoff"] == 2
+    assert set(json.loads(cache_path.read_text(encoding="utf-8"))) >= {"handoff", "wiki_health"}
+
+
+def test_max_latency_returns_partial(slow_collectors, tmp_path):
+    calls, delays = slow_collectors
+    delays["wiki_health"] = 1.5
+    cache_path = tmp_path / "briefing.json"
+
+    t0 = time.monotonic()
+    text = sb.generate_briefing(max_latency=0.6, cache_path=cache_path)
+    elapsed = time.monotonic() - t0
+
+    assert elapsed < 1.2
+    assert "未取得" in text and "wiki_health" in text
+    assert "GIT STATE" in text and "Branch: main" in text
+
+    # The late collector still finishes in the background and warms the cache.
+    time.sleep(1.3)
+    data, pending, _ = sb.collect_sections(max_latency=0.6, cache_path=cache_path)
+    assert pending == []
+    assert data["wiki_health"]["avg_trust_score"] == 90.0
+    assert calls["wiki_health"] == 1
+
+
+@pytest.mark.parametrize("max_latency", [None, 5.0])
+def test_raising_collector_is_reported_as_failed(slow_collectors, monkeypatch, caplog, max_latency):
+    def boom():
+        raise RuntimeError("handoff unreadable")
+
+    monkeypatch.setattr(sb, "get_handoff_summary", boom)
+
+    data, pending, failed = sb.collect_sections(max_latency=max_latency, cache_path=None)
+    assert pending == []
+    assert failed == {"handoff": "RuntimeError: handoff unreadable"}
+    assert data["handoff"] == sb._collectors()["handoff"][2]
+    assert "briefing collector handoff failed" in caplog.text
+
+    text = sb.generate_briefing(max_latency=max_latency, cache_path=None)
+    assert "取得失敗: handoff (RuntimeError: handoff unreadable)" in text
+    assert "未取得" not in text
+    assert "GIT STATE" in text
+
+    out = json.loads(sb.generate_json(max_latency=max_latency, cache_path=None))
+    assert out["failed"] == {"handoff": "RuntimeError: handoff unreadable"} and out["pending"] == []
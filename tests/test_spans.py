@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/common/spans.py"""
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from tools.common import spans
+from tools.common.evidence_ledger import EvidenceLedger
+from tools.common.spans import SpanRecorder, profile_to, span, timed
+
+
+@timed("work")
+def _work(delay: float = 0.0) -> str:
+    with span("inner"):
+        time.sleep(delay)
+    return "done"
+
+
+class TestSpans:
+    def test_disabled_is_noop(self):
+        assert spans.current_recorder() is None
+        assert span("x") is span("y")  # 共有の no-op
+        assert _work() == "done"
+
+    def test_nested_paths_and_counts(self):
+        rec = SpanRecorder()
+        with rec.activate():
+            with span("ocr"):
+                _work(0.01)
+                _work()
+            _work()
+
+        totals = rec.totals_ms()
+        assert set(totals) == {"ocr/work/inner", "ocr/work", "ocr", "work/inner", "work"}
+        assert totals["ocr"] >= totals["ocr/work"] >= totals["ocr/work/inner"] >= 10
+        assert rec.counts()["ocr/work"] == 2
+        assert spans.current_recorder() is None
+
+    def test_folded_uses_self_time(self):
+        rec = SpanRecorder()
+        with rec.activate():
+            with span("outer"):
+                with span("inner"):
+                    time.sleep(0.02)
+
+        lines = dict(line.rsplit(" ", 1) for line in rec.to_folded().splitlines())
+        assert set(lines) == {"outer;inner", "outer"}
+        assert int(lines["outer;inner"]) >= 20_000
+        assert int(lines["outer"]) < int(lines["outer;inner"])
+
+    def test_recording_is_per_thread(self):
+        rec = SpanRecorder()
+        with rec.activate():
+            t = threading.Thread(target=_work)
+            t.start()
+            t.join()
+
+        assert rec.totals_ms() == {}
+
+    def test_exception_still_closes_span(self):
+        rec = SpanRecorder()
+        with rec.activate():
+            with pytest.raises(ValueError):
+                with span("boom"):
+                    raise ValueError("x")
+            with span("after"):
+                pass
+
+        assert set(rec.totals_ms()) == {"boom", "after"}
+
+    def test_emit_metrics_to_evidence_ledger(self, tmp_path):
+        ledger = EvidenceLedger(str(tmp_path / "evidence"))
+        rec = SpanRecorder()
+        with rec.activate():
+            _work()
+        with ledger.start_run("ocr", scenario="scenario-44") as run:
+            rec.emit_metrics(run, key="stage_ms:a.pdf")
+            rec.emit_metrics(None)
+
+        record = ledger.latest("ocr")
+        assert set(record.output_summary["stage_ms:a.pdf"]) == {"work/inner", "work"}
+
+    def test_profile_to_writes_prof_and_folded(self, tmp_path):
+        rec = SpanRecorder()
+        with profile_to(tmp_path / "prof", "a", rec), rec.activate():
+            _work()
+
+        stats = pstats.Stats(str(tmp_path / "prof" / "a.prof"))
+        assert any(func[2] == "_work" for func in stats.stats)
+        assert (tmp_path / "prof" / "a.folded").read_text(encoding="utf-8").startswith("work;inner ")
+
+
+class TestPreprocessInstrumentation:
+    def test_preprocess_records_stages(self, tmp_path, monkeypatch):
+        fitz = pytest.importorskip("fitz")
+        pytest.importorskip("cv2")
+        pytest.importorskip("PIL")
+        import common.logger as common_logger
+        from common.spans import SpanRecorder as ToolSpanRecorder  # ツール側と同じ import パス
+        from pdf_preprocess import PDFPreprocessor
+
+        # 既定ロガーは C:\ProgramData 配下にファイルを作るため差し替える
+        monkeypatch.setattr(common_logger, "_logger", logging.getLogger("test_spans"))
+        pdf = tmp_path / "fax.pdf"
+        doc = fitz.open()
+        doc.new_page(width=300, height=420).insert_text((40, 80), "INVOICE 12345 TOTAL 1000", fontsize=14)
+        doc.save(str(pdf))
+        doc.close()
+
+        rec = ToolSpanRecorder()
+        with rec.activate():
+            result = PDFPreprocessor(dpi=100).preprocess(pdf, output_dir=tmp_path / "out", do_border=False)
+
+        assert result.success
+        totals = rec.totals_ms()
+        for stage in ("preprocess", "preprocess/render", "preprocess/skew_detect",
+                      "preprocess/rotation_detect", "preprocess/shadow_detect"):
+            assert stage in totals
+        assert "preprocess/border" not in totals
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/common/tesseract_engine.py"""
+import os
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+np = pytest.importorskip("numpy")
+
+from tools.common import tesseract_engine as te
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def fake_exe(tmp_path: Path) -> Path:
+    """tesseract.exe の代わり: 画像サイズを出力し、起動回数を記録する。"""
+    if os.name == "nt":
+        pytest.skip("stub executable relies on a shebang")
+    calls = tmp_path / "calls.txt"
+    script = tmp_path / "tesseract"
+    script.write_text(
+        textwrap.dedent(
+            f"""\
+            #!{sys.executable}
+            import sys
+            from pathlib import Path
+            src = Path(sys.argv[1])
+            with open({str(calls)!r}, "a") as f:
+                f.write(" ".join(sys.argv[1:]) + "\\n")
+            paths = [Path(p) for p in src.read_text().split()] if src.suffix == ".txt" else [src]
+            for p in paths:
+                head = p.read_bytes().split(b"\\n")[:2]
+                sys.stdout.write(f"{{p.stem}} {{head[1].decode()}}\\n\\f")
+            """
+        ),
+        encoding="utf-8",
+    )
+    script.chmod(0o755)
+    return script
+
+
+def _calls(fake_exe: Path) -> list[str]:
+    p = fake_exe.parent / "calls.txt"
+    return p.read_text().splitlines() if p.exists() else []
+
+
+class FakeApi:
+    inits = 0
+
+    def __init__(self, lang: str, psm: int, path: str | None = None) -> None:
+        FakeApi.inits += 1
+        self.lang = lang
+        self._shape = None
+
+    def SetImageBytes(self, data, w, h, bpp, bpl):  # noqa: N802
+        assert bpp == 1 and bpl == w and len(data) == w * h
+        self._shape = (w, h)
+
+    def SetImageFile(self, path):  # noqa: N802
+        self._shape = Path(path).name
+
+    def GetUTF8Text(self):  # noqa: N802
+        return f"api {self._shape}"
+
+    def End(self):  # noqa: N802
+        pass
+
+
+@pytest.fixture
+def fake_tesserocr(monkeypatch):
+    FakeApi.inits = 0
+    monkeypatch.setattr(te, "tesserocr", type("M", (), {"PyTessBaseAPI": FakeApi}), raising=False)
+    monkeypatch.setattr(te, "_TESSEROCR_AVAILABLE", True)
+    return FakeApi
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+class TestHelpers:
+    def test_to_gray_from_bgr(self):
+        bgr = np.zeros((2, 3, 3), dtype=np.uint8)
+        bgr[..., 2] = 255  # red
+        gray = te.to_gray(bgr)
+        assert gray.shape == (2, 3)
+        assert gray.dtype == np.uint8
+        assert 70 <= int(gray[0, 0]) <= 80
+
+    def test_write_pgm_header(self, tmp_path):
+        p = tmp_path / "x.pgm"
+        te.write_pgm(p, np.full((4, 5), 200, dtype=np.uint8))
+        data = p.read_bytes()
+        assert data.startswith(b"P5\n5 4\n255\n")
+        assert len(data) == len(b"P5\n5 4\n255\n") + 20
+
+
+# ---------------------------------------------------------------------------
+# subprocess backend
+# ---------------------------------------------------------------------------
+
+class TestSubprocessBackend:
+    def test_batch_uses_one_process(self, fake_exe):
+        engine = te.TesseractEngine(exe=fake_exe, backend="subprocess", languages="jpn")
+        pages = [np.zeros((10 + i, 20, 3), dtype=np.uint8) for i in range(3)]
+
+        texts = engine.images_to_text(pages)
+
+        assert [t.strip() for t in texts] == ["page_0000 20 10", "page_0001 20 11", "page_0002 20 12"]
+        calls = _calls(fake_exe)
+        assert len(calls) == 1
+        assert calls[0].split()[0].endswith("pages.txt")
+        assert "-l jpn --psm 6" in calls[0]
+
+    def test_single_path_input(self, fake_exe, tmp_path):
+        img = tmp_path / "scan.pgm"
+        te.write_pgm(img, np.zeros((7, 9), dtype=np.uint8))
+        engine = te.TesseractEngine(exe=fake_exe, backend="subprocess")
+
+        assert engine.image_to_text(img).strip() == "scan 9 7"
+
+    def test_missing_exe_raises(self, monkeypatch):
+        monkeypatch.setattr(te, "_TESSEROCR_AVAILABLE", False)
+        monkeypatch.setattr(te, "find_tesseract_exe", lambda: None)
+        with pytest.raises(RuntimeError):
+            te.TesseractEngine()
+
+
+# ---------------------------------------------------------------------------
+# tesserocr backend
+# ---------------------------------------------------------------------------
+
+class TestTesserocrBackend:
+    def test_api_handle_is_reused(self, fake_tesserocr, fake_exe):
+        engine = te.TesseractEngine(exe=fake_exe)
+        assert engine.backend == "tesserocr"
+
+        texts = engine.images_to_text([np.zeros((4, 6), dtype=np.uint8)] * 3)
+        texts += [engine.image_to_text(np.zeros((5, 6, 3), dtype=np.uint8))]
+
+        assert texts == ["api (6, 4)"] * 3 + ["api (6, 5)"]
+        assert fake_tesserocr.inits == 1
+        assert _calls(fake_exe) == []
+
+    def test_falls_back_to_subprocess_on_api_error(self, fake_tesserocr, fake_exe, monkeypatch):
+        engine = te.TesseractEngine(exe=fake_exe)
+
+        def broken(self):
+            raise RuntimeError("api crashed")
+
+        monkeypatch.setattr(FakeApi, "GetUTF8Text", broken)
+        text = engine.image_to_text(np.zeros((3, 4), dtype=np.uint8))
+
+        assert text.strip() == "page_0000 4 3"
+        assert len(_calls(fake_exe)) == 1
+
+    def test_init_failure_uses_subprocess(self, fake_tesserocr, fake_exe, monkeypatch):
+        def failing_init(self, **kwargs):
+            raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+        monkeypatch.setattr(FakeApi, "__init__", failing_init)
+        engine = te.TesseractEngine(exe=fake_exe)
+
+        assert engine.backend == "subprocess"
+        assert "tessdata" in (engine.init_error or "")
+
+    def test_get_engine_is_cached(self, fake_tesserocr, fake_exe):
+        te.reset_engines()
+        try:
+            a = te.get_tesseract_engine(languages="jpn", exe=fake_exe)
+            b = te.get_tesseract_engine(languages="jpn", exe=fake_exe)
+            c = te.get_tesseract_engine(languages="jpn+eng", exe=fake_exe)
+        finally:
+            te.reset_engines()
+
+        assert a is b
+        assert a is not c
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/video2pdd/control_repo.py and phase1_robin ControlRepository linking"""
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.video2pdd import control_repo as cr
+from tools.video2pdd import phase1_robin
+from tools.video2pdd.event_log import create_step
+
+
+def _png(seed: int, size: int = 300) -> bytes:
+    return b"\x89PNG\r\n\x1a\n" + random.Random(seed).randbytes(size)
+
+
+def _collect_reference(obj, result: dict) -> None:
+    """Former json.load() based lookup (recursive, later objects win)."""
+    if isinstance(obj, dict):
+        name = obj.get("Name") or obj.get("name") or obj.get("DisplayName")
+        img = obj.get("Screenshot") or obj.get("screenshot") or obj.get("Image")
+        if name and img and isinstance(img, str):
+            result[name] = img
+        for value in obj.values():
+            _collect_reference(value, result)
+    elif isinstance(obj, list):
+        for item in obj:
+            _collect_reference(item, result)
+
+
+def _random_repo(rng: random.Random, depth: int = 0):
+    names = ["Button 'OK'", "Edit \"金額\"", "Pane 'x\\\\y'", "Div 1", "タブ"]
+    kind = rng.random()
+    if depth > 3 or kind < 0.2:
+        return rng.choice([1, -2.5e3, True, False, None, "text", "", "a\\\"b"])
+    if kind < 0.45:
+        return [_random_repo(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    obj = {}
+    for key in rng.sample(["Name", "name", "DisplayName", "Screenshot", "Image", "Id", "Controls"], rng.randint(0, 5)):
+        if key in cr.NAME_KEYS:
+            obj[key] = rng.choice(names + [""])
+        elif key in cr.IMAGE_KEYS:
+            obj[key] = rng.choice([base64.b64encode(_png(rng.randint(0, 9))).decode(), "", None])
+        else:
+            obj[key] = _random_repo(rng, depth + 1)
+    return obj
+
+
+def _write(path: Path, obj, **dump_kwargs) -> Path:
+    path.write_text(json.dumps(obj, **dump_kwargs), encoding="utf-8")
+    return path
+
+
+def _decoded_index(path: Path, cache_dir: Path) -> dict:
+    return {
+        name: base64.b64encode(cr.extract_screenshot(path, ref, cache_dir).read_bytes()).decode()
+        for name, ref in cr.scan_control_repo(path).items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Streaming scan
+# ---------------------------------------------------------------------------
+
+class TestScan:
+    @pytest.mark.parametrize("chunk", [7, 64, 1 << 16])
+    def test_matches_json_load(self, tmp_path, monkeypatch, chunk):
+        monkeypatch.setattr(cr, "READ_CHUNK", chunk)
+        rng = random.Random(42)
+        for trial in range(40):
+            doc = {"Screens": [_random_repo(rng) for _ in range(rng.randint(1, 4))]}
+            path = _write(tmp_path / f"repo{trial}.json", doc, ensure_ascii=trial % 2 == 0, indent=trial % 3 or None)
+            expected: dict = {}
+            _collect_reference(doc, expected)
+            assert _decoded_index(path, tmp_path / "cache") == expected, trial
+
+    def test_screenshot_not_materialized(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cr, "READ_CHUNK", 1024)
+        big = base64.b64encode(_png(1, 200_000)).decode()
+        path = _write(tmp_path / "repo.json", {"Controls": [{"Name": "Big", "Screenshot": big}]})
+
+        buffers = []
+        fill = cr._Scanner._fill
+
+        def spy(self):
+            ok = fill(self)
+            buffers.append(len(self.buf))
+            return ok
+
+        monkeypatch.setattr(cr._Scanner, "_fill", spy)
+        index = cr.scan_control_repo(path)
+
+        assert set(index) == {"Big"}
+        assert max(buffers) < 4 * 1024
+
+    def test_escaped_slashes_and_data_url(self, tmp_path):
+        data = _png(3)
+        b64 = base64.b64encode(data).decode()
+        raw = (
+            '{"A": {"Name": "x", "Image": "' + b64.replace("/", "\\/") + '"},'
+            ' "B": {"Name": "y", "Screenshot": "data:image/png;base64,' + b64 + '"}}'
+        )
+        (tmp_path / "repo.json").write_bytes(b"\xef\xbb\xbf" + raw.encode())
+
+        index = cr.scan_control_repo(tmp_path / "repo.json")
+
+        for name in ("x", "y"):
+            out = cr.extract_screenshot(tmp_path / "repo.json", index[name], tmp_path / "cache")
+            assert out.read_bytes() == data
+            assert out.name == hashlib.sha256(data).hexdigest() + ".png"
+
+    @pytest.mark.parametrize("text", ['{"Name": "a"', '{"Name" "a"}', '[1, 2', '{"a": 1} x', '{"a": "b'])
+    def test_malformed_raises(self, tmp_path, text):
+        (tmp_path / "bad.json").write_text(text, encoding="utf-8")
+        with pytest.raises(ValueError):
+            cr.scan_control_repo(tmp_path / "bad.json")
+
+
+# ---------------------------------------------------------------------------
+# phase1_robin linking
+# ---------------------------------------------------------------------------
+
+class TestLinkControlRepo:
+    def test_only_referenced_controls_are_decoded(self, tmp_path):
+        controls = [
+            {"Name": f"Button {i}", "Screenshot": base64.b64encode(_png(i)).decode()}
+            for i in range(20)
+        ]
+        controls.append({"Name": "Copy", "Screenshot": controls[3]["Screenshot"]})
+        repo = _write(tmp_path / "repo.json", {"Screens": [{"Name": "Win", "Controls": controls}]})
+        event_log = {"steps": [
+            create_step(num="1", raw_line="", action_category="ui_automation", action_type="click",
+                        target_element="Button 3"),
+            create_step(num="2", raw_line="", action_category="ui_automation", action_type="click",
+                        target_element="Copy"),
+            create_step(num="3", raw_line="", action_category="ui_automation", action_type="click",
+                        target_element="Missing"),
+        ]}
+
+        phase1_robin._link_control_repo(event_log, str(repo), tmp_path / "shots")
+
+        paths = [s["screenshot_path"] for s in event_log["steps"]]
+        assert paths[0] == paths[1]  # identical image -> one cache file
+        assert Path(paths[0]).read_bytes() == _png(3)
+        assert paths[2] is None
+        assert [p.name for p in (tmp_path / "shots").iterdir()] == [Path(paths[0]).name]
+
+    def test_corrupt_repo_is_skipped(self, tmp_path):
+        (tmp_path / "repo.json").write_text('{"Name": "a", "Screenshot": "iVBO', encoding="utf-8")
+        event_log = {"steps": [create_step(num="1", raw_line="", action_category="ui_automation",
+                                           action_type="click", target_element="a")]}
+        phase1_robin._link_control_repo(event_log, str(tmp_path / "repo.json"), tmp_path / "shots")
+        assert event_log["steps"][0]["screenshot_path"] is None
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/video2pdd/phase1_video.py (LocalBackend, no network)"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools.video2pdd import phase1_video as p1
+
+
+def _steps_json(*timestamps: str, phases=None, ambiguities=None) -> str:
+    steps = [
+        {
+            "num": i,
+            "timestamp": ts,
+            "application": "Excel",
+            "app_type": "desktop",
+            "action": "Click",
+            "target": f"button {i}",
+            "confidence": 0.95,
+        }
+        for i, ts in enumerate(timestamps, start=1)
+    ]
+    return json.dumps({
+        "steps": steps,
+        "flow_phases": phases or [],
+        "ambiguities": ambiguities or [],
+    })
+
+
+@pytest.fixture
+def video(tmp_path) -> Path:
+    path = tmp_path / "rec.mp4"
+    path.write_bytes(b"\x00\x00\x00\x18ftypmp42" + os.urandom(256))
+    return path
+
+
+@pytest.fixture
+def sleeps() -> list:
+    return []
+
+
+def _analyze(video, cache_dir, backend, sleeps, **kwargs):
+    return p1.analyze_video(
+        str(video), backend=backend, cache_dir=cache_dir, sleep=sleeps.append, **kwargs
+    )
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class TestCache:
+    def test_rerun_hits_analysis_cache(self, video, tmp_path, sleeps):
+        backend = p1.LocalBackend(lambda path, prompt: _steps_json("00:01", "00:04"))
+
+        first = _analyze(video, tmp_path / "cache", backend, sleeps)
+        second = _analyze(video, tmp_path / "cache", backend, sleeps)
+
+        assert first == second
+        assert len(first["steps"]) == 2
+        assert len(backend.uploads) == 1
+        assert backend.generate_calls == 1
+
+    def test_non_json_answer_is_not_cached(self, video, tmp_path, sleeps):
+        replies = iter(["Sorry, I cannot", _steps_json("00:01")])
+        backend = p1.LocalBackend(lambda path, prompt: next(replies))
+
+        with pytest.raises(ValueError, match="Could not parse"):
+            _analyze(video, tmp_path / "cache", backend, sleeps)
+        result = _analyze(video, tmp_path / "cache", backend, sleeps)
+        again = _analyze(video, tmp_path / "cache", backend, sleeps)
+
+        assert len(result["steps"]) == 1 and again == result
+        assert backend.generate_calls == 2  # second run asks again, third hits the cache
+
+    def test_unparseable_cache_entry_is_dropped(self, video, tmp_path, sleeps):
+        backend = p1.LocalBackend(lambda path, prompt: _steps_json("00:01"))
+        _analyze(video, tmp_path / "cache", backend, sleeps)
+        [entry] = (tmp_path / "cache" / "analysis").glob("*.txt")
+        entry.write_text("Sorry, I cannot", encoding="utf-8")  # written by an older version
+
+        result = _analyze(video, tmp_path / "cache", backend, sleeps)
+
+        assert len(result["steps"]) == 1
+        assert backend.generate_calls == 2
+        assert json.loads(entry.read_text(encoding="utf-8"))["steps"]
+
+    def test_prompt_change_reuses_upload(self, video, tmp_path, sleeps):
+        backend = p1.LocalBackend(lambda path, prompt: _steps_json("00:01"))
+
+        _analyze(video, tmp_path / "cache", backend, sleeps)
+        _analyze(video, tmp_path / "cache", backend, sleeps, with_audio=True)
+
+        assert len(backend.uploads) == 1
+        assert backend.generate_calls == 2
+
+    def test_no_cache_still_reuses_upload(self, video, tmp_path, sleeps):
+        backend = p1.LocalBackend(lambda path, prompt: _steps_json("00:01"))
+
+        _analyze(video, tmp_path / "cache", backend, sleeps)
+        _analyze(video, tmp_path / "cache", backend, sleeps, use_cache=False)
+
+        assert len(backend.uploads) == 1
+        assert backend.generate_calls == 2
+
+    def test_expired_upload_is_uploaded_again(self, video, tmp_path, sleeps):
+        backend = p1.LocalBackend(lambda path, prompt: _steps_json("00:01"))
+        _analyze(video, tmp_path / "cache", backend, sleeps)
+
+        backend.files.clear()  # provider deleted the file
+        _analyze(video, tmp_path / "cache", backend, sleeps, use_cache=False)
+
+        assert len(backend.uploads) == 2
+
+
+# ---------------------------------------------------------------------------
+# Retry / polling
+# ---------------------------------------------------------------------------
+
+class TestRetry:
+    def test_generate_retry_does_not_reupload(self, video, tmp_path, sleeps):
+        calls = []
+
+        def flaky(path, prompt):
+            calls.append(path)
+            if len(calls) < 3:
+                raise ConnectionError("503")
+            return _steps_json("00:02")
+
+        backend = p1.LocalBackend(flaky)
+        data = _analyze(video, tmp_path / "cache", backend, sleeps)
+
+        assert data["steps"][0]["timestamp"] == "00:02"
+        assert len(backend.uploads) == 1
+        assert len(calls) == 3
+        assert sleeps[-2:] == [p1.RETRY_DELAY_SEC, p1.RETRY_DELAY_SEC * 2]
+
+    def test_gives_up_after_max_retries(self, video, tmp_path, sleeps):
+        backend = p1.LocalBackend(lambda path, prompt: "")
+        with pytest.raises(RuntimeError, match="failed after"):
+            _analyze(video, tmp_path / "cache", backend, sleeps)
+        assert backend.generate_calls == p1.MAX_RETRIES
+        assert len(backend.uploads) == 1
+
+    def test_poll_backoff(self, video, tmp_path, sleeps):
+        backend = p1.LocalBackend(lambda path, prompt: _steps_json("00:01"), processing_polls=8)
+        _analyze(video, tmp_path / "cache", backend, sleeps)
+        assert sleeps == [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0, 30.0]
+
+    def test_failed_processing_drops_cached_handle(self, video, tmp_path, sleeps):
+        class FailingBackend(p1.LocalBackend):
+            def get(self, name):
+                return p1.RemoteFile(name=name, uri="", state=p1.STATE_FAILED)
+
+        with pytest.raises(RuntimeError, match="processing failed"):
+            _analyze(video, tmp_path / "cache", FailingBackend(), sleeps)
+        cache = p1.AnalysisCache(tmp_path / "cache")
+        assert cache.get_upload("local", p1._file_sha256(video)) is None
+
+
+# ---------------------------------------------------------------------------
+# Segments
+# ---------------------------------------------------------------------------
+
+class TestSegments:
+    def test_merge_offsets_numbers_and_timestamps(self):
+        first = json.loads(_steps_json(
+            "00:05", "09:58",
+            phases=[{"name": "open", "step_range": [1, 2]}],
+        ))
+        second = json.loads(_steps_json(
+            "00:03", "00:40", "59:30",
+            phases=[{"name": "enter", "step_range": [1, 3]}],
+            ambiguities=[{"step_num": 2, "description": "?"}],
+        ))
+
+        merged = p1._merge_segment_outputs([(0.0, first), (600.0, second)])
+
+        assert [s["num"] for s in merged["steps"]] == [1, 2, 3, 4, 5]
+        assert [s["timestamp"] for s in merged["steps"]] == [
+            "00:05", "09:58", "10:03", "10:40", "1:09:30",
+        ]
+        assert [ph["step_range"] for ph in merged["flow_phases"]] == [[1, 2], [3, 5]]
+        assert merged["ambiguities"][0]["step_num"] == 4
+
+    def test_segmented_run_uploads_each_segment_once(self, video, tmp_path, sleeps, monkeypatch):
+        seg_a, seg_b = tmp_path / "seg_000.mp4", tmp_path / "seg_001.mp4"
+        seg_a.write_bytes(b"a" * 64)
+        seg_b.write_bytes(b"b" * 64)
+        monkeypatch.setattr(
+            p1, "split_video",
+            lambda path, sec, out_dir: [p1.VideoSegment(seg_a, 0.0), p1.VideoSegment(seg_b, 300.0)],
+        )
+        backend = p1.LocalBackend(lambda path, prompt: _steps_json("00:10"))
+
+        data = _analyze(video, tmp_path / "cache", backend, sleeps, segment_sec=300)
+        again = _analyze(video, tmp_path / "cache", backend, sleeps, segment_sec=300)
+
+        assert [s["timestamp"] for s in data["steps"]] == ["00:10", "05:10"]
+        assert again == data
+        assert backend.uploads == [seg_a, seg_b]
+        assert backend.generate_calls == 2
+
+    def test_split_without_ffmpeg_is_single_segment(self, video, tmp_path, monkeypatch):
+        monkeypatch.setattr(p1.shutil, "which", lambda name: None)
+        segments = p1.split_video(video, 60, tmp_path / "segs")
+        assert segments == [p1.VideoSegment(video, 0.0)]
+
+    def test_split_reads_existing_segment_list(self, video, tmp_path):
+        out_dir = tmp_path / "segs"
+        out_dir.mkdir()
+        (out_dir / "segments.csv").write_text(
+            "seg_000.mp4,0.000000,61.200000\nseg_001.mp4,61.200000,118.000000\n", encoding="utf-8"
+        )
+        segments = p1.split_video(video, 60, out_dir)
+        assert segments == [
+            p1.VideoSegment(out_dir / "seg_000.mp4", 0.0),
+            p1.VideoSegment(out_dir / "seg_001.mp4", 61.2),
+        ]
@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+"""Tests for tools/web_invoice_downloader.py"""
+import asyncio
+import http.server
+import io
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+
+# パスを通す
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tools import web_invoice_downloader as wid
+
+
+# ---------------------------------------------------------------------------
+# Fake async browser (Playwright の BrowserContext / Page の代わり)
+# ---------------------------------------------------------------------------
+
+class FakeContext:
+    def __init__(self, browser: "FakeBrowser", storage_state: str | None) -> None:
+        self.browser = browser
+        self.storage_state_in = storage_state
+        self.closed = False
+
+    async def new_page(self):
+        return object()
+
+    async def storage_state(self, path: str) -> None:
+        Path(path).write_text(json.dumps({"cookies": [{"name": "sid"}]}), encoding="utf-8")
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.contexts: list[FakeContext] = []
+        self.closed = False
+
+    async def new_context(self, **kwargs):
+        ctx = FakeContext(self, kwargs.get("storage_state"))
+        self.contexts.append(ctx)
+        return ctx
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakePlaywright:
+    stopped = False
+
+    async def stop(self) -> None:
+        self.stopped = True
+
+
+class FakeLauncher:
+    def __init__(self) -> None:
+        self.browsers: list[FakeBrowser] = []
+
+    async def __call__(self, headless: bool):
+        self.browsers.append(FakeBrowser())
+        return FakePlaywright(), self.browsers[-1]
+
+
+class Tracker:
+    """同時実行数（全体・テナント別）を記録するジョブ"""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.by_tenant: dict[str, int] = {}
+        self.max_by_tenant: dict[str, int] = {}
+
+    def job(self, tenant: str, value):
+        async def run(session: dict):
+            with self.lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+                self.by_tenant[tenant] = self.by_tenant.get(tenant, 0) + 1
+                self.max_by_tenant[tenant] = max(self.max_by_tenant.get(tenant, 0), self.by_tenant[tenant])
+            await asyncio.sleep(self.delay)
+            with self.lock:
+                self.active -= 1
+                self.by_tenant[tenant] -= 1
+            return value, session["context"]
+
+        return run
+
+
+@pytest.fixture
+def launcher():
+    return FakeLauncher()
+
+
+# ---------------------------------------------------------------------------
+# WebDownloadService
+# ---------------------------------------------------------------------------
+
+class TestWebDownloadService:
+    def test_concurrency_is_bounded_by_workers(self, launcher):
+        svc = wid.WebDownloadService(workers=2, launch=launcher)
+        tracker = Tracker()
+        try:
+            futs = [svc.submit(f"vendor{i}", tracker.job(f"vendor{i}", i)) for i in range(6)]
+            values = [f.result(timeout=5)[0] for f in futs]
+        finally:
+            svc.close()
+
+        assert values == list(range(6))
+        assert tracker.max_active == 2
+        assert len(launcher.browsers) == 1  # one browser for all tenants
+        assert len(launcher.browsers[0].contexts) == 6
+
+    def test_same_tenant_is_serialised_on_one_context(self, launcher):
+        svc = wid.WebDownloadService(workers=4, launch=launcher)
+        tracker = Tracker()
+        try:
+            futs = [svc.submit("a", tracker.job("a", i)) for i in range(3)]
+            futs.append(svc.submit("b", tracker.job("b", 9)))
+            results = [f.result(timeout=5) for f in futs]
+        finally:
+            svc.close()
+
+        assert tracker.max_by_tenant == {"a": 1, "b": 1}
+        assert tracker.max_active == 2
+        contexts_a = {id(ctx) for _, ctx in results[:3]}
+        assert len(contexts_a) == 1
+        assert results[3][1] is not results[0][1]
+
+    def test_storage_state_is_saved_and_reused(self, launcher, tmp_path):
+        state_dir = tmp_path / "web_sessions"
+        svc = wid.WebDownloadService(state_dir=state_dir, launch=launcher)
+        svc.submit("Portal/A", Tracker(0).job("Portal/A", 1)).result(timeout=5)
+        svc.close()
+
+        state = state_dir / "Portal_A.json"
+        assert state.exists()
+        assert launcher.browsers[0].contexts[0].storage_state_in is None
+        assert launcher.browsers[0].closed
+
+        svc = wid.WebDownloadService(state_dir=state_dir, launch=launcher)
+        try:
+            svc.submit("Portal/A", Tracker(0).job("Portal/A", 1)).result(timeout=5)
+        finally:
+            svc.close()
+        assert launcher.browsers[1].contexts[0].storage_state_in == str(state)
+
+    def test_idle_contexts_are_evicted(self, launcher, tmp_path):
+        svc = wid.WebDownloadService(idle_timeout_s=0.1, state_dir=tmp_path, launch=launcher)
+        try:
+            svc.submit("a", Tracker(0).job("a", 1)).result(timeout=5)
+            deadline = time.monotonic() + 5
+            while svc.tenants() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert svc.tenants() == []
+            assert svc.evicted == ["a"]
+            assert launcher.browsers[0].contexts[0].closed
+
+            svc.submit("a", Tracker(0).job("a", 2)).result(timeout=5)
+            assert len(launcher.browsers[0].contexts) == 2
+        finally:
+            svc.close()
+
+    def test_close_waits_for_pending_jobs(self, launcher):
+        svc = wid.WebDownloadService(workers=1, launch=launcher)
+        tracker = Tracker(0.05)
+        futs = [svc.submit(f"t{i}", tracker.job(f"t{i}", i)) for i in range(3)]
+        svc.close()
+
+        assert all(f.done() and not f.exception() for f in futs)
+        with pytest.raises(RuntimeError):
+            svc.submit("t", tracker.job("t", 0))
+
+    def test_launch_failure_is_reported_by_future(self):
+        async def broken(headless):
+            raise RuntimeError("Executable doesn't exist")
+
+        svc = wid.WebDownloadService(launch=broken)
+        try:
+            with pytest.raises(RuntimeError, match="Executable"):
+                svc.submit("a", Tracker(0).job("a", 1)).result(timeout=5)
+        finally:
+            svc.close()
+
+
+# ---------------------------------------------------------------------------
+# submit_web_download
+# ---------------------------------------------------------------------------
+
+def _cfg(**kw) -> "wid.WebDownloadConfig":
+    vendor = wid.VendorWebConfig(
+        handler_id="fake",
+        target_name="Fake Portal",
+        sender_pattern=r"@portal\.example$",
+        url_pattern="",
+        options={},
+    )
+    return wid.WebDownloadConfig(enabled=True, vendors=(vendor,), **kw)
+
+
+class TestSubmitWebDownload:
+    @pytest.fixture
+    def fake_handler(self, monkeypatch):
+        release = threading.Event()
+        calls: list[str] = []
+
+        async def handler(*, session, subject, download_dir, **kwargs):
+            calls.append(subject)
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            pdf = download_dir / f"{len(calls)}.pdf"
+            pdf.write_bytes(b"%PDF-1.4 fake")
+            return [pdf]
+
+        monkeypatch.setitem(wid._HANDLER_REGISTRY, "fake", handler)
+        monkeypatch.setattr(wid, "_get_credential", lambda target: ("user", "pass"))
+        return release, calls
+
+    def _submit(self, tmp_path, service, **kw):
+        args = dict(
+            cfg=_cfg(),
+            sender="billing@portal.example",
+            urls=["https://portal.example/login"],
+            subject="請求書 2026年3月",
+            received_dt=datetime(2026, 3, 31, 9, 0),
+            download_dir=tmp_path / "dl",
+            log_path=tmp_path / "run.log",
+            dry_run=False,
+            scan_only=False,
+            service=service,
+        )
+        args.update(kw)
+        return wid.submit_web_download(**args)
+
+    def test_returns_before_download_and_dedupes_inflight(self, tmp_path, launcher, fake_handler):
+        release, calls = fake_handler
+        svc = wid.WebDownloadService(launch=launcher)
+        try:
+            first = self._submit(tmp_path, svc)
+            second = self._submit(tmp_path, svc)
+            assert not first.done()
+            assert second.done() and second.result().pdfs == []
+
+            release.set()
+            result = first.result(timeout=5)
+        finally:
+            svc.close()
+
+        assert [p.name for p in result.pdfs] == ["1.pdf"]
+        assert result.errors == []
+        assert len(calls) == 1
+        assert wid._is_already_downloaded(tmp_path / "dl", "Fake Portal", datetime(2026, 3, 31))
+        log = (tmp_path / "run.log").read_text(encoding="utf-8")
+        assert "[SKIP] Download in progress" in log
+        assert "[web] Success" in log
+        assert wid._inflight == set()
+
+    def test_dry_run_does_not_start_browser(self, tmp_path, launcher, fake_handler):
+        svc = wid.WebDownloadService(launch=launcher)
+        try:
+            fut = self._submit(tmp_path, svc, dry_run=True)
+        finally:
+            svc.close()
+
+        assert fut.done() and fut.result().pdfs == []
+        assert launcher.browsers == []
+
+    def test_handler_error_goes_to_result(self, tmp_path, launcher, monkeypatch):
+        async def handler(**kwargs):
+            raise RuntimeError("no invoice links")
+
+        monkeypatch.setitem(wid._HANDLER_REGISTRY, "fake", handler)
+        monkeypatch.setattr(wid, "_get_credential", lambda target: ("user", "pass"))
+        svc = wid.WebDownloadService(launch=launcher)
+        try:
+            result = self._submit(tmp_path, svc).result(timeout=5)
+        finally:
+            svc.close()
+
+        assert result.pdfs == []
+        assert result.errors == ["[ERROR] Web download failed: no invoice links"]
+
+
+# ---------------------------------------------------------------------------
+# Local portal (real Chromium; skipped when it cannot be launched)
+# ---------------------------------------------------------------------------
+
+def _zip_bytes() -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("invoice_202603.pdf", b"%PDF-1.4 zipped")
+    return buf.getvalue()
+
+
+class _PortalHandler(http.server.BaseHTTPRequestHandler):
+    logins: list[str] = []
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _logged_in(self) -> bool:
+        return "sid=ok" in (self.headers.get("Cookie") or "")
+
+    def _html(self, body: str) -> None:
+        data = f"<html><body>{body}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, cookie: bool = False) -> None:
+        self.send_response(302)
+        if cookie:
+            self.send_header("Set-Cookie", "sid=ok; Path=/; Max-Age=3600")
+        self.send_header("Location", location)
+        self.end_headers()
+
+    def _file(self, name: str, data: bytes, ctype: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Disposition", f'attachment; filename="{name}"')
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:  # noqa: N802
+        path = self.path.split("?")[0]
+        portal = path.split("/")[1]
+        if path.endswith("/login"):
+            if self._logged_in():
+                return self._redirect(f"/{portal}/top")
+            button = '<button type="submit">ログイン</button>' if portal == "rakuraku" else (
+                '<button name="doLogin" type="submit">ログイン</button>'
+            )
+            return self._html(
+                f'<form method="post" action="/{portal}/login">'
+                '<input id="loginId" name="loginId"><input id="password" name="password" type="password">'
+                f"{button}</form>"
+            )
+        if not self._logged_in():
+            return self._redirect(f"/{portal}/login")
+        if path == "/rakuraku/top":
+            return self._html('<a href="/rakuraku/list">請求書一覧</a>')
+        if path == "/rakuraku/list":
+            return self._html('<a href="/rakuraku/bulk.zip">一括ダウンロード</a>')
+        if path == "/rakuraku/bulk.zip":
+            return self._file("bulk.zip", _zip_bytes(), "application/zip")
+        if path == "/newfile/top":
+            return self._html("mypage")
+        if path == "/newfile/invoice.html":
+            return self._html(
+                '<a href="/newfile/viewer.html?uri=mypage/eform/file/479735">請求書_202603</a>'
+            )
+        if path == "/newfile/mypage/eform/file/479735":
+            return self._file("479735.pdf", b"%PDF-1.4 newfile", "application/pdf")
+        self.send_error(404)
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        portal = self.path.split("/")[1]
+        if form.get("loginId") == ["user"] and form.get("password") == ["pass"]:
+            type(self).logins.append(portal)
+            return self._redirect(f"/{portal}/top", cookie=True)
+        self._redirect(f"/{portal}/login")
+
+
+@pytest.fixture
+def portal():
+    _PortalHandler.logins = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _PortalHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def chromium_service(tmp_path):
+    pytest.importorskip("playwright")
+    svc = wid.WebDownloadService(workers=2, state_dir=tmp_path / "web_sessions")
+
+    async def probe(session):
+        return True
+
+    try:
+        svc.submit("probe", probe).result(timeout=60)
+    except Exception as e:
+        svc.close()
+        pytest.skip(f"chromium unavailable: {e}")
+    return svc
+
+
+class TestLocalPortal:
+    def test_login_zip_and_direct_download(self, portal, chromium_service, tmp_path, monkeypatch):
+        monkeypatch.setattr(wid, "_get_credential", lambda target: ("user", "pass"))
+        cfg = wid.WebDownloadConfig(
+            enabled=True,
+            vendors=(
+                wid.VendorWebConfig(
+                    handler_id="rakuraku_meisai",
+                    target_name="Rakuraku",
+                    sender_pattern=r"@rakuraku\.example$",
+                    url_pattern="",
+                    options={"login_url": f"{portal}/rakuraku/login"},
+                ),
+                wid.VendorWebConfig(
+                    handler_id="daiohs_newfile",
+                    target_name="Newfile",
+                    sender_pattern=r"@newfile\.example$",
+                    url_pattern="",
+                    options={
+                        "login_url": f"{portal}/newfile/login",
+                        "invoice_list_url": f"{portal}/newfile/invoice.html",
+                        "file_base_url": f"{portal}/newfile/",
+                    },
+                ),
+            ),
+        )
+
+        def submit(sender: str, month: int, service):
+            return wid.submit_web_download(
+                cfg=cfg,
+                sender=sender,
+                urls=[portal],
+                subject="請求書",
+                received_dt=datetime(2026, month, 1),
+                download_dir=tmp_path / "dl" / str(month),
+                log_path=tmp_path / "run.log",
+                dry_run=False,
+                scan_only=False,
+                service=service,
+            )
+
+        try:
+            futs = [submit("a@rakuraku.example", 3, chromium_service), submit("b@newfile.example", 3, chromium_service)]
+            rakuraku, newfile = [f.result(timeout=120) for f in futs]
+        finally:
+            chromium_service.close()
+
+        assert rakuraku.errors == [] and newfile.errors == []
+        assert [p.read_bytes() for p in rakuraku.pdfs] == [b"%PDF-1.4 zipped"]
+        assert [p.read_bytes() for p in newfile.pdfs] == [b"%PDF-1.4 newfile"]
+        assert sorted(_PortalHandler.logins) == ["newfile", "rakuraku"]
+
+        # The saved storage_state keeps both tenants logged in for the next run.
+        svc = wid.WebDownloadService(state_dir=tmp_path / "web_sessions")
+        try:
+            again = submit("a@rakuraku.example", 4, svc).result(timeout=120)
+        finally:
+            svc.close()
+        assert again.errors == [] and len(again.pdfs) == 1
+        assert sorted(_PortalHandler.logins) == ["newfile", "rakuraku"]
+        assert "[rakuraku] Session reused" in (tmp_path / "run.log").read_text(encoding="utf-8")
@@ -7,6 +7,7 @@ Run: python -m pytest tests/test_wiki_lint.py -v
 
 import sys
 import os
+import re
 import tempfile
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
@@ -14,8 +15,11 @@ from datetime import datetime, timedelta, timezone
 # Allow importing from tools/
 sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
 
+import wiki_lint
 from wiki_lint import (
+    CONTRADICTION_TOPICS,
     FileLintResult,
+    LintCache,
     Issue,
     ContradictionHit,
     STALE_DAYS,
@@ -29,6 +33,10 @@ from wiki_lint import (
     check_size,
     check_staleness,
     check_orphan,
+    check_source_references,
+    compile_topic_regex,
+    lint_all,
+    scan_topics,
     render_text_report,
     render_json_report,
     short_path,
@@ -380,6 +388,129 @@ class TestContradictionDetection:
             fp2.unlink(missing_ok=True)
 
 
+class TestTopicRegex:
+    LINES = [
+        "DPI 300 で取り込み、dpi=200 は不可",
+        "engine: yomitoku → easyocr fallback (gpt-4o for vision)",
+        "clasp deploy -i AKfy... / clasp deploy",
+        "font: Meiryo / メイリオ, Segoe UI",
+        "--company-code 300 を指定, 12/31 は末日扱い",
+        "mail: KANRI.TIC@tokai-ic.co.jp",
+        "nothing to see here",
+        "",
+    ]
+
+    @staticmethod
+    def _reference(lines: list[str]) -> list[tuple[str, int, str]]:
+        """旧実装（topic → line → pattern で re.search）の結果を (topic, line, snippet) で返す。"""
+        hits = []
+        for lno, line in enumerate(lines, start=1):
+            for topic, patterns in CONTRADICTION_TOPICS.items():
+                if any(re.search(p, line, re.IGNORECASE) for p in patterns):
+                    hits.append((topic, lno, line.strip()[:80]))
+        return hits
+
+    def test_single_pass_matches_per_pattern_search(self):
+        assert scan_topics(self.LINES) == self._reference(self.LINES)
+
+    def test_all_topics_found_on_one_line(self):
+        line = " ".join(self.LINES)
+        topics = [t for t, _, _ in scan_topics([line])]
+        assert topics == list(CONTRADICTION_TOPICS)
+
+    def test_overlapping_topics_at_later_position(self):
+        pattern, groups = compile_topic_regex({"a": [r"abc"], "b": [r"bcd"]})
+        assert [groups[m.lastgroup] for m in pattern.finditer("xabcd")] == ["a", "b"]
+
+    def test_build_topic_index_order_is_file_then_line(self):
+        fp1 = write_temp_file("末日\nDPI 144\n")
+        fp2 = write_temp_file("DPI 300\n")
+        try:
+            index = build_topic_index([fp1, fp2])
+            assert [(lno, sn) for _, lno, sn in index["DPI"]] == [(2, "DPI 144"), (1, "DPI 300")]
+            assert [lno for _, lno, _ in index["bank holiday"]] == [1]
+        finally:
+            fp1.unlink(missing_ok=True)
+            fp2.unlink(missing_ok=True)
+
+
+class TestLintCache:
+    def test_only_changed_files_are_rescanned(self, tmp_path):
+        a = tmp_path / "a.md"
+        b = tmp_path / "b.md"
+        a.write_text("DPI 300\n", encoding="utf-8")
+        b.write_text("DPI 144\n", encoding="utf-8")
+        cache_path = tmp_path / "cache" / "wiki_lint.json"
+
+        first = LintCache(cache_path)
+        build_topic_index([a, b], first)
+        first.save()
+        assert first.rescanned == [str(a), str(b)]
+
+        b.write_text("DPI 600\nline\n", encoding="utf-8")
+        second = LintCache(cache_path)
+        index = build_topic_index([a, b], second)
+        assert second.rescanned == [str(b)]
+        assert [sn for _, _, sn in index["DPI"]] == ["DPI 300", "DPI 600"]
+
+    def test_checks_share_one_read(self, tmp_path, monkeypatch):
+        fp = tmp_path / "skill.md"
+        fp.write_text("see missing/file_xyz.py\nDPI 300\n", encoding="utf-8")
+        reads: list[Path] = []
+        real = wiki_lint.read_lines
+        monkeypatch.setattr(wiki_lint, "read_lines", lambda p: reads.append(p) or real(p))
+
+        cache = LintCache()
+        result = FileLintResult(path=str(fp), display_path=fp.name)
+        check_size(result, fp, cache=cache)
+        check_source_references(result, fp, cache)
+        build_topic_index([fp], cache)
+
+        assert reads == [fp]
+        assert result.line_count == 2
+        assert [i.code for i in result.issues] == ["SOURCE_MISSING"]
+
+    def test_pattern_change_invalidates(self, tmp_path, monkeypatch):
+        fp = tmp_path / "a.md"
+        fp.write_text("DPI 300\n", encoding="utf-8")
+        cache_path = tmp_path / "wiki_lint.json"
+        cache = LintCache(cache_path)
+        cache.get(fp)
+        cache.save()
+
+        monkeypatch.setattr(wiki_lint, "_SCAN_PATTERNS", "changed")
+        again = LintCache(cache_path)
+        again.get(fp)
+        assert again.rescanned == [str(fp)]
+
+    def test_lint_all_writes_and_reuses_cache(self, tmp_path, monkeypatch):
+        mem = tmp_path / "memory"
+        mem.mkdir()
+        (mem / "MEMORY.md").write_text("- [a](a.md)\n- [gone](gone.md)\n", encoding="utf-8")
+        (mem / "a.md").write_text("DPI 300\n", encoding="utf-8")
+        (mem / "orphan.md").write_text("DPI 144\n", encoding="utf-8")
+        monkeypatch.setattr(wiki_lint, "MEMORY_DIR", mem)
+        monkeypatch.setattr(wiki_lint, "DECISIONS_DIR", tmp_path / "none")
+        monkeypatch.setattr(wiki_lint, "SKILLS_DIR", tmp_path / "none")
+        monkeypatch.setattr(wiki_lint, "AGENTS_MD", tmp_path / "none.md")
+        cache_path = tmp_path / "cache.json"
+
+        results, contradictions, broken = lint_all(cache_path=cache_path)
+        again = lint_all(cache_path=cache_path)
+        uncached = lint_all(cache_path=None)
+
+        assert cache_path.exists()
+        assert broken == ["gone.md"]
+        assert [c.topic for c in contradictions] == ["DPI"]
+        codes = {r.display_path.split(os.sep)[-1]: [i.code for i in r.issues] for r in results}
+        assert "ORPHAN" in codes["orphan.md"]
+        for other in (again, uncached):
+            assert [(r.display_path, r.trust_score) for r in other[0]] == [
+                (r.display_path, r.trust_score) for r in results
+            ]
+            assert other[1] == contradictions
+
+
 # ---------------------------------------------------------------------------
 # Report rendering smoke tests
 # ---------------------------------------------------------------------------
@@ -451,6 +582,7 @@ if __name__ == "__main__":
         TestOrphanDetection,
         TestSizeAlert,
         TestContradictionDetection,
+        TestTopicRegex,
         TestReportRendering,
     ]
 
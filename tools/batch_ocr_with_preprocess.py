@@ -3,11 +3,10 @@
 全PDFを前処理付きでOCR実行し、成功率を検証
 
 1. 全サンプルPDFに前処理（回転補正）を適用
-2. Adobe PDF Services API (OCR-JA) でOCR
+2. 回転補正したPDFをまとめて Adobe PDF Services API (OCR-JA) でOCR（run_ocr_batch で1ジョブ）
 3. 結果を抽出して成功率を計算
 """
 import sys
-import shutil
 import time
 from pathlib import Path
 
@@ -19,6 +18,51 @@ from pdf_ocr import PDFOCRProcessor
 from pdf_preprocess import PDFPreprocessor
 
 
+def _failed_row(pdf_path, rotated):
+    return {
+        'name': pdf_path.name,
+        'vendor': '',
+        'date': '',
+        'amount': 0,
+        'invoice': '',
+        'success': False,
+        'rotated': rotated,
+    }
+
+
+def _row_from_ocr_output(ocr_processor, pdf_path, ocr_output):
+    """OCR済みPDFからテキスト抽出→データ抽出（ファイル名で補完）"""
+    if not ocr_output:
+        print(f"  → OCR失敗")
+        return _failed_row(pdf_path, rotated=True)
+
+    text = ocr_processor.extract_text(ocr_output)
+    extract_result = ocr_processor.parse_invoice_data(text)
+
+    # ファイル名からの補完
+    filename_info = ocr_processor.extract_from_filename(pdf_path.name)
+    if not extract_result.vendor_name and filename_info['vendor']:
+        extract_result.vendor_name = filename_info['vendor']
+    if not extract_result.issue_date and filename_info['date']:
+        extract_result.issue_date = filename_info['date']
+    if extract_result.amount == 0 and filename_info['amount'] > 0:
+        extract_result.amount = filename_info['amount']
+
+    if extract_result.vendor_name or extract_result.amount > 0:
+        extract_result.success = True
+
+    print(f"  → OCR成功: vendor={extract_result.vendor_name}, date={extract_result.issue_date}, amount={extract_result.amount}")
+    return {
+        'name': pdf_path.name,
+        'vendor': extract_result.vendor_name,
+        'date': extract_result.issue_date,
+        'amount': extract_result.amount,
+        'invoice': extract_result.invoice_number,
+        'success': extract_result.success,
+        'rotated': True,
+    }
+
+
 def batch_ocr_all_pdfs():
     """全PDFを前処理付きでOCR"""
     setup_logger("batch_ocr")
@@ -40,6 +84,9 @@ def batch_ocr_all_pdfs():
     print("=" * 90)
 
     results = []
+    # 回転補正したPDFはまとめて1回のOCRジョブに回す: {元PDF: 前処理済みPDF}
+    ocr_targets = {}
+    ocr_slots = {}  # 元PDF → results 内の位置（後で埋める）
 
     for i, pdf_path in enumerate(pdf_files, 1):
         print(f"\n[{i}/{len(pdf_files)}] {pdf_path.name}")
@@ -54,55 +101,10 @@ def batch_ocr_all_pdfs():
             )
 
             if preproc_result.rotated:
-                print(f"  → 回転補正: {preproc_result.rotation_angle}度")
-
-            # 2. OCR実行（前処理済みPDFを使用）
-            if preproc_result.rotated:
-                # 前処理済みPDFをOCR-JAのinputにコピー
-                ocr_input = ocr_processor.input_dir / pdf_path.name
-                shutil.copy2(preproc_result.output_path, ocr_input)
-
-                # OCR実行
-                ocr_output = ocr_processor.run_ocr(pdf_path)
-
-                if ocr_output:
-                    # OCR済みPDFからテキスト抽出→データ抽出
-                    text = ocr_processor.extract_text(ocr_output)
-                    extract_result = ocr_processor.parse_invoice_data(text)
-
-                    # ファイル名からの補完
-                    filename_info = ocr_processor.extract_from_filename(pdf_path.name)
-                    if not extract_result.vendor_name and filename_info['vendor']:
-                        extract_result.vendor_name = filename_info['vendor']
-                    if not extract_result.issue_date and filename_info['date']:
-                        extract_result.issue_date = filename_info['date']
-                    if extract_result.amount == 0 and filename_info['amount'] > 0:
-                        extract_result.amount = filename_info['amount']
-
-                    if extract_result.vendor_name or extract_result.amount > 0:
-                        extract_result.success = True
-
-                    results.append({
-                        'name': pdf_path.name,
-                        'vendor': extract_result.vendor_name,
-                        'date': extract_result.issue_date,
-                        'amount': extract_result.amount,
-                        'invoice': extract_result.invoice_number,
-                        'success': extract_result.success,
-                        'rotated': True,
-                    })
-                    print(f"  → OCR成功: vendor={extract_result.vendor_name}, date={extract_result.issue_date}, amount={extract_result.amount}")
-                else:
-                    results.append({
-                        'name': pdf_path.name,
-                        'vendor': '',
-                        'date': '',
-                        'amount': 0,
-                        'invoice': '',
-                        'success': False,
-                        'rotated': True,
-                    })
-                    print(f"  → OCR失敗")
+                print(f"  → 回転補正: {preproc_result.rotation_angle}度（OCR待ち）")
+                ocr_targets[pdf_path] = preproc_result.output_path
+                ocr_slots[pdf_path] = len(results)
+                results.append(None)
             else:
                 # 回転不要 = 既存のOCR結果を使用
                 extract_result = ocr_processor.process_pdf(pdf_path, skip_ocr=True)
@@ -119,17 +121,29 @@ def batch_ocr_all_pdfs():
 
         except Exception as e:
             logger.error(f"処理エラー: {pdf_path.name} - {e}")
-            results.append({
-                'name': pdf_path.name,
-                'vendor': '',
-                'date': '',
-                'amount': 0,
-                'invoice': '',
-                'success': False,
-                'rotated': False,
-            })
+            results.append(_failed_row(pdf_path, rotated=False))
             print(f"  → エラー: {e}")
 
+    # 2. OCR実行（前処理済みPDFを1ジョブで。Node起動・APIセッション確立は1回だけ）
+    if ocr_targets:
+        print(f"\nOCR実行: 回転補正済み {len(ocr_targets)}ファイルを一括処理")
+        try:
+            ocr_outputs = ocr_processor.run_ocr_batch(list(ocr_targets.values()))
+        except Exception as e:
+            logger.error(f"バッチOCRエラー: {e}")
+            ocr_outputs = {}
+
+        for pdf_path, preproc_path in ocr_targets.items():
+            print(f"  {pdf_path.name}")
+            ocr_output = ocr_outputs.get(preproc_path)
+            try:
+                row = _row_from_ocr_output(ocr_processor, pdf_path, ocr_output)
+            except Exception as e:
+                logger.error(f"処理エラー: {pdf_path.name} - {e}")
+                row = _failed_row(pdf_path, rotated=True)
+                print(f"  → エラー: {e}")
+            results[ocr_slots[pdf_path]] = row
+
     # 結果サマリー
     print("\n" + "=" * 90)
     print("結果サマリー")
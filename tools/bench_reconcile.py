@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+請求書突合（common/reconcile.py）のエンジン別処理時間計測
+
+建設資材の請求書のような多明細（既定 10,000 行）を合成し、decimal / vectorized の
+2 エンジンで reconcile_invoice を実行して処理時間と結果の一致を確認する。
+
+使い方:
+  python bench_reconcile.py                          # 10,000 行, per_line / invoice_level
+  python bench_reconcile.py --lines 500 --repeat 5
+  python bench_reconcile.py --out bench_results/reconcile.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from tools.common.reconcile import reconcile_invoice
+
+MODES = ("per_line", "invoice_level")
+ENGINES = ("decimal", "vectorized")
+
+
+def make_invoice(lines: int, seed: int = 0) -> pd.DataFrame:
+    """OCR 抽出結果を模した明細（通貨記号・桁区切り・少数の不一致を含む）を作る。"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(lines):
+        qty = rng.choice([1, 1, 2, 3, 5, 10, 12, 20, 2.5])
+        unit = rng.choice([rng.randint(50, 99_999), round(rng.uniform(10, 5000), 2)])
+        discount = rng.choice([0, 0, 0, 100, 500])
+        rate = rng.choice(["0.10", "0.10", "0.08"])
+        net = Decimal(str(qty)) * Decimal(str(unit)) - discount
+        total = int((net * (1 + Decimal(rate))).to_integral_value())
+        if rng.random() < 0.02:
+            total += rng.choice([-10, -1, 1, 100])  # OCR の読み違い
+        rows.append({
+            "qty": qty,
+            "unit_price": f"¥{unit:,}",
+            "discount": str(discount),
+            "tax_rate": rate,
+            "extracted_row_total": f"{total:,}",
+        })
+    return pd.DataFrame(rows)
+
+
+def _summary(res: dict) -> tuple:
+    rows = res["rows"]
+    return (
+        rows["expected_total"].tolist(),
+        rows["flag"].tolist(),
+        res["invoice_total_expected"],
+        res["total_EM"],
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="reconcile_invoice のエンジン別処理時間計測")
+    parser.add_argument("--lines", type=int, default=10_000, help="明細行数")
+    parser.add_argument("--repeat", type=int, default=3, help="計測回数（最小値を採用）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=None, help="結果 JSON の保存先")
+    args = parser.parse_args(argv)
+
+    df = make_invoice(args.lines, seed=args.seed)
+    results = []
+    ok = True
+    for mode in MODES:
+        timings = {}
+        outputs = {}
+        for engine in ENGINES:
+            best = None
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                res = reconcile_invoice(df, mode=mode, engine=engine)
+                elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+            timings[engine] = best
+            outputs[engine] = _summary(res)
+        identical = outputs["decimal"] == outputs["vectorized"]
+        ok = ok and identical
+        speedup = timings["decimal"] / timings["vectorized"] if timings["vectorized"] > 0 else 0.0
+        results.append({
+            "mode": mode,
+            "lines": args.lines,
+            "decimal_seconds": round(timings["decimal"], 4),
+            "vectorized_seconds": round(timings["vectorized"], 4),
+            "speedup": round(speedup, 1),
+            "identical": identical,
+        })
+        print(
+            f"{mode:<14} lines={args.lines:<6} decimal={timings['decimal']:>8.3f}s  "
+            f"vectorized={timings['vectorized']:>8.3f}s  x{speedup:.1f}  identical={identical}"
+        )
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
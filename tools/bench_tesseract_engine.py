@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tesseract OCR バックエンドのスループット計測
+
+data/ 以下の PDF を全ページレンダリングし、次の方式で OCR して pages/sec を比較する。
+
+  legacy      — 1 ページずつ PNG 書き出し → tesseract.exe を 1 回起動（従来方式）
+  batch       — numpy 配列 → PGM → 画像リストで PDF ごとに 1 回だけ起動
+  tesserocr   — 常駐 PyTessBaseAPI に numpy 配列を直接渡す（tesserocr 導入時のみ）
+
+使い方:
+  python bench_tesseract_engine.py                       # data/ 全体, 全方式
+  python bench_tesseract_engine.py --data data/MOCK_FAX --modes legacy,batch --limit 5
+  python bench_tesseract_engine.py --out bench_results/tesseract_engine.json
+
+依存関係:
+  pip install pymupdf numpy        (+ tesseract.exe または pip install tesserocr)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import fitz  # type: ignore  # PyMuPDF
+import numpy as np
+
+from common.tesseract_engine import TesseractEngine
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MODES = ("legacy", "batch", "tesserocr")
+
+
+def render_pages(pdf_path: Path, dpi: int, max_pages: int | None) -> list[np.ndarray]:
+    doc = fitz.open(stream=pdf_path.read_bytes(), filetype="pdf")
+    try:
+        mat = fitz.Matrix(dpi / 72.0, dpi / 72.0)
+        n = doc.page_count if max_pages is None else min(max_pages, doc.page_count)
+        pages = []
+        for i in range(n):
+            pix = doc.load_page(i).get_pixmap(matrix=mat, alpha=False)
+            pages.append(np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n))
+        return pages
+    finally:
+        doc.close()
+
+
+def run_mode(mode: str, pdfs: list[Path], *, dpi: int, max_pages: int | None, languages: str) -> dict:
+    backend = "tesserocr" if mode == "tesserocr" else "subprocess"
+    engine = TesseractEngine(languages=languages, backend=backend)
+    pages = 0
+    chars = 0
+    t0 = time.perf_counter()
+    for pdf in pdfs:
+        rasters = render_pages(pdf, dpi, max_pages)
+        pages += len(rasters)
+        if mode == "legacy":
+            with tempfile.TemporaryDirectory(prefix="tess_bench_") as tmp:
+                for i, arr in enumerate(rasters):
+                    png = Path(tmp) / f"p{i + 1}.png"
+                    fitz.Pixmap(fitz.csRGB, arr.shape[1], arr.shape[0], arr.tobytes(), False).save(str(png))
+                    chars += len(engine.image_to_text(png))
+        else:
+            chars += sum(len(t) for t in engine.images_to_text(rasters))
+    elapsed = time.perf_counter() - t0
+    engine.close()
+    return {
+        "mode": mode,
+        "backend": engine.backend,
+        "pdfs": len(pdfs),
+        "pages": pages,
+        "chars": chars,
+        "elapsed_seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Tesseract OCR バックエンドのスループット計測")
+    parser.add_argument("--data", type=Path, default=REPO_ROOT / "data", help="PDF を探すディレクトリ")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"カンマ区切り: {','.join(MODES)}")
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--max-pages", type=int, default=None, help="PDF ごとの最大ページ数")
+    parser.add_argument("--limit", type=int, default=None, help="PDF 数の上限")
+    parser.add_argument("--languages", default="jpn+eng")
+    parser.add_argument("--out", type=Path, default=None, help="結果 JSON の保存先")
+    args = parser.parse_args(argv)
+
+    pdfs = sorted(args.data.rglob("*.pdf"))
+    if args.limit:
+        pdfs = pdfs[: args.limit]
+    if not pdfs:
+        print(f"PDF が見つかりません: {args.data}", file=sys.stderr)
+        return 1
+
+    results = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        if mode not in MODES:
+            parser.error(f"unknown mode: {mode}")
+        try:
+            res = run_mode(mode, pdfs, dpi=args.dpi, max_pages=args.max_pages, languages=args.languages)
+        except RuntimeError as e:
+            print(f"[SKIP] {mode}: {e}", file=sys.stderr)
+            continue
+        results.append(res)
+        print(
+            f"{mode:<10} backend={res['backend']:<10} pages={res['pages']:<4} "
+            f"elapsed={res['elapsed_seconds']:>8.2f}s  {res['pages_per_sec']:.2f} pages/s"
+        )
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
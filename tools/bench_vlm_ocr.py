@@ -20,6 +20,12 @@ VLM OCR 5エンジン統一ベンチマーク
   # 建築許可証カテゴリ
   python bench_vlm_ocr.py --engines gpt54 --category permit --limit 20
 
+  # 複数エンジンを並行実行（エンジンごとの並列数・秒間リクエスト数を指定）
+  python bench_vlm_ocr.py --engines gpt54,paddlevl --concurrency gpt54=8 --rate gpt54=4
+
+  # 中断した実行の続き（最新の結果ファイルに記録済みの id を飛ばして追記）
+  python bench_vlm_ocr.py --engines gpt54 --category invoice --resume
+
   # 結果をスコアリング
   python bench_vlm_ocr.py --score results_paddlevl_invoice_20260410.jsonl
 
@@ -40,10 +46,13 @@ import logging
 import os
 import re
 import sys
+import threading
 import time
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import IO, Callable
 
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding="utf-8", errors="replace")
@@ -165,6 +174,19 @@ CATEGORY_CONFIG: dict[str, dict] = {
 GOLDEN_DATASET = CATEGORY_CONFIG["invoice"]["golden_path"]
 PDF_SEARCH_DIRS = CATEGORY_CONFIG["invoice"]["pdf_dirs"]
 
+# ---------------------------------------------------------------------------
+# Executor limits (API エンジンは並列、ローカル GPU モデルは 1 件ずつ)
+# ---------------------------------------------------------------------------
+ENGINE_CONCURRENCY: dict[str, int] = {
+    "gpt54": 4,
+    "qianfan": 1,
+    "hunyuan": 1,
+    "paddlevl": 1,
+    "docling": 1,
+}
+ENGINE_RATE_LIMIT: dict[str, float] = {"gpt54": 2.0}  # requests/second
+WRITER_FLUSH_EVERY = 10
+
 
 # ---------------------------------------------------------------------------
 # PDF → image conversion
@@ -559,6 +581,104 @@ def find_pdf(filename: str, search_dirs: list[Path] | None = None) -> Path | Non
     return None
 
 
+def build_pdf_index(search_dirs: list[Path] | None = None) -> dict[str, Path]:
+    """filename → path for every file under the search dirs (one walk, first dir wins)."""
+    index: dict[str, Path] = {}
+    for base in search_dirs or PDF_SEARCH_DIRS:
+        if not base.exists():
+            continue
+        for root, _dirs, files in os.walk(base):
+            for name in files:
+                index.setdefault(name, Path(root) / name)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Executor helpers
+# ---------------------------------------------------------------------------
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across an engine's workers."""
+
+    def __init__(
+        self,
+        rate_per_s: float | None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.interval = 1.0 / rate_per_s if rate_per_s else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+class ResultWriter:
+    """Single buffered JSONL writer shared by all engine workers."""
+
+    def __init__(self, flush_every: int = WRITER_FLUSH_EVERY):
+        self.flush_every = flush_every
+        self._files: dict[Path, IO[str]] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, row: dict) -> None:
+        line = json.dumps(row, ensure_ascii=False) + "\n"
+        with self._lock:
+            f = self._files.get(path)
+            if f is None:
+                f = self._files[path] = open(path, "a", encoding="utf-8")
+            f.write(line)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                for handle in self._files.values():
+                    handle.flush()
+                self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_recorded_rows(path: Path) -> dict:
+    """{id: row} already written to a results JSONL (last row per id wins)."""
+    rows: dict = {}
+    if not path.exists():
+        return rows
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 中断時の書きかけ行
+            if isinstance(row, dict) and "id" in row:
+                rows[row["id"]] = row
+    return rows
+
+
+def latest_results_path(eng_name: str, category: str) -> Path | None:
+    """Newest results_<engine>_<category>_<ts>.jsonl in RESULTS_DIR."""
+    paths = sorted(RESULTS_DIR.glob(f"results_{eng_name}_{category}_*.jsonl"))
+    return paths[-1] if paths else None
+
+
 # ---------------------------------------------------------------------------
 # Scoring helpers
 # ---------------------------------------------------------------------------
@@ -593,12 +713,147 @@ def score_invoice_number(predicted: str | None, expected: str) -> tuple[bool, st
 # ---------------------------------------------------------------------------
 # Main benchmark runner
 # ---------------------------------------------------------------------------
+def _bench_entry(
+    engine,
+    eng_name: str,
+    entry: dict,
+    entry_id,
+    pos: str,
+    pdf_path: Path,
+    category: str,
+    cat_prompt: str,
+    limiter: RateLimiter,
+) -> dict:
+    """Run one engine on one PDF and build its result row."""
+    filename = entry["filename"]
+    limiter.acquire()
+    log.info("%s [%s/%s] %s", pos, eng_name, category, filename[:50])
+    t0 = time.time()
+    try:
+        extracted = engine.extract(str(pdf_path), prompt=cat_prompt)
+        elapsed = time.time() - t0
+
+        row = {
+            "id": entry_id,
+            "filename": filename,
+            "category": category,
+            "vendor": extracted.get("vendor_name"),
+            "issue_date": str(extracted.get("issue_date", "")),
+            "amount": str(extracted.get("amount", "")),
+            "invoice_no": extracted.get("invoice_number", ""),
+            "elapsed_sec": round(elapsed, 2),
+            "engine": eng_name,
+        }
+        if "_tokens" in extracted:
+            row["tokens"] = extracted["_tokens"]
+        if "_raw" in extracted:
+            row["raw_preview"] = extracted["_raw"][:500]
+
+        log.info(
+            "  → %s vendor=%s date=%s amount=%s inv=%s (%.1fs)",
+            eng_name,
+            row["vendor"],
+            row["issue_date"],
+            row["amount"],
+            row["invoice_no"],
+            elapsed,
+        )
+        return row
+
+    except Exception as e:
+        elapsed = time.time() - t0
+        log.error("  → %s ERROR: %s (%.1fs)", eng_name, e, elapsed)
+        return {
+            "id": entry_id,
+            "filename": filename,
+            "category": category,
+            "error": str(e),
+            "elapsed_sec": round(elapsed, 2),
+            "engine": eng_name,
+        }
+
+
+def _run_engine(
+    eng_name: str,
+    golden: list[dict],
+    pdf_index: dict[str, Path],
+    category: str,
+    cat_prompt: str,
+    writer: ResultWriter,
+    workers: int,
+    rate_per_s: float | None,
+    resume: bool,
+) -> list[dict] | None:
+    """All golden entries on one engine (bounded pool). None if the engine fails to init."""
+    cls = ENGINE_CLASSES[eng_name]
+    log.info("=== Initializing engine: %s ===", eng_name)
+    try:
+        engine = cls()
+    except Exception as e:
+        log.error("Failed to init %s: %s", eng_name, e)
+        return None
+
+    out_path = latest_results_path(eng_name, category) if resume else None
+    recorded = load_recorded_rows(out_path) if out_path else {}
+    if out_path is None:
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_path = RESULTS_DIR / f"results_{eng_name}_{category}_{ts}.jsonl"
+    else:
+        log.info("%s: resuming %s (%d ids recorded)", eng_name, out_path.name, len(recorded))
+        with open(out_path, "rb+") as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")  # 書きかけ行の後ろから追記しない
+
+    limiter = RateLimiter(rate_per_s)
+    results: list[dict | None] = [None] * len(golden)
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=f"bench-{eng_name}") as pool:
+        for i, entry in enumerate(golden):
+            filename = entry["filename"]
+            entry_id = entry.get("id", i + 1)
+            if entry_id in recorded:
+                results[i] = recorded[entry_id]
+                continue
+            pdf_path = pdf_index.get(filename)
+            if not pdf_path or not pdf_path.exists():
+                log.warning("#%s SKIP (not found): %s", entry_id, filename[:60])
+                results[i] = {
+                    "id": entry_id,
+                    "filename": filename,
+                    "category": category,
+                    "error": "pdf_not_found",
+                }
+                continue
+            futures[i] = pool.submit(
+                _bench_entry, engine, eng_name, entry, entry_id,
+                f"#{i + 1}/{len(golden)}", pdf_path, category, cat_prompt, limiter,
+            )
+            futures[i].add_done_callback(lambda f: writer.write(out_path, f.result()))
+        for i, fut in futures.items():
+            results[i] = fut.result()
+
+    log.info("=== %s/%s complete: %d results → %s ===", eng_name, category, len(results), out_path)
+    return [r for r in results if r is not None]
+
+
 def run_benchmark(
     engine_names: list[str],
     limit: int | None = None,
     category: str = "invoice",
+    *,
+    concurrency: dict[str, int] | None = None,
+    rate_limits: dict[str, float] | None = None,
+    resume: bool = False,
 ) -> dict[str, list[dict]]:
-    """Run extraction on golden dataset for each engine. Return {engine: [results]}."""
+    """Run extraction on golden dataset for each engine. Return {engine: [results]}.
+
+    Engines run in parallel; each has its own worker pool (ENGINE_CONCURRENCY)
+    and request rate (ENGINE_RATE_LIMIT), overridable per call. All rows go
+    through one buffered writer. With resume=True, each engine appends to its
+    latest results file and skips ids already recorded there.
+    """
     cfg = CATEGORY_CONFIG.get(category)
     if not cfg:
         log.error("Unknown category: %s (available: %s)", category, list(CATEGORY_CONFIG))
@@ -620,91 +875,31 @@ def run_benchmark(
              category, len(golden), cat_prompt[:40])
 
     RESULTS_DIR.mkdir(exist_ok=True)
-    all_results: dict[str, list[dict]] = {}
+    pdf_index = build_pdf_index(pdf_dirs)
+    workers = {**ENGINE_CONCURRENCY, **(concurrency or {})}
+    rates = {**ENGINE_RATE_LIMIT, **(rate_limits or {})}
 
+    names = []
     for eng_name in engine_names:
-        cls = ENGINE_CLASSES.get(eng_name)
-        if not cls:
+        if eng_name not in ENGINE_CLASSES:
             log.error("Unknown engine: %s (available: %s)", eng_name, list(ENGINE_CLASSES))
             continue
+        if eng_name not in names:
+            names.append(eng_name)
+    if not names:
+        return {}
 
-        log.info("=== Initializing engine: %s ===", eng_name)
-        try:
-            engine = cls()
-        except Exception as e:
-            log.error("Failed to init %s: %s", eng_name, e)
-            continue
-
-        results: list[dict] = []
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        out_path = RESULTS_DIR / f"results_{eng_name}_{category}_{ts}.jsonl"
-
-        for i, entry in enumerate(golden):
-            filename = entry["filename"]
-            entry_id = entry.get("id", i + 1)
-            pdf_path = find_pdf(filename, pdf_dirs)
-
-            if not pdf_path or not pdf_path.exists():
-                log.warning("#%d SKIP (not found): %s", entry_id, filename[:60])
-                results.append({
-                    "id": entry_id,
-                    "filename": filename,
-                    "category": category,
-                    "error": "pdf_not_found",
-                })
-                continue
-
-            log.info("#%d/%d [%s/%s] %s", i + 1, len(golden), eng_name, category, filename[:50])
-            t0 = time.time()
-            try:
-                extracted = engine.extract(str(pdf_path), prompt=cat_prompt)
-                elapsed = time.time() - t0
-
-                row = {
-                    "id": entry_id,
-                    "filename": filename,
-                    "category": category,
-                    "vendor": extracted.get("vendor_name"),
-                    "issue_date": str(extracted.get("issue_date", "")),
-                    "amount": str(extracted.get("amount", "")),
-                    "invoice_no": extracted.get("invoice_number", ""),
-                    "elapsed_sec": round(elapsed, 2),
-                    "engine": eng_name,
-                }
-                if "_tokens" in extracted:
-                    row["tokens"] = extracted["_tokens"]
-                if "_raw" in extracted:
-                    row["raw_preview"] = extracted["_raw"][:500]
-
-                results.append(row)
-                log.info(
-                    "  → vendor=%s date=%s amount=%s inv=%s (%.1fs)",
-                    row["vendor"],
-                    row["issue_date"],
-                    row["amount"],
-                    row["invoice_no"],
-                    elapsed,
-                )
-
-            except Exception as e:
-                elapsed = time.time() - t0
-                log.error("  → ERROR: %s (%.1fs)", e, elapsed)
-                results.append({
-                    "id": entry_id,
-                    "filename": filename,
-                    "category": category,
-                    "error": str(e),
-                    "elapsed_sec": round(elapsed, 2),
-                    "engine": eng_name,
-                })
-
-            with open(out_path, "a", encoding="utf-8") as f:
-                f.write(json.dumps(results[-1], ensure_ascii=False) + "\n")
-
-        log.info("=== %s/%s complete: %d results → %s ===", eng_name, category, len(results), out_path)
-        all_results[eng_name] = results
+    with ResultWriter() as writer, ThreadPoolExecutor(max_workers=len(names)) as engines:
+        futures = {
+            eng_name: engines.submit(
+                _run_engine, eng_name, golden, pdf_index, category, cat_prompt, writer,
+                workers.get(eng_name, 1), rates.get(eng_name), resume,
+            )
+            for eng_name in names
+        }
+        all_results = {name: fut.result() for name, fut in futures.items()}
 
-    return all_results
+    return {name: rows for name, rows in all_results.items() if rows is not None}
 
 
 # ---------------------------------------------------------------------------
@@ -868,6 +1063,16 @@ def print_summary(all_results: dict[str, list[dict]], category: str) -> None:
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
+def _parse_engine_map(spec: str) -> dict[str, str]:
+    """"gpt54=8,paddlevl=1" → {"gpt54": "8", "paddlevl": "1"}"""
+    out: dict[str, str] = {}
+    for part in spec.split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            out[key.strip()] = value.strip()
+    return out
+
+
 def main():
     parser = argparse.ArgumentParser(description="VLM OCR 5エンジン統一ベンチマーク")
     parser.add_argument(
@@ -887,6 +1092,21 @@ def main():
         default=None,
         help="Limit number of golden entries to process",
     )
+    parser.add_argument(
+        "--concurrency",
+        default="",
+        help="Per-engine worker count, e.g. gpt54=8,paddlevl=1",
+    )
+    parser.add_argument(
+        "--rate",
+        default="",
+        help="Per-engine request rate limit (req/s), e.g. gpt54=4",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to each engine's latest results file, skipping recorded ids",
+    )
     parser.add_argument(
         "--score",
         type=str,
@@ -924,7 +1144,14 @@ def main():
         return
 
     engine_names = [e.strip() for e in args.engines.split(",") if e.strip()]
-    all_results = run_benchmark(engine_names, limit=args.limit, category=args.category)
+    all_results = run_benchmark(
+        engine_names,
+        limit=args.limit,
+        category=args.category,
+        concurrency={k: int(v) for k, v in _parse_engine_map(args.concurrency).items()},
+        rate_limits={k: float(v) for k, v in _parse_engine_map(args.rate).items()},
+        resume=args.resume,
+    )
     print_summary(all_results, args.category)
 
 
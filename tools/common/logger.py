@@ -12,25 +12,66 @@ Usage:
     logger = get_logger()
     logger.info("処理開始")
     logger.error("エラー発生", exc_info=True)
+
+    # 非同期モード（ホットループでディスク/コンソールI/Oを待たない）
+    setup_logger("scenario_44", async_mode=True, json_lines=True, log_dir=Path("./log"))
+    with LogContext("OCR"):          # JSON行に stage / duration_ms を記録
+        ...
+    shutdown_logger()                # 終了時に残りを書き出す（atexit でも実行）
+
+環境変数（引数未指定時に参照）:
+    RK10_LOG_DIR    ログ出力先（既定: BASE_DIR/log）
+    RK10_LOG_ASYNC  1 で非同期モード
+    RK10_LOG_JSON   1 でファイル出力を JSON Lines（*.jsonl）にする
 """
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
 import sys
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Union
 
 # ベースディレクトリ
 BASE_DIR = Path(r"C:\ProgramData\RK10\Robots\44PDF一般経費楽楽精算申請")
 LOG_DIR = BASE_DIR / "log"
 
+LOG_DIR_ENV = "RK10_LOG_DIR"
+LOG_ASYNC_ENV = "RK10_LOG_ASYNC"
+LOG_JSON_ENV = "RK10_LOG_JSON"
+
+OVERFLOW_POLICIES = ("block", "drop")
+
 # グローバルロガー
 _logger: Optional[logging.Logger] = None
 
+# 非同期モードの書き込みスレッド（ロガー名ごと）
+_writers: Dict[str, "_AsyncLogWriter"] = {}
+_writers_lock = threading.Lock()
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
 
 def setup_logger(
     name: str,
     log_level: int = logging.INFO,
-    console_output: bool = True
+    console_output: bool = True,
+    *,
+    log_dir: Optional[Union[str, Path]] = None,
+    async_mode: Optional[bool] = None,
+    json_lines: Optional[bool] = None,
+    queue_size: int = 10000,
+    overflow: str = "block",
+    flush_interval: float = 0.2,
+    batch_size: int = 256,
 ) -> logging.Logger:
     """ロガーをセットアップ
 
@@ -38,24 +79,44 @@ def setup_logger(
         name: ロガー名（ログファイル名のプレフィックスにも使用）
         log_level: ログレベル
         console_output: コンソールにも出力するか
+        log_dir: ログ出力先（None: 環境変数 RK10_LOG_DIR → LOG_DIR）
+        async_mode: QueueHandler + 書き込みスレッドで出力する（None: 環境変数 RK10_LOG_ASYNC）
+        json_lines: ファイル出力を JSON Lines にする（None: 環境変数 RK10_LOG_JSON）
+        queue_size: 非同期モードのキュー上限
+        overflow: キュー満杯時の方針（"block": 空くまで待つ / "drop": 破棄して件数を記録）
+        flush_interval: 非同期モードでバッチをまとめる最大待ち時間（秒）
+        batch_size: 1回の flush でまとめる最大件数
 
     Returns:
         設定済みのロガー
     """
     global _logger
 
+    if overflow not in OVERFLOW_POLICIES:
+        raise ValueError(f"overflow は {OVERFLOW_POLICIES} のいずれか: {overflow}")
+    if log_dir is None:
+        log_dir = os.environ.get(LOG_DIR_ENV) or LOG_DIR
+    if async_mode is None:
+        async_mode = _env_flag(LOG_ASYNC_ENV)
+    if json_lines is None:
+        json_lines = _env_flag(LOG_JSON_ENV)
+
     # ログディレクトリ作成
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_dir = Path(log_dir)
+    log_dir.mkdir(parents=True, exist_ok=True)
 
     # ログファイル名（日付入り）
     today = datetime.now().strftime("%Y%m%d")
-    log_file = LOG_DIR / f"{name}_{today}.log"
+    log_file = log_dir / f"{name}_{today}.{'jsonl' if json_lines else 'log'}"
 
     # ロガー作成
     logger = logging.getLogger(name)
     logger.setLevel(log_level)
 
-    # 既存のハンドラをクリア
+    # 既存のハンドラをクリア（前回の書き込みスレッドは残りを書き出してから止める）
+    _stop_writer(name)
+    for handler in list(logger.handlers):
+        handler.close()
     logger.handlers.clear()
 
     # フォーマッタ
@@ -65,17 +126,31 @@ def setup_logger(
     )
 
     # ファイルハンドラ
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_cls = _BatchFileHandler if async_mode else logging.FileHandler
+    file_handler = file_cls(log_file, encoding='utf-8')
     file_handler.setLevel(log_level)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
+    handlers: List[logging.Handler] = [file_handler]
 
     # コンソールハンドラ
     if console_output:
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_cls = _BatchStreamHandler if async_mode else logging.StreamHandler
+        console_handler = console_cls(sys.stdout)
         console_handler.setLevel(log_level)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    if async_mode:
+        writer = _AsyncLogWriter(
+            name, handlers, queue_size=queue_size, overflow=overflow,
+            flush_interval=flush_interval, batch_size=batch_size,
+        )
+        with _writers_lock:
+            _writers[name] = writer
+        logger.addHandler(writer.queue_handler)
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
 
     _logger = logger
     logger.info(f"ログ開始: {log_file}")
@@ -83,6 +158,177 @@ def setup_logger(
     return logger
 
 
+def shutdown_logger(name: Optional[str] = None) -> None:
+    """非同期モードの書き込みスレッドを止め、キューに残ったログを書き出す
+
+    Args:
+        name: ロガー名（None: すべて）
+    """
+    with _writers_lock:
+        names = list(_writers) if name is None else [name]
+    for n in names:
+        _stop_writer(n)
+
+
+def _stop_writer(name: str) -> None:
+    with _writers_lock:
+        writer = _writers.pop(name, None)
+    if writer is not None:
+        writer.stop()
+
+
+_STANDARD_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """1レコード1行のJSON（extra= で渡した stage / duration_ms などもそのまま出力）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:  # 非同期モードではキュー投入時に文字列化済み
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _BatchFlushMixin:
+    """emit ごとには flush せず、書き込みスレッドがバッチ単位で flush_batch する"""
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()  # type: ignore[misc]
+
+
+class _BatchFileHandler(_BatchFlushMixin, logging.FileHandler):
+    pass
+
+
+class _BatchStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
+
+_EXC_FORMATTER = logging.Formatter()
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """上限付きキューへ投入する（"drop" の場合は満杯時に破棄して件数を数える）"""
+
+    def __init__(self, q: "queue.Queue", overflow: str = "block"):
+        super().__init__(q)
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """引数を埋めたコピーを返す（トレースバックは本文に混ぜず exc_text に残す）
+
+        QueueHandler.prepare はトレースバックを msg に連結して exc_info / exc_text を消すため、
+        JsonLinesFormatter の "exc" が出力されなくなる。
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None  # フレームを書き込みスレッドまで持ち回らない
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+_STOP = object()
+
+
+class _AsyncLogWriter:
+    """キューからレコードを取り出してハンドラへ書き込むバックグラウンドスレッド
+
+    最初の1件から flush_interval 秒（または batch_size 件）までをまとめて書き、
+    ハンドラの flush はバッチごとに1回だけ行う。
+    """
+
+    def __init__(self, name: str, handlers: List[logging.Handler], *, queue_size: int,
+                 overflow: str, flush_interval: float, batch_size: int):
+        self.name = name
+        self.handlers = handlers
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self.queue_handler = _BoundedQueueHandler(self.queue, overflow=overflow)
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name=f"log-writer-{name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        atexit.unregister(self.stop)  # 再セットアップのたびに登録が残らないように
+        if not self._thread.is_alive():
+            return
+        # 停止後のログがキューに溜まり続けないよう先に外す
+        logging.getLogger(self.name).removeHandler(self.queue_handler)
+        self.queue.put(_STOP)
+        self._thread.join()
+        if self.queue_handler.dropped:
+            record = logging.LogRecord(
+                self.name, logging.WARNING, __file__, 0,
+                f"ログキューが満杯のため {self.queue_handler.dropped} 件を破棄しました", None, None,
+            )
+            self._write([record])
+        for handler in self.handlers:
+            handler.close()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is _STOP
+            self._write([r for r in batch if r is not _STOP])
+            if stop:
+                return
+
+    def _write(self, records: List[logging.LogRecord]) -> None:
+        for record in records:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for handler in self.handlers:
+            try:
+                flush = getattr(handler, "flush_batch", handler.flush)
+                flush()
+            except Exception:
+                pass
+        self.batches += 1
+
+
 def get_logger() -> logging.Logger:
     """現在のロガーを取得
 
@@ -111,16 +357,22 @@ class LogContext:
     def __init__(self, operation_name: str):
         self.operation_name = operation_name
         self.logger = get_logger()
+        self.duration: Optional[float] = None
+        self._start = 0.0
 
     def __enter__(self):
         self.logger.info(f"=== {self.operation_name} 開始 ===")
+        self._start = time.perf_counter()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.duration = time.perf_counter() - self._start
+        # JSON Lines では stage / duration_ms が個別フィールドになる
+        extra = {"stage": self.operation_name, "duration_ms": round(self.duration * 1000, 3)}
         if exc_type is None:
-            self.logger.info(f"=== {self.operation_name} 完了 ===")
+            self.logger.info(f"=== {self.operation_name} 完了 ({self.duration:.2f}s) ===", extra=extra)
         else:
-            self.logger.error(f"=== {self.operation_name} 失敗 ===", exc_info=True)
+            self.logger.error(f"=== {self.operation_name} 失敗 ({self.duration:.2f}s) ===", exc_info=True, extra=extra)
         return False  # 例外を再送出
 
 
@@ -136,4 +388,5 @@ if __name__ == "__main__":
     with LogContext("テスト処理"):
         logger.info("処理中...")
 
-    print(f"\nログファイル: {LOG_DIR}")
+    shutdown_logger()
+    print(f"\nログファイル: {os.environ.get(LOG_DIR_ENV) or LOG_DIR}")
@@ -0,0 +1,658 @@
+# -*- coding: utf-8 -*-
+"""
+OCR Model Server — EasyOCR / YomiToku のモデルを常駐させて複数ツールで共有する
+
+EasyOCR の Reader や YomiToku の DocumentAnalyzer は読み込みに数秒〜十数秒かかり、
+メモリも大きい。これまでは CLI を起動するたびにプロセスごとに読み込み直していた。
+本モジュールは
+
+- サーバ: localhost で待ち受け（multiprocessing.connection、authkey 認証）、
+  モデルを (種類, 設定) ごとに 1 つだけ温めておく。届いた画像は (モデル, 引数) ごとの
+  キューに積み、batch_window_s だけ後続を待って最大 max_batch 件ずつ続けて実行する
+- クライアント: easyocr_readtext() / yomitoku_analyze() を呼ぶだけ。接続情報ファイルが
+  無い・接続できない・サーバ側にモデルが無い場合は、同じプロセス内でモデルを
+  読み込んで実行する（従来互換のフォールバック）
+
+入力は numpy 配列または画像ファイルパス（同一マシン前提のため、パスはサーバ側で読む）。
+サーバ経由の YomiToku 結果は属性アクセスできる SimpleNamespace（paragraphs / tables など）。
+
+Usage:
+    # サーバ（常駐。接続情報は artifacts/cache/ocr_server/server.json に書く）
+    python tools/common/ocr_server.py --preload easyocr yomitoku-lite
+
+    # クライアント
+    from common.ocr_server import easyocr_readtext, yomitoku_analyze
+
+    lines = easyocr_readtext(img_path, detail=0)
+    per_tile = easyocr_readtext_batch([tile1, tile2, tile3])   # 1 要求で複数画像
+    result = yomitoku_analyze(page_bgr, lite_mode=True)
+
+環境変数:
+    OCR_MODEL_SERVER=off       サーバを使わない（常にプロセス内）
+    OCR_MODEL_SERVER_INFO=...  接続情報ファイルのパス
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Sequence
+
+DEFAULT_INFO_PATH = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "ocr_server" / "server.json"
+DEFAULT_BATCH_WINDOW_S = 0.01
+DEFAULT_MAX_BATCH = 8
+DEFAULT_TIMEOUT_S = 300.0
+# サーバが見つからなかった後、この秒数は探し直さない（毎回の接続試行を避ける）
+DISCOVERY_RETRY_S = 30.0
+
+ModelKey = tuple[str, tuple]
+
+
+class ModelUnavailable(RuntimeError):
+    """モデルを読み込めない（パッケージ未導入など）。"""
+
+
+# -- models -------------------------------------------------------------------
+
+
+def _load_easyocr(languages: tuple[str, ...], gpu: bool) -> Any:
+    try:
+        import easyocr  # type: ignore
+    except Exception as e:
+        raise ModelUnavailable("easyocr が利用できません。") from e
+    return easyocr.Reader(list(languages), gpu=gpu, verbose=False)
+
+
+def _load_yomitoku(lite_mode: bool, gpu: bool) -> Any:
+    try:
+        from yomitoku import DocumentAnalyzer  # type: ignore
+    except Exception as e:
+        raise ModelUnavailable("yomitoku が利用できません。") from e
+    configs: dict[str, Any] = {}
+    if lite_mode:
+        configs = {
+            "ocr": {"model_name": "lite"},
+            "layout_analyzer": {"model_name": "lite"},
+        }
+    return DocumentAnalyzer(configs=configs, device="cuda" if gpu else "cpu")
+
+
+def _run_easyocr(reader: Any, image: Any, *, detail: int = 1) -> Any:
+    if isinstance(image, Path):
+        image = str(image)
+    return reader.readtext(image, detail=detail)
+
+
+def _run_yomitoku(analyzer: Any, image: Any) -> Any:
+    if isinstance(image, (str, Path)):
+        from yomitoku.data.functions import load_image  # type: ignore
+
+        image = load_image(str(image))
+        # yomitoku 0.11.0: load_image() may return nested list
+        while isinstance(image, (list, tuple)):
+            if not image:
+                raise RuntimeError("load_image returned empty")
+            image = image[0]
+    result, _, _ = analyzer(image)
+    return result
+
+
+LOADERS: dict[str, Callable[..., Any]] = {"easyocr": _load_easyocr, "yomitoku": _load_yomitoku}
+RUNNERS: dict[str, Callable[..., Any]] = {"easyocr": _run_easyocr, "yomitoku": _run_yomitoku}
+
+
+class ModelPool:
+    """(種類, 設定) ごとにモデルを 1 つだけ読み込み、使用はモデルごとに直列化する。"""
+
+    def __init__(
+        self,
+        loaders: dict[str, Callable[..., Any]] | None = None,
+        runners: dict[str, Callable[..., Any]] | None = None,
+    ) -> None:
+        self._loaders = dict(LOADERS if loaders is None else loaders)
+        self._runners = dict(RUNNERS if runners is None else runners)
+        self._models: dict[ModelKey, Any] = {}
+        self._locks: dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.load_count = 0
+
+    def _model_lock(self, key: ModelKey) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, kind: str, options: tuple) -> Any:
+        key = (kind, options)
+        with self._model_lock(key):
+            model = self._models.get(key)
+            if model is None:
+                loader = self._loaders.get(kind)
+                if loader is None:
+                    raise ModelUnavailable(f"unsupported model: {kind}")
+                model = loader(*options)
+                self._models[key] = model
+                self.load_count += 1
+            return model
+
+    def run_batch(self, kind: str, options: tuple, images: Sequence[Any], params: dict) -> list[tuple[bool, Any]]:
+        """画像ごとに (成功, 結果 or 例外) を返す。1 件の失敗で他を止めない。"""
+        model = self.get(kind, options)
+        runner = self._runners[kind]
+        out: list[tuple[bool, Any]] = []
+        with self._model_lock((kind, options)):
+            for image in images:
+                try:
+                    out.append((True, runner(model, image, **params)))
+                except Exception as e:
+                    out.append((False, e))
+        return out
+
+    def run(self, kind: str, options: tuple, image: Any, params: dict) -> Any:
+        [(ok, value)] = self.run_batch(kind, options, [image], params)
+        if not ok:
+            raise value
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+def _plain(value: Any) -> Any:
+    """送信用に numpy / pydantic を素の Python 値に直す（クライアントに依存を持ち込まない）。"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if hasattr(value, "model_dump"):
+        return _plain(value.model_dump())
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "__dict__"):
+        return _plain(vars(value))
+    return str(value)
+
+
+def _to_namespace(value: Any) -> Any:
+    if isinstance(value, dict):
+        return SimpleNamespace(**{k: _to_namespace(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(v) for v in value]
+    return value
+
+
+# -- server -------------------------------------------------------------------
+
+
+@dataclass
+class _Job:
+    image: Any
+    done: threading.Event = field(default_factory=threading.Event)
+    ok: bool = False
+    value: Any = None
+    unavailable: bool = False
+
+
+class OcrModelServer:
+    """温めたモデルを localhost で提供する。接続ごとにスレッド、(モデル, 引数) ごとにバッチャ。"""
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        authkey: bytes | None = None,
+        pool: ModelPool | None = None,
+        batch_window_s: float = DEFAULT_BATCH_WINDOW_S,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ) -> None:
+        self.authkey = authkey or secrets.token_bytes(32)
+        self.pool = pool or ModelPool()
+        self.batch_window_s = batch_window_s
+        self.max_batch = max(1, max_batch)
+        self._listener = Listener((host, port), backlog=64, authkey=self.authkey)
+        self.address: tuple[str, int] = self._listener.address
+        self._queues: dict[tuple, queue.Queue] = {}
+        self._queues_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._conns: set[Connection] = set()
+        self._conns_lock = threading.Lock()
+        self.batch_sizes: list[int] = []
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self) -> "OcrModelServer":
+        threading.Thread(target=self.serve_forever, name="ocr-server", daemon=True).start()
+        return self
+
+    def serve_forever(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._closed.is_set():
+                    return
+                continue  # 認証失敗など。待ち受けは続ける
+            threading.Thread(target=self._handle, args=(conn,), name="ocr-conn", daemon=True).start()
+
+    def close(self) -> None:
+        self._closed.set()
+        try:
+            # accept() で待っているスレッドを起こす（認証に失敗させて serve_forever を抜ける）
+            socket.create_connection(self.address, timeout=1.0).close()
+        except OSError:
+            pass
+        try:
+            self._listener.close()
+        except Exception:
+            pass
+        with self._conns_lock:
+            for conn in self._conns:
+                # recv 中のハンドラを EOF で起こす（クライアント側は接続断としてプロセス内実行に切り替える）
+                try:
+                    with socket.fromfd(conn.fileno(), socket.AF_INET, socket.SOCK_STREAM) as sock:
+                        sock.shutdown(socket.SHUT_RDWR)
+                except (OSError, ValueError):
+                    pass
+        with self._queues_lock:
+            for q in self._queues.values():
+                q.put(None)
+            self._queues.clear()
+
+    def preload(self, kind: str, options: tuple) -> None:
+        self.pool.get(kind, options)
+
+    def write_info(self, path: Path = DEFAULT_INFO_PATH) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"host": self.address[0], "port": self.address[1], "authkey": self.authkey.hex(), "pid": os.getpid()}
+            ),
+            encoding="utf-8",
+        )
+        try:
+            os.chmod(tmp, 0o600)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+        return path
+
+    # -- request handling ---------------------------------------------------
+
+    def _handle(self, conn: Connection) -> None:
+        with self._conns_lock:
+            self._conns.add(conn)
+        try:
+            while not self._closed.is_set():
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    conn.send(self._dispatch(request))
+                except (EOFError, OSError):
+                    return
+        finally:
+            with self._conns_lock:
+                self._conns.discard(conn)
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op not in ("run", "run_many"):
+            return {"ok": False, "error": f"unknown op: {op}"}
+        images = request["images"] if op == "run_many" else [request["image"]]
+        jobs = [_Job(image) for image in images]
+        q = self._queue_for(request["kind"], tuple(request["options"]), dict(request.get("params") or {}))
+        for job in jobs:
+            q.put(job)  # まとめて積むので、まとめて実行される
+        for job in jobs:
+            job.done.wait()
+        unavailable = next((job for job in jobs if job.unavailable), None)
+        if unavailable is not None:
+            return {"ok": False, "error": str(unavailable.value), "unavailable": True}
+        if op == "run_many":
+            return {
+                "ok": True,
+                "results": [
+                    {"ok": True, "result": _plain(job.value)} if job.ok else {"ok": False, "error": str(job.value)}
+                    for job in jobs
+                ],
+            }
+        [job] = jobs
+        if job.ok:
+            return {"ok": True, "result": _plain(job.value)}
+        return {"ok": False, "error": str(job.value)}
+
+    def _queue_for(self, kind: str, options: tuple, params: dict) -> queue.Queue:
+        key = (kind, options, tuple(sorted(params.items())))
+        with self._queues_lock:
+            q = self._queues.get(key)
+            if q is None:
+                q = queue.Queue()
+                self._queues[key] = q
+                threading.Thread(
+                    target=self._batcher, args=(q, kind, options, params), name=f"ocr-batch-{kind}", daemon=True
+                ).start()
+            return q
+
+    def _batcher(self, q: queue.Queue, kind: str, options: tuple, params: dict) -> None:
+        while True:
+            job = q.get()
+            if job is None:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self.batch_window_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = q.get(timeout=remaining) if remaining > 0 else q.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    q.put(None)  # 終了は今のバッチを返してから
+                    break
+                batch.append(nxt)
+            self.batch_sizes.append(len(batch))
+            try:
+                results = self.pool.run_batch(kind, options, [j.image for j in batch], params)
+            except Exception as e:
+                results = [(False, e)] * len(batch)
+            for j, (ok, value) in zip(batch, results):
+                j.ok, j.value = ok, value
+                j.unavailable = isinstance(value, ModelUnavailable)
+                j.done.set()
+
+
+# -- client -------------------------------------------------------------------
+
+
+class OcrClient:
+    """OcrModelServer への接続（スレッドごとに 1 本。並行呼び出しはサーバ側でまとめられる）。"""
+
+    def __init__(self, address: tuple[str, int], authkey: bytes, *, timeout_s: float = DEFAULT_TIMEOUT_S) -> None:
+        self.address = (address[0], int(address[1]))
+        self._authkey = authkey
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+        self._conns: list[Connection] = []
+        self._conns_lock = threading.Lock()
+
+    def _conn(self) -> Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, authkey=self._authkey)
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def _call(self, request: dict) -> dict:
+        try:
+            conn = self._conn()
+            conn.send(request)
+            if not conn.poll(self.timeout_s):
+                raise TimeoutError(f"ocr server did not answer in {self.timeout_s}s")
+            return conn.recv()
+        except (OSError, EOFError, AuthenticationError) as e:
+            self._drop()
+            raise ConnectionError(f"ocr server unreachable: {e}") from e
+        except TimeoutError:
+            self._drop()  # 遅れて届く応答を次の要求の応答と取り違えない
+            raise
+
+    def _drop(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def ping(self) -> bool:
+        try:
+            return bool(self._call({"op": "ping"}).get("ok"))
+        except (ConnectionError, TimeoutError):
+            return False
+
+    def run(self, kind: str, options: tuple, image: Any, params: dict | None = None) -> Any:
+        response = self._call({"op": "run", "kind": kind, "options": options, "image": image, "params": params or {}})
+        if response.get("ok"):
+            return response.get("result")
+        if response.get("unavailable"):
+            raise ModelUnavailable(response.get("error") or kind)
+        raise RuntimeError(response.get("error") or "ocr server error")
+
+    def run_many(self, kind: str, options: tuple, images: Sequence[Any], params: dict | None = None) -> list[tuple[bool, Any]]:
+        """1 回の要求で複数画像を送る。画像ごとに (成功, 結果 or エラー文字列)。"""
+        response = self._call(
+            {"op": "run_many", "kind": kind, "options": options, "images": list(images), "params": params or {}}
+        )
+        if response.get("unavailable"):
+            raise ModelUnavailable(response.get("error") or kind)
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error") or "ocr server error")
+        return [(bool(r.get("ok")), r.get("result") if r.get("ok") else r.get("error")) for r in response["results"]]
+
+    def close(self) -> None:
+        with self._conns_lock:
+            for conn in self._conns:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._conns.clear()
+        self._local = threading.local()
+
+
+def _info_path() -> Path:
+    return Path(os.environ.get("OCR_MODEL_SERVER_INFO") or DEFAULT_INFO_PATH)
+
+
+def _server_disabled() -> bool:
+    return os.environ.get("OCR_MODEL_SERVER", "").strip().lower() in ("0", "off", "false", "no")
+
+
+_CLIENT: OcrClient | None = None
+_CLIENT_CHECKED_AT: float | None = None
+_CLIENT_LOCK = threading.Lock()
+_LOCAL_POOL = ModelPool()
+
+
+def get_client() -> OcrClient | None:
+    """起動中のサーバへのクライアント。無ければ None（DISCOVERY_RETRY_S ごとに探し直す）。"""
+    global _CLIENT, _CLIENT_CHECKED_AT
+    if _server_disabled():
+        return None
+    with _CLIENT_LOCK:
+        if _CLIENT is not None:
+            return _CLIENT
+        now = time.monotonic()
+        if _CLIENT_CHECKED_AT is not None and now - _CLIENT_CHECKED_AT < DISCOVERY_RETRY_S:
+            return None
+        _CLIENT_CHECKED_AT = now
+        try:
+            info = json.loads(_info_path().read_text(encoding="utf-8"))
+            client = OcrClient((info["host"], info["port"]), bytes.fromhex(info["authkey"]))
+        except Exception:
+            return None
+        if not client.ping():
+            client.close()
+            return None
+        _CLIENT = client
+        return client
+
+
+def reset_client() -> None:
+    """接続を閉じ、次の呼び出しでサーバを探し直す（テスト・サーバ再起動用）。"""
+    global _CLIENT, _CLIENT_CHECKED_AT
+    with _CLIENT_LOCK:
+        if _CLIENT is not None:
+            _CLIENT.close()
+        _CLIENT = None
+        _CLIENT_CHECKED_AT = None
+
+
+def _forget_client(client: OcrClient) -> None:
+    global _CLIENT, _CLIENT_CHECKED_AT
+    with _CLIENT_LOCK:
+        if _CLIENT is client:
+            _CLIENT.close()
+            _CLIENT = None
+            _CLIENT_CHECKED_AT = time.monotonic()
+
+
+def _run(kind: str, options: tuple, image: Any, params: dict) -> tuple[Any, bool]:
+    """(結果, サーバ経由か) を返す。サーバに届かない・モデルが無い場合はプロセス内で実行する。"""
+    client = get_client()
+    if client is not None:
+        try:
+            return client.run(kind, options, image, params), True
+        except ModelUnavailable:
+            pass
+        except ConnectionError:
+            _forget_client(client)
+    return _LOCAL_POOL.run(kind, options, image, params), False
+
+
+def _run_many(kind: str, options: tuple, images: Sequence[Any], params: dict) -> tuple[list[tuple[bool, Any]], bool]:
+    """_run の複数画像版。画像ごとに (成功, 結果 or エラー)。"""
+    client = get_client()
+    if client is not None:
+        try:
+            return client.run_many(kind, options, images, params), True
+        except ModelUnavailable:
+            pass
+        except ConnectionError:
+            _forget_client(client)
+    return _LOCAL_POOL.run_batch(kind, options, images, params), False
+
+
+# -- public API ---------------------------------------------------------------
+
+
+def easyocr_readtext(
+    image: Any,
+    *,
+    languages: Sequence[str] = ("ja", "en"),
+    gpu: bool = False,
+    detail: int = 1,
+) -> list:
+    """EasyOCR の Reader.readtext と同じ形（detail=1 は (bbox, text, conf) のリスト）。"""
+    result, remote = _run("easyocr", (tuple(languages), bool(gpu)), image, {"detail": int(detail)})
+    if remote and detail:
+        return [tuple(r) for r in result]
+    return result
+
+
+def easyocr_readtext_batch(
+    images: Sequence[Any],
+    *,
+    languages: Sequence[str] = ("ja", "en"),
+    gpu: bool = False,
+    detail: int = 1,
+    return_exceptions: bool = False,
+) -> list:
+    """複数画像を 1 回の呼び出しで readtext する（サーバへは 1 要求。結果は入力順）。
+
+    return_exceptions=True なら失敗した画像の位置に例外を入れて返す（既定は最初の失敗を送出）。
+    """
+    if not images:
+        return []
+    results, remote = _run_many("easyocr", (tuple(languages), bool(gpu)), images, {"detail": int(detail)})
+    out: list = []
+    for ok, value in results:
+        if not ok:
+            err = value if isinstance(value, Exception) else RuntimeError(str(value))
+            if not return_exceptions:
+                raise err
+            out.append(err)
+        elif remote and detail:
+            out.append([tuple(r) for r in value])
+        else:
+            out.append(value)
+    return out
+
+
+def yomitoku_analyze(image: Any, *, lite_mode: bool = True, gpu: bool = False) -> Any:
+    """YomiToku DocumentAnalyzer の結果（paragraphs / tables / figures などを属性で読める）。"""
+    result, remote = _run("yomitoku", (bool(lite_mode), bool(gpu)), image, {})
+    return _to_namespace(result) if remote else result
+
+
+def get_easyocr_reader(*, languages: Sequence[str] = ("ja", "en"), gpu: bool = False) -> Any:
+    """プロセス内で共有する Reader（readtext 以外の API が要る場合用）。"""
+    return _LOCAL_POOL.get("easyocr", (tuple(languages), bool(gpu)))
+
+
+def get_yomitoku_analyzer(*, lite_mode: bool = True, gpu: bool = False) -> Any:
+    """プロセス内で共有する DocumentAnalyzer。"""
+    return _LOCAL_POOL.get("yomitoku", (bool(lite_mode), bool(gpu)))
+
+
+# -- CLI ----------------------------------------------------------------------
+
+PRELOAD_SPECS: dict[str, ModelKey] = {
+    "easyocr": ("easyocr", (("ja", "en"), False)),
+    "easyocr-gpu": ("easyocr", (("ja", "en"), True)),
+    "yomitoku-lite": ("yomitoku", (True, False)),
+    "yomitoku-full": ("yomitoku", (False, False)),
+    "yomitoku-lite-gpu": ("yomitoku", (True, True)),
+    "yomitoku-full-gpu": ("yomitoku", (False, True)),
+}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="EasyOCR / YomiToku のモデルを常駐させる OCR サーバ")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=0, help="0 なら空きポート（接続情報ファイルに書く）")
+    ap.add_argument("--info", type=Path, default=_info_path())
+    ap.add_argument("--preload", nargs="*", default=[], choices=sorted(PRELOAD_SPECS))
+    ap.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW_S * 1000)
+    ap.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    args = ap.parse_args(argv)
+
+    server = OcrModelServer(
+        host=args.host, port=args.port, batch_window_s=args.batch_window_ms / 1000, max_batch=args.max_batch
+    )
+    for spec in args.preload:
+        t0 = time.perf_counter()
+        server.preload(*PRELOAD_SPECS[spec])
+        print(f"loaded {spec} in {time.perf_counter() - t0:.1f}s", flush=True)
+    info = server.write_info(args.info)
+    print(f"ocr server listening on {server.address[0]}:{server.address[1]} (info: {info})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            if json.loads(info.read_text(encoding="utf-8")).get("pid") == os.getpid():
+                info.unlink()
+        except Exception:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Ordered Pipeline — 有界キュー付きの producer/consumer ワーカープール
+
+単一スレッド（Outlook COM の STA スレッドなど）がタスクを投入し、後段の
+CPU/IO 処理をワーカースレッドで並行実行する。結果はチケット（投入順の seq）
+で受け取るため、呼び出し側は投入順に取り出すだけで決定的な順序を保てる。
+
+- キューは有界。満杯なら submit() がブロックする（back-pressure）
+- ステージ別の深さ（queued / running / awaiting_merge）を最大・平均で記録
+- workers=0 の場合はスレッドを起こさず submit() 内で同期実行する
+- ワーカー内の例外はチケットに保持し、result() で呼び出し側に再送出する
+
+Usage:
+    from common.ordered_pipeline import OrderedPipeline
+
+    with OrderedPipeline(workers=4, max_queued=8) as pipe:
+        tickets = [pipe.submit(process, p) for p in paths]
+        rows = [t.result() for t in tickets]   # 投入順
+    print(pipe.stats())
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+STAGES = ("queued", "running", "awaiting_merge")
+
+
+# ---------------------------------------------------------------------------
+# Result
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class PipelineStats:
+    """パイプラインの計測値。"""
+
+    workers: int
+    max_queued: int
+    submitted: int
+    completed: int
+    failed: int
+    cancelled: int
+    # ステージ名 -> 深さ（状態遷移ごとにサンプリング）
+    max_depth: dict[str, int] = field(default_factory=dict)
+    mean_depth: dict[str, float] = field(default_factory=dict)
+    # back-pressure: キュー満杯で submit() が待たされた回数と合計秒数
+    producer_blocked: int = 0
+    producer_blocked_seconds: float = 0.0
+    # ワーカーが実処理に使った合計秒数 / パイプライン生存時間
+    busy_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    def summary(self) -> str:
+        depth = " ".join(
+            f"{s}_depth(max={self.max_depth.get(s, 0)},mean={self.mean_depth.get(s, 0.0)})"
+            for s in STAGES
+        )
+        return (
+            f"workers={self.workers} max_queued={self.max_queued} "
+            f"submitted={self.submitted} completed={self.completed} failed={self.failed} "
+            f"cancelled={self.cancelled} {depth} "
+            f"producer_blocked={self.producer_blocked}({self.producer_blocked_seconds}s) "
+            f"busy={self.busy_seconds}s elapsed={self.elapsed_seconds}s"
+        )
+
+
+class PipelineCancelled(RuntimeError):
+    """close(cancel_pending=True) で実行されずに破棄されたタスク。"""
+
+
+class PipelineTicket:
+    """投入 1 件分の結果ハンドル。"""
+
+    def __init__(self, pipeline: "OrderedPipeline", seq: int) -> None:
+        self._pipeline = pipeline
+        self.seq = seq
+        self._event = threading.Event()
+        self._value: Any = None
+        self._error: BaseException | None = None
+        self._taken = False
+
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def result(self, timeout: float | None = None) -> Any:
+        """完了を待って結果を返す（ワーカー内の例外はここで再送出）。"""
+        if not self._event.wait(timeout):
+            raise TimeoutError(f"pipeline task #{self.seq} did not finish in {timeout}s")
+        if not self._taken:
+            self._taken = True
+            self._pipeline._on_taken()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def _set(self, value: Any = None, error: BaseException | None = None) -> None:
+        self._value = value
+        self._error = error
+        self._event.set()
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+class OrderedPipeline:
+    """有界キュー + ワーカースレッドプール。"""
+
+    def __init__(self, *, workers: int = 4, max_queued: int | None = None) -> None:
+        if workers < 0:
+            raise ValueError(f"workers must be >= 0: {workers}")
+        self._workers = int(workers)
+        self._max_queued = int(max_queued) if max_queued is not None else max(1, 2 * self._workers)
+        if self._max_queued < 1:
+            raise ValueError(f"max_queued must be >= 1: {max_queued}")
+        self._queue: queue.Queue[tuple[PipelineTicket, Callable[..., Any], tuple, dict] | None] = (
+            queue.Queue(maxsize=self._max_queued)
+        )
+        self._lock = threading.Lock()
+        self._depth = {s: 0 for s in STAGES}
+        self._max_depth = {s: 0 for s in STAGES}
+        self._depth_sum = {s: 0 for s in STAGES}
+        self._samples = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._blocked = 0
+        self._blocked_seconds = 0.0
+        self._busy_seconds = 0.0
+        self._started = time.perf_counter()
+        self._finished: float | None = None
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"ordered-pipeline-{i}", daemon=True)
+            for i in range(self._workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def __enter__(self) -> "OrderedPipeline":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.close(cancel_pending=exc_type is not None)
+
+    # -- producer side --------------------------------------------------------
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> PipelineTicket:
+        """タスクを投入する。キュー満杯ならワーカーが取り出すまでブロックする。"""
+        if self._closed:
+            raise RuntimeError("pipeline is closed")
+        with self._lock:
+            ticket = PipelineTicket(self, self._submitted)
+            self._submitted += 1
+
+        if self._workers == 0:
+            self._transition(None, "running")
+            self._run(ticket, fn, args, kwargs)
+            return ticket
+
+        item = (ticket, fn, args, kwargs)
+        # submit() で待たされている 1 件も queued に数える
+        self._transition(None, "queued")
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            t0 = time.perf_counter()
+            self._queue.put(item)
+            with self._lock:
+                self._blocked += 1
+                self._blocked_seconds += time.perf_counter() - t0
+        return ticket
+
+    def close(self, *, cancel_pending: bool = False) -> PipelineStats:
+        """ワーカーを停止して計測値を返す。cancel_pending なら未着手タスクを破棄する。"""
+        if not self._closed:
+            self._closed = True
+            if cancel_pending:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        continue
+                    ticket = item[0]
+                    with self._lock:
+                        self._cancelled += 1
+                    self._transition("queued", "awaiting_merge")
+                    ticket._set(error=PipelineCancelled(f"pipeline task #{ticket.seq} cancelled"))
+            for _ in self._threads:
+                self._queue.put(None)
+            for t in self._threads:
+                t.join()
+            self._finished = time.perf_counter()
+        return self.stats()
+
+    def stats(self) -> PipelineStats:
+        with self._lock:
+            n = max(1, self._samples)
+            end = self._finished if self._finished is not None else time.perf_counter()
+            return PipelineStats(
+                workers=self._workers,
+                max_queued=self._max_queued,
+                submitted=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                cancelled=self._cancelled,
+                max_depth=dict(self._max_depth),
+                mean_depth={s: round(self._depth_sum[s] / n, 2) for s in STAGES},
+                producer_blocked=self._blocked,
+                producer_blocked_seconds=round(self._blocked_seconds, 3),
+                busy_seconds=round(self._busy_seconds, 3),
+                elapsed_seconds=round(end - self._started, 3),
+            )
+
+    # -- worker side ----------------------------------------------------------
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            ticket, fn, args, kwargs = item
+            self._transition("queued", "running")
+            self._run(ticket, fn, args, kwargs)
+
+    def _run(
+        self, ticket: PipelineTicket, fn: Callable[..., Any], args: tuple, kwargs: dict
+    ) -> None:
+        t0 = time.perf_counter()
+        try:
+            value = fn(*args, **kwargs)
+        except BaseException as e:  # noqa: BLE001 - 呼び出し側で再送出する
+            with self._lock:
+                self._failed += 1
+                self._busy_seconds += time.perf_counter() - t0
+            self._transition("running", "awaiting_merge")
+            ticket._set(error=e)
+            return
+        with self._lock:
+            self._completed += 1
+            self._busy_seconds += time.perf_counter() - t0
+        self._transition("running", "awaiting_merge")
+        ticket._set(value=value)
+
+    def _on_taken(self) -> None:
+        self._transition("awaiting_merge", None)
+
+    def _transition(self, src: str | None, dst: str | None) -> None:
+        with self._lock:
+            if src is not None:
+                self._depth[src] -= 1
+            if dst is not None:
+                self._depth[dst] += 1
+                self._max_depth[dst] = max(self._max_depth[dst], self._depth[dst])
+            self._samples += 1
+            for s in STAGES:
+                self._depth_sum[s] += self._depth[s]
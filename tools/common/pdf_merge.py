@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+PDF Merge — ストリーミング結合エンジン
+
+一括印刷用の結合PDFを PyMuPDF の insert_pdf で 1 ファイルずつ取り込み、
+入力ドキュメントは取り込み直後に閉じる（全ページを Python オブジェクトとして
+保持しない）。月末の数百添付でもピークメモリが入力総量に比例しにくい。
+
+- ページ数 / サイズ上限でチャンク分割（プリンタスプーラ向け）
+- 保存時に garbage=4 で同一フォント・画像ストリームを重複排除
+- pages/sec とピーク RSS を MergeStats で返す
+- PyMuPDF が無い環境では pypdf にフォールバック（チャンク分割のみ対応）
+
+Usage:
+    from common.pdf_merge import merge_pdfs_streaming
+
+    result = merge_pdfs_streaming(paths, run_dir / "merged.pdf", max_pages_per_chunk=200)
+    for p in result.output_paths:
+        print(p)
+    print(result.stats.pages_per_sec, result.stats.peak_rss_bytes)
+"""
+from __future__ import annotations
+
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+try:
+    import fitz  # type: ignore  # PyMuPDF
+
+    _PYMUPDF_AVAILABLE = True
+except Exception:
+    _PYMUPDF_AVAILABLE = False
+
+try:
+    from pypdf import PdfReader, PdfWriter  # type: ignore
+
+    _PYPDF_AVAILABLE = True
+except Exception:
+    _PYPDF_AVAILABLE = False
+
+
+# ---------------------------------------------------------------------------
+# Result
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class MergeStats:
+    """結合処理の計測値。"""
+
+    engine: str                     # "pymupdf" / "pypdf"
+    input_docs: int
+    pages: int
+    chunks: int
+    output_bytes: int
+    elapsed_seconds: float
+    pages_per_sec: float
+    peak_rss_bytes: int | None      # 取得できない環境では None
+
+
+@dataclass(frozen=True)
+class MergeResult:
+    output_paths: tuple[Path, ...]
+    stats: MergeStats
+    # 読み込めずスキップした入力（path, error）
+    skipped: tuple[tuple[str, str], ...] = field(default_factory=tuple)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def peak_rss_bytes() -> int | None:
+    """プロセスのピーク RSS（バイト）。取得不可なら None。"""
+    try:
+        import resource  # POSIX only
+
+        peak = int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        # Linux は KiB、macOS はバイト単位
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        pass
+    try:
+        import psutil  # type: ignore
+
+        info = psutil.Process().memory_info()
+        return int(getattr(info, "peak_wset", 0) or info.rss)
+    except Exception:
+        return None
+
+
+def chunk_output_path(output_path: Path, index: int, total: int) -> Path:
+    """チャンク出力パス。1 チャンクなら output_path そのもの。
+
+    例: merged.pdf → merged_001.pdf, merged_002.pdf, ...
+    """
+    if total <= 1:
+        return output_path
+    return output_path.with_name(f"{output_path.stem}_{index:03d}{output_path.suffix}")
+
+
+def plan_chunks(
+    page_counts: Sequence[int],
+    byte_sizes: Sequence[int],
+    *,
+    max_pages_per_chunk: int | None = None,
+    max_bytes_per_chunk: int | None = None,
+) -> list[list[int]]:
+    """入力ドキュメントのインデックスをチャンクに割り当てる。
+
+    ドキュメントは分割しない（請求書 1 通が 2 チャンクに跨らない）。
+    上限を単独で超えるドキュメントはそれだけで 1 チャンクになる。
+    バイト上限は入力ファイルサイズの合計で近似する（重複排除で実サイズは小さくなる）。
+    """
+    chunks: list[list[int]] = []
+    current: list[int] = []
+    cur_pages = 0
+    cur_bytes = 0
+    for idx, (pages, size) in enumerate(zip(page_counts, byte_sizes)):
+        over_pages = max_pages_per_chunk is not None and cur_pages + pages > max_pages_per_chunk
+        over_bytes = max_bytes_per_chunk is not None and cur_bytes + size > max_bytes_per_chunk
+        if current and (over_pages or over_bytes):
+            chunks.append(current)
+            current, cur_pages, cur_bytes = [], 0, 0
+        current.append(idx)
+        cur_pages += pages
+        cur_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+# ---------------------------------------------------------------------------
+# Engines
+# ---------------------------------------------------------------------------
+
+def _merge_with_pymupdf(
+    input_paths: Sequence[Path],
+    output_path: Path,
+    *,
+    max_pages_per_chunk: int | None,
+    max_bytes_per_chunk: int | None,
+    dedupe_resources: bool,
+) -> tuple[list[Path], int, int, list[tuple[str, str]]]:
+    # 1st pass: page counts only (document is closed immediately)
+    readable: list[Path] = []
+    page_counts: list[int] = []
+    skipped: list[tuple[str, str]] = []
+    for p in input_paths:
+        try:
+            with fitz.open(str(p)) as src:
+                page_counts.append(int(src.page_count))
+            readable.append(p)
+        except Exception as e:
+            skipped.append((str(p), f"{type(e).__name__}: {e}"))
+
+    plan = plan_chunks(
+        page_counts,
+        [_file_size(p) for p in readable],
+        max_pages_per_chunk=max_pages_per_chunk,
+        max_bytes_per_chunk=max_bytes_per_chunk,
+    )
+
+    # garbage=4: 未参照オブジェクト削除 + 同一オブジェクト/ストリームの統合
+    save_kwargs = {"garbage": 4, "deflate": True} if dedupe_resources else {"garbage": 1}
+    outputs: list[Path] = []
+    total_pages = 0
+    for chunk_no, doc_indexes in enumerate(plan, start=1):
+        out_path = chunk_output_path(output_path, chunk_no, len(plan))
+        out_doc = fitz.open()
+        try:
+            for idx in doc_indexes:
+                with fitz.open(str(readable[idx])) as src:
+                    out_doc.insert_pdf(src)
+                total_pages += page_counts[idx]
+            out_doc.save(str(out_path), **save_kwargs)
+        finally:
+            out_doc.close()
+        outputs.append(out_path)
+    return outputs, len(readable), total_pages, skipped
+
+
+def _merge_with_pypdf(
+    input_paths: Sequence[Path],
+    output_path: Path,
+    *,
+    max_pages_per_chunk: int | None,
+    max_bytes_per_chunk: int | None,
+) -> tuple[list[Path], int, int, list[tuple[str, str]]]:
+    readable: list[Path] = []
+    page_counts: list[int] = []
+    skipped: list[tuple[str, str]] = []
+    for p in input_paths:
+        try:
+            page_counts.append(len(PdfReader(str(p)).pages))
+            readable.append(p)
+        except Exception as e:
+            skipped.append((str(p), f"{type(e).__name__}: {e}"))
+
+    plan = plan_chunks(
+        page_counts,
+        [_file_size(p) for p in readable],
+        max_pages_per_chunk=max_pages_per_chunk,
+        max_bytes_per_chunk=max_bytes_per_chunk,
+    )
+    outputs: list[Path] = []
+    total_pages = 0
+    for chunk_no, doc_indexes in enumerate(plan, start=1):
+        out_path = chunk_output_path(output_path, chunk_no, len(plan))
+        writer = PdfWriter()
+        for idx in doc_indexes:
+            reader = PdfReader(str(readable[idx]))
+            for page in reader.pages:
+                writer.add_page(page)
+            total_pages += page_counts[idx]
+        with out_path.open("wb") as f:
+            writer.write(f)
+        outputs.append(out_path)
+    return outputs, len(readable), total_pages, skipped
+
+
+def merge_pdfs_streaming(
+    input_paths: Sequence[Path],
+    output_path: Path,
+    *,
+    max_pages_per_chunk: int | None = None,
+    max_bytes_per_chunk: int | None = None,
+    dedupe_resources: bool = True,
+    engine: str = "auto",
+) -> MergeResult:
+    """入力 PDF を順に結合し、必要ならチャンク分割して保存する。
+
+    Args:
+        input_paths: 結合順の入力 PDF
+        output_path: 出力パス（チャンク分割時は ``{stem}_{NNN}{suffix}``）
+        max_pages_per_chunk: 1 ファイルあたりのページ上限（None = 無制限）
+        max_bytes_per_chunk: 1 ファイルあたりの入力バイト上限（None = 無制限）
+        dedupe_resources: 同一フォント/画像を統合する（PyMuPDF のみ）
+        engine: "auto" / "pymupdf" / "pypdf"
+
+    Raises:
+        RuntimeError: 利用可能なエンジンが無い場合
+        ValueError: 上限値が不正、または読み込める入力が 1 件も無い場合
+    """
+    if max_pages_per_chunk is not None and max_pages_per_chunk <= 0:
+        raise ValueError(f"max_pages_per_chunk must be positive: {max_pages_per_chunk}")
+    if max_bytes_per_chunk is not None and max_bytes_per_chunk <= 0:
+        raise ValueError(f"max_bytes_per_chunk must be positive: {max_bytes_per_chunk}")
+
+    if engine == "auto":
+        engine = "pymupdf" if _PYMUPDF_AVAILABLE else "pypdf"
+    if engine == "pymupdf" and not _PYMUPDF_AVAILABLE:
+        raise RuntimeError("PyMuPDF (fitz) が利用できません。")
+    if engine == "pypdf" and not _PYPDF_AVAILABLE:
+        raise RuntimeError("pypdf が利用できません。")
+    if engine not in ("pymupdf", "pypdf"):
+        raise ValueError(f"unsupported merge engine: {engine}")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    if engine == "pymupdf":
+        outputs, docs, pages, skipped = _merge_with_pymupdf(
+            input_paths,
+            output_path,
+            max_pages_per_chunk=max_pages_per_chunk,
+            max_bytes_per_chunk=max_bytes_per_chunk,
+            dedupe_resources=dedupe_resources,
+        )
+    else:
+        outputs, docs, pages, skipped = _merge_with_pypdf(
+            input_paths,
+            output_path,
+            max_pages_per_chunk=max_pages_per_chunk,
+            max_bytes_per_chunk=max_bytes_per_chunk,
+        )
+    elapsed = time.perf_counter() - t0
+
+    if not outputs:
+        raise ValueError("結合可能なPDFがありません。")
+
+    stats = MergeStats(
+        engine=engine,
+        input_docs=docs,
+        pages=pages,
+        chunks=len(outputs),
+        output_bytes=sum(_file_size(p) for p in outputs),
+        elapsed_seconds=round(elapsed, 3),
+        pages_per_sec=round(pages / elapsed, 1) if elapsed > 0 else float(pages),
+        peak_rss_bytes=peak_rss_bytes(),
+    )
+    return MergeResult(output_paths=tuple(outputs), stats=stats, skipped=tuple(skipped))
@@ -4,16 +4,40 @@ Two rounding modes:
   - per_line: round tax per line item (simpler, common in small invoices)
   - invoice_level: round tax once per tax-rate group, then apportion via largest-remainder (large invoices)
 
+Two engines:
+  - vectorized: parses amounts into int64 arrays scaled by 10**k (k = decimal places per column) and
+    does half-up rounding / largest-remainder apportionment with numpy. Exact-half and tied remainders
+    that the Decimal path would resolve through 28-digit rounding are re-evaluated with Decimal, and the
+    per-cell exponents / signs are tracked, so the written Decimals are identical to the Decimal path's
+    (Decimal('332'), not Decimal('332.000')).
+  - decimal: the reference implementation (Decimal per cell).
+  engine='auto' (default) uses the vectorized engine and falls back to Decimal when a column cannot be
+  represented exactly in int64 (unparseable cells, too many digits, intermediate overflow).
+
 Usage:
     from tools.common.reconcile import reconcile_invoice
     result = reconcile_invoice(df, mode='invoice_level', tolerance=Decimal('1'))
 """
 from decimal import Decimal, ROUND_HALF_UP, getcontext
+import numpy as np
 import pandas as pd
+import re
 import time
 
 getcontext().prec = 28
 
+ENGINES = ('auto', 'vectorized', 'decimal')
+
+# int64 engine limits: digits per cell / decimal places per column / bound for every intermediate
+_MAX_DIGITS = 18
+_MAX_SCALE = 6
+_INT_LIMIT = 2 ** 61
+# coefficients at or above 10**28 would be rounded by the Decimal context (prec 28); kept conservative
+_COEF_LIMIT = 9.9e27
+_NUMBER_RE = re.compile(r'([+-]?)([0-9]*)(?:\.([0-9]*))?\Z')
+_NEG_ZERO = Decimal('-0')
+_CURRENCY_CHARS = str.maketrans('', '', '¥￥,，')
+
 
 def D(x):
     """Convert to Decimal safely."""
@@ -59,21 +83,52 @@ def distribute_by_largest_remainder(components, target_sum):
     return [floored[i] + Decimal(adjust[i]) for i in range(len(components))]
 
 
-def reconcile_invoice(df, mode='per_line', tolerance=Decimal('1')):
+def reconcile_invoice(df, mode='per_line', tolerance=Decimal('1'), engine='auto'):
     """Reconcile extracted row totals against computed expected totals.
 
     Args:
         df: DataFrame with columns: qty, unit_price, discount, tax_rate, extracted_row_total
         mode: 'per_line' (round per row) or 'invoice_level' (round per tax-rate group)
         tolerance: maximum acceptable difference per row (in yen)
+        engine: 'auto' (vectorized, Decimal fallback), 'vectorized' (raise if not representable) or 'decimal'
 
     Returns:
         dict with keys: rows (DataFrame), per_row_match_rate, invoice_total_extracted,
-        invoice_total_expected, total_EM, processing_seconds
+        invoice_total_expected, total_EM, processing_seconds, engine
     """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
     t0 = time.time()
     df2 = df.copy()
     df2['qty'] = df2.get('qty', 1).fillna(1)
+
+    result = None
+    used = 'vectorized'
+    if engine != 'decimal':
+        result = _reconcile_vectorized(df2, mode, tolerance)
+        if result is None and engine == 'vectorized':
+            raise ValueError('invoice cannot be represented exactly in int64; use engine="decimal"')
+    if result is None:
+        result = _reconcile_decimal(df2, mode, tolerance)
+        used = 'decimal'
+    invoice_total_extracted, invoice_total_expected = result
+
+    per_row_match_rate = 1 - (df2['flag'].sum() / len(df2))
+    total_em = 1 if invoice_total_extracted == invoice_total_expected else 0
+
+    return {
+        'rows': df2,
+        'per_row_match_rate': float(per_row_match_rate),
+        'invoice_total_extracted': float(invoice_total_extracted),
+        'invoice_total_expected': float(invoice_total_expected),
+        'total_EM': total_em,
+        'processing_seconds': time.time() - t0,
+        'engine': used,
+    }
+
+
+def _reconcile_decimal(df2, mode, tolerance):
+    """Reference engine: Decimal per cell. Fills df2 in place, returns (extracted_total, expected_total)."""
     for c in ['unit_price', 'discount', 'tax_rate', 'extracted_row_total']:
         df2[c] = df2[c].apply(norm_currency) if c in df2.columns else Decimal(0)
 
@@ -88,18 +143,20 @@ def reconcile_invoice(df, mode='per_line', tolerance=Decimal('1')):
             lambda r: D(r['qty']) * D(r['unit_price']) - D(r['discount']), axis=1
         )
         expected_totals = [Decimal(0)] * len(df2)
-        for rate, group in df2.groupby('tax_rate'):
-            nets = group['net'].tolist()
+        nets_all = df2['net'].tolist()
+        # .indices gives row positions (the frame index may not be a RangeIndex)
+        for rate, positions in df2.groupby('tax_rate').indices.items():
+            nets = [nets_all[p] for p in positions]
             sum_nets = sum(nets)
             raw_tax = [n * D(rate) for n in nets]
+            sum_raw_tax = sum(raw_tax)
             total_tax = round_yen(sum_nets * D(rate))
-            if sum(raw_tax) == 0:
+            if sum_raw_tax == 0:
                 apportioned = [Decimal(0)] * len(raw_tax)
             else:
-                ideal = [(r / sum(raw_tax) * total_tax) for r in raw_tax]
+                ideal = [(r / sum_raw_tax * total_tax) for r in raw_tax]
                 apportioned = distribute_by_largest_remainder(ideal, total_tax)
-            for idx, (_, val) in enumerate(group.iterrows()):
-                ridx = val.name
+            for idx, ridx in enumerate(positions):
                 expected_totals[ridx] = round_yen(nets[idx] + apportioned[idx])
         df2['expected_total'] = expected_totals
 
@@ -107,20 +164,273 @@ def reconcile_invoice(df, mode='per_line', tolerance=Decimal('1')):
         lambda r: D(r.get('extracted_row_total', 0)) - D(r['expected_total']), axis=1
     )
     df2['flag'] = df2['delta'].abs() > D(tolerance)
+    return sum(df2['extracted_row_total']), sum(df2['expected_total'])
 
-    per_row_match_rate = 1 - (df2['flag'].sum() / len(df2))
-    invoice_total_extracted = sum(df2['extracted_row_total'])
-    invoice_total_expected = sum(df2['expected_total'])
-    total_em = 1 if invoice_total_extracted == invoice_total_expected else 0
 
-    return {
-        'rows': df2,
-        'per_row_match_rate': float(per_row_match_rate),
-        'invoice_total_extracted': float(invoice_total_extracted),
-        'invoice_total_expected': float(invoice_total_expected),
-        'total_EM': total_em,
-        'processing_seconds': time.time() - t0,
-    }
+# ---------------------------------------------------------------------------
+# vectorized engine (int64 scaled integers)
+# ---------------------------------------------------------------------------
+
+def _scaled_ints(col, clean):
+    """Parse a column as norm_currency (clean=True) / D (clean=False) would, into
+    (int64 array, scale, exponents, sign bits, Decimals).
+
+    Exponents and sign bits are per cell, as the Decimal path's as_tuple() would give them
+    ('1.50' -> -2, '-0' -> negative zero); the Decimals are the cells the Decimal path writes back.
+    Only distinct values are parsed (invoices repeat tax rates, quantities and discounts).
+    Returns None when any cell is outside the exact int64 fast path (the Decimal path decides then).
+    """
+    if pd.api.types.is_integer_dtype(col.dtype):
+        values = col.to_numpy(dtype=np.int64)
+        if len(values) and int(np.abs(values).max()) >= 10 ** _MAX_DIGITS:
+            return None
+        decimals = [Decimal(v) for v in values.tolist()]
+        return values, 0, np.zeros(len(values), dtype=np.int64), values < 0, decimals
+
+    na = col.isna().to_numpy()
+    if na.any() and not clean:
+        return None
+    codes, uniques = pd.factorize(col.astype(str).to_numpy(dtype=object))
+    parsed = []
+    for text in uniques:
+        if clean:
+            text = text.translate(_CURRENCY_CHARS)
+        m = _NUMBER_RE.match(text.strip())
+        if m is None:
+            parsed.append(None)
+            continue
+        sign, int_part, frac_part = m.group(1), m.group(2).lstrip('0'), (m.group(3) or '').rstrip('0')
+        if not m.group(2) and not m.group(3):
+            parsed.append(None)
+            continue
+        parsed.append((sign == '-', int_part, frac_part, -len(m.group(3) or ''), text.strip()))
+
+    used = np.zeros(len(uniques), dtype=bool)
+    used[codes[~na]] = True
+    if any(p is None for p, u in zip(parsed, used) if u):
+        return None
+    scale = max((len(p[2]) for p, u in zip(parsed, used) if u), default=0)
+    if scale > _MAX_SCALE:
+        return None
+    unique_values, unique_exps, unique_neg, unique_decimals = [], [], [], []
+    for p, u in zip(parsed, used):
+        if not u:
+            unique_values.append(0)
+            unique_exps.append(0)
+            unique_neg.append(False)
+            unique_decimals.append(Decimal(0))
+            continue
+        neg, int_part, frac_part, exp, text = p
+        digits = int_part + frac_part.ljust(scale, '0')
+        if len(digits) > _MAX_DIGITS:
+            return None
+        v = int(digits or '0')
+        unique_values.append(-v if neg else v)
+        unique_exps.append(exp)
+        unique_neg.append(neg)
+        unique_decimals.append(Decimal(text))
+    values = np.zeros(len(codes), dtype=np.int64)
+    exps = np.zeros(len(codes), dtype=np.int64)
+    neg = np.zeros(len(codes), dtype=bool)
+    decimals = np.full(len(codes), Decimal(0), dtype=object)
+    rows = codes[~na]
+    values[~na] = np.asarray(unique_values, dtype=np.int64)[rows]
+    exps[~na] = np.asarray(unique_exps, dtype=np.int64)[rows]
+    neg[~na] = np.asarray(unique_neg, dtype=bool)[rows]
+    decimals[~na] = np.asarray(unique_decimals, dtype=object)[rows]
+    return values, scale, exps, neg, decimals.tolist()
+
+
+def _round_half_up(num, den):
+    """round(num / den) half away from zero, as Decimal ROUND_HALF_UP does (den > 0)."""
+    q = (np.abs(num) * 2 + den) // (2 * den)
+    return np.where(num < 0, -q, q)
+
+
+def _absmax(values):
+    return int(np.abs(values).max()) if len(values) else 0
+
+
+def _sign_of_sum(a, a_neg, b, b_neg, total):
+    """Sign bits of Decimal a + b: a zero sum is negative only when both operands are negative zeros."""
+    return (total < 0) | ((a == 0) & (b == 0) & a_neg & b_neg)
+
+
+def _coefficients_fit(values, scale, exps):
+    """True if every value (scale) written with its exponent keeps a coefficient Decimal would not round."""
+    if not len(values):
+        return True
+    return bool(np.all(np.abs(values) * np.power(10.0, -exps - scale) < _COEF_LIMIT))
+
+
+def _to_decimals(values, scale, exps, neg):
+    """Decimals for int64 values (scale) written with the Decimal path's per-cell exponents and signs."""
+    out = []
+    for v, exp, ng in zip(values.tolist(), exps.tolist(), neg.tolist()):
+        shift = -exp - scale
+        coef = abs(v) * 10 ** shift if shift >= 0 else abs(v) // 10 ** -shift
+        dec = Decimal(-coef if ng else coef) if coef or not ng else _NEG_ZERO
+        # exact: _coefficients_fit() keeps coef under the context precision
+        out.append(dec.scaleb(exp) if exp else dec)
+    return out
+
+
+def _apportion_vectorized(nets, kn, rate, kr, total_tax):
+    """distribute_by_largest_remainder() for one tax-rate group on int64 nets (scale kn).
+
+    ideal_i = nets_i * total_tax / sum(nets) is kept as an exact fraction. The Decimal path rounds
+    the quotient to 28 digits, which only matters for exact halves and for exactly tied remainders
+    straddling the cut-off; those rows are re-evaluated with the same Decimal expression.
+    """
+    den = int(nets.sum())
+    num = nets * total_tax
+    if den < 0:
+        num, den = -num, -den
+    floored = _round_half_up(num, den)
+    frac = num - floored * den  # remainder numerator over den, in [-den/2, den/2]
+
+    rate_dec = Decimal(rate).scaleb(-kr)
+    sum_raw_tax = Decimal(int(nets.sum())).scaleb(-kn) * rate_dec
+    total_dec = Decimal(total_tax)
+
+    def decimal_ideal(i):
+        ideal = Decimal(int(nets[i])).scaleb(-kn) * rate_dec / sum_raw_tax * total_dec
+        fl = ideal.quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+        return fl, ideal - fl
+
+    for i in np.flatnonzero(2 * np.abs(frac) == den):
+        fl, f = decimal_ideal(i)
+        floored[i] = int(fl)
+        frac[i] = den // 2 if f > 0 else -(den // 2)
+
+    n = len(nets)
+    delta = total_tax - int(floored.sum())
+    step = 1 if delta > 0 else -1
+    base, rem = divmod(abs(delta), n)
+    adjust = np.full(n, base * step, dtype=np.int64)
+    if rem:
+        order = np.argsort(-frac, kind='stable')
+        cut = frac[order[rem - 1]]
+        if frac[order[rem]] == cut:
+            tied = np.flatnonzero(frac[order] == cut)
+            start, end = int(tied[0]), int(tied[-1]) + 1
+            block = order[start:end]
+            if len(np.unique(nets[block])) > 1:
+                keys = {int(i): decimal_ideal(i)[1] for i in block}
+                order[start:end] = sorted(block.tolist(), key=lambda i: keys[i], reverse=True)
+        adjust[order[:rem]] += step
+    return floored + adjust
+
+
+def _reconcile_vectorized(df2, mode, tolerance):
+    """int64 engine. Fills df2 in place like _reconcile_decimal; returns None if not representable.
+
+    Values are computed on scaled integers; the exponent and sign bit of every output cell follow
+    Decimal's rules (product: sum of exponents, xor of signs; sum: smaller exponent, a zero sum is
+    negative only for two negative zeros; quantize: exponent 0, sign kept), so the written Decimals
+    are identical to the Decimal path's, not merely equal.
+    """
+    if len(df2) == 0:
+        return None
+    n_rows = len(df2)
+    parsed = {'qty': _scaled_ints(df2['qty'], clean=False)}
+    for c in ['unit_price', 'discount', 'tax_rate', 'extracted_row_total']:
+        if c in df2.columns:
+            parsed[c] = _scaled_ints(df2[c], clean=True)
+        else:
+            zeros = np.zeros(n_rows, dtype=np.int64)
+            parsed[c] = (zeros, 0, zeros, zeros != 0, [Decimal(0)] * n_rows)
+    if any(v is None for v in parsed.values()):
+        return None
+    tol = D(tolerance)
+    if not tol.is_finite():
+        return None
+    kt = max(0, -tol.as_tuple().exponent)
+    if kt > _MAX_SCALE:
+        return None
+    tol_int = int(tol.scaleb(kt))
+
+    (q, kq, xq, sq, _), (u, ku, xu, su, u_dec) = parsed['qty'], parsed['unit_price']
+    (d, kd, xd, sd, d_dec), (r, kr, xr, sr, r_dec) = parsed['discount'], parsed['tax_rate']
+    e, ke, xe, se, e_dec = parsed['extracted_row_total']
+    kn = max(kq + ku, kd)
+    mul_qu, mul_d = 10 ** (kn - kq - ku), 10 ** (kn - kd)
+
+    # every intermediate stays under _INT_LIMIT when these bounds hold
+    net_max = _absmax(q) * _absmax(u) * mul_qu + _absmax(d) * mul_d
+    sum_max = net_max * n_rows
+    tax_max = sum_max * _absmax(r) // 10 ** (kn + kr) + 1
+    bounds = (
+        _absmax(q) * _absmax(u) * mul_qu, sum_max, sum_max * _absmax(r) * 2 + 10 ** (kn + kr),
+        net_max + tax_max * 10 ** kn,
+    )
+    if max(bounds) >= _INT_LIMIT:
+        return None
+
+    prod = q * mul_qu * u
+    net = prod - d * mul_d
+    x_prod, s_prod = xq + xu, sq ^ su
+    x_net = np.minimum(x_prod, xd)
+    s_net = _sign_of_sum(prod, s_prod, d, ~sd, net)
+    if not (_coefficients_fit(prod, kn, x_prod) and _coefficients_fit(net, kn, x_net)):
+        return None
+    if mode == 'per_line':
+        tax = _round_half_up(net * r, 10 ** (kn + kr))
+        s_tax = s_net ^ sr
+        expected = net + tax * 10 ** kn
+        kx = kn
+        x_exp = np.minimum(x_net, 0)
+        s_exp = _sign_of_sum(net, s_net, tax, s_tax, expected)
+    else:
+        expected = np.zeros(n_rows, dtype=np.int64)
+        s_exp = np.zeros(n_rows, dtype=bool)
+        kx = 0
+        x_exp = np.zeros(n_rows, dtype=np.int64)
+        rates, group = np.unique(r, return_inverse=True)
+        for g, rate in enumerate(rates.tolist()):
+            positions = np.flatnonzero(group == g)
+            nets = net[positions]
+            sum_nets = int(nets.sum())
+            total_tax = int(_round_half_up(np.int64(sum_nets * rate), 10 ** (kn + kr)))
+            if rate == 0 or sum_nets == 0:
+                apportioned = np.zeros(len(positions), dtype=np.int64)
+            elif _absmax(nets) * abs(total_tax) * 2 + abs(sum_nets) >= _INT_LIMIT:
+                return None
+            else:
+                apportioned = _apportion_vectorized(nets, kn, rate, kr, total_tax)
+            # nets that cancel out (sum close to 0) can apportion far more than total_tax to one row
+            if (net_max + _absmax(apportioned) * 10 ** kn) * 2 + 10 ** kn >= _INT_LIMIT:
+                return None
+            unrounded = nets + apportioned * 10 ** kn
+            expected[positions] = _round_half_up(unrounded, 10 ** kn)
+            # apportioned amounts are never negative zero; round_yen keeps the sign of the sum
+            s_exp[positions] = _sign_of_sum(nets, s_net[positions], apportioned, apportioned < 0, unrounded)
+
+    kdl = max(ke, kx)
+    exp_max = _absmax(expected)
+    bounds = (
+        exp_max * n_rows, _absmax(e) * n_rows, tol_int * 10 ** kdl,
+        (_absmax(e) * 10 ** (kdl - ke) + exp_max * 10 ** (kdl - kx)) * 10 ** kt,
+    )
+    if max(bounds) >= _INT_LIMIT:
+        return None
+    delta = e * 10 ** (kdl - ke) - expected * 10 ** (kdl - kx)
+    x_delta = np.minimum(xe, x_exp)
+    s_delta = _sign_of_sum(e, se, expected, ~s_exp, delta)
+    if not (_coefficients_fit(expected, kx, x_exp) and _coefficients_fit(delta, kdl, x_delta)):
+        return None
+    flag = np.abs(delta) * 10 ** kt > tol_int * 10 ** kdl
+
+    df2['unit_price'] = u_dec
+    df2['discount'] = d_dec
+    df2['tax_rate'] = r_dec
+    df2['extracted_row_total'] = e_dec
+    if mode != 'per_line':
+        df2['net'] = _to_decimals(net, kn, x_net, s_net)
+    df2['expected_total'] = _to_decimals(expected, kx, x_exp, s_exp)
+    df2['delta'] = _to_decimals(delta, kdl, x_delta, s_delta)
+    df2['flag'] = flag
+    return Decimal(int(e.sum())).scaleb(-ke), Decimal(int(expected.sum())).scaleb(-kx)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Run Journal — run_id 単位の先行書き込み（write-ahead）進捗ジャーナル
+
+長時間バッチ（Outlook 400 通など）の状態遷移を 1 行 1 イベントの JSONL で
+追記し、各行を flush + fsync してから処理を進める。クラッシュ/COM タイムアウト後は
+ジャーナルを読み戻して完了済みの作業をスキップできる。
+
+- 追記のみ（上書きしない）。最後の行が途中で切れていても読み込み時に無視する
+- イベントは {"seq", "ts", "event", ...任意フィールド}
+
+Usage:
+    from common.run_journal import RunJournal
+
+    journal = RunJournal(run_dir / "progress_journal.jsonl")
+    journal.append("message", entry_id=eid, state="started")
+    ...
+    for ev in RunJournal.load(run_dir / "progress_journal.jsonl"):
+        print(ev["event"], ev.get("state"))
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+
+JOURNAL_FILE_NAME = "progress_journal.jsonl"
+
+
+class RunJournal:
+    """追記専用の JSONL ジャーナル。"""
+
+    def __init__(self, path: Path, *, fsync: bool = True) -> None:
+        self._path = Path(path)
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._seq = len(self.load(self._path))
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def append(self, event: str, **fields: Any) -> dict[str, Any]:
+        """イベントを 1 行追記し、ディスクへ同期してから返す。"""
+        with self._lock:
+            self._seq += 1
+            record: dict[str, Any] = {
+                "seq": self._seq,
+                "ts": datetime.now().isoformat(timespec="seconds"),
+                "event": event,
+            }
+            record.update(fields)
+            line = json.dumps(record, ensure_ascii=False, default=str)
+            with self._path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                if self._fsync:
+                    try:
+                        os.fsync(f.fileno())
+                    except OSError:
+                        pass
+            return record
+
+    @staticmethod
+    def load(path: Path) -> list[dict[str, Any]]:
+        """ジャーナルを読み込む（存在しなければ空、壊れた行はスキップ）。"""
+        path = Path(path)
+        if not path.exists():
+            return []
+        events: list[dict[str, Any]] = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError:
+                    # クラッシュで途中まで書かれた最終行
+                    continue
+                if isinstance(obj, dict) and "event" in obj:
+                    events.append(obj)
+        return events
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Spans — 処理段階ごとの所要時間計測
+
+SpanRecorder を activate() したスレッドでだけ記録する。未有効時の span() は共有の
+no-op を返し、@timed は関数をそのまま呼ぶだけなので、計測コードを常設できる。
+
+- 入れ子の span は "preprocess/render" のようなパスで集計する
+- totals_ms(): パスごとの合計時間（ms）。SmartOCRResult.preprocess_info などに載せる
+- to_folded(): collapsed stack 形式（"a;b <μs>"）。py-spy --format raw / speedscope /
+  flamegraph.pl でそのまま読める
+- emit_metrics(): 証跡台帳の RunContext.add_metric へ出力
+
+Usage:
+    from common.spans import SpanRecorder, span, timed
+
+    @timed("render")
+    def pdf_to_image(...): ...
+
+    recorder = SpanRecorder()
+    with recorder.activate():
+        with span("preprocess"):
+            pdf_to_image(...)
+    recorder.totals_ms()   # {"preprocess": 812.4, "preprocess/render": 640.1}
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_local = threading.local()
+
+
+def current_recorder() -> Optional["SpanRecorder"]:
+    """このスレッドで有効な SpanRecorder（未有効なら None）"""
+    return getattr(_local, "recorder", None)
+
+
+class SpanRecorder:
+    """span の所要時間をパスごとに集計する（1 スレッド・1 処理単位で使う）"""
+
+    def __init__(self) -> None:
+        self._stack: List[list] = []  # [path, 子 span の合計秒]
+        self._total: Dict[Tuple[str, ...], float] = {}
+        self._self: Dict[Tuple[str, ...], float] = {}
+        self._count: Dict[Tuple[str, ...], int] = {}
+
+    @contextmanager
+    def activate(self) -> Iterator["SpanRecorder"]:
+        previous = current_recorder()
+        _local.recorder = self
+        try:
+            yield self
+        finally:
+            _local.recorder = previous
+
+    def _enter(self, name: str) -> None:
+        parent = self._stack[-1][0] if self._stack else ()
+        self._stack.append([parent + (name,), 0.0])
+
+    def _exit(self, elapsed: float) -> None:
+        path, children = self._stack.pop()
+        self._total[path] = self._total.get(path, 0.0) + elapsed
+        self._self[path] = self._self.get(path, 0.0) + max(0.0, elapsed - children)
+        self._count[path] = self._count.get(path, 0) + 1
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+    def totals_ms(self) -> Dict[str, float]:
+        """{"preprocess/render": 合計ms, ...}（最初に記録された順）"""
+        return {"/".join(p): round(t * 1000, 1) for p, t in self._total.items()}
+
+    def counts(self) -> Dict[str, int]:
+        return {"/".join(p): n for p, n in self._count.items()}
+
+    def to_folded(self) -> str:
+        """collapsed stack 形式（1 行 1 パス、値は自己時間 μs）"""
+        lines = [f"{';'.join(p)} {int(round(t * 1_000_000))}" for p, t in self._self.items()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def emit_metrics(self, run: Any, key: str = "stage_ms") -> None:
+        """RunContext.add_metric(key, totals_ms()) を呼ぶ（run が None なら何もしない）"""
+        if run is not None:
+            run.add_metric(key, self.totals_ms())
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "t0")
+
+    def __init__(self, recorder: SpanRecorder, name: str) -> None:
+        self.recorder = recorder
+        self.name = name
+        self.t0 = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.recorder._enter(self.name)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        self.recorder._exit(time.perf_counter() - self.t0)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str):
+    """計測ブロック（SpanRecorder 未有効なら no-op）"""
+    recorder = current_recorder()
+    return _NOOP if recorder is None else _Span(recorder, name)
+
+
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    """関数全体を span にするデコレータ（name 省略時は関数名）"""
+
+    def decorator(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            recorder = current_recorder()
+            if recorder is None:
+                return fn(*args, **kwargs)
+            with _Span(recorder, label):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@contextmanager
+def profile_to(out_dir: Path, stem: str, recorder: Optional[SpanRecorder] = None) -> Iterator[Path]:
+    """ブロックを cProfile で計測し <stem>.prof（pstats / snakeviz）と <stem>.folded を書き出す"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield out_dir
+    finally:
+        profiler.disable()
+        profiler.dump_stats(str(out_dir / f"{stem}.prof"))
+        if recorder is not None:
+            (out_dir / f"{stem}.folded").write_text(recorder.to_folded(), encoding="utf-8")
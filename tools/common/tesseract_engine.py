@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Tesseract Engine — 常駐ハンドル型の Tesseract OCR バックエンド
+
+OCR フォールバックで 1 画像ごとに tesseract.exe を起動すると、毎回プロセス起動と
+jpn.traineddata の読み込み、PNG のエンコード/デコードが発生する。本モジュールは
+
+- tesserocr が使える場合: PyTessBaseAPI をスレッドごとに 1 つ常駐させ、
+  numpy 配列をそのまま SetImageBytes で渡す（ファイル I/O なし）
+- 使えない場合: tesseract.exe を subprocess で呼ぶ（従来互換のフォールバック）。
+  複数ページは画像リストファイルで 1 回の起動にまとめ、PGM（無圧縮）で受け渡す
+
+入力は numpy 配列（グレー HxW / カラー HxWx3, uint8）または画像ファイルパス。
+
+Usage:
+    from common.tesseract_engine import get_tesseract_engine
+
+    engine = get_tesseract_engine(languages="jpn+eng", tessdata_dir=tessdata)
+    text = engine.image_to_text(page_bgr)
+    texts = engine.images_to_text([p1, p2, p3])   # 1 回の呼び出しで複数ページ
+    print(engine.backend)                         # "tesserocr" / "subprocess"
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Sequence, Union
+
+try:
+    import numpy as np  # type: ignore
+
+    _NUMPY_AVAILABLE = True
+except Exception:
+    _NUMPY_AVAILABLE = False
+
+try:
+    import tesserocr  # type: ignore
+
+    _TESSEROCR_AVAILABLE = True
+except Exception:
+    _TESSEROCR_AVAILABLE = False
+
+
+ImageInput = Union["np.ndarray", Path, str]
+
+# tesseract の text レンダラはページごとに改ページ（\f）を出力する
+PAGE_SEPARATOR = "\f"
+
+
+def find_tesseract_exe() -> Path | None:
+    """TESSERACT_EXE → 既定インストール先 → PATH の順で探す。"""
+    env = os.environ.get("TESSERACT_EXE")
+    if env:
+        p = Path(env)
+        if p.exists():
+            return p
+    for c in (
+        Path(r"C:\Program Files\Tesseract-OCR\tesseract.exe"),
+        Path(r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe"),
+    ):
+        if c.exists():
+            return c
+    which = shutil.which("tesseract")
+    return Path(which) if which else None
+
+
+def to_gray(image: "np.ndarray") -> "np.ndarray":
+    """uint8 のグレースケール連続配列に変換する（BGR/RGB の差は OCR 上無視できる）。"""
+    arr = np.asarray(image)
+    if arr.ndim == 3:
+        if arr.shape[2] == 4:
+            arr = arr[:, :, :3]
+        if arr.shape[2] == 1:
+            arr = arr[:, :, 0]
+        else:
+            arr = (
+                arr[:, :, 0].astype(np.uint16) * 29
+                + arr[:, :, 1].astype(np.uint16) * 150
+                + arr[:, :, 2].astype(np.uint16) * 77
+            ) >> 8
+    if arr.dtype != np.uint8:
+        arr = np.clip(arr, 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(arr)
+
+
+def write_pgm(path: Path, image: "np.ndarray") -> None:
+    """無圧縮 PGM (P5) で書き出す。PNG 圧縮より速く、leptonica がそのまま読める。"""
+    gray = to_gray(image)
+    h, w = gray.shape
+    with Path(path).open("wb") as f:
+        f.write(f"P5\n{w} {h}\n255\n".encode("ascii"))
+        f.write(gray.tobytes())
+
+
+class TesseractEngine:
+    """Tesseract OCR（tesserocr 常駐ハンドル / subprocess フォールバック）。"""
+
+    def __init__(
+        self,
+        *,
+        languages: str = "jpn+eng",
+        tessdata_dir: Path | None = None,
+        psm: int = 6,
+        exe: Path | None = None,
+        backend: str = "auto",
+    ) -> None:
+        if backend not in ("auto", "tesserocr", "subprocess"):
+            raise ValueError(f"unsupported backend: {backend}")
+        self.languages = languages
+        self.tessdata_dir = Path(tessdata_dir) if tessdata_dir is not None else None
+        self.psm = int(psm)
+        self.exe = Path(exe) if exe is not None else find_tesseract_exe()
+        self._local = threading.local()
+        self._apis: list[Any] = []
+        self._apis_lock = threading.Lock()
+        self.init_error: str | None = None
+
+        self.backend = "subprocess"
+        if backend in ("auto", "tesserocr") and _TESSEROCR_AVAILABLE and _NUMPY_AVAILABLE:
+            try:
+                self._api()  # 初期化失敗（traineddata 不足など）をここで検出する
+                self.backend = "tesserocr"
+            except Exception as e:
+                self.init_error = f"{type(e).__name__}: {e}"
+        if self.backend == "subprocess":
+            if backend == "tesserocr":
+                raise RuntimeError(f"tesserocr が利用できません。{self.init_error or ''}".strip())
+            if self.exe is None:
+                raise RuntimeError("tesseract が利用できません。")
+
+    # -- public ---------------------------------------------------------------
+
+    def image_to_text(self, image: ImageInput, *, timeout_s: int = 60) -> str:
+        return self.images_to_text([image], timeout_s=timeout_s)[0]
+
+    def images_to_text(self, images: Sequence[ImageInput], *, timeout_s: int = 60) -> list[str]:
+        """複数ページを 1 回の呼び出しで OCR し、入力順のテキストを返す。"""
+        if not images:
+            return []
+        if self.backend == "tesserocr":
+            try:
+                return [self._tesserocr_one(img) for img in images]
+            except Exception:
+                if self.exe is None:
+                    raise
+                # 常駐ハンドルが壊れた場合も処理は止めない（subprocess へ退避）
+        return self._subprocess_batch(images, timeout_s=timeout_s)
+
+    def close(self) -> None:
+        with self._apis_lock:
+            for api in self._apis:
+                try:
+                    api.End()
+                except Exception:
+                    pass
+            self._apis.clear()
+        self._local = threading.local()
+
+    # -- tesserocr ------------------------------------------------------------
+
+    def _api(self) -> Any:
+        api = getattr(self._local, "api", None)
+        if api is not None:
+            return api
+        kwargs: dict[str, Any] = {"lang": self.languages, "psm": self.psm}
+        if self.tessdata_dir is not None:
+            kwargs["path"] = str(self.tessdata_dir)
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        self._local.api = api
+        with self._apis_lock:
+            self._apis.append(api)
+        return api
+
+    def _tesserocr_one(self, image: ImageInput) -> str:
+        api = self._api()
+        if isinstance(image, (str, Path)):
+            api.SetImageFile(str(image))
+        else:
+            gray = to_gray(image)
+            h, w = gray.shape
+            api.SetImageBytes(gray.tobytes(), w, h, 1, w)
+        return str(api.GetUTF8Text() or "")
+
+    # -- subprocess -----------------------------------------------------------
+
+    def _command(self, input_path: Path) -> list[str]:
+        cmd = [str(self.exe), str(input_path), "stdout", "-l", self.languages, "--psm", str(self.psm)]
+        if self.tessdata_dir is not None:
+            cmd.extend(["--tessdata-dir", str(self.tessdata_dir)])
+        return cmd
+
+    def _run(self, input_path: Path, timeout_s: float) -> str:
+        proc = subprocess.run(
+            self._command(input_path),
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout_s,
+        )
+        if proc.returncode != 0:
+            err = (proc.stderr or "").strip()
+            raise RuntimeError(f"tesseract failed: rc={proc.returncode} stderr={err}")
+        return proc.stdout or ""
+
+    def _subprocess_batch(self, images: Sequence[ImageInput], *, timeout_s: int) -> list[str]:
+        # Use an ASCII temp directory to avoid native path issues on Windows.
+        with tempfile.TemporaryDirectory(prefix="tess_engine_") as tmp:
+            tmp_dir = Path(tmp)
+            paths: list[Path] = []
+            for i, img in enumerate(images):
+                if isinstance(img, (str, Path)):
+                    paths.append(Path(img))
+                else:
+                    p = tmp_dir / f"page_{i:04d}.pgm"
+                    write_pgm(p, img)
+                    paths.append(p)
+
+            if len(paths) == 1:
+                return [self._run(paths[0], timeout_s)]
+
+            list_file = tmp_dir / "pages.txt"
+            list_file.write_text("\n".join(str(p) for p in paths) + "\n", encoding="utf-8")
+            out = self._run(list_file, timeout_s * len(paths))
+            pages = out.split(PAGE_SEPARATOR)
+            if len(pages) >= len(paths) and not "".join(pages[len(paths):]).strip():
+                return pages[: len(paths)]
+            # 区切りが崩れた場合は 1 枚ずつ（正しさ優先）
+            return [self._run(p, timeout_s) for p in paths]
+
+
+_ENGINES: dict[tuple[str, str, int, str, str], TesseractEngine] = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def get_tesseract_engine(
+    *,
+    languages: str = "jpn+eng",
+    tessdata_dir: Path | None = None,
+    psm: int = 6,
+    exe: Path | None = None,
+    backend: str = "auto",
+) -> TesseractEngine:
+    """(languages, tessdata_dir, psm, exe, backend) ごとにエンジンを 1 つだけ作って使い回す。"""
+    key = (languages, str(tessdata_dir or ""), int(psm), str(exe or ""), backend)
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(key)
+        if engine is None:
+            engine = TesseractEngine(
+                languages=languages, tessdata_dir=tessdata_dir, psm=psm, exe=exe, backend=backend
+            )
+            _ENGINES[key] = engine
+        return engine
+
+
+def reset_engines() -> None:
+    """キャッシュ済みエンジンを閉じて破棄する（テスト・設定変更用）。"""
+    with _ENGINES_LOCK:
+        for engine in _ENGINES.values():
+            engine.close()
+        _ENGINES.clear()
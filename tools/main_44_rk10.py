@@ -10,6 +10,7 @@ Usage:
 
     # Phase 2: 一括処理（ログイン→全PDF登録→終了）
     python main_44_rk10.py --run-all
+    python main_44_rk10.py --run-all --no-resume   # 登録済みチェックポイントを破棄して全件
 
     # Phase 3: 後処理（PDF移動→結果出力）
     python main_44_rk10.py --post
@@ -26,10 +27,15 @@ Options:
 Created: 2026-01-26
 """
 import argparse
+import hashlib
 import json
 import os
+import re
 import shutil
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
@@ -47,6 +53,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from common.config_loader import load_config, get_env
 from common.logger import setup_logger, get_logger, LogContext
+from common.run_journal import RunJournal
+from common.spans import SpanRecorder, span
 
 from pdf_renamer import PDFRenamer
 from rakuraku_upload import RakurakuUploader, ReceiptData
@@ -70,6 +78,8 @@ WORK_OUTPUT_DIR = Path(__file__).parent.parent / "work" / "output"
 DATA_JSON_PATH = WORK_OUTPUT_DIR / "data.json"
 RESULT_JSON_PATH = WORK_OUTPUT_DIR / "result.json"
 INDEX_FILE_PATH = WORK_OUTPUT_DIR / "current_index.txt"
+# --run-all の登録済みチェックポイント（1 件確定ごとに追記、--pre で破棄）
+RUN_ALL_JOURNAL_PATH = WORK_OUTPUT_DIR / "run_all_journal.jsonl"
 
 # OCR失敗フォルダ
 OCR_FAILED_BASE_DIR = Path(__file__).parent.parent / "work" / "ocr_failed"
@@ -429,8 +439,9 @@ def cmd_pre(config: dict) -> int:
         except Exception:
             pass
 
-    # インデックスリセット
+    # インデックスリセット（新しい data.json なので登録済みチェックポイントも破棄）
     INDEX_FILE_PATH.write_text("0", encoding="utf-8")
+    RUN_ALL_JOURNAL_PATH.unlink(missing_ok=True)
 
     return 0
 
@@ -438,9 +449,100 @@ def cmd_pre(config: dict) -> int:
 # =============================================================================
 # コマンド: --run-all（一括処理）
 # =============================================================================
-def cmd_run_all(config: dict, headless: bool = False, dry_run: bool = False) -> int:
+INVOICE_NUMBER_RE = re.compile(r"^T\d{13}$")
+
+
+@dataclass
+class PreparedEntry:
+    """事前準備済みの 1 件（ファイル確認・入力値検証まで）"""
+    item: dict
+    receipt: Optional[ReceiptData] = None
+    sha256: str = ""
+    error: str = ""
+    warnings: List[str] = field(default_factory=list)
+    prepare_ms: float = 0.0
+
+
+def prepare_entry(item: dict) -> PreparedEntry:
+    """1 件分のファイル読み込みと入力値検証（前の件の確定待ちと並行して実行）
+
+    ファイルが無い・PDF でない場合は error、入力値の不備は warnings に入れる
+    （空欄の項目は従来どおり OCR 自動入力に任せる）。
+    """
+    t0 = time.perf_counter()
+    prepared = PreparedEntry(item=item)
+    # _preprocessed_pathは一時ファイルで削除済みの場合があるため、_pdf_path（出力フォルダ）を使用
+    upload_path = Path(item["_pdf_path"])
+    try:
+        if not upload_path.exists():
+            prepared.error = f"ファイルが存在しません: {upload_path}"
+            return prepared
+        content = upload_path.read_bytes()
+        if not content.startswith(b"%PDF"):
+            prepared.error = f"PDFではありません: {upload_path}"
+            return prepared
+        prepared.sha256 = hashlib.sha256(content).hexdigest()
+
+        issue_date = str(item.get("issue_date", "") or "").replace("/", "").replace("-", "")
+        amount = item.get("amount", 0) or 0
+        invoice_number = str(item.get("invoice_number", "") or "")
+        if not item.get("vendor_name"):
+            prepared.warnings.append("取引先名が空です")
+        if issue_date and not (len(issue_date) == 8 and issue_date.isdigit()):
+            prepared.warnings.append(f"取引日の形式が不正です: {item.get('issue_date')}")
+        if not isinstance(amount, int) or amount <= 0:
+            prepared.warnings.append(f"金額が不正です: {amount}")
+            amount = amount if isinstance(amount, int) else 0
+        if invoice_number and not INVOICE_NUMBER_RE.match(invoice_number):
+            prepared.warnings.append(f"事業者登録番号の形式が不正です: {invoice_number}")
+
+        prepared.receipt = ReceiptData(
+            pdf_path=str(upload_path),
+            vendor_name=item.get("vendor_name", ""),
+            trading_date=item.get("issue_date", ""),
+            amount=amount,
+            invoice_number=invoice_number,
+        )
+    except OSError as e:
+        prepared.error = f"ファイル読み込みエラー: {e}"
+    finally:
+        prepared.prepare_ms = round((time.perf_counter() - t0) * 1000, 1)
+    return prepared
+
+
+def load_submitted_entries(journal_path: Path) -> Dict[tuple, dict]:
+    """チェックポイントから登録済みの結果を読む: (pdf_path, sha256) -> result item"""
+    submitted: Dict[tuple, dict] = {}
+    for ev in RunJournal.load(journal_path):
+        if ev.get("event") == "entry" and ev.get("state") == "submitted":
+            submitted[(ev.get("pdf_path"), ev.get("sha256"))] = ev.get("result") or {}
+    return submitted
+
+
+def _result_item(item: dict, status: str, message: str, **extra) -> dict:
+    result_item = {
+        "index": item["_index"],
+        "pdf_name": item["_pdf_name"],
+        "pdf_path": item["_pdf_path"],
+        "status": status,
+        "message": message,
+        "vendor_name": item.get("vendor_name", ""),
+        "amount": item.get("amount", 0),
+        "timestamp": datetime.now().isoformat()
+    }
+    result_item.update(extra)
+    return result_item
+
+
+def cmd_run_all(config: dict, headless: bool = False, dry_run: bool = False, resume: bool = True) -> int:
     """一括処理: ログイン→全PDF登録→終了
 
+    - ブラウザ起動・ログインは 1 回だけ（以降は同じコンテキストで登録）
+    - 画面待ちは固定 sleep ではなく準備完了条件（RakurakuUploader explicit_waits）
+    - 次の 1 件のファイル読み込み・入力値検証を、現在の件の登録と並行して行う
+    - 工程別の所要時間を result.json の timings_ms に記録
+    - 確定した件は RUN_ALL_JOURNAL_PATH に記録し、再実行時はスキップ（--no-resume で無効）
+
     Returns:
         0: 成功, 1: 失敗
     """
@@ -470,88 +572,104 @@ def cmd_run_all(config: dict, headless: bool = False, dry_run: bool = False) ->
         "summary": {
             "total": len(data_list),
             "success": 0,
-            "failed": 0
+            "failed": 0,
+            "resumed": 0
         },
         "results": []
     }
 
-    # アップローダー初期化
-    uploader = RakurakuUploader(config)
-
-    # 全件処理
-    for item in data_list:
-        pdf_path = Path(item["_pdf_path"])
-        # _preprocessed_pathは一時ファイルで削除済みの場合があるため、_pdf_path（出力フォルダ）を使用
-        upload_path = item["_pdf_path"]
-
-        # ファイル存在チェック
-        if not Path(upload_path).exists():
-            logger.error(f"ファイルが存在しません: {upload_path}")
-            results["summary"]["failed"] += 1
-            results["results"].append({
-                "index": item["_index"],
-                "pdf_name": item["_pdf_name"],
-                "pdf_path": item["_pdf_path"],
-                "status": "エラー",
-                "message": f"ファイルが存在しません: {upload_path}",
-                "vendor_name": item.get("vendor_name", ""),
-                "amount": item.get("amount", 0),
-                "timestamp": datetime.now().isoformat()
-            })
-            continue
-
-        logger.info(f"処理中: {item['_pdf_name']}")
-
-        # ReceiptData作成
-        receipt_data = ReceiptData(
-            pdf_path=upload_path,
-            vendor_name=item.get("vendor_name", ""),
-            trading_date=item.get("issue_date", ""),
-            amount=item.get("amount", 0),
-            invoice_number=item.get("invoice_number", "")
-        )
+    # チェックポイント（ドライランでは記録しない）
+    if not resume:
+        RUN_ALL_JOURNAL_PATH.unlink(missing_ok=True)
+    journal = None if dry_run else RunJournal(RUN_ALL_JOURNAL_PATH)
+    submitted = {} if dry_run else load_submitted_entries(RUN_ALL_JOURNAL_PATH)
+    if submitted:
+        logger.info(f"登録済みチェックポイント: {len(submitted)}件（再登録しません）")
 
-        # アップロード実行
-        try:
-            success = uploader.run(
-                pdf_path=upload_path,
-                data=receipt_data,
-                headless=headless,
-                dry_run=dry_run
-            )
-
-            result_item = {
-                "index": item["_index"],
-                "pdf_name": item["_pdf_name"],
-                "pdf_path": item["_pdf_path"],
-                "status": "成功" if success else "失敗",
-                "message": "登録完了" if success else "登録失敗",
-                "vendor_name": item.get("vendor_name", ""),
-                "amount": item.get("amount", 0),
-                "timestamp": datetime.now().isoformat()
-            }
-            results["results"].append(result_item)
-
-            if success:
-                results["summary"]["success"] += 1
-                logger.info(f"  → 成功")
-            else:
-                results["summary"]["failed"] += 1
-                logger.error(f"  → 失敗")
+    # アップローダー初期化（ブラウザは最初の登録時に起動）
+    uploader = RakurakuUploader(config, explicit_waits=True)
+    logged_in = False
 
-        except Exception as e:
-            logger.error(f"アップロードエラー: {e}")
-            results["summary"]["failed"] += 1
-            results["results"].append({
-                "index": item["_index"],
-                "pdf_name": item["_pdf_name"],
-                "pdf_path": item["_pdf_path"],
-                "status": "エラー",
-                "message": str(e),
-                "vendor_name": item.get("vendor_name", ""),
-                "amount": item.get("amount", 0),
-                "timestamp": datetime.now().isoformat()
-            })
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="rk44-prefetch") as prefetch:
+        next_entry = prefetch.submit(prepare_entry, data_list[0])
+        try:
+            for i in range(len(data_list)):
+                prepared = next_entry.result()
+                item = prepared.item
+                if i + 1 < len(data_list):
+                    next_entry = prefetch.submit(prepare_entry, data_list[i + 1])
+
+                timings = {"prepare": prepared.prepare_ms}
+                if prepared.error:
+                    logger.error(prepared.error)
+                    results["summary"]["failed"] += 1
+                    results["results"].append(_result_item(
+                        item, "エラー", prepared.error, timings_ms=timings))
+                    continue
+
+                previous = submitted.get((item["_pdf_path"], prepared.sha256))
+                if previous:
+                    logger.info(f"登録済みのためスキップ: {item['_pdf_name']}")
+                    results["summary"]["success"] += 1
+                    results["summary"]["resumed"] += 1
+                    results["results"].append({**previous, "resumed": True})
+                    continue
+
+                logger.info(f"処理中: {item['_pdf_name']}")
+                for warning in prepared.warnings:
+                    logger.warning(f"  入力値: {warning}")
+
+                recorder = SpanRecorder()
+                t0 = time.perf_counter()
+                try:
+                    with recorder.activate():
+                        if not logged_in:
+                            with span("login"):
+                                uploader.start_browser(headless=headless)
+                                logged_in = True
+                                uploader.login()
+                        success = uploader.register(prepared.receipt, dry_run=dry_run)
+                    status = "成功" if success else "失敗"
+                    message = "登録完了" if success else "登録失敗"
+                except Exception as e:
+                    logger.error(f"アップロードエラー: {e}")
+                    success = False
+                    status, message = "エラー", str(e)
+                    if logged_in:
+                        # ブラウザ/セッションが壊れている可能性: 次の件で起動からやり直す
+                        try:
+                            uploader.close_browser()
+                        except Exception:
+                            pass
+                        logged_in = False
+
+                timings.update(recorder.totals_ms())
+                timings["total"] = round((time.perf_counter() - t0) * 1000, 1)
+                result_item = _result_item(
+                    item, status, message,
+                    sha256=prepared.sha256,
+                    warnings=prepared.warnings,
+                    timings_ms=timings,
+                )
+                results["results"].append(result_item)
+
+                if success:
+                    results["summary"]["success"] += 1
+                    logger.info(f"  → 成功 ({timings['total']:.0f}ms)")
+                    if journal is not None:
+                        journal.append(
+                            "entry",
+                            state="submitted",
+                            pdf_path=item["_pdf_path"],
+                            sha256=prepared.sha256,
+                            result=result_item,
+                        )
+                else:
+                    results["summary"]["failed"] += 1
+                    logger.error(f"  → 失敗")
+        finally:
+            if logged_in:
+                uploader.close_browser()
 
     # 結果出力
     results["completed_at"] = datetime.now().isoformat()
@@ -559,7 +677,7 @@ def cmd_run_all(config: dict, headless: bool = False, dry_run: bool = False) ->
     logger.info(f"result.json出力完了: {RESULT_JSON_PATH}")
 
     logger.info("=== 一括処理完了 ===")
-    logger.info(f"  成功: {results['summary']['success']}件")
+    logger.info(f"  成功: {results['summary']['success']}件（うち前回登録済み {results['summary']['resumed']}件）")
     logger.info(f"  失敗: {results['summary']['failed']}件")
 
     return 0 if results["summary"]["failed"] == 0 else 1
@@ -699,6 +817,7 @@ def main():
     parser.add_argument("--env", choices=["LOCAL", "PROD"], help="環境")
     parser.add_argument("--headless", action="store_true", help="ヘッドレスモード")
     parser.add_argument("--dry-run", action="store_true", help="ドライラン（確定しない）")
+    parser.add_argument("--no-resume", action="store_true", help="登録済みチェックポイントを破棄して全件登録（--run-allで使用）")
     parser.add_argument("--send-mail", action="store_true", help="メール送信（--postで使用）")
     parser.add_argument("--test-mode", action="store_true", help="テストアドレスにメール送信")
 
@@ -726,7 +845,9 @@ def main():
         return cmd_pre(config)
 
     if args.run_all:
-        return cmd_run_all(config, headless=args.headless, dry_run=args.dry_run)
+        return cmd_run_all(
+            config, headless=args.headless, dry_run=args.dry_run, resume=not args.no_resume
+        )
 
     if args.post:
         return cmd_post(config, send_mail_flag=args.send_mail, test_mode=args.test_mode)
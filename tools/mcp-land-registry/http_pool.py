@@ -0,0 +1,141 @@
+"""共有 HTTP クライアント — 接続プール + TTL キャッシュ + 同一リクエストの合流。
+
+server.py の全ツールが 1 つの httpx.AsyncClient を共有する（lifespan で生成・破棄）。
+
+- 接続プール: keep-alive で TLS / 接続確立を呼び出しごとに繰り返さない
+- TTL キャッシュ: GET の応答 JSON を (URL, params, headers) をキーに ttl 秒保持
+  （国交省の取引価格のように、ほぼ変わらないデータの再取得を防ぐ）
+- 合流: 同じキーの GET が実行中なら上流へは 1 回だけ投げ、結果を共有する
+- 失敗（HTTP エラー・例外）はキャッシュしない。POST 等は常に素通し
+
+Usage:
+    pool = CachedHttpClient()
+    data = await pool.get_json(url, params={...}, ttl=3600)
+    await pool.aclose()
+
+テストでは transport=httpx.MockTransport(handler) を渡す。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+import httpx
+
+DEFAULT_TIMEOUT_S = 30.0
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+DEFAULT_MAX_ENTRIES = 256
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...], tuple[tuple[str, str], ...]]
+
+
+def _cache_key(url: str, params: dict | None, headers: dict | None) -> CacheKey:
+    return (
+        url,
+        tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+        tuple(sorted((k.lower(), str(v)) for k, v in (headers or {}).items())),
+    )
+
+
+class CachedHttpClient:
+    """httpx.AsyncClient を共有し、GET の JSON を TTL キャッシュ・合流する。"""
+
+    def __init__(
+        self,
+        *,
+        transport: httpx.AsyncBaseTransport | None = None,
+        timeout: float = DEFAULT_TIMEOUT_S,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = httpx.AsyncClient(timeout=timeout, limits=limits, transport=transport)
+        self._cache: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[CacheKey, asyncio.Task] = {}
+        self._generation = 0  # invalidate() ごとに進める
+        self._max_entries = max_entries
+        self._clock = clock
+        self.upstream_calls = 0
+
+    async def aclose(self) -> None:
+        for task in list(self._inflight.values()):
+            task.cancel()
+        self._inflight.clear()
+        self._cache.clear()
+        await self._client.aclose()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Any = None,
+        params: dict | None = None,
+        headers: dict | None = None,
+    ) -> httpx.Response:
+        """キャッシュを通さない呼び出し（共有プールは使う）。"""
+        self.upstream_calls += 1
+        return await self._client.request(method, url, json=json, params=params, headers=headers)
+
+    async def _fetch_json(self, key: CacheKey, url: str, params: dict | None, headers: dict | None, ttl: float) -> Any:
+        generation = self._generation
+        resp = await self.request("GET", url, params=params, headers=headers)
+        resp.raise_for_status()
+        data = resp.json()
+        if ttl > 0 and generation == self._generation:  # 取得中に破棄されたら保存しない
+            self._cache[key] = (self._clock() + ttl, data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        return data
+
+    async def get_json(
+        self,
+        url: str,
+        *,
+        params: dict | None = None,
+        headers: dict | None = None,
+        ttl: float = 0.0,
+    ) -> Any:
+        """GET して JSON を返す。ttl 秒以内の同一キーはキャッシュ、実行中なら合流。
+
+        HTTP エラーは httpx.HTTPStatusError（合流中の全呼び出し元に同じ例外）。
+        呼び出し元がキャンセルされても、共有中の上流リクエストは止めない。
+        """
+        key = _cache_key(url, params, headers)
+        hit = self._cache.get(key)
+        if hit is not None:
+            expires, data = hit
+            if self._clock() < expires:
+                self._cache.move_to_end(key)
+                return data
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_json(key, url, params, headers, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: CacheKey, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # 待ち手が全員キャンセル済みでも未回収警告を出さない
+
+    def invalidate(self, url_prefix: str = "") -> int:
+        """url_prefix で始まるキャッシュを破棄する（更新系 API の後に呼ぶ）。
+
+        実行中の GET には以後合流させず、その結果もキャッシュしない。
+        """
+        self._generation += 1
+        for k in [k for k in self._inflight if k[0].startswith(url_prefix)]:
+            del self._inflight[k]
+        stale = [k for k in self._cache if k[0].startswith(url_prefix)]
+        for k in stale:
+            del self._cache[k]
+        return len(stale)
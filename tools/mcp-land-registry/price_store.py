@@ -0,0 +1,224 @@
+"""国交省 取引価格の集計ストア（SQLite）。
+
+lookup_market_price は (市区町村, 年) ごとに全取引を取得し、宅地(土地) の抽出と
+坪単価の平均・最小・最大を毎回計算していた。ここでは (市区町村, 年) 単位で一度だけ
+取り込み、町名ごとの集計を事前計算して保存する。
+
+- trades: 宅地(土地) の取引（API の並び順 seq 付き。直近 5 件の表示用）
+- district_stats: 町名ごとの件数・坪単価の合計/最小/最大・価格/面積の合計
+- loads: 取り込み日時。max_age_s を過ぎた (市区町村, 年) だけを取り直す
+  （取り直しはその区分の行だけを 1 トランザクションで入れ替える）
+
+町名の部分一致（district in DistrictName）は district_stats の町名数ぶんだけを見る。
+
+Usage:
+    store = MarketPriceStore()
+    if not store.is_fresh("23210", 2024):
+        store.load("23210", 2024, api_json["data"])
+    stats = store.stats("23210", 2024, district="一里山")
+    rows = store.latest("23210", 2024, district="一里山")
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_DB_PATH = Path(
+    os.environ.get(
+        "LAND_REGISTRY_PRICE_DB",
+        Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "land_registry" / "market_prices.sqlite3",
+    )
+)
+
+LAND_TYPE = "宅地(土地)"
+M2_PER_TSUBO = 3.30579
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS loads (
+    city_code TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    n_rows INTEGER NOT NULL,
+    PRIMARY KEY (city_code, year)
+);
+CREATE TABLE IF NOT EXISTS trades (
+    city_code TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    district TEXT NOT NULL,
+    district_name TEXT,
+    trade_price INTEGER NOT NULL,
+    area TEXT,
+    city_planning TEXT,
+    period TEXT,
+    direction TEXT,
+    breadth TEXT,
+    PRIMARY KEY (city_code, year, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS district_stats (
+    city_code TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    district TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    n_priced INTEGER NOT NULL,
+    sum_tsubo REAL NOT NULL,
+    min_tsubo REAL,
+    max_tsubo REAL,
+    sum_price INTEGER NOT NULL,
+    sum_area REAL NOT NULL,
+    PRIMARY KEY (city_code, year, district)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True)
+class MarketStats:
+    """宅地取引の集計（n_priced は価格・面積が正の件数）。"""
+    n_rows: int
+    n_priced: int
+    avg_tsubo: int
+    min_tsubo: int
+    max_tsubo: int
+    avg_price: int
+    avg_area: int
+
+
+@dataclass(frozen=True)
+class Trade:
+    """表示用の 1 取引（値は API の文字列のまま。欠損は None）。"""
+    district_name: str | None
+    trade_price: int
+    area: str | None
+    city_planning: str | None
+    period: str | None
+    direction: str | None
+    breadth: str | None
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0  # "2,000㎡以上" など数値でない面積は集計対象外
+
+
+class MarketPriceStore:
+    """(市区町村コード, 年) 単位で取り込んだ宅地取引の集計ストア。"""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_DB_PATH,
+        *,
+        max_age_s: float = 86400.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age_s = max_age_s
+        self._clock = clock
+        self._db = sqlite3.connect(str(path))
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def is_fresh(self, city_code: str, year: int) -> bool:
+        row = self._db.execute(
+            "SELECT fetched_at FROM loads WHERE city_code = ? AND year = ?", (city_code, year)
+        ).fetchone()
+        return row is not None and self._clock() - row[0] < self.max_age_s
+
+    def has(self, city_code: str, year: int) -> bool:
+        return self._db.execute(
+            "SELECT 1 FROM loads WHERE city_code = ? AND year = ?", (city_code, year)
+        ).fetchone() is not None
+
+    def load(self, city_code: str, year: int, items: list[dict]) -> int:
+        """API の data 配列でその (市区町村, 年) を入れ替える。取り込んだ宅地件数を返す。"""
+        trades = []
+        stats: dict[str, list] = {}
+        for item in items:
+            if LAND_TYPE not in item.get("Type", ""):
+                continue
+            name = item.get("DistrictName")
+            district = name or ""
+            price = _to_int(item.get("TradePrice", 0))
+            area = _to_float(item.get("Area", 0))
+            trades.append((
+                city_code, year, len(trades), district, name, price,
+                item.get("Area"), item.get("CityPlanning"), item.get("Period"),
+                item.get("Direction"), item.get("Breadth"),
+            ))
+            s = stats.setdefault(district, [0, 0, 0.0, None, None, 0, 0.0])
+            s[0] += 1
+            if price > 0 and area > 0:
+                tsubo = price / (area / M2_PER_TSUBO)
+                s[1] += 1
+                s[2] += tsubo
+                s[3] = tsubo if s[3] is None else min(s[3], tsubo)
+                s[4] = tsubo if s[4] is None else max(s[4], tsubo)
+                s[5] += price
+                s[6] += area
+
+        key = (city_code, year)
+        with self._db:
+            self._db.execute("DELETE FROM trades WHERE city_code = ? AND year = ?", key)
+            self._db.execute("DELETE FROM district_stats WHERE city_code = ? AND year = ?", key)
+            self._db.executemany("INSERT INTO trades VALUES (?,?,?,?,?,?,?,?,?,?,?)", trades)
+            self._db.executemany(
+                "INSERT INTO district_stats VALUES (?,?,?,?,?,?,?,?,?,?)",
+                [(city_code, year, d, *s) for d, s in stats.items()],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO loads VALUES (?,?,?,?)",
+                (city_code, year, self._clock(), len(trades)),
+            )
+        return len(trades)
+
+    def stats(self, city_code: str, year: int, district: str | None = None) -> MarketStats | None:
+        """町名（部分一致）で絞った集計。宅地取引が 0 件なら None。"""
+        row = self._db.execute(
+            "SELECT SUM(n_rows), SUM(n_priced), SUM(sum_tsubo), MIN(min_tsubo), MAX(max_tsubo),"
+            " SUM(sum_price), SUM(sum_area) FROM district_stats"
+            " WHERE city_code = ? AND year = ? AND (? IS NULL OR instr(district, ?) > 0)",
+            (city_code, year, district or None, district or None),
+        ).fetchone()
+        n_rows, n_priced, sum_tsubo, min_tsubo, max_tsubo, sum_price, sum_area = row
+        if not n_rows:
+            return None
+        if not n_priced:
+            return MarketStats(n_rows, 0, 0, 0, 0, 0, 0)
+        return MarketStats(
+            n_rows=n_rows,
+            n_priced=n_priced,
+            avg_tsubo=int(sum_tsubo / n_priced),
+            min_tsubo=int(min_tsubo),
+            max_tsubo=int(max_tsubo),
+            avg_price=int(sum_price / n_priced),
+            avg_area=int(sum_area / n_priced),
+        )
+
+    def latest(
+        self, city_code: str, year: int, district: str | None = None, limit: int = 5
+    ) -> list[Trade]:
+        """API の並び順で先頭 limit 件（町名は部分一致）。"""
+        rows = self._db.execute(
+            "SELECT district_name, trade_price, area, city_planning, period, direction, breadth"
+            " FROM trades WHERE city_code = ? AND year = ?"
+            " AND (? IS NULL OR instr(district, ?) > 0) ORDER BY seq LIMIT ?",
+            (city_code, year, district or None, district or None, limit),
+        ).fetchall()
+        return [Trade(*r) for r in rows]
@@ -8,21 +8,35 @@
   - submit_for_approval: 承認フローへ送信
   - list_pending_approvals: 承認待ち一覧
   - review_approval: 承認 / 却下
+
+HTTP は lifespan で生成する共有クライアント（http_pool.CachedHttpClient）経由。
+GET 応答は TTL キャッシュされ、同時の同一 GET は 1 回の上流呼び出しに合流する。
+更新系 API の後は土地台帳側のキャッシュを破棄する。
+国交省の取引価格は price_store.MarketPriceStore（SQLite）に (市区町村, 年) 単位で
+取り込み、町名別の集計と直近取引はそこから引く。
 """
 
 from __future__ import annotations
 
 import os
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 import httpx
 from mcp.server.fastmcp import FastMCP
 
+from http_pool import CachedHttpClient
+from price_store import MarketPriceStore
+
 API_BASE = os.environ.get("LAND_REGISTRY_API", "http://54.238.230.57:8000/api/v1")
 DEFAULT_USER = os.environ.get("LAND_REGISTRY_USER", "claude-mcp")
 MLIT_API_KEY = os.environ.get("MLIT_API_KEY", "04b062c964fb4d958607708d771c46c0")
 MLIT_API_URL = "https://www.reinfolib.mlit.go.jp/ex-api/external/XIT001"
 
+# 土地台帳 GET 応答のキャッシュ秒数 / 国交省 取引価格ストアの取り直し間隔
+LAND_REGISTRY_CACHE_TTL_S = float(os.environ.get("LAND_REGISTRY_CACHE_TTL_S", "30"))
+MLIT_CACHE_TTL_S = float(os.environ.get("MLIT_CACHE_TTL_S", "21600"))
+
 # 市区町村コード
 CITY_CODES = {
     "刈谷市": "23210", "安城市": "23212", "知立市": "23225",
@@ -30,12 +44,46 @@ CITY_CODES = {
     "岡崎市": "23202", "西尾市": "23213", "豊明市": "23229",
 }
 
+_http: CachedHttpClient | None = None
+_prices: MarketPriceStore | None = None
+
+
+def _pool() -> CachedHttpClient:
+    """共有 HTTP クライアント（lifespan 外で呼ばれた場合はここで生成）。"""
+    global _http
+    if _http is None:
+        _http = CachedHttpClient()
+    return _http
+
+
+def _price_store() -> MarketPriceStore:
+    global _prices
+    if _prices is None:
+        _prices = MarketPriceStore(max_age_s=MLIT_CACHE_TTL_S)
+    return _prices
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[dict]:
+    global _http, _prices
+    _http = CachedHttpClient()
+    try:
+        yield {}
+    finally:
+        http, _http = _http, None
+        await http.aclose()
+        if _prices is not None:
+            _prices.close()
+            _prices = None
+
+
 mcp = FastMCP(
     "land-registry",
     instructions=(
         "自社土地台帳アプリ（Land Registry v3）を操作するMCPサーバー。"
         "愛知県刈谷市・安城市の不動産物件を検索・閲覧・更新申請できます。"
     ),
+    lifespan=_lifespan,
 )
 
 
@@ -56,12 +104,18 @@ async def _api(
 ) -> Any:
     """Call Land Registry REST API."""
     url = f"{API_BASE}{path}"
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.request(
-            method, url, json=json, params=params, headers=_headers(user_id)
+    pool = _pool()
+    if method == "GET":
+        return await pool.get_json(
+            url, params=params, headers=_headers(user_id), ttl=LAND_REGISTRY_CACHE_TTL_S
         )
-        resp.raise_for_status()
-        return resp.json()
+    resp = await pool.request(
+        method, url, json=json, params=params, headers=_headers(user_id)
+    )
+    resp.raise_for_status()
+    if path != "/lands/search":
+        pool.invalidate(API_BASE)  # 更新系: 詳細・承認待ちを取り直させる
+    return resp.json()
 
 
 # ---------- Tool 1: search_properties ----------
@@ -205,50 +259,40 @@ async def lookup_market_price(
     if not city_code:
         return f"ERROR: '{city}' は未対応。対応都市: {', '.join(CITY_CODES.keys())}"
 
-    params = {"year": str(year), "area": "23", "city": city_code}
-    headers = {"Ocp-Apim-Subscription-Key": MLIT_API_KEY}
-
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(MLIT_API_URL, params=params, headers=headers)
-        if resp.status_code != 200:
-            return f"ERROR: API returned {resp.status_code}"
-        data = resp.json()
-
-    items = data.get("data", [])
-    lands = [i for i in items if "宅地(土地)" in i.get("Type", "")]
-
-    if district:
-        lands = [i for i in lands if district in i.get("DistrictName", "")]
-
-    if not lands:
+    store = _price_store()
+    if not store.is_fresh(city_code, year):
+        params = {"year": str(year), "area": "23", "city": city_code}
+        headers = {"Ocp-Apim-Subscription-Key": MLIT_API_KEY}
+        try:
+            data = await _pool().get_json(MLIT_API_URL, params=params, headers=headers)
+        except (httpx.HTTPError, ValueError) as e:
+            # HTTP エラー・タイムアウト・接続失敗・JSON でない応答のどれでも、
+            # 前回取り込み分があればそれで答える
+            if not store.has(city_code, year):
+                if isinstance(e, httpx.HTTPStatusError):
+                    return f"ERROR: API returned {e.response.status_code}"
+                return f"ERROR: API request failed ({type(e).__name__})"
+        else:
+            store.load(city_code, year, data.get("data", []))
+
+    stats = store.stats(city_code, year, district)
+    if stats is None:
         area_label = f"{city}{district}" if district else city
         return f"{area_label}の{year}年の宅地取引データはありません。"
 
-    # Compute stats
-    prices = []
-    areas = []
-    tsubo_prices = []
-    for item in lands:
-        p = int(item.get("TradePrice", 0))
-        a = float(item.get("Area", 0))
-        if p > 0 and a > 0:
-            prices.append(p)
-            areas.append(a)
-            tsubo_prices.append(p / (a / 3.30579))
-
-    if not tsubo_prices:
+    if not stats.n_priced:
         return "取引データはありますが、価格・面積が不明な件のみでした。"
 
-    avg_tsubo = int(sum(tsubo_prices) / len(tsubo_prices))
-    min_tsubo = int(min(tsubo_prices))
-    max_tsubo = int(max(tsubo_prices))
-    avg_price = int(sum(prices) / len(prices))
-    avg_area = int(sum(areas) / len(areas))
+    avg_tsubo = stats.avg_tsubo
+    min_tsubo = stats.min_tsubo
+    max_tsubo = stats.max_tsubo
+    avg_price = stats.avg_price
+    avg_area = stats.avg_area
 
     area_label = f"{city}{district}" if district else city
     lines = [
         f"=== {area_label} {year}年 宅地取引相場 ===",
-        f"取引件数: {len(tsubo_prices)}件",
+        f"取引件数: {stats.n_priced}件",
         f"平均坪単価: {avg_tsubo:,}円/坪（{avg_tsubo // 10000}万円/坪）",
         f"坪単価範囲: {min_tsubo:,}〜{max_tsubo:,}円/坪",
         f"平均取引価格: {avg_price:,}円（{avg_price // 10000}万円）",
@@ -256,14 +300,14 @@ async def lookup_market_price(
         "",
         "--- 直近取引（最大5件） ---",
     ]
-    for item in lands[:5]:
-        p = int(item.get("TradePrice", 0))
-        a = item.get("Area", "?")
-        d = item.get("DistrictName", "?")
-        z = item.get("CityPlanning", "?")
-        period = item.get("Period", "?")
-        direction = item.get("Direction", "")
-        breadth = item.get("Breadth", "")
+    for t in store.latest(city_code, year, district, limit=5):
+        p = t.trade_price
+        a = t.area if t.area is not None else "?"
+        d = t.district_name if t.district_name is not None else "?"
+        z = t.city_planning if t.city_planning is not None else "?"
+        period = t.period if t.period is not None else "?"
+        direction = t.direction or ""
+        breadth = t.breadth or ""
         road = f"{direction}{breadth}m" if direction and breadth else ""
         lines.append(
             f"  {d} | {p:,}円 | {a}m² | {z} | {road} | {period}"
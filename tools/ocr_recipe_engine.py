@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+OCR 前処理レシピエンジン（複数レシピの並行実行・早期打ち切り・取引先別の優先順）
+
+scratchpad/method3_multi_recipe.py の「全レシピで EasyOCR → 最高スコアを採用」を
+本番向けにしたもの。
+
+- レシピ（original / sauvola / otsu / denoise / dilate / clahe）はメモリ上の画像に
+  適用し、そのまま OCR に渡す（一時 PNG を書かない）
+- 前処理は最大 workers 件を並行に実行する。OCR は同時に ocr_slots 件まで（既定 1）。
+  EasyOCR のモデルは 1 つをロック付きで共有するので、workers で速くなるのは前処理だけ
+- score_result が threshold 以上の結果が出た時点で残りのレシピは投入せず、
+  前処理中のレシピも OCR に渡さない（OCR 中の 1 件だけは終わるまで走る）
+- 取引先ごとにどのレシピが勝ったかを記録し（RecipePriors）、次回は勝ち数の多い
+  レシピから試す。取引先が分からない場合は全体の勝ち数順
+
+OCR は common.ocr_server.easyocr_readtext（常駐 OCR モデルサーバがあればそちら、
+無ければプロセス内）。同じサーバに並行で投げた画像はサーバ側でまとめて処理される。
+
+Usage:
+    from ocr_recipe_engine import MultiRecipeEngine
+
+    engine = MultiRecipeEngine(threshold=0.85, workers=3)
+    outcome = engine.process_pdf("receipt.pdf")            # 取引先はファイル名から推定
+    outcome = engine.run(page_bgr, vendor_hint="東京電力")
+    print(outcome.recipe, outcome.score, outcome.fields, outcome.tried)
+    engine.priors.save()                                    # 学習した優先順を保存
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Sequence
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PRIORS_PATH = Path(__file__).resolve().parent.parent / "artifacts" / "cache" / "ocr_recipes" / "priors.json"
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_WORKERS = 3
+DEFAULT_OCR_SLOTS = 1
+
+# OCR の戻り値: [(bbox, text, confidence), ...]（EasyOCR readtext の detail=1 と同じ形）
+OcrFn = Callable[[np.ndarray], Sequence[tuple]]
+
+
+# ── レシピ（BGR uint8 → BGR uint8。入力は書き換えない） ──────────────────
+
+
+def _gray(img: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+
+def recipe_original(img: np.ndarray) -> np.ndarray:
+    """前処理なし。"""
+    return img
+
+
+def recipe_sauvola(img: np.ndarray, window_size: int = 25, k: float = 0.2) -> np.ndarray:
+    """Sauvola 適応二値化。"""
+    gray = _gray(img)
+    mean = cv2.blur(gray, (window_size, window_size)).astype(np.float64)
+    sq_mean = cv2.blur(gray.astype(np.float64) ** 2, (window_size, window_size))
+    std = np.sqrt(np.maximum(sq_mean - mean ** 2, 0))
+    threshold = mean * (1 + k * (std / 128 - 1))
+    binary = ((gray > threshold) * 255).astype(np.uint8)
+    return cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+
+
+def recipe_otsu(img: np.ndarray) -> np.ndarray:
+    """大津の二値化。"""
+    _, binary = cv2.threshold(_gray(img), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return cv2.cvtColor(binary, cv2.COLOR_GRAY2BGR)
+
+
+def recipe_denoise(img: np.ndarray) -> np.ndarray:
+    """Non-local means によるノイズ除去。"""
+    denoised = cv2.fastNlMeansDenoising(_gray(img), h=10, templateWindowSize=7, searchWindowSize=21)
+    return cv2.cvtColor(denoised, cv2.COLOR_GRAY2BGR)
+
+
+def recipe_dilate(img: np.ndarray) -> np.ndarray:
+    """細い・かすれた文字を太らせる（反転して膨張→戻す）。"""
+    _, binary = cv2.threshold(_gray(img), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    dilated = cv2.dilate(cv2.bitwise_not(binary), np.ones((2, 2), np.uint8), iterations=1)
+    return cv2.cvtColor(cv2.bitwise_not(dilated), cv2.COLOR_GRAY2BGR)
+
+
+def recipe_clahe(img: np.ndarray) -> np.ndarray:
+    """CLAHE によるコントラスト強調。"""
+    enhanced = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(_gray(img))
+    return cv2.cvtColor(enhanced, cv2.COLOR_GRAY2BGR)
+
+
+# 既定の試行順（優先順の学習が無いときはこの順）
+RECIPES: dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "original": recipe_original,
+    "sauvola": recipe_sauvola,
+    "otsu": recipe_otsu,
+    "denoise": recipe_denoise,
+    "dilate": recipe_dilate,
+    "clahe": recipe_clahe,
+}
+
+
+# ── フィールド抽出・スコア ───────────────────────────────────────────
+
+_AMOUNT_PATTERNS = [
+    re.compile(r"(?:合\s*計|請求金額|ご請求金額|税込合計)[^\d]*?([\d,]+)"),
+    re.compile(r"(?:税込|総合計)[^\d]*?([\d,]+)"),
+    re.compile(r"¥\s*([\d,]+)"),
+]
+_DATE_PATTERNS = [
+    (re.compile(r"(\d{4})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日"), 0),
+    (re.compile(r"令和\s*(\d{1,2})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日"), 2018),
+    (re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2})"), 0),
+]
+_VENDOR_RE = re.compile(r"(?:株式会社|有限会社|合同会社|合資会社).{1,20}|.{1,20}(?:株式会社|有限会社|合同会社)")
+_FILENAME_VENDOR_DATE_RE = re.compile(r"^(.+?)_(\d{8})")
+
+
+def extract_fields(raw_text: str) -> dict:
+    """金額・発行日（YYYYMMDD）・取引先を本文から抜き出す（簡易版）。"""
+    amount = 0
+    for pat in _AMOUNT_PATTERNS:
+        m = pat.search(raw_text)
+        if m:
+            try:
+                amount = int(m.group(1).replace(",", ""))
+                break
+            except ValueError:
+                pass
+
+    issue_date = ""
+    for pat, year_offset in _DATE_PATTERNS:
+        m = pat.search(raw_text)
+        if m:
+            issue_date = f"{int(m.group(1)) + year_offset}{int(m.group(2)):02d}{int(m.group(3)):02d}"
+            break
+
+    vm = _VENDOR_RE.search(raw_text)
+    return {
+        "amount": amount,
+        "issue_date": issue_date,
+        "vendor_name": vm.group(0).strip() if vm else "",
+    }
+
+
+def score_result(raw_text: str, avg_conf: float, fields: dict) -> float:
+    """OCR 結果の良さ（0〜1）。信頼度 0.3・文字量 0.3（500 文字で満点）・抽出項目 0.4。"""
+    text_len = len(raw_text.replace("\n", "").replace(" ", ""))
+    text_score = min(text_len / 500, 1.0)
+    field_score = 0.0
+    if fields.get("amount", 0) > 0:
+        field_score += 0.33
+    if fields.get("issue_date", ""):
+        field_score += 0.33
+    if fields.get("vendor_name", ""):
+        field_score += 0.34
+    return (avg_conf * 0.3) + (text_score * 0.3) + (field_score * 0.4)
+
+
+def vendor_from_filename(filename: str) -> str | None:
+    """「取引先_YYYYMMDD…」形式のファイル名から取引先を取る。"""
+    m = _FILENAME_VENDOR_DATE_RE.match(Path(filename).name)
+    return m.group(1) if m else None
+
+
+# ── 取引先別の優先順 ─────────────────────────────────────────────────
+
+
+class RecipePriors:
+    """取引先ごとのレシピ勝ち数（JSON 永続化）。"""
+
+    GLOBAL = ""
+
+    def __init__(self, path: Path | None = DEFAULT_PRIORS_PATH) -> None:
+        self.path = Path(path) if path is not None else None
+        self._wins: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._wins = {
+                    str(v): {str(r): int(n) for r, n in counts.items()} for v, counts in data.get("wins", {}).items()
+                }
+            except Exception:
+                self._wins = {}  # 壊れたファイルは学習し直す
+
+    @staticmethod
+    def _key(vendor: str | None) -> str:
+        return re.sub(r"\s+", "", vendor or "")
+
+    def order(self, vendor: str | None, recipes: Sequence[str]) -> list[str]:
+        """その取引先の勝ち数 → 全体の勝ち数 → 既定順 で並べる。"""
+        with self._lock:
+            own = dict(self._wins.get(self._key(vendor), {})) if self._key(vendor) else {}
+            overall = dict(self._wins.get(self.GLOBAL, {}))
+        default = {name: i for i, name in enumerate(recipes)}
+        return sorted(recipes, key=lambda r: (-own.get(r, 0), -overall.get(r, 0), default[r]))
+
+    def record(self, vendor: str | None, recipe: str) -> None:
+        with self._lock:
+            keys = {self.GLOBAL, self._key(vendor)}
+            for key in keys:
+                counts = self._wins.setdefault(key, {})
+                counts[recipe] = counts.get(recipe, 0) + 1
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            payload = json.dumps({"wins": self._wins}, ensure_ascii=False, indent=1, sort_keys=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ── エンジン ─────────────────────────────────────────────────────────
+
+
+@dataclass
+class RecipeResult:
+    """1 レシピ分の OCR 結果"""
+    recipe: str
+    score: float
+    raw_text: str
+    confidence: float
+    fields: dict
+    error: str = ""
+
+
+@dataclass
+class RecipeOutcome:
+    """エンジンの結果（tried は完了順、scores は完了したレシピのスコア）"""
+    recipe: str
+    score: float
+    raw_text: str
+    confidence: float
+    fields: dict
+    tried: list[str] = field(default_factory=list)
+    scores: dict[str, float] = field(default_factory=dict)
+    stopped_early: bool = False
+
+
+def _easyocr(image: np.ndarray) -> Sequence[tuple]:
+    from common.ocr_server import easyocr_readtext
+
+    return easyocr_readtext(image)
+
+
+class MultiRecipeEngine:
+    """前処理レシピを優先順に並行実行し、十分なスコアが出たら打ち切る。"""
+
+    def __init__(
+        self,
+        *,
+        ocr_fn: OcrFn | None = None,
+        recipes: dict[str, Callable[[np.ndarray], np.ndarray]] | None = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        workers: int = DEFAULT_WORKERS,
+        priors: RecipePriors | None = None,
+        ocr_slots: int = DEFAULT_OCR_SLOTS,
+    ) -> None:
+        self.ocr_fn = ocr_fn or _easyocr
+        self.recipes = dict(RECIPES if recipes is None else recipes)
+        self.threshold = threshold
+        self.workers = max(1, workers)
+        self.priors = priors if priors is not None else RecipePriors()
+        # OCR の同時実行数。モデル側が直列なので、増やしても待ち行列が伸びるだけ
+        self._ocr_slots = threading.Semaphore(max(1, ocr_slots))
+
+    def _evaluate(self, name: str, img: np.ndarray, stop: threading.Event) -> RecipeResult | None:
+        """前処理 → OCR。打ち切り済みなら OCR に渡さず None を返す。"""
+        try:
+            prepared = self.recipes[name](img)
+            if stop.is_set():
+                return None
+            with self._ocr_slots:
+                if stop.is_set():
+                    return None
+                detections = list(self.ocr_fn(prepared))
+        except Exception as e:
+            return RecipeResult(name, -1.0, "", 0.0, {}, error=f"{type(e).__name__}: {e}")
+        raw_text = "\n".join(str(d[1]) for d in detections)
+        confs = [float(d[2]) for d in detections]
+        avg_conf = sum(confs) / len(confs) if confs else 0.0
+        fields = extract_fields(raw_text)
+        return RecipeResult(name, score_result(raw_text, avg_conf, fields), raw_text, avg_conf, fields)
+
+    def run(self, img: np.ndarray, *, vendor_hint: str | None = None) -> RecipeOutcome:
+        """img（BGR）に全レシピを試し、最良の結果を返す。"""
+        order = self.priors.order(vendor_hint, list(self.recipes))
+        results: list[RecipeResult] = []
+        stopped_early = False
+        stop = threading.Event()
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr-recipe")
+        try:
+            pending = list(order)
+            running: set[Future] = set()
+            while pending or running:
+                # 優先順に、空いた枠の分だけ投入する（早期打ち切り時に無駄な OCR を増やさない）
+                while pending and len(running) < self.workers:
+                    running.add(executor.submit(self._evaluate, pending.pop(0), img, stop))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    res = fut.result()
+                    if res is None:
+                        continue
+                    results.append(res)
+                    if res.error:
+                        log.debug(f"recipe {res.recipe} failed: {res.error}")
+                    elif res.score >= self.threshold:
+                        stopped_early = True
+                if stopped_early:
+                    break
+        finally:
+            # 前処理中・OCR 待ちのレシピは stop を見て OCR せずに終わる。実行中は待たない（結果は捨てる）
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        ok = [r for r in results if not r.error]
+        if not ok:
+            return RecipeOutcome("none", 0.0, "", 0.0, extract_fields(""), tried=[r.recipe for r in results])
+        # 同点は優先順の早いほう
+        rank = {name: i for i, name in enumerate(order)}
+        best = max(ok, key=lambda r: (r.score, -rank[r.recipe]))
+        self.priors.record(vendor_hint, best.recipe)
+        return RecipeOutcome(
+            recipe=best.recipe,
+            score=round(best.score, 4),
+            raw_text=best.raw_text,
+            confidence=best.confidence,
+            fields=dict(best.fields),
+            tried=[r.recipe for r in results],
+            scores={r.recipe: round(r.score, 4) for r in ok},
+            stopped_early=stopped_early,
+        )
+
+    def process_pdf(self, pdf_path: str | Path, *, dpi: int = 300, vendor_hint: str | None = None) -> RecipeOutcome:
+        """1 ページ目をメモリ上で描画して run する。取引先・日付が取れなければファイル名で補う。"""
+        pdf_path = Path(pdf_path)
+        if vendor_hint is None:
+            vendor_hint = vendor_from_filename(pdf_path.name)
+        outcome = self.run(render_first_page(pdf_path, dpi=dpi), vendor_hint=vendor_hint)
+        m = _FILENAME_VENDOR_DATE_RE.match(pdf_path.name)
+        if m:
+            outcome.fields["vendor_name"] = outcome.fields.get("vendor_name") or m.group(1)
+            outcome.fields["issue_date"] = outcome.fields.get("issue_date") or m.group(2)
+        return outcome
+
+
+def render_first_page(pdf_path: Path, *, dpi: int = 300) -> np.ndarray:
+    """PDF の 1 ページ目を BGR の numpy 配列にする（ファイルを書かない）。"""
+    import fitz
+
+    with fitz.open(str(pdf_path)) as doc:
+        pix = doc[0].get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), alpha=False)
+        data = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.h, pix.w, pix.n)
+        if pix.n == 1:
+            return cv2.cvtColor(data, cv2.COLOR_GRAY2BGR)
+        return cv2.cvtColor(data[:, :, :3], cv2.COLOR_RGB2BGR)
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="複数レシピの前処理 + EasyOCR（早期打ち切り・取引先別の優先順）")
+    parser.add_argument("pdfs", nargs="+", type=Path)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="このスコア以上で打ち切る（1 超で全レシピ）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--vendor", default=None, help="取引先（省略時はファイル名から推定）")
+    parser.add_argument("--priors", type=Path, default=DEFAULT_PRIORS_PATH)
+    parser.add_argument("--no-learn", action="store_true", help="優先順の学習結果を保存しない")
+    args = parser.parse_args()
+
+    engine = MultiRecipeEngine(threshold=args.threshold, workers=args.workers, priors=RecipePriors(args.priors))
+    for pdf in args.pdfs:
+        outcome = engine.process_pdf(pdf, vendor_hint=args.vendor)
+        print(json.dumps({
+            "file": pdf.name,
+            "recipe": outcome.recipe,
+            "score": outcome.score,
+            "stopped_early": outcome.stopped_early,
+            "tried": outcome.tried,
+            "scores": outcome.scores,
+            **outcome.fields,
+        }, ensure_ascii=False))
+    if not args.no_learn:
+        engine.priors.save()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
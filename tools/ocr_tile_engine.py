@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+タイル OCR エンジン（一括認識・格子バケットでの重複除去・低信頼領域だけの再分割）
+
+scratchpad/method4_tile_ocr.py の「3x3 タイル（10% 重なり）を個別に OCR → 重複除去」を
+本番向けにしたもの。
+
+- タイルは元画像のビュー（コピー・一時 PNG なし）。全タイルと全ページ画像を
+  1 回の easyocr_readtext_batch に渡す（常駐 OCR モデルサーバがあれば 1 要求）
+- 重なり部分の重複除去は中心座標の格子バケット（セル = merge_radius）で近傍だけを見る。
+  結果は旧 merge_detections の総当たり（O(n²)）と同じ
+- 文字はあるが平均信頼度が subdivide_below 未満のタイルだけを 2x2 に分け直して
+  もう一度まとめて認識し、子タイルのほうが信頼度が高ければ置き換える（max_depth 段まで）
+
+Usage:
+    from ocr_tile_engine import TileOcrEngine
+
+    engine = TileOcrEngine()
+    result = engine.run(page_bgr)              # result.raw_text / result.detections
+    fields = engine.process_pdf("receipt.pdf") # タイルと全ページのスコアが高いほう
+"""
+from __future__ import annotations
+
+import json
+import math
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Sequence
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ocr_recipe_engine import _FILENAME_VENDOR_DATE_RE, extract_fields, render_first_page, score_result
+
+DEFAULT_MERGE_RADIUS = 20.0
+DEFAULT_SUBDIVIDE_BELOW = 0.6
+DEFAULT_MIN_TILE_PX = 160
+
+# [(bbox, text, confidence), ...]。bbox は 4 点 [[x, y], ...]
+Detection = tuple[list, str, float]
+# 画像のリスト → 画像ごとの検出（失敗した画像は例外オブジェクト）
+BatchOcrFn = Callable[[list[np.ndarray]], list]
+
+
+@dataclass(frozen=True)
+class Tile:
+    """元画像上の矩形（x, y は左上）。depth は再分割の段数。"""
+    x: int
+    y: int
+    w: int
+    h: int
+    depth: int = 0
+
+    def view(self, img: np.ndarray) -> np.ndarray:
+        return img[self.y:self.y + self.h, self.x:self.x + self.w]
+
+
+def split_tiles(
+    width: int,
+    height: int,
+    rows: int = 3,
+    cols: int = 3,
+    overlap: float = 0.10,
+    *,
+    origin: tuple[int, int] = (0, 0),
+    depth: int = 0,
+) -> list[Tile]:
+    """width x height の領域を rows x cols に重なり付きで分ける（座標は origin 基準の画像座標）。"""
+    ox, oy = origin
+    tile_h = height // rows
+    tile_w = width // cols
+    overlap_h = int(tile_h * overlap)
+    overlap_w = int(tile_w * overlap)
+    tiles = []
+    for r in range(rows):
+        for c in range(cols):
+            y1 = max(0, r * tile_h - overlap_h)
+            y2 = min(height, (r + 1) * tile_h + overlap_h)
+            x1 = max(0, c * tile_w - overlap_w)
+            x2 = min(width, (c + 1) * tile_w + overlap_w)
+            tiles.append(Tile(ox + x1, oy + y1, x2 - x1, y2 - y1, depth))
+    return tiles
+
+
+def _center(bbox: Sequence[Sequence[float]]) -> tuple[float, float]:
+    xs = [pt[0] for pt in bbox]
+    ys = [pt[1] for pt in bbox]
+    return sum(xs) / len(xs), sum(ys) / len(ys)
+
+
+def merge_detections(detections: Sequence[Detection], radius: float = DEFAULT_MERGE_RADIUS) -> list[Detection]:
+    """中心が縦横とも radius 未満の検出を 1 つにまとめる（信頼度の高いほうを残す）。
+
+    (y, x) の中心順に走査し、近傍は格子バケット（セル = radius）の 3x3 セルだけを見る。
+    """
+    if not detections:
+        return []
+    dets = sorted(detections, key=lambda d: (_center(d[0])[1], _center(d[0])[0]))
+    centers = [_center(d[0]) for d in dets]
+    cells = [(math.floor(cx / radius), math.floor(cy / radius)) for cx, cy in centers]
+    buckets: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for idx, cell in enumerate(cells):
+        buckets[cell].append(idx)
+
+    merged: list[Detection] = []
+    used: set[int] = set()
+    for i, (cx_i, cy_i) in enumerate(centers):
+        if i in used:
+            continue
+        bx, by = cells[i]
+        neighbours = sorted(
+            j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in buckets.get((bx + dx, by + dy), ()) if j > i
+        )
+        best = i
+        for j in neighbours:
+            if j in used:
+                continue
+            cx_j, cy_j = centers[j]
+            if abs(cx_i - cx_j) < radius and abs(cy_i - cy_j) < radius:
+                if dets[j][2] > dets[best][2]:
+                    used.add(best)
+                    best = j
+                else:
+                    used.add(j)
+        merged.append(dets[best])
+        used.add(best)
+    return merged
+
+
+def _mean_conf(detections: Sequence[Detection]) -> float:
+    return sum(float(d[2]) for d in detections) / len(detections) if detections else 0.0
+
+
+def _offset(detections: Sequence[Detection], tile: Tile) -> list[Detection]:
+    return [([[pt[0] + tile.x, pt[1] + tile.y] for pt in bbox], text, float(conf)) for bbox, text, conf in detections]
+
+
+def _text(detections: Sequence[Detection]) -> str:
+    ordered = sorted(detections, key=lambda d: min(pt[1] for pt in d[0]))
+    return "\n".join(str(d[1]) for d in ordered)
+
+
+def _easyocr_batch(images: list[np.ndarray]) -> list:
+    from common.ocr_server import easyocr_readtext_batch
+
+    return easyocr_readtext_batch(images, return_exceptions=True)
+
+
+@dataclass
+class TileOcrResult:
+    """タイル OCR の結果（座標は元画像基準）"""
+    detections: list[Detection]
+    raw_text: str
+    confidence: float
+    full_detections: list[Detection] = field(default_factory=list)
+    full_text: str = ""
+    full_confidence: float = 0.0
+    tiles_recognized: int = 0
+    subdivided: int = 0
+    ocr_calls: int = 0
+
+
+class TileOcrEngine:
+    """重なり付きタイルを一括認識し、低信頼のタイルだけを細かくして読み直す。"""
+
+    def __init__(
+        self,
+        *,
+        batch_ocr_fn: BatchOcrFn | None = None,
+        rows: int = 3,
+        cols: int = 3,
+        overlap: float = 0.10,
+        subdivide_below: float = DEFAULT_SUBDIVIDE_BELOW,
+        max_depth: int = 1,
+        min_tile_px: int = DEFAULT_MIN_TILE_PX,
+        merge_radius: float = DEFAULT_MERGE_RADIUS,
+        include_full_page: bool = True,
+    ) -> None:
+        self.batch_ocr_fn = batch_ocr_fn or _easyocr_batch
+        self.rows = rows
+        self.cols = cols
+        self.overlap = overlap
+        self.subdivide_below = subdivide_below
+        self.max_depth = max_depth
+        self.min_tile_px = min_tile_px
+        self.merge_radius = merge_radius
+        self.include_full_page = include_full_page
+
+    def _recognize(self, img: np.ndarray, tiles: list[Tile], extra: list[np.ndarray] = ()) -> list[list[Detection]]:
+        outputs = self.batch_ocr_fn([t.view(img) for t in tiles] + list(extra))
+        # 失敗したタイルは「検出なし」として扱う（他のタイルは活かす）
+        return [[] if isinstance(out, Exception) else list(out) for out in outputs]
+
+    def _should_subdivide(self, tile: Tile, detections: list[Detection]) -> bool:
+        return (
+            bool(detections)  # 余白タイルは分けない
+            and _mean_conf(detections) < self.subdivide_below
+            and tile.depth < self.max_depth
+            and min(tile.w, tile.h) // 2 >= self.min_tile_px
+        )
+
+    def run(self, img: np.ndarray) -> TileOcrResult:
+        h, w = img.shape[:2]
+        tiles = split_tiles(w, h, self.rows, self.cols, self.overlap)
+        extra = [img] if self.include_full_page else []
+        outputs = self._recognize(img, tiles, extra)
+        calls = 1
+        full = outputs[len(tiles)] if self.include_full_page else []
+
+        kept: dict[Tile, list[Detection]] = {t: _offset(d, t) for t, d in zip(tiles, outputs)}
+        recognized = len(tiles)
+        subdivided = 0
+        frontier = [t for t in tiles if self._should_subdivide(t, kept[t])]
+        while frontier:
+            children = {
+                parent: split_tiles(
+                    parent.w, parent.h, 2, 2, self.overlap, origin=(parent.x, parent.y), depth=parent.depth + 1
+                )
+                for parent in frontier
+            }
+            flat = [c for cs in children.values() for c in cs]
+            child_out = dict(zip(flat, self._recognize(img, flat)))
+            calls += 1
+            recognized += len(flat)
+            frontier = []
+            for parent, cs in children.items():
+                child_dets = {c: _offset(child_out[c], c) for c in cs}
+                merged_children = [d for ds in child_dets.values() for d in ds]
+                if _mean_conf(merged_children) <= _mean_conf(kept[parent]):
+                    continue
+                subdivided += 1
+                del kept[parent]
+                kept.update(child_dets)
+                frontier.extend(c for c in cs if self._should_subdivide(c, child_dets[c]))
+
+        merged = merge_detections([d for ds in kept.values() for d in ds], self.merge_radius)
+        return TileOcrResult(
+            detections=merged,
+            raw_text=_text(merged),
+            confidence=_mean_conf(merged),
+            full_detections=full,
+            full_text="\n".join(str(d[1]) for d in full),
+            full_confidence=_mean_conf(full),
+            tiles_recognized=recognized,
+            subdivided=subdivided,
+            ocr_calls=calls,
+        )
+
+    def process_pdf(self, pdf_path: str | Path, *, dpi: int = 300) -> dict:
+        """1 ページ目をタイル OCR し、全ページ OCR とスコアの高いほうの抽出結果を返す。"""
+        pdf_path = Path(pdf_path)
+        res = self.run(render_first_page(pdf_path, dpi=dpi))
+        tile_fields = extract_fields(res.raw_text)
+        tile_score = score_result(res.raw_text, res.confidence, tile_fields)
+        full_fields = extract_fields(res.full_text)
+        full_score = score_result(res.full_text, res.full_confidence, full_fields)
+
+        use_tile = not self.include_full_page or tile_score >= full_score
+        result = dict(tile_fields if use_tile else full_fields)
+        result.update({
+            "raw_text": res.raw_text if use_tile else res.full_text,
+            "confidence": res.confidence if use_tile else res.full_confidence,
+            "mode": "tile" if use_tile else "full",
+            "tile_score": round(tile_score, 4),
+            "full_score": round(full_score, 4),
+            "tile_chars": len(res.raw_text),
+            "full_chars": len(res.full_text),
+            "tiles_recognized": res.tiles_recognized,
+            "subdivided": res.subdivided,
+            "ocr_calls": res.ocr_calls,
+        })
+
+        # ファイル名で補う（取引先_YYYYMMDD…）
+        m = _FILENAME_VENDOR_DATE_RE.match(pdf_path.name)
+        if m:
+            result["vendor_name"] = result.get("vendor_name") or m.group(1)
+            result["issue_date"] = result.get("issue_date") or m.group(2)
+        return result
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="タイル OCR（一括認識・重複除去・低信頼タイルの再分割）")
+    parser.add_argument("pdfs", nargs="+", type=Path)
+    parser.add_argument("--grid", default="3x3", help="行x列（既定 3x3）")
+    parser.add_argument("--subdivide-below", type=float, default=DEFAULT_SUBDIVIDE_BELOW)
+    parser.add_argument("--max-depth", type=int, default=1, help="再分割の最大段数（0 で再分割しない）")
+    parser.add_argument("--dpi", type=int, default=300)
+    args = parser.parse_args()
+
+    rows, cols = (int(v) for v in args.grid.lower().split("x"))
+    engine = TileOcrEngine(rows=rows, cols=cols, subdivide_below=args.subdivide_below, max_depth=args.max_depth)
+    for pdf in args.pdfs:
+        result = engine.process_pdf(pdf, dpi=args.dpi)
+        result.pop("raw_text", None)
+        print(json.dumps({"file": pdf.name, **result}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,16 +10,24 @@ Scenario 12/13: 受信メールのPDFを保存・一括印刷（Outlook COM）
 安全:
 - 既定はドライラン（--execute を付けない限り保存/印刷しない）
 - 上書き禁止（ファイル名衝突は自動で退避名にする）
+- 実行モードでは run_dir/progress_journal.jsonl に進捗を先行記録し、中断時は --resume RUN_ID で残りだけ再開する
+
+性能:
+- Outlook COM 呼び出し（列挙/SaveAsFile/既読化）は単一スレッドのまま、保存後の
+  sha256・復号・項目抽出（OCR含む）・リネーム/振り分けはワーカープールで並行実行する
+  （config.post_process.workers / max_queued、結果はメール順にマージ）
 
 Usage examples:
     python outlook_save_pdf_and_batch_print.py --config C:\\...\\tool_config.json --dry-run --dry-run-mail
     python outlook_save_pdf_and_batch_print.py --config C:\\...\\tool_config.json --execute
     python outlook_save_pdf_and_batch_print.py --config C:\\...\\tool_config.json --execute --print
+    python outlook_save_pdf_and_batch_print.py --config C:\\...\\tool_config.json --execute --resume 20260331_120000
 """
 
 from __future__ import annotations
 
 import argparse
+import bisect
 import csv
 import hashlib
 import html
@@ -31,11 +39,14 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Callable, Iterable, Sequence, TypeVar
 from unicodedata import normalize
@@ -48,6 +59,11 @@ from common.email_notifier import (
     html_link_to_path,
     send_outlook,
 )
+from common.ocr_server import ModelUnavailable, easyocr_readtext, yomitoku_analyze
+from common.ordered_pipeline import OrderedPipeline, PipelineTicket
+from common.pdf_merge import merge_pdfs_streaming
+from common.run_journal import JOURNAL_FILE_NAME, RunJournal
+from common.tesseract_engine import get_tesseract_engine
 
 try:
     import win32com.client as win32  # type: ignore
@@ -67,7 +83,7 @@ except Exception:
 try:
     from web_invoice_downloader import (
         WebDownloadConfig, VendorWebConfig, WebDownloadResult,
-        dispatch_web_download, cleanup_web_sessions,
+        submit_web_download, cleanup_web_sessions,
     )
     _WEB_DOWNLOAD_AVAILABLE = True
 except Exception:
@@ -222,7 +238,9 @@ def _find_tesseract_exe() -> Path | None:
 
 
 _TESSERACT_EXE = _find_tesseract_exe()
-_TESSERACT_AVAILABLE = _TESSERACT_EXE is not None
+# tesserocr keeps a warm in-process API handle; tesseract.exe is the subprocess fallback.
+_TESSEROCR_AVAILABLE = importlib.util.find_spec("tesserocr") is not None
+_TESSERACT_AVAILABLE = _TESSERACT_EXE is not None or _TESSEROCR_AVAILABLE
 
 
 DEFAULT_ARTIFACT_DIR = (
@@ -262,7 +280,12 @@ ZIP_MAX_MEMBERS = 80
 ZIP_MAX_TOTAL_UNCOMPRESSED_BYTES = 250 * 1024 * 1024
 ZIP_MAX_MEMBER_UNCOMPRESSED_BYTES = 80 * 1024 * 1024
 ZIP_PASSWORD_MAX_CANDIDATES = 20
+PDF_PASSWORD_TRIAL_WORKERS = 4
 PROCESSED_MANIFEST_NAME = "processed_attachments_manifest.jsonl"
+# Shared state touched by the post-processing workers (see PostProcessConfig).
+_LOG_LOCK = threading.Lock()
+_MANIFEST_LOCK = threading.Lock()
+_ROUTE_LOCK = threading.Lock()
 PROJECT_NOISE_RE = re.compile(
     r"(請求書|御請求書|納品書|見積書|契約書類|契約書|電子決済サービス|査定表|チェックリスト|回収チェックリスト|精算分|本体工事精算分|控え)"
 )
@@ -306,6 +329,19 @@ class OutlookSelection:
 class MergeConfig:
     enabled: bool = True
     output_name: str = "merged.pdf"
+    # Split merged output for the printer spooler (None = single file).
+    max_pages_per_file: int | None = None
+    max_bytes_per_file: int | None = None
+    # Merge identical embedded fonts/images across invoices (PyMuPDF only).
+    dedupe_resources: bool = True
+
+
+@dataclass(frozen=True)
+class PostProcessConfig:
+    # Worker threads running the post-SaveAsFile steps (0 = inline on the COM thread).
+    workers: int = 4
+    # Saved-but-unprocessed attachments allowed before SaveAsFile blocks (back-pressure).
+    max_queued: int = 8
 
 
 @dataclass(frozen=True)
@@ -382,6 +418,7 @@ class ToolConfig:
     save_dir: str | None = None
     outlook: OutlookSelection | None = None
     merge: MergeConfig = MergeConfig()
+    post_process: PostProcessConfig = PostProcessConfig()
     print: PrintConfig = PrintConfig()
     mail: MailConfig = MailConfig()
     rename: RenameConfig = RenameConfig()
@@ -555,6 +592,8 @@ class RunReport:
     project_master_path: str | None
     new_project_candidates_path: str | None
     unresolved: Sequence[str]
+    # All merged chunk paths (merged_pdf_path is the first one).
+    merged_pdf_paths: Sequence[str] = tuple()
 
 
 def _now_run_id() -> str:
@@ -1126,7 +1165,7 @@ def _load_processed_attachment_index(path: Path) -> dict[str, dict[str, Any]]:
 
 def _append_processed_attachment_record(path: Path, record: dict[str, Any]) -> None:
     _ensure_dir(path.parent)
-    with path.open("a", encoding="utf-8") as f:
+    with _MANIFEST_LOCK, path.open("a", encoding="utf-8") as f:
         f.write(json.dumps(record, ensure_ascii=False) + "\n")
 
 
@@ -1217,30 +1256,26 @@ def _render_pdf_first_page_png(pdf_path: Path, out_path: Path, dpi: int = 200) -
                     pass
 
 
-_EASYOCR_READERS: dict[tuple[tuple[str, ...], bool], Any] = {}
-
-
-def _get_easyocr_reader(
-    *,
-    languages: Sequence[str] = ("ja", "en"),
-    use_gpu: bool = False,
-) -> Any:
-    key = (tuple(languages), use_gpu)
-    cached = _EASYOCR_READERS.get(key)
-    if cached is not None:
-        return cached
-
-    if not _EASYOCR_AVAILABLE:
-        raise RuntimeError("easyocr が利用できません。")
+def _render_pdf_pages_array(pdf_path: Path, *, dpi: int = 200, max_pages: int = 1) -> list[Any]:
+    """Render the first pages straight to BGR uint8 arrays (no PNG encode/decode)."""
+    if not (_PYMUPDF_AVAILABLE and _CV2_AVAILABLE):
+        raise RuntimeError("PyMuPDF (fitz) / OpenCV が利用できません。")
+    # Open from bytes: no native path issues and no temp copy for non-ASCII names.
+    doc = fitz.open(stream=pdf_path.read_bytes(), filetype="pdf")
     try:
-        import easyocr  # type: ignore
-    except Exception as e:
-        raise RuntimeError("easyocr が利用できません。") from e
-
-    # Reader initialization can be heavy; keep it cached per (langs, gpu).
-    reader = easyocr.Reader(list(languages), gpu=use_gpu, verbose=False)
-    _EASYOCR_READERS[key] = reader
-    return reader
+        zoom = dpi / 72.0
+        mat = fitz.Matrix(zoom, zoom)
+        pages: list[Any] = []
+        for i in range(min(max_pages, doc.page_count)):
+            pix = doc.load_page(i).get_pixmap(matrix=mat, alpha=False)
+            rgb = _np.frombuffer(pix.samples, dtype=_np.uint8).reshape(pix.height, pix.width, pix.n)
+            if pix.n == 1:
+                pages.append(_cv2.cvtColor(rgb[:, :, 0], _cv2.COLOR_GRAY2BGR))
+            else:
+                pages.append(_cv2.cvtColor(rgb[:, :, :3], _cv2.COLOR_RGB2BGR))
+        return pages
+    finally:
+        doc.close()
 
 
 def _extract_pdf_text_easyocr_ocr(pdf_path: Path, *, run_dir: Path) -> str:
@@ -1262,8 +1297,6 @@ def _extract_pdf_text_easyocr_ocr(pdf_path: Path, *, run_dir: Path) -> str:
         best = ""
         best_dpi: int | None = None
 
-        reader = _get_easyocr_reader(languages=("ja", "en"), use_gpu=False)
-
         for dpi in attempts:
             tmp_img = tmp_dir / f"p1_{dpi}.png"
             try:
@@ -1276,7 +1309,10 @@ def _extract_pdf_text_easyocr_ocr(pdf_path: Path, *, run_dir: Path) -> str:
 
             try:
                 # detail=0 returns list[str]. Keep as lines to preserve signals.
-                lines = reader.readtext(str(preproc_img), detail=0)
+                # Served by the resident OCR model server when running, else in-process.
+                lines = easyocr_readtext(str(preproc_img), languages=("ja", "en"), gpu=False, detail=0)
+            except ModelUnavailable:
+                raise  # easyocr itself is missing; another DPI will not help
             except Exception:
                 continue
 
@@ -1349,48 +1385,24 @@ def _get_tesseract_tessdata_dir() -> Path | None:
 
 
 def _tesseract_image_to_text(
-    image_path: Path,
+    image: "Path | Any",
     *,
     languages: str,
     tessdata_dir: Path | None,
     timeout_s: int,
 ) -> str:
-    if not _TESSERACT_AVAILABLE or _TESSERACT_EXE is None:
+    """OCR one image (file path or numpy raster) on the cached engine for these settings."""
+    if not _TESSERACT_AVAILABLE:
         raise RuntimeError("tesseract が利用できません。")
-
-    cmd = [
-        str(_TESSERACT_EXE),
-        str(image_path),
-        "stdout",
-        "-l",
-        languages,
-        "--psm",
-        "6",
-    ]
-    if tessdata_dir is not None:
-        cmd.extend(["--tessdata-dir", str(tessdata_dir)])
-
-    proc = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        timeout=timeout_s,
+    engine = get_tesseract_engine(
+        languages=languages, tessdata_dir=tessdata_dir, psm=6, exe=_TESSERACT_EXE
     )
-    if proc.returncode != 0:
-        err = (proc.stderr or "").strip()
-        raise RuntimeError(f"tesseract failed: rc={proc.returncode} stderr={err}")
-    return proc.stdout or ""
+    return engine.image_to_text(image, timeout_s=timeout_s)
 
 
 def _preprocess_png_for_ocr(img_path: Path) -> Path:
     """Apply deskew and shadow removal to a rendered PNG before OCR.
 
-    Implements algorithms from pdf-ocr Skill (pdf_preprocess.py template):
-    - Deskew: Hough transform line detection → median angle → warpAffine
-    - Shadow removal: block brightness std deviation → GaussianBlur background subtraction
-
     Returns path to preprocessed image (new file) or original if unchanged/unavailable.
     """
     if not _CV2_AVAILABLE:
@@ -1399,7 +1411,30 @@ def _preprocess_png_for_ocr(img_path: Path) -> Path:
         img = _cv2.imread(str(img_path))
         if img is None:
             return img_path
+        img, modified = _preprocess_array_for_ocr(img)
+        if not modified:
+            return img_path
 
+        preproc_path = img_path.parent / f"_preproc_{img_path.name}"
+        _cv2.imwrite(str(preproc_path), img)
+        return preproc_path
+
+    except Exception:
+        return img_path
+
+
+def _preprocess_array_for_ocr(img: Any) -> tuple[Any, bool]:
+    """Apply deskew and shadow removal to a BGR raster before OCR.
+
+    Implements algorithms from pdf-ocr Skill (pdf_preprocess.py template):
+    - Deskew: Hough transform line detection → median angle → warpAffine
+    - Shadow removal: block brightness std deviation → GaussianBlur background subtraction
+
+    Returns (image, modified); the input is returned as-is when unchanged/unavailable.
+    """
+    if not _CV2_AVAILABLE:
+        return img, False
+    try:
         modified = False
 
         # --- Deskew (Hough transform, from pdf_preprocess.py PDFPreprocessor.detect_skew_angle_hough) ---
@@ -1463,15 +1498,10 @@ def _preprocess_png_for_ocr(img_path: Path) -> Path:
             img = _cv2.cvtColor(stretched, _cv2.COLOR_GRAY2BGR)
             modified = True
 
-        if not modified:
-            return img_path
-
-        preproc_path = img_path.parent / f"_preproc_{img_path.name}"
-        _cv2.imwrite(str(preproc_path), img)
-        return preproc_path
+        return img, modified
 
     except Exception:
-        return img_path
+        return img, False
 
 
 def _extract_pdf_text_tesseract_ocr(pdf_path: Path, *, run_dir: Path) -> str:
@@ -1503,19 +1533,22 @@ def _extract_pdf_text_tesseract_ocr(pdf_path: Path, *, run_dir: Path) -> str:
         last_error: BaseException | None = None
 
         for dpi in attempts:
-            tmp_img = tmp_dir / f"p1_{dpi}.png"
             try:
-                _render_pdf_first_page_png(pdf_path, tmp_img, dpi=dpi)
+                if _CV2_AVAILABLE:
+                    # Render straight to a raster; no PNG round trip before OCR.
+                    page = _render_pdf_pages_array(pdf_path, dpi=dpi, max_pages=1)[0]
+                    # Apply pdf-ocr Skill preprocessing (deskew + shadow removal).
+                    ocr_input: Any = _preprocess_array_for_ocr(page)[0]
+                else:
+                    ocr_input = tmp_dir / f"p1_{dpi}.png"
+                    _render_pdf_first_page_png(pdf_path, ocr_input, dpi=dpi)
             except Exception as e:
                 last_error = e
                 continue
 
-            # Apply pdf-ocr Skill preprocessing (deskew + shadow removal).
-            preproc_img = _preprocess_png_for_ocr(tmp_img)
-
             try:
                 raw = _tesseract_image_to_text(
-                    preproc_img,
+                    ocr_input,
                     languages=languages,
                     tessdata_dir=tessdata_dir,
                     timeout_s=60,
@@ -1571,33 +1604,6 @@ def _extract_pdf_text_tesseract_ocr(pdf_path: Path, *, run_dir: Path) -> str:
             pass
 
 
-_YOMITOKU_ANALYZERS: dict[tuple[bool, bool], Any] = {}
-
-
-def _get_yomitoku_analyzer(*, use_gpu: bool = False, lite_mode: bool = True) -> Any:
-    key = (use_gpu, lite_mode)
-    cached = _YOMITOKU_ANALYZERS.get(key)
-    if cached is not None:
-        return cached
-
-    if not _YOMITOKU_AVAILABLE:
-        raise RuntimeError("yomitoku が利用できません。")
-    try:
-        from yomitoku import DocumentAnalyzer  # type: ignore
-    except Exception as e:
-        raise RuntimeError("yomitoku が利用できません。") from e
-    device = "cuda" if use_gpu else "cpu"
-    configs: dict[str, Any] = {}
-    if lite_mode:
-        configs = {
-            "ocr": {"model_name": "lite"},
-            "layout_analyzer": {"model_name": "lite"},
-        }
-    analyzer = DocumentAnalyzer(configs=configs, device=device)
-    _YOMITOKU_ANALYZERS[key] = analyzer
-    return analyzer
-
-
 def _yomitoku_content_to_text(value: Any) -> str:
     if value is None:
         return ""
@@ -1663,10 +1669,6 @@ def _extract_text_from_yomitoku_result(result: Any) -> str:
 def _extract_pdf_text_yomitoku_ocr(pdf_path: Path, *, run_dir: Path) -> str:
     if not (_YOMITOKU_AVAILABLE and _PYMUPDF_AVAILABLE):
         raise RuntimeError("yomitoku / PyMuPDF が利用できません。")
-    try:
-        from yomitoku.data.functions import load_image  # type: ignore
-    except Exception as e:
-        raise RuntimeError("yomitoku が利用できません。") from e
     # Use an ASCII temp directory to avoid native path issues on Windows.
     tmp_obj = tempfile.TemporaryDirectory(prefix="s12_13_ocr_")
     tmp_dir = Path(tmp_obj.name)
@@ -1680,14 +1682,8 @@ def _extract_pdf_text_yomitoku_ocr(pdf_path: Path, *, run_dir: Path) -> str:
         for dpi, lite_mode in attempts:
             tmp_img = tmp_dir / f"p1_{dpi}_{'lite' if lite_mode else 'full'}.png"
             _render_pdf_first_page_png(pdf_path, tmp_img, dpi=dpi)
-            analyzer = _get_yomitoku_analyzer(use_gpu=False, lite_mode=lite_mode)
-            img = load_image(str(tmp_img))
-            # yomitoku 0.11.0: load_image() may return nested list
-            while isinstance(img, (list, tuple)):
-                if not img:
-                    raise RuntimeError(f"load_image returned empty: {tmp_img}")
-                img = img[0]
-            result, _, _ = analyzer(img)
+            # The image is loaded by whichever side runs the model (resident server or in-process).
+            result = yomitoku_analyze(str(tmp_img), lite_mode=lite_mode, gpu=False)
             text = _extract_text_from_yomitoku_result(result)
             if len(text) > len(best):
                 best = text
@@ -2437,8 +2433,14 @@ def _resolve_project_master_path(config_dir: Path) -> Path:
     return fallback
 
 
-def _load_web_download_config(raw_section: dict | None) -> Any:
-    """Parse web_download config section into WebDownloadConfig or None."""
+def _load_web_download_config(
+    raw_section: dict | None, artifact_dir: str = DEFAULT_ARTIFACT_DIR
+) -> Any:
+    """Parse web_download config section into WebDownloadConfig or None.
+
+    Portal logins (storage_state) are kept under <artifact_dir>/web_sessions
+    unless web_download.state_dir is set.
+    """
     if not raw_section:
         return None
     if not _WEB_DOWNLOAD_AVAILABLE:
@@ -2457,6 +2459,9 @@ def _load_web_download_config(raw_section: dict | None) -> Any:
         headless=bool(raw_section.get("headless", True)),
         download_timeout_ms=int(raw_section.get("download_timeout_ms", 30000)),
         vendors=tuple(vendors),
+        workers=max(1, int(raw_section.get("workers", 2))),
+        idle_timeout_s=float(raw_section.get("idle_timeout_s", 300.0)),
+        state_dir=str(raw_section.get("state_dir") or Path(artifact_dir) / "web_sessions"),
     )
 
 
@@ -2543,6 +2548,25 @@ def _load_config(path: Path, project_master_override: Path | None = None) -> Too
             enabled=bool(merge_raw.get("enabled", True)),
             output_name=str(merge_raw.get("output_name", "merged.pdf")).strip()
             or "merged.pdf",
+            max_pages_per_file=(
+                int(merge_raw["max_pages_per_file"])
+                if merge_raw.get("max_pages_per_file")
+                else None
+            ),
+            max_bytes_per_file=(
+                int(merge_raw["max_bytes_per_file"])
+                if merge_raw.get("max_bytes_per_file")
+                else None
+            ),
+            dedupe_resources=bool(merge_raw.get("dedupe_resources", True)),
+        )
+
+    post_raw = raw.get("post_process") if isinstance(raw, dict) else None
+    post_process = PostProcessConfig()
+    if isinstance(post_raw, dict):
+        post_process = PostProcessConfig(
+            workers=max(0, int(post_raw.get("workers", 4))),
+            max_queued=max(1, int(post_raw.get("max_queued", 8))),
         )
 
     print_raw = raw.get("print") if isinstance(raw, dict) else None
@@ -2665,12 +2689,13 @@ def _load_config(path: Path, project_master_override: Path | None = None) -> Too
     pm_entries, project_master_path = _resolve_and_load_project_master(path, project_master_override)
     routing = _apply_fallback_subdir_timestamp(routing)
 
+    artifact_dir = str(raw.get("artifact_dir", DEFAULT_ARTIFACT_DIR)).strip() or DEFAULT_ARTIFACT_DIR
     cfg = ToolConfig(
-        artifact_dir=str(raw.get("artifact_dir", DEFAULT_ARTIFACT_DIR)).strip()
-        or DEFAULT_ARTIFACT_DIR,
+        artifact_dir=artifact_dir,
         save_dir=(str(raw["save_dir"]).strip() if raw.get("save_dir") else None),
         outlook=outlook,
         merge=merge,
+        post_process=post_process,
         print=prn,
         mail=mail,
         rename=ren,
@@ -2681,7 +2706,7 @@ def _load_config(path: Path, project_master_override: Path | None = None) -> Too
         project_master=tuple(pm_entries),
         project_master_path=str(project_master_path),
         enable_web_download=_load_bool_safe(raw, "enable_web_download", default=False),
-        web_download=_load_web_download_config(raw.get("web_download")),
+        web_download=_load_web_download_config(raw.get("web_download"), artifact_dir),
     )
 
     return cfg
@@ -2878,7 +2903,96 @@ def _safe_received_time(item: Any) -> datetime | None:
     return None
 
 
-def _iter_mail_items(folder: Any, unread_only: bool, max_messages: int) -> list[Any]:
+# DASL property names for Items.Restrict (server-side filtering).
+_DASL_DATE_RECEIVED = "urn:schemas:httpmail:datereceived"
+_DASL_READ = "urn:schemas:httpmail:read"
+_DASL_HAS_ATTACHMENT = "urn:schemas:httpmail:hasattachment"
+_DASL_MESSAGE_CLASS = "http://schemas.microsoft.com/mapi/proptag/0x001A001F"
+
+
+def _build_mail_restrict_filter(
+    *,
+    received_since: datetime | None,
+    unread_only: bool,
+    require_attachments: bool = False,
+) -> str:
+    """Build a DASL filter for Items.Restrict.
+
+    DASL compares datereceived in UTC, so naive (local) datetimes are converted.
+    Attachments are not required by default: password mails and URL-only mails
+    carry no attachment but are still needed by the run.
+    """
+    clauses: list[str] = [f'"{_DASL_MESSAGE_CLASS}" LIKE \'IPM.Note%\'']
+    if received_since is not None:
+        since_utc = received_since.astimezone(timezone.utc)
+        clauses.append(f'"{_DASL_DATE_RECEIVED}" >= \'{since_utc.strftime("%Y/%m/%d %H:%M")}\'')
+    if unread_only:
+        clauses.append(f'"{_DASL_READ}" = 0')
+    if require_attachments:
+        clauses.append(f'"{_DASL_HAS_ATTACHMENT}" = 1')
+    return "@SQL=" + " AND ".join(clauses)
+
+
+def _iter_mail_items_restricted(
+    folder: Any,
+    *,
+    max_messages: int,
+    restrict_filter: str,
+) -> list[Any]:
+    """Enumerate via Items.Restrict + GetFirst/GetNext (newest first).
+
+    Only the filtered subset crosses the COM boundary, and paging stops as
+    soon as max_messages MailItems are collected.
+    """
+    items = _com_retry(lambda: folder.Items)
+    restricted = _com_retry(lambda: items.Restrict(restrict_filter), retries=5)
+    _com_retry(lambda: restricted.Sort("[ReceivedTime]", True), retries=5)
+
+    res: list[Any] = []
+    item = _com_retry(lambda: restricted.GetFirst(), retries=10)
+    while item is not None and len(res) < max_messages:
+        # MailItem Class=43 (the MessageClass filter already excludes most others)
+        try:
+            if int(getattr(item, "Class", 0)) == 43:
+                res.append(item)
+        except Exception:
+            pass
+        item = _com_retry(lambda: restricted.GetNext(), retries=10)
+    return res
+
+
+def _iter_mail_items(
+    folder: Any,
+    unread_only: bool,
+    max_messages: int,
+    *,
+    received_since: datetime | None = None,
+    use_restrict: bool = True,
+    log_path: Path | None = None,
+) -> list[Any]:
+    if use_restrict and max_messages > 0:
+        restrict_filter = _build_mail_restrict_filter(
+            received_since=received_since, unread_only=unread_only
+        )
+        try:
+            res = _iter_mail_items_restricted(
+                folder, max_messages=max_messages, restrict_filter=restrict_filter
+            )
+            if log_path is not None:
+                _append_log(log_path, f"enumerate mail items: restrict filter={restrict_filter} loaded={len(res)}")
+            return res
+        except Exception as e:
+            if log_path is not None:
+                _append_log(log_path, f"[WARN] Items.Restrict failed, fallback to full scan: {e}")
+
+    res = _iter_mail_items_scan(folder, unread_only, max_messages)
+    if received_since is not None:
+        res = [it for it in res if (_safe_received_time(it) or datetime.min) >= received_since]
+    return res
+
+
+def _iter_mail_items_scan(folder: Any, unread_only: bool, max_messages: int) -> list[Any]:
+    """Fallback: walk folder.Items by index and filter per item over COM."""
     items = _com_retry(lambda: folder.Items)
     try:
         _com_retry(lambda: items.Sort("[ReceivedTime]", True), retries=5)
@@ -3007,7 +3121,11 @@ def _decrypt_pdf(src: Path, dst: Path, password: str) -> None:
     ok = reader.decrypt(password)
     if ok == 0:
         raise ValueError("PDF復号に失敗しました（パスワード不一致）。")
+    _write_decrypted_pdf(reader, dst)
+
 
+def _write_decrypted_pdf(reader: Any, dst: Path) -> None:
+    """Write pages of an already-decrypted PdfReader to dst."""
     writer = PdfWriter()
     for page in reader.pages:
         writer.add_page(page)
@@ -3015,6 +3133,48 @@ def _decrypt_pdf(src: Path, dst: Path, password: str) -> None:
         writer.write(f)
 
 
+def _find_pdf_password(
+    reader: Any,
+    passwords: Sequence[str],
+    *,
+    max_workers: int = PDF_PASSWORD_TRIAL_WORKERS,
+) -> str | None:
+    """Try candidate passwords against an already-loaded encrypted PdfReader.
+
+    The PDF is parsed once by the caller; each trial only runs the key
+    derivation/verification. Trials run concurrently, but the result is the
+    highest-ranked candidate that matches (same as the old serial loop).
+    """
+    if not passwords:
+        return None
+
+    def _try(pw: str) -> bool:
+        try:
+            return reader.decrypt(pw) != 0
+        except Exception:
+            return False
+
+    if max_workers <= 1 or len(passwords) == 1:
+        for pw in passwords:
+            if _try(pw):
+                return pw
+        return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(passwords))) as pool:
+        futures = [pool.submit(_try, pw) for pw in passwords]
+        winner: str | None = None
+        for pw, fut in zip(passwords, futures):
+            if fut.result():
+                winner = pw
+                break
+        for fut in futures:
+            fut.cancel()
+    if winner is not None:
+        # Make sure the reader holds the key derived from the chosen password.
+        reader.decrypt(winner)
+    return winner
+
+
 def _extract_email_address(email_str: str) -> str:
     """Extract email address from various formats.
 
@@ -3047,10 +3207,68 @@ def _extract_email_domain(email_str: str) -> str:
     return addr.split("@", 1)[-1]
 
 
+class _TimeSortedNotes:
+    """PasswordNotes sorted by received_time with a parallel key list for bisect."""
+
+    def __init__(self, notes: Iterable[PasswordNote]) -> None:
+        self.notes = sorted(notes, key=lambda n: n.received_time)
+        self.times = [n.received_time for n in self.notes]
+
+    def window(self, target_time: datetime, window: timedelta) -> list[tuple[float, str]]:
+        lo = bisect.bisect_left(self.times, target_time - window)
+        hi = bisect.bisect_right(self.times, target_time + window)
+        return [
+            (abs((n.received_time - target_time).total_seconds()), n.password)
+            for n in self.notes[lo:hi]
+        ]
+
+
+class PasswordNoteIndex:
+    """Password mails indexed once per run for the staged candidate lookup.
+
+    Notes are grouped by sender address and by sender domain, each group
+    sorted by received_time, so every stage's time window is a bisect
+    instead of a scan over all notes.
+    """
+
+    def __init__(self, notes: Iterable[PasswordNote]) -> None:
+        self._notes = list(notes)
+        by_addr: dict[str, list[PasswordNote]] = {}
+        by_domain: dict[str, list[PasswordNote]] = {}
+        for n in self._notes:
+            addr = _extract_email_address(n.sender)
+            if not addr:
+                continue
+            by_addr.setdefault(addr, []).append(n)
+            domain = addr.split("@", 1)[-1]
+            if domain:
+                by_domain.setdefault(domain, []).append(n)
+        self._all = _TimeSortedNotes(self._notes)
+        self._by_addr = {k: _TimeSortedNotes(v) for k, v in by_addr.items()}
+        self._by_domain = {k: _TimeSortedNotes(v) for k, v in by_domain.items()}
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def __iter__(self):
+        return iter(self._notes)
+
+    def by_address(self, addr: str, target_time: datetime, window: timedelta) -> list[tuple[float, str]]:
+        group = self._by_addr.get(addr) if addr else None
+        return group.window(target_time, window) if group else []
+
+    def by_domain(self, domain: str, target_time: datetime, window: timedelta) -> list[tuple[float, str]]:
+        group = self._by_domain.get(domain) if domain else None
+        return group.window(target_time, window) if group else []
+
+    def by_time(self, target_time: datetime, window: timedelta) -> list[tuple[float, str]]:
+        return self._all.window(target_time, window)
+
+
 def _candidate_passwords_with_fallback(
     target_time: datetime,
     target_sender: str,
-    notes: Sequence[PasswordNote],
+    notes: "Sequence[PasswordNote] | PasswordNoteIndex",
     log_path: Path,
 ) -> list[str]:
     """Find password candidates using staged fallback strategy.
@@ -3059,46 +3277,31 @@ def _candidate_passwords_with_fallback(
     Stage 2: Relaxed - 3 min + domain match
     Stage 3: Last resort - 10 min + time only (max 5 candidates)
 
+    Pass a PasswordNoteIndex built once per run; a plain sequence is indexed
+    on the fly.
+
     Returns list of password candidates (empty if none found).
     """
+    index = notes if isinstance(notes, PasswordNoteIndex) else PasswordNoteIndex(notes)
     target_addr = _extract_email_address(target_sender)
     target_domain = _extract_email_domain(target_sender)
 
     # Stage 1: 30 seconds + exact sender match
-    stage1_window = timedelta(seconds=30)
-    stage1_candidates: list[tuple[float, str]] = []
-    for n in notes:
-        note_addr = _extract_email_address(n.sender)
-        if target_addr and note_addr and target_addr == note_addr:
-            dt = abs((n.received_time - target_time).total_seconds())
-            if dt <= stage1_window.total_seconds():
-                stage1_candidates.append((dt, n.password))
+    stage1_candidates = index.by_address(target_addr, target_time, timedelta(seconds=30))
 
     if stage1_candidates:
         _append_log(log_path, f"[Password] Stage1 match: exact sender, {len(stage1_candidates)} candidates")
         return _deduplicate_passwords(stage1_candidates)
 
     # Stage 2: 3 minutes + domain match
-    stage2_window = timedelta(minutes=3)
-    stage2_candidates: list[tuple[float, str]] = []
-    for n in notes:
-        note_domain = _extract_email_domain(n.sender)
-        if target_domain and note_domain and target_domain == note_domain:
-            dt = abs((n.received_time - target_time).total_seconds())
-            if dt <= stage2_window.total_seconds():
-                stage2_candidates.append((dt, n.password))
+    stage2_candidates = index.by_domain(target_domain, target_time, timedelta(minutes=3))
 
     if stage2_candidates:
         _append_log(log_path, f"[Password] Stage2 match: domain only, {len(stage2_candidates)} candidates")
         return _deduplicate_passwords(stage2_candidates)
 
     # Stage 3: 10 minutes + time only (last resort)
-    stage3_window = timedelta(minutes=10)
-    stage3_candidates: list[tuple[float, str]] = []
-    for n in notes:
-        dt = abs((n.received_time - target_time).total_seconds())
-        if dt <= stage3_window.total_seconds():
-            stage3_candidates.append((dt, n.password))
+    stage3_candidates = index.by_time(target_time, timedelta(minutes=10))
 
     if stage3_candidates:
         _append_log(log_path, f"[Password] Stage3 match: time only, {len(stage3_candidates)} candidates")
@@ -3217,16 +3420,35 @@ def _extract_pdf_members_from_zip(
         return _extract_with_open(zf)
 
 
-def _merge_pdfs(input_paths: Sequence[Path], output_path: Path) -> None:
-    if not _PYPDF_AVAILABLE:
-        raise RuntimeError("pypdf が利用できません。")
-    writer = PdfWriter()
-    for p in input_paths:
-        reader = PdfReader(str(p))
-        for page in reader.pages:
-            writer.add_page(page)
-    with output_path.open("wb") as f:
-        writer.write(f)
+def _merge_pdfs(
+    input_paths: Sequence[Path],
+    output_path: Path,
+    *,
+    merge_cfg: MergeConfig = MergeConfig(),
+    log_path: Path | None = None,
+    unresolved: list[str] | None = None,
+) -> list[Path]:
+    """Stream-merge PDFs (PyMuPDF insert_pdf; pypdf fallback) and return chunk paths."""
+    result = merge_pdfs_streaming(
+        input_paths,
+        output_path,
+        max_pages_per_chunk=merge_cfg.max_pages_per_file,
+        max_bytes_per_chunk=merge_cfg.max_bytes_per_file,
+        dedupe_resources=merge_cfg.dedupe_resources,
+    )
+    for path, err in result.skipped:
+        if unresolved is not None:
+            unresolved.append(f"failed to merge pdf (skipped): {Path(path).name} error={err}")
+    if log_path is not None:
+        st = result.stats
+        peak_mb = f"{st.peak_rss_bytes / (1024 * 1024):.1f}MB" if st.peak_rss_bytes else "-"
+        _append_log(
+            log_path,
+            f"merge stats: engine={st.engine} docs={st.input_docs} pages={st.pages} "
+            f"chunks={st.chunks} bytes={st.output_bytes} elapsed={st.elapsed_seconds}s "
+            f"pages_per_sec={st.pages_per_sec} peak_rss={peak_mb}",
+        )
+    return list(result.output_paths)
 
 
 def _default_printer() -> str | None:
@@ -3328,13 +3550,15 @@ def _route_and_move_file(
     log_prefix: str = "rename/move",
 ) -> Path:
     _ensure_dir(dest_dir)
-    final_path = _unique_path(dest_dir / final_name)
-    _append_log(log_path, f"{log_prefix}: {primary_path.name} -> {final_path}")
-    try:
-        _move_file(primary_path, final_path)
-    except Exception:
-        unresolved.append(f"failed to move file: {primary_path.name} -> {final_path}")
-        final_path = primary_path
+    # Post-processing workers may route into the same folder; pick-name-and-move is atomic.
+    with _ROUTE_LOCK:
+        final_path = _unique_path(dest_dir / final_name)
+        _append_log(log_path, f"{log_prefix}: {primary_path.name} -> {final_path}")
+        try:
+            _move_file(primary_path, final_path)
+        except Exception:
+            unresolved.append(f"failed to move file: {primary_path.name} -> {final_path}")
+            final_path = primary_path
     return final_path
 
 
@@ -3404,7 +3628,7 @@ def _decrypt_pdf_if_needed(
     cfg: "ToolConfig",
     received_dt: datetime,
     sender: str,
-    password_notes: "Sequence[PasswordNote]",
+    password_notes: "Sequence[PasswordNote] | PasswordNoteIndex",
     log_path: Path,
     unresolved: list[str],
     subject: str = "",
@@ -3430,22 +3654,32 @@ def _decrypt_pdf_if_needed(
         return pdf_path, None
     out_base = pdf_path.with_name(pdf_path.stem + "__decrypted.pdf")
     decrypted_path: Path | None = None
-    for pw in passwords:
-        out = _unique_path(out_base)
-        try:
-            _append_log(log_path, f"decrypt pdf: {pdf_path.name} -> {out.name}")
-            _decrypt_pdf(pdf_path, out, pw)
-            decrypted_path = out
-            break
-        except Exception as e:
-            try:
-                out.unlink()
-            except Exception:
-                pass
+    try:
+        # Parse once; every candidate is verified against the loaded document.
+        reader = PdfReader(str(pdf_path))
+        pw = _find_pdf_password(reader, passwords)
+        if pw is None:
             _append_log(
                 log_path,
-                f"[WARN] decrypt failed (try next): {pdf_path.name} error={e}",
+                f"[WARN] decrypt failed: {pdf_path.name} no match in {len(passwords)} candidates",
             )
+        else:
+            out = _unique_path(out_base)
+            _append_log(log_path, f"decrypt pdf: {pdf_path.name} -> {out.name}")
+            try:
+                _write_decrypted_pdf(reader, out)
+                decrypted_path = out
+            except Exception:
+                try:
+                    out.unlink()
+                except Exception:
+                    pass
+                raise
+    except Exception as e:
+        _append_log(
+            log_path,
+            f"[WARN] decrypt failed: {pdf_path.name} error={e}",
+        )
     if decrypted_path is None:
         unresolved.append(
             f"failed to decrypt encrypted pdf: {pdf_path.name} (subject={subject})"
@@ -3465,13 +3699,14 @@ def _process_saved_pdf_file(
     body_snippet: str = "",
     received_dt: datetime,
     received_time_s: str,
-    password_notes: Sequence[PasswordNote],
+    password_notes: "Sequence[PasswordNote] | PasswordNoteIndex",
     save_dir: Path,
     run_dir: Path,
     log_path: Path,
     unresolved: list[str],
     processed_index: dict[str, dict[str, Any]],
     processed_manifest_path: Path,
+    journal: RunJournal | None = None,
 ) -> SavedAttachment:
     sha = _sha256_file(pdf_path)
     manifest_key = _processed_attachment_key(entry_id, attachment_name, sha)
@@ -3505,6 +3740,14 @@ def _process_saved_pdf_file(
         unresolved=unresolved,
         subject=subject,
     )
+    if journal is not None and decrypted_path is not None:
+        journal.append(
+            "attachment",
+            entry_id=entry_id,
+            attachment_name=attachment_name,
+            state="decrypted",
+            path=str(decrypted_path),
+        )
 
     final_path = primary_path
     vendor: str | None = None
@@ -3575,6 +3818,15 @@ def _process_saved_pdf_file(
                 )
                 fields = None
 
+        if journal is not None:
+            journal.append(
+                "attachment",
+                entry_id=entry_id,
+                attachment_name=attachment_name,
+                state="extracted",
+                complete=fields is not None,
+            )
+
         if fields is not None:
             vendor = fields.vendor
             issue_date = fields.issue_date
@@ -3738,6 +3990,120 @@ def _process_saved_pdf_file(
     )
 
 
+@dataclass
+class _ResumeState:
+    """State rebuilt from a run's progress journal for --resume."""
+
+    started_at: datetime | None = None
+    completed_messages: set[str] = field(default_factory=set)
+    # Report rows / unresolved / URL tasks of completed messages, in journal order.
+    saved_rows: list[SavedAttachment] = field(default_factory=list)
+    unresolved: list[str] = field(default_factory=list)
+    url_only_tasks: list[UrlOnlyTask] = field(default_factory=list)
+    # Routed attachments of messages that did not finish:
+    # (entry_id, attachment_index) -> (attachment_name, row, unresolved).
+    # Keyed by position in the mail, not by name: one mail can carry two "請求書.pdf".
+    # The position can shift between runs, so reuse also requires the same name.
+    routed_attachments: dict[tuple[str, int], tuple[str, SavedAttachment, list[str]]] = field(
+        default_factory=dict
+    )
+
+
+def _load_resume_state(events: Sequence[dict[str, Any]]) -> _ResumeState:
+    state = _ResumeState()
+    routed_by_message: dict[str, dict[int, tuple[str, SavedAttachment, list[str]]]] = {}
+    for ev in events:
+        kind = ev.get("event")
+        if kind == "run" and ev.get("state") == "started" and state.started_at is None:
+            try:
+                state.started_at = datetime.fromisoformat(str(ev.get("started_at")))
+            except ValueError:
+                pass
+        elif kind == "attachment" and ev.get("state") == "routed" and isinstance(ev.get("row"), dict):
+            try:
+                index = int(ev["attachment_index"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            routed_by_message.setdefault(str(ev.get("entry_id")), {})[index] = (
+                str(ev.get("attachment_name") or ""),
+                SavedAttachment(**ev["row"]),
+                [str(u) for u in ev.get("unresolved") or []],
+            )
+        elif kind == "message" and ev.get("state") == "done":
+            entry_id = str(ev.get("entry_id"))
+            if entry_id in state.completed_messages:
+                continue
+            state.completed_messages.add(entry_id)
+            routed = routed_by_message.pop(entry_id, {})
+            # Workers journal "routed" in completion order; restore attachment order.
+            state.saved_rows.extend(routed[i][1] for i in sorted(routed))
+            state.unresolved.extend(str(u) for u in ev.get("unresolved") or [])
+            for t in ev.get("url_only_tasks") or []:
+                state.url_only_tasks.append(UrlOnlyTask(**{**t, "urls": tuple(t.get("urls") or ())}))
+    for entry_id, routed in routed_by_message.items():
+        for index, entry in routed.items():
+            state.routed_attachments[(entry_id, index)] = entry
+    return state
+
+
+@dataclass
+class _WebDownloadSlot:
+    """A portal download of a URL-only mail, running on the web download service."""
+
+    future: Any  # concurrent.futures.Future[WebDownloadResult]
+    url_task: UrlOnlyTask  # recorded when the download yields no PDF
+    process_kwargs: dict[str, Any]  # mail fields for _post_process_attachment
+    expanded: bool = False  # downloaded PDFs were queued on the pipeline
+
+
+@dataclass
+class _PendingMail:
+    """A mail whose attachments were saved on the COM thread and are still being post-processed."""
+
+    item: Any
+    entry_id: str
+    # In mail order: a PipelineTicket, or an already-known (row | None, unresolved) pair.
+    slots: list[Any] = field(default_factory=list)
+    attachments_saved: int = 0
+    url_only_tasks: list[UrlOnlyTask] = field(default_factory=list)
+    web: _WebDownloadSlot | None = None
+
+    def ready(self) -> bool:
+        if self.web is not None and not self.web.expanded:
+            return False
+        return all(s.done() for s in self.slots if isinstance(s, PipelineTicket))
+
+    def collect(self) -> tuple[list[SavedAttachment], list[str]]:
+        """Rows and unresolved items in slot order (re-raises worker failures)."""
+        rows: list[SavedAttachment] = []
+        unresolved: list[str] = []
+        for slot in self.slots:
+            row, slot_unresolved = slot.result() if isinstance(slot, PipelineTicket) else slot
+            if row is not None:
+                rows.append(row)
+            unresolved.extend(slot_unresolved)
+        return rows, unresolved
+
+
+def _post_process_attachment(
+    *, journal: RunJournal | None, attachment_index: int, **process_kwargs: Any
+) -> tuple[SavedAttachment, list[str]]:
+    """Worker side of the pipeline: everything after SaveAsFile for one PDF."""
+    att_unresolved: list[str] = []
+    row = _process_saved_pdf_file(unresolved=att_unresolved, journal=journal, **process_kwargs)
+    if journal is not None:
+        journal.append(
+            "attachment",
+            entry_id=process_kwargs["entry_id"],
+            attachment_index=attachment_index,
+            attachment_name=process_kwargs["attachment_name"],
+            state="routed",
+            row=asdict(row),
+            unresolved=att_unresolved,
+        )
+    return row, att_unresolved
+
+
 def _validate_mail_config(cfg: ToolConfig, dry_run: bool, scan_only: bool) -> None:
     if scan_only or dry_run:
         return
@@ -3829,9 +4195,14 @@ def _send_success_mail(cfg: ToolConfig, report: RunReport, run_dir: Path, dry_ru
     save_dir_html = (
         html_link_to_path(Path(report.save_dir)) if report.save_dir else "(未指定)"
     )
+    merged_targets = list(report.merged_pdf_paths) or (
+        [report.merged_pdf_path] if report.merged_pdf_path else []
+    )
     merged_html = (
-        html_link_to_path(Path(report.merged_pdf_path))
-        if report.merged_pdf_path
+        html_link_to_path(Path(merged_targets[0]))
+        if len(merged_targets) == 1
+        else " / ".join(html_link_to_path(Path(p), label=Path(p).name) for p in merged_targets)
+        if merged_targets
         else "(なし)"
     )
     new_project_candidates = [a for a in report.saved_attachments if a.route_reason == "new_project_candidate"]
@@ -3930,9 +4301,10 @@ def _send_error_mail(
 
 def _append_log(log_path: Path, line: str) -> None:
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_path.write_text("", encoding="utf-8") if not log_path.exists() else None
-    with log_path.open("a", encoding="utf-8") as f:
-        f.write(f"[{ts}] {line}\n")
+    with _LOG_LOCK:
+        log_path.write_text("", encoding="utf-8") if not log_path.exists() else None
+        with log_path.open("a", encoding="utf-8") as f:
+            f.write(f"[{ts}] {line}\n")
 
 
 def _list_outlook_stores(mapi: Any) -> list[str]:
@@ -3979,6 +4351,7 @@ def _finalize_and_notify(
     folder_path: str,
     scanned: int,
     save_dir: Path | None,
+    merged_pdf_paths: Sequence[str] = (),
 ) -> int:
     finished_at = datetime.now()
     report = RunReport(
@@ -3996,6 +4369,7 @@ def _finalize_and_notify(
         project_master_path=cfg.project_master_path,
         new_project_candidates_path=None,
         unresolved=tuple(unresolved),
+        merged_pdf_paths=tuple(merged_pdf_paths),
     )
     new_project_candidates_path = run_dir / "new_project_candidates.csv"
     if _write_new_project_candidates_csv(new_project_candidates_path, saved_rows):
@@ -4014,6 +4388,7 @@ def _finalize_and_notify(
             project_master_path=report.project_master_path,
             new_project_candidates_path=str(new_project_candidates_path),
             unresolved=report.unresolved,
+            merged_pdf_paths=report.merged_pdf_paths,
         )
         _append_log(
             log_path,
@@ -4183,6 +4558,13 @@ def main(argv: Sequence[str] | None = None) -> int:
         required=False,
         help="支払月サブフォルダ名（例: '2026.3末支払.RK'）。完成形をそのまま指定",
     )
+    ap.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="RUN_ID",
+        help="Resume an interrupted --execute run from its progress journal (skips completed mails/attachments)",
+    )
     args = ap.parse_args(list(argv) if argv is not None else None)
     project_master_override = None
     if args.project_master_path:
@@ -4230,8 +4612,18 @@ def main(argv: Sequence[str] | None = None) -> int:
     mail_dry_run = True if scan_only else (bool(args.dry_run_mail) or dry_run)
     _validate_mail_config(cfg, dry_run=dry_run, scan_only=scan_only)
 
-    run_id = _now_run_id()
-    run_dir = Path(cfg.artifact_dir) / f"run_{run_id}"
+    resume_state = _ResumeState()
+    if args.resume:
+        if dry_run:
+            ap.error("--resume requires --execute")
+        run_id = str(args.resume).strip()
+        run_dir = Path(cfg.artifact_dir) / f"run_{run_id}"
+        if not (run_dir / JOURNAL_FILE_NAME).exists():
+            ap.error(f"--resume: progress journal not found: {run_dir / JOURNAL_FILE_NAME}")
+        resume_state = _load_resume_state(RunJournal.load(run_dir / JOURNAL_FILE_NAME))
+    else:
+        run_id = _now_run_id()
+        run_dir = Path(cfg.artifact_dir) / f"run_{run_id}"
     _ensure_dir(run_dir)
     log_path = run_dir / "run.log"
     _append_log(log_path, f"start run_id={run_id} dry_run={dry_run} config={args.config}")
@@ -4240,10 +4632,23 @@ def main(argv: Sequence[str] | None = None) -> int:
         f"project_master: {cfg.project_master_path or '(none)'} entries={len(cfg.project_master)}",
     )
 
-    started_at = datetime.now()
+    started_at = resume_state.started_at or datetime.now()
+    # Write-ahead progress journal (execute mode only; dry-run has nothing to resume).
+    journal: RunJournal | None = None if dry_run else RunJournal(run_dir / JOURNAL_FILE_NAME)
+    if journal is not None and args.resume:
+        _append_log(
+            log_path,
+            f"resume: completed_messages={len(resume_state.completed_messages)} "
+            f"restored_rows={len(resume_state.saved_rows)} "
+            f"routed_attachments_in_partial_messages={len(resume_state.routed_attachments)}",
+        )
+        journal.append("run", state="resumed")
+    elif journal is not None:
+        journal.append("run", state="started", started_at=started_at.isoformat(timespec="seconds"))
     merged_pdf_path: str | None = None
+    merged_pdf_paths: list[str] = []
     printed_paths: list[str] = []
-    unresolved: list[str] = []
+    unresolved: list[str] = list(resume_state.unresolved)
 
     try:
         save_dir: Path | None = None
@@ -4330,12 +4735,20 @@ def main(argv: Sequence[str] | None = None) -> int:
         if args.include_read:
             _append_log(log_path, "override: include_read=true -> unread_only=false")
 
-        items = _iter_mail_items(folder, effective_unread_only, max_messages=max_messages)
-        _append_log(log_path, f"loaded messages: {len(items)} (unread_only={effective_unread_only})")
-
-        # Restrict by received time if configured.
+        cutoff: datetime | None = None
         if outlook_cfg.received_within_days is not None:
             cutoff = datetime.now() - timedelta(days=outlook_cfg.received_within_days)
+        items = _iter_mail_items(
+            folder,
+            effective_unread_only,
+            max_messages=max_messages,
+            received_since=cutoff,
+            log_path=log_path,
+        )
+        _append_log(log_path, f"loaded messages: {len(items)} (unread_only={effective_unread_only})")
+
+        # Restrict by received time if configured (already applied server-side; kept as a guard).
+        if cutoff is not None:
             kept = []
             for it in items:
                 rt = _safe_received_time(it)
@@ -4391,9 +4804,10 @@ def main(argv: Sequence[str] | None = None) -> int:
             log_path,
             f"candidates={len(candidates)} password_notes={len(password_notes)}",
         )
+        password_index = PasswordNoteIndex(password_notes)
 
-        saved_rows: list[SavedAttachment] = []
-        url_only_tasks: list[UrlOnlyTask] = []
+        saved_rows: list[SavedAttachment] = list(resume_state.saved_rows)
+        url_only_tasks: list[UrlOnlyTask] = list(resume_state.url_only_tasks)
         processed_manifest_path = Path(cfg.artifact_dir) / PROCESSED_MANIFEST_NAME
         processed_index = (
             _load_processed_attachment_index(processed_manifest_path) if not dry_run else {}
@@ -4404,277 +4818,378 @@ def main(argv: Sequence[str] | None = None) -> int:
                 f"loaded processed manifest: {processed_manifest_path} records={len(processed_index)}",
             )
 
-        for it in candidates:
-            try:
-                subject = str(it.Subject or "")
-            except Exception:
-                subject = ""
+        # COM thread: enumerate + SaveAsFile only. Everything after SaveAsFile runs on
+        # the post-processing pool; mails are finalized (report rows, mark-as-read, journal)
+        # in mail order once all of their attachments are done.
+        pending_mails: deque[_PendingMail] = deque()
 
-            sender = _safe_sender(it)
-            rt_dt = _safe_received_time(it) or datetime.now()
-            rt_s = rt_dt.strftime("%Y-%m-%d %H:%M:%S")
+        def finish_mail(mail: _PendingMail) -> None:
+            rows, mail_unresolved = mail.collect()
+            saved_rows.extend(rows)
+            unresolved.extend(mail_unresolved)
+            url_only_tasks.extend(mail.url_only_tasks)
+            it = mail.item
+            entry_id = mail.entry_id
+            ok = mail.attachments_saved > 0 and not mail_unresolved
 
-            try:
-                entry_id = str(it.EntryID)
-            except Exception:
-                entry_id = f"(no_entry_id:{rt_s})"
+            # Mimic the human workflow: reading/handling a mail marks it as processed.
+            # This is intentionally best-effort to avoid blocking invoice collection.
+            if (not dry_run) and bool(outlook_cfg.mark_as_read_on_success) and ok:
+                try:
+                    it.UnRead = False
+                    it.Save()
+                    _append_log(log_path, f"marked as read: entry_id={entry_id}")
+                except Exception as e:
+                    _append_log(
+                        log_path,
+                        f"[WARN] failed to mark as read: entry_id={entry_id} error={e}",
+                    )
 
-            unresolved_before_mail = len(unresolved)
+            # Set FlagStatus = 2 (red flag) on successful processing.
+            if (not dry_run) and bool(outlook_cfg.mark_flag_on_success) and ok:
+                try:
+                    it.FlagStatus = 2
+                    it.Save()
+                    _append_log(log_path, f"marked with red flag: entry_id={entry_id}")
+                except Exception as e:
+                    _append_log(
+                        log_path,
+                        f"[WARN] failed to set flag: entry_id={entry_id} error={e}",
+                    )
 
-            def process_pdf(pdf_path: Path, att_name: str) -> SavedAttachment:
-                return _process_saved_pdf_file(
-                    cfg=cfg,
-                    pdf_path=pdf_path,
-                    attachment_name=att_name,
+            if journal is not None:
+                journal.append(
+                    "message",
                     entry_id=entry_id,
-                    subject=subject,
-                    sender=sender,
-                    body_snippet=body[:500] if body else "",
-                    received_dt=rt_dt,
-                    received_time_s=rt_s,
-                    password_notes=password_notes,
-                    save_dir=save_dir,
-                    run_dir=run_dir,
-                    log_path=log_path,
-                    unresolved=unresolved,
-                    processed_index=processed_index,
-                    processed_manifest_path=processed_manifest_path,
+                    state="done",
+                    attachments_saved=mail.attachments_saved,
+                    unresolved=mail_unresolved,
+                    url_only_tasks=[asdict(t) for t in mail.url_only_tasks],
                 )
 
-            def add_url_task(urls_list: list[str]) -> None:
-                url_only_tasks.append(UrlOnlyTask(
-                    message_entry_id=entry_id,
-                    subject=subject,
-                    sender=sender,
-                    received_time=rt_s,
-                    urls=tuple(_mask_url(u) for u in urls_list),
-                ))
+        def reuse_routed(mail: _PendingMail, att_index: int, att_name: str) -> bool:
+            hit = resume_state.routed_attachments.get((mail.entry_id, att_index))
+            if hit is None:
+                return False
+            routed_name, row, row_unresolved = hit
+            if routed_name != att_name:
+                # An attachment that failed last time now succeeded (or ZIP/web order
+                # changed): this position belongs to another file, so process it again.
+                _append_log(
+                    log_path,
+                    f"[RESUME] position {att_index} was {routed_name}, now {att_name}; not reusing",
+                )
+                return False
+            _append_log(log_path, f"[RESUME] reuse routed attachment: {att_name} -> {row.saved_path}")
+            if journal is not None:
+                journal.append(
+                    "attachment",
+                    entry_id=mail.entry_id,
+                    attachment_index=att_index,
+                    attachment_name=att_name,
+                    state="routed",
+                    row=asdict(row),
+                    unresolved=row_unresolved,
+                )
+            mail.slots.append((row, list(row_unresolved)))
+            return True
 
-            # URL-only detection (body) for later; avoid logging sensitive bodies.
-            try:
-                body = str(it.Body or "")
-            except Exception:
-                body = ""
-            urls = _extract_urls(body)
+        def process_pdf(
+            mail: _PendingMail, pdf_path: Path, att_name: str, process_kwargs: dict[str, Any]
+        ) -> None:
+            # Position of this PDF within the mail (attachments, then portal downloads).
+            att_index = mail.attachments_saved
+            mail.attachments_saved += 1
+            if reuse_routed(mail, att_index, att_name):
+                return
+            if journal is not None:
+                journal.append(
+                    "attachment",
+                    entry_id=mail.entry_id,
+                    attachment_index=att_index,
+                    attachment_name=att_name,
+                    state="saved",
+                    path=str(pdf_path),
+                )
+            # Blocks while the queue is full (back-pressure on SaveAsFile).
+            mail.slots.append(pipeline.submit(
+                _post_process_attachment,
+                journal=journal,
+                attachment_index=att_index,
+                cfg=cfg,
+                pdf_path=pdf_path,
+                attachment_name=att_name,
+                password_notes=password_index,
+                save_dir=save_dir,
+                run_dir=run_dir,
+                log_path=log_path,
+                processed_index=processed_index,
+                processed_manifest_path=processed_manifest_path,
+                **process_kwargs,
+            ))
+
+        def expand_web_download(mail: _PendingMail) -> None:
+            """Queue the PDFs of a finished portal download (COM thread, in drain order)."""
+            web = mail.web
+            result = web.future.result()
+            for err_msg in result.errors:
+                mail.slots.append((None, [err_msg]))
+            for wp in result.pdfs:
+                process_pdf(mail, wp, wp.name, web.process_kwargs)
+            if not result.pdfs:
+                mail.url_only_tasks.append(web.url_task)
+            web.expanded = True
+
+        def drain_mails(*, block: bool) -> None:
+            # Portal downloads finish out of order; their PDFs join the pipeline as soon
+            # as they arrive, while report rows are still finalized in mail order.
+            for mail in pending_mails:
+                if mail.web is not None and not mail.web.expanded and (block or mail.web.future.done()):
+                    expand_web_download(mail)
+            while pending_mails and (block or pending_mails[0].ready()):
+                finish_mail(pending_mails.popleft())
+
+        with OrderedPipeline(
+            workers=cfg.post_process.workers, max_queued=cfg.post_process.max_queued
+        ) as pipeline:
+            for it in candidates:
+                try:
+                    subject = str(it.Subject or "")
+                except Exception:
+                    subject = ""
 
-            # Save PDF attachments.
-            attachments_saved = 0
-            try:
-                atts = it.Attachments
-                att_count = int(atts.Count)
-            except Exception:
-                att_count = 0
-                atts = None
-
-            if att_count <= 0:
-                if urls:
-                    web_pdfs: list[Path] = []
-                    if (
-                        _WEB_DOWNLOAD_AVAILABLE
-                        and cfg.enable_web_download
-                        and cfg.web_download
-                        and not scan_only
-                    ):
-                        web_dl_dir = run_dir / "web_downloads"
-                        web_pdfs_result = dispatch_web_download(
-                            cfg=cfg.web_download,
-                            sender=sender,
-                            urls=list(urls),
-                            subject=subject,
-                            received_dt=rt_dt,
-                            download_dir=web_dl_dir,
-                            log_path=log_path,
-                            dry_run=dry_run,
-                            scan_only=scan_only,
-                        )
-                        web_pdfs = web_pdfs_result.pdfs
-                        for err_msg in web_pdfs_result.errors:
-                            unresolved.append(err_msg)
-                    if web_pdfs:
-                        for wp in web_pdfs:
-                            saved_rows.append(process_pdf(wp, wp.name))
-                            attachments_saved += 1
-                    else:
-                        add_url_task(urls)
-                continue
+                sender = _safe_sender(it)
+                rt_dt = _safe_received_time(it) or datetime.now()
+                rt_s = rt_dt.strftime("%Y-%m-%d %H:%M:%S")
 
-            for j in range(1, att_count + 1):
                 try:
-                    att = atts.Item(j)
-                    att_name = str(att.FileName or "")
+                    entry_id = str(it.EntryID)
                 except Exception:
-                    continue
-                att_name_l = att_name.lower().strip()
-                is_pdf = att_name_l.endswith(".pdf")
-                is_zip = att_name_l.endswith(".zip")
-                if not (is_pdf or is_zip):
-                    continue
-                if is_zip and (not cfg.enable_zip_processing):
-                    _append_log(
-                        log_path,
-                        f"[MVP-SKIP] zip processing is disabled: {att_name}",
-                    )
-                    continue
-
-                received_ymd = rt_dt.strftime("%Y%m%d")
-                subj_slug = _slug_subject(subject)
-                att_slug = _sanitize_filename(att_name)
-                tmp_name = f"{received_ymd}__{subj_slug}__{att_slug}"
-                tmp_name = _sanitize_filename(tmp_name)
+                    entry_id = f"(no_entry_id:{rt_s})"
 
-                if dry_run:
-                    dest_preview = (save_dir / tmp_name) if save_dir else Path(tmp_name)
-                    kind = "zip" if is_zip else "pdf"
-                    _append_log(
-                        log_path,
-                        f"[DRY] save attachment({kind}): {att_name} -> {dest_preview}",
-                    )
-                    if is_pdf:
-                        # fake sha for report
-                        saved_rows.append(
-                            SavedAttachment(
-                                message_entry_id=entry_id,
-                                message_subject=subject,
-                                sender=sender,
-                                received_time=rt_s,
-                                attachment_name=att_name,
-                                saved_path=str(dest_preview),
-                                original_saved_path=str(dest_preview),
-                                vendor=None,
-                                issue_date=None,
-                                amount=None,
-                                invoice_no=None,
-                                project=None,
-                                sha256="(dry-run)",
-                                was_encrypted=False,
-                                decrypted_path=None,
-                                encrypted_original_path=None,
-                                route_subdir=None,
-                                route_reason=None,
-                                processing_status="dry_run",
-                            )
-                        )
-                        attachments_saved += 1
+                if entry_id in resume_state.completed_messages:
+                    _append_log(log_path, f"[RESUME] skip completed mail: entry_id={entry_id}")
                     continue
 
-                if save_dir is None:
-                    raise RuntimeError("save_dir must be set in execute mode")
-                attachments_dir = run_dir / "attachments"
-                _ensure_dir(attachments_dir)
-
-                if is_pdf:
-                    dest_path = _unique_path(attachments_dir / tmp_name)
-                    _append_log(
-                        log_path, f"save attachment(pdf): {att_name} -> {dest_path}"
-                    )
-                    att.SaveAsFile(str(dest_path))
-                    saved_rows.append(process_pdf(dest_path, att_name))
-                    attachments_saved += 1
-                    continue
+                mail = _PendingMail(item=it, entry_id=entry_id)
+                if journal is not None:
+                    journal.append("message", entry_id=entry_id, state="started", subject=subject)
 
-                # ZIP attachment: extract PDFs and process each.
-                zip_path = _unique_path(attachments_dir / tmp_name)
-                _append_log(log_path, f"save attachment(zip): {att_name} -> {zip_path}")
-                att.SaveAsFile(str(zip_path))
+                def defer_mail() -> None:
+                    pending_mails.append(mail)
+                    drain_mails(block=False)
 
-                extracted_parent = attachments_dir / "extracted"
-                _ensure_dir(extracted_parent)
-                extracted_dir = _unique_dir(
-                    extracted_parent / _sanitize_filename(zip_path.stem)
+                # URL-only detection (body) for later; avoid logging sensitive bodies.
+                try:
+                    body = str(it.Body or "")
+                except Exception:
+                    body = ""
+                urls = _extract_urls(body)
+                process_kwargs: dict[str, Any] = dict(
+                    entry_id=entry_id,
+                    subject=subject,
+                    sender=sender,
+                    body_snippet=body[:500] if body else "",
+                    received_dt=rt_dt,
+                    received_time_s=rt_s,
                 )
-                _ensure_dir(extracted_dir)
 
-                pw_candidates = _candidate_passwords_with_fallback(
-                    target_time=rt_dt,
-                    target_sender=sender,
-                    notes=password_notes,
-                    log_path=log_path,
-                )
-                attempts: list[str | None] = [None] + list(pw_candidates)
-                extracted_pdfs: list[Path] = []
-                last_error: Exception | None = None
-                for pw in attempts:
-                    _recreate_dir(extracted_dir)
-                    try:
-                        extracted_pdfs = _extract_pdf_members_from_zip(
-                            zip_path,
-                            password=pw,
-                            out_dir=extracted_dir,
-                            log_path=log_path,
-                        )
-                        last_error = None
-                        break
-                    except Exception as e:
-                        last_error = e
-                        if _is_wrong_zip_password_error(e) and pw is not attempts[-1]:
-                            _append_log(
-                                log_path,
-                                f"[WARN] zip extract failed (try next password): {zip_path.name} error={e}",
-                            )
-                            continue
-                        break
-
-                if last_error is not None:
-                    hint = ""
-                    if isinstance(last_error, NotImplementedError) and (not _PYZIPPER_AVAILABLE):
-                        hint = " / AES暗号ZIPの可能性があります（pyzipperが必要）。"
-                    unresolved.append(
-                        f"ZIP展開に失敗: {zip_path.name} (subject={subject}) error={last_error}{hint}"
+                def url_task() -> UrlOnlyTask:
+                    return UrlOnlyTask(
+                        message_entry_id=entry_id,
+                        subject=subject,
+                        sender=sender,
+                        received_time=rt_s,
+                        urls=tuple(_mask_url(u) for u in urls),
                     )
-                    continue
 
-                if not extracted_pdfs:
-                    unresolved.append(
-                        f"ZIP内にPDFが見つかりません: {zip_path.name} (subject={subject})"
-                    )
+                # Save PDF attachments.
+                try:
+                    atts = it.Attachments
+                    att_count = int(atts.Count)
+                except Exception:
+                    att_count = 0
+                    atts = None
+
+                if att_count <= 0:
+                    if urls:
+                        if (
+                            _WEB_DOWNLOAD_AVAILABLE
+                            and cfg.enable_web_download
+                            and cfg.web_download
+                            and not scan_only
+                        ):
+                            # Runs on the web download service; the mail loop moves on and
+                            # drain_mails() queues the PDFs once the download is done.
+                            mail.web = _WebDownloadSlot(
+                                future=submit_web_download(
+                                    cfg=cfg.web_download,
+                                    sender=sender,
+                                    urls=list(urls),
+                                    subject=subject,
+                                    received_dt=rt_dt,
+                                    download_dir=run_dir / "web_downloads",
+                                    log_path=log_path,
+                                    dry_run=dry_run,
+                                    scan_only=scan_only,
+                                ),
+                                url_task=url_task(),
+                                process_kwargs=process_kwargs,
+                            )
+                        else:
+                            mail.url_only_tasks.append(url_task())
+                    defer_mail()
                     continue
 
-                for pdf_path in extracted_pdfs:
+                for j in range(1, att_count + 1):
                     try:
-                        rel = str(pdf_path.relative_to(extracted_dir))
+                        att = atts.Item(j)
+                        att_name = str(att.FileName or "")
                     except Exception:
-                        rel = pdf_path.name
-                    display_name = f"{att_name}::{rel}"
-                    saved_rows.append(process_pdf(pdf_path, display_name))
-                    attachments_saved += 1
+                        continue
+                    att_name_l = att_name.lower().strip()
+                    is_pdf = att_name_l.endswith(".pdf")
+                    is_zip = att_name_l.endswith(".zip")
+                    if not (is_pdf or is_zip):
+                        continue
+                    if is_zip and (not cfg.enable_zip_processing):
+                        _append_log(
+                            log_path,
+                            f"[MVP-SKIP] zip processing is disabled: {att_name}",
+                        )
+                        continue
 
-            if attachments_saved == 0 and urls:
-                add_url_task(urls)
+                    received_ymd = rt_dt.strftime("%Y%m%d")
+                    subj_slug = _slug_subject(subject)
+                    att_slug = _sanitize_filename(att_name)
+                    tmp_name = f"{received_ymd}__{subj_slug}__{att_slug}"
+                    tmp_name = _sanitize_filename(tmp_name)
 
-            # Mimic the human workflow: reading/handling a mail marks it as processed.
-            # This is intentionally best-effort to avoid blocking invoice collection.
-            if (
-                (not dry_run)
-                and bool(outlook_cfg.mark_as_read_on_success)
-                and attachments_saved > 0
-                and len(unresolved) == unresolved_before_mail
-            ):
-                try:
-                    it.UnRead = False
-                    it.Save()
-                    _append_log(log_path, f"marked as read: entry_id={entry_id}")
-                except Exception as e:
-                    _append_log(
-                        log_path,
-                        f"[WARN] failed to mark as read: entry_id={entry_id} error={e}",
+                    if dry_run:
+                        dest_preview = (save_dir / tmp_name) if save_dir else Path(tmp_name)
+                        kind = "zip" if is_zip else "pdf"
+                        _append_log(
+                            log_path,
+                            f"[DRY] save attachment({kind}): {att_name} -> {dest_preview}",
+                        )
+                        if is_pdf:
+                            # fake sha for report
+                            mail.slots.append((
+                                SavedAttachment(
+                                    message_entry_id=entry_id,
+                                    message_subject=subject,
+                                    sender=sender,
+                                    received_time=rt_s,
+                                    attachment_name=att_name,
+                                    saved_path=str(dest_preview),
+                                    original_saved_path=str(dest_preview),
+                                    vendor=None,
+                                    issue_date=None,
+                                    amount=None,
+                                    invoice_no=None,
+                                    project=None,
+                                    sha256="(dry-run)",
+                                    was_encrypted=False,
+                                    decrypted_path=None,
+                                    encrypted_original_path=None,
+                                    route_subdir=None,
+                                    route_reason=None,
+                                    processing_status="dry_run",
+                                ),
+                                [],
+                            ))
+                            mail.attachments_saved += 1
+                        continue
+
+                    if save_dir is None:
+                        raise RuntimeError("save_dir must be set in execute mode")
+                    attachments_dir = run_dir / "attachments"
+                    _ensure_dir(attachments_dir)
+
+                    if is_pdf:
+                        if reuse_routed(mail, mail.attachments_saved, att_name):
+                            mail.attachments_saved += 1
+                            continue
+                        dest_path = _unique_path(attachments_dir / tmp_name)
+                        _append_log(
+                            log_path, f"save attachment(pdf): {att_name} -> {dest_path}"
+                        )
+                        att.SaveAsFile(str(dest_path))
+                        process_pdf(mail, dest_path, att_name, process_kwargs)
+                        continue
+
+                    # ZIP attachment: extract PDFs and process each.
+                    zip_path = _unique_path(attachments_dir / tmp_name)
+                    _append_log(log_path, f"save attachment(zip): {att_name} -> {zip_path}")
+                    att.SaveAsFile(str(zip_path))
+
+                    extracted_parent = attachments_dir / "extracted"
+                    _ensure_dir(extracted_parent)
+                    extracted_dir = _unique_dir(
+                        extracted_parent / _sanitize_filename(zip_path.stem)
                     )
+                    _ensure_dir(extracted_dir)
 
-            # Set FlagStatus = 2 (red flag) on successful processing.
-            if (
-                (not dry_run)
-                and bool(outlook_cfg.mark_flag_on_success)
-                and attachments_saved > 0
-                and len(unresolved) == unresolved_before_mail
-            ):
-                try:
-                    it.FlagStatus = 2
-                    it.Save()
-                    _append_log(log_path, f"marked with red flag: entry_id={entry_id}")
-                except Exception as e:
-                    _append_log(
-                        log_path,
-                        f"[WARN] failed to set flag: entry_id={entry_id} error={e}",
+                    pw_candidates = _candidate_passwords_with_fallback(
+                        target_time=rt_dt,
+                        target_sender=sender,
+                        notes=password_index,
+                        log_path=log_path,
                     )
+                    attempts: list[str | None] = [None] + list(pw_candidates)
+                    extracted_pdfs: list[Path] = []
+                    last_error: Exception | None = None
+                    for pw in attempts:
+                        _recreate_dir(extracted_dir)
+                        try:
+                            extracted_pdfs = _extract_pdf_members_from_zip(
+                                zip_path,
+                                password=pw,
+                                out_dir=extracted_dir,
+                                log_path=log_path,
+                            )
+                            last_error = None
+                            break
+                        except Exception as e:
+                            last_error = e
+                            if _is_wrong_zip_password_error(e) and pw is not attempts[-1]:
+                                _append_log(
+                                    log_path,
+                                    f"[WARN] zip extract failed (try next password): {zip_path.name} error={e}",
+                                )
+                                continue
+                            break
+
+                    if last_error is not None:
+                        hint = ""
+                        if isinstance(last_error, NotImplementedError) and (not _PYZIPPER_AVAILABLE):
+                            hint = " / AES暗号ZIPの可能性があります（pyzipperが必要）。"
+                        mail.slots.append((None, [
+                            f"ZIP展開に失敗: {zip_path.name} (subject={subject}) error={last_error}{hint}"
+                        ]))
+                        continue
+
+                    if not extracted_pdfs:
+                        mail.slots.append((None, [
+                            f"ZIP内にPDFが見つかりません: {zip_path.name} (subject={subject})"
+                        ]))
+                        continue
+
+                    for pdf_path in extracted_pdfs:
+                        try:
+                            rel = str(pdf_path.relative_to(extracted_dir))
+                        except Exception:
+                            rel = pdf_path.name
+                        display_name = f"{att_name}::{rel}"
+                        process_pdf(mail, pdf_path, display_name, process_kwargs)
+
+                if mail.attachments_saved == 0 and urls:
+                    mail.url_only_tasks.append(url_task())
+
+                defer_mail()
+
+            drain_mails(block=True)
+        _append_log(log_path, f"post-process pipeline: {pipeline.stats().summary()}")
 
         # Cleanup web browser sessions
         if _WEB_DOWNLOAD_AVAILABLE and cfg.enable_web_download:
@@ -4691,12 +5206,21 @@ def main(argv: Sequence[str] | None = None) -> int:
         if not dry_run and cfg.merge.enabled and printable:
             merged = run_dir / cfg.merge.output_name
             _append_log(log_path, f"merge pdfs: {len(printable)} -> {merged}")
-            _merge_pdfs(printable, merged)
-            merged_pdf_path = str(merged)
+            merged_pdf_paths = [
+                str(p)
+                for p in _merge_pdfs(
+                    printable,
+                    merged,
+                    merge_cfg=cfg.merge,
+                    log_path=log_path,
+                    unresolved=unresolved,
+                )
+            ]
+            merged_pdf_path = merged_pdf_paths[0] if merged_pdf_paths else None
 
         # Print (jidoka: do not print in dry-run)
         if do_print and printable:
-            targets = [Path(merged_pdf_path)] if merged_pdf_path else printable
+            targets = [Path(p) for p in merged_pdf_paths] if merged_pdf_paths else printable
             if cfg.print.method == "shell":
                 printer = cfg.print.printer_name or _default_printer()
                 for p in targets:
@@ -4723,6 +5247,9 @@ def main(argv: Sequence[str] | None = None) -> int:
                 f"URL-only mails detected: {len(url_only_tasks)} (web download is out of MVP scope)"
             )
 
+        if journal is not None:
+            journal.append("run", state="finished", saved=len(saved_rows), unresolved=len(unresolved))
+
         return _finalize_and_notify(
             cfg=cfg,
             run_id=run_id,
@@ -4741,6 +5268,7 @@ def main(argv: Sequence[str] | None = None) -> int:
             folder_path=folder_path,
             scanned=scanned,
             save_dir=save_dir,
+            merged_pdf_paths=merged_pdf_paths,
         )
 
     except Exception as e:
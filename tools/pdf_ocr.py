@@ -15,16 +15,21 @@ Usage:
     #  'issue_date': '20251107',
     #  'amount': 22803,
     #  'invoice_number': 'T1010701026820'}
+
+    # 複数PDFは1回のOCRジョブにまとめる（入力PDF → *_ocr.pdf / 失敗時None）
+    outputs = processor.run_ocr_batch([Path("a.pdf"), Path("b.pdf")])
 """
 import os
 import re
 import shutil
 import subprocess
 import sys
+import tempfile
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Sequence
 
 # PyMuPDFでテキスト抽出
 try:
@@ -59,6 +64,11 @@ class PDFOCRProcessor:
 
     # OCR-JAのパス（RK10配下に配置）
     OCR_JA_DIR = Path(r"C:\ProgramData\RK10\Tools\OCR-JA")
+    # inputフォルダ内の全PDFを処理するNodeスクリプト
+    OCR_COMMAND = ["node", "ocr_folder.js"]
+    # OCRジョブのタイムアウト（run_ocr_batchは件数に応じて延長）
+    OCR_TIMEOUT_SEC = 300
+    OCR_TIMEOUT_PER_FILE_SEC = 60
 
     def __init__(self):
         self.logger = get_logger()
@@ -162,41 +172,145 @@ class PDFOCRProcessor:
                 pass
 
         # OCR実行
+        if not self._run_ocr_job(timeout=self.OCR_TIMEOUT_SEC):
+            return None
+
+        # 出力ファイルを確認
+        output_name = pdf_path.stem + "_ocr.pdf"
+        output_file = self.output_dir / output_name
+
+        if output_file.exists():
+            self.logger.info(f"OCR完了: {output_file.name}")
+            return output_file
+
+        # エラーフォルダを確認
+        error_file = self.error_dir / pdf_path.name
+        if error_file.exists():
+            self.logger.error(f"OCR失敗（errorフォルダに移動）: {pdf_path.name}")
+            return None
+
+        self.logger.error(f"OCR出力ファイルが見つかりません: {output_name}")
+        return None
+
+    def run_ocr_batch(
+        self,
+        pdf_paths: Sequence[Path],
+        batch_size: Optional[int] = None,
+    ) -> Dict[Path, Optional[Path]]:
+        """複数PDFをまとめてOCR-JAに投入し、入力ごとの出力PDFを返す
+
+        ocr_folder.js はinputフォルダ全体を処理するため、回転補正済みの入力を
+        ステージングしてジョブを1回だけ起動する（Node起動・APIセッション確立がN回→1回）。
+        回転補正はバックグラウンドで先行して進め、batch_size を指定した場合は
+        ジョブ実行中に次のバッチの回転補正が並行して進む。
+
+        Args:
+            pdf_paths: 入力PDFパス
+            batch_size: 1ジョブあたりの最大件数（None=全件を1ジョブ）
+
+        Returns:
+            {入力PDFパス: 出力PDFパス（失敗時はNone）}（入力順）
+        """
+        pdf_paths = [Path(p) for p in pdf_paths]
+        results: Dict[Path, Optional[Path]] = {p: None for p in pdf_paths}
+        if not pdf_paths:
+            return results
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size は1以上を指定してください: {batch_size}")
+        size = batch_size or len(pdf_paths)
+        batches = [pdf_paths[i:i + size] for i in range(0, len(pdf_paths), size)]
+
+        # OCR-JAは入力名から出力名を決めるため、同名の入力は退避名にする
+        staged_names: Dict[Path, str] = {}
+        used: set = set()
+        for p in pdf_paths:
+            name = p.name
+            n = 2
+            while name.lower() in used:
+                name = f"{p.stem}__{n}{p.suffix}"
+                n += 1
+            used.add(name.lower())
+            staged_names[p] = name
+
+        self.logger.info(f"バッチOCR開始: {len(pdf_paths)}件 / {len(batches)}ジョブ")
+        with tempfile.TemporaryDirectory(prefix="ocr_ja_stage_") as tmp, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-rotate") as rotator:
+            stage_dir = Path(tmp)
+            # 回転補正は全件を先に投入し、ジョブ実行と並行して順に処理させる
+            staged: Dict[Path, Future] = {
+                p: rotator.submit(self._stage_for_ocr, p, stage_dir / staged_names[p])
+                for p in pdf_paths
+            }
+
+            for batch in batches:
+                submitted: List[Path] = []
+                for p in batch:
+                    try:
+                        staged_file = staged[p].result()
+                        shutil.move(str(staged_file), str(self.input_dir / staged_names[p]))
+                        submitted.append(p)
+                    except Exception as e:
+                        self.logger.error(f"OCR入力の準備に失敗: {p.name} - {e}")
+                if not submitted:
+                    continue
+
+                job_started = time.time()
+                timeout = max(self.OCR_TIMEOUT_SEC, self.OCR_TIMEOUT_PER_FILE_SEC * len(submitted))
+                ok = self._run_ocr_job(timeout=timeout)
+                for p in submitted:
+                    results[p] = self._collect_ocr_output(staged_names[p], since=job_started, job_ok=ok)
+
+        done = sum(1 for v in results.values() if v is not None)
+        self.logger.info(f"バッチOCR完了: 成功 {done}/{len(pdf_paths)}")
+        return results
+
+    def _stage_for_ocr(self, pdf_path: Path, staged_path: Path) -> Path:
+        """回転補正した入力をステージングフォルダへ置く（元ファイルは変更しない）"""
+        corrected_path = self.fix_rotation(pdf_path)
+        shutil.copy2(corrected_path, staged_path)
+        if corrected_path != pdf_path and corrected_path.exists():
+            try:
+                corrected_path.unlink()
+            except Exception:
+                pass
+        return staged_path
+
+    def _run_ocr_job(self, timeout: int) -> bool:
+        """ocr_folder.js を1回実行（inputフォルダ内の全PDFを処理）"""
         try:
             result = subprocess.run(
-                ["node", "ocr_folder.js"],
+                self.OCR_COMMAND,
                 cwd=str(self.OCR_JA_DIR),
                 capture_output=True,
                 text=True,
-                timeout=300  # 5分タイムアウト
+                timeout=timeout
             )
 
             if result.returncode != 0:
                 self.logger.error(f"OCR失敗: {result.stderr}")
-                return None
+                return False
 
         except subprocess.TimeoutExpired:
             self.logger.error("OCRタイムアウト")
-            return None
+            return False
         except Exception as e:
             self.logger.error(f"OCR実行エラー: {e}")
-            return None
-
-        # 出力ファイルを確認
-        output_name = pdf_path.stem + "_ocr.pdf"
-        output_file = self.output_dir / output_name
+            return False
+        return True
 
-        if output_file.exists():
+    def _collect_ocr_output(self, staged_name: str, since: float, job_ok: bool) -> Optional[Path]:
+        """ジョブ後の output/*_ocr.pdf と error/ を入力1件に対応付ける"""
+        output_file = self.output_dir / (Path(staged_name).stem + "_ocr.pdf")
+        # 以前の実行の出力を成功と誤認しない
+        if output_file.exists() and output_file.stat().st_mtime >= since - 1:
             self.logger.info(f"OCR完了: {output_file.name}")
             return output_file
 
-        # エラーフォルダを確認
-        error_file = self.error_dir / pdf_path.name
+        error_file = self.error_dir / staged_name
         if error_file.exists():
-            self.logger.error(f"OCR失敗（errorフォルダに移動）: {pdf_path.name}")
-            return None
-
-        self.logger.error(f"OCR出力ファイルが見つかりません: {output_name}")
+            self.logger.error(f"OCR失敗（errorフォルダに移動）: {staged_name}")
+        elif job_ok:
+            self.logger.error(f"OCR出力ファイルが見つかりません: {output_file.name}")
         return None
 
     def extract_text(self, pdf_path: Path) -> str:
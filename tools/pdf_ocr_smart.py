@@ -28,10 +28,12 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, List
 import re
+from contextlib import nullcontext
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from common.logger import get_logger
+from common.spans import SpanRecorder, profile_to, span, timed
 
 # 前処理モジュール
 from pdf_preprocess import PDFPreprocessor, PreprocessResult, SKEW_THRESHOLD_DEFAULT
@@ -247,6 +249,7 @@ class SmartOCRProcessor:
 
         return master
 
+    @timed("fallback_t_number")
     def _lookup_vendor_by_t_number(self, t_number: str) -> str:
         """
         T番号から会社名を検索
@@ -329,6 +332,7 @@ class SmartOCRProcessor:
 
         return min(score, 1.0)
 
+    @timed("fallback_amount")
     def _extract_amount_fallback(self, text: str) -> int:
         """
         raw_textから金額をフォールバック抽出
@@ -372,6 +376,7 @@ class SmartOCRProcessor:
         # 最大値を返す（複数候補がある場合）
         return max(amounts) if amounts else 0
 
+    @timed("fallback_filename")
     def _extract_from_filename(self, filename: str) -> dict:
         """
         ファイル名から金額・日付・店舗名を抽出
@@ -480,6 +485,7 @@ class SmartOCRProcessor:
 
         return result
 
+    @timed("fallback_vendor")
     def _extract_vendor_fallback(self, text: str) -> str:
         """
         raw_textから取引先名をフォールバック抽出
@@ -619,22 +625,47 @@ class SmartOCRProcessor:
         output_dir: Path = None,
         skip_preprocess: bool = False,
         auto_queue: bool = True,
-        debug_all: bool = False
+        debug_all: bool = False,
+        run_context=None,
+        profile_dir: Path = None
     ) -> SmartOCRResult:
         """
         PDFをスマートOCR処理
 
+        段階ごとの所要時間（ms）を result.preprocess_info["stage_ms"] に記録する
+        （例: "preprocess/render", "preprocess/skew_detect", "yomitoku_lite", "easyocr", "fallback_vendor"）。
+
         Args:
             pdf_path: 入力PDFパス
             output_dir: 前処理済みPDFの出力先
             skip_preprocess: 前処理をスキップするか
             auto_queue: 低信頼度時に自動的にキューに追加するか
             debug_all: 全ファイルでデバッグログを出力（通常はNG時のみ）
+            run_context: 証跡台帳の RunContext（指定時は stage_ms:<ファイル名> をメトリクスに追加）
+            profile_dir: 指定時は <stem>.prof（cProfile）と <stem>.folded（段階別 collapsed stack）を出力
 
         Returns:
             処理結果
         """
         pdf_path = Path(pdf_path)
+        recorder = SpanRecorder()
+        profiling = profile_to(profile_dir, pdf_path.stem, recorder) if profile_dir else nullcontext()
+        with profiling, recorder.activate():
+            result = self._process(pdf_path, output_dir, skip_preprocess, auto_queue, debug_all)
+
+        result.preprocess_info["stage_ms"] = recorder.totals_ms()
+        recorder.emit_metrics(run_context, key=f"stage_ms:{pdf_path.name}")
+        return result
+
+    def _process(
+        self,
+        pdf_path: Path,
+        output_dir: Path,
+        skip_preprocess: bool,
+        auto_queue: bool,
+        debug_all: bool
+    ) -> SmartOCRResult:
+        """process() の本体（span 計測は呼び出し側で有効化）"""
         result = SmartOCRResult()
 
         if not pdf_path.exists():
@@ -705,7 +736,8 @@ class SmartOCRProcessor:
             # カスケードモードの場合: まずliteで実行、欠損時のみfullで再実行
             if self.cascade_mode:
                 # 1st pass: lite=True
-                ocr_result = self.get_ocr_processor(lite=True).process_pdf(ocr_target)
+                with span("yomitoku_lite"):
+                    ocr_result = self.get_ocr_processor(lite=True).process_pdf(ocr_target)
                 result.preprocess_info["cascade_1st_pass"] = "lite"
 
                 # 欠損チェック（vendor空 or date空 or amount=0）
@@ -729,12 +761,14 @@ class SmartOCRProcessor:
                     )
 
                     # 2nd pass: lite=False（フルモデル）
-                    ocr_result = self.get_ocr_processor(lite=False).process_pdf(ocr_target)
+                    with span("yomitoku_full"):
+                        ocr_result = self.get_ocr_processor(lite=False).process_pdf(ocr_target)
                     result.preprocess_info["cascade_2nd_pass"] = "full"
                     result.preprocess_info["cascade_reason"] = missing_info
             else:
                 # 通常モード（lite_modeの設定に従う）
-                ocr_result = self.ocr_processor.process_pdf(ocr_target)
+                with span("yomitoku_lite" if self.lite_mode else "yomitoku_full"):
+                    ocr_result = self.ocr_processor.process_pdf(ocr_target)
 
             # 結果をコピー
             result.vendor_name = ocr_result.vendor_name
@@ -753,7 +787,8 @@ class SmartOCRProcessor:
             if yomitoku_score < 0.5 and EASYOCR_AVAILABLE and self.easyocr_processor:
                 self.logger.info(f"YomiToku信頼度低 ({yomitoku_score:.2f}) → EasyOCRフォールバック")
                 try:
-                    easyocr_result = self.easyocr_processor.process_pdf(ocr_target)
+                    with span("easyocr"):
+                        easyocr_result = self.easyocr_processor.process_pdf(ocr_target)
                     easyocr_score = self.evaluate_confidence(easyocr_result)
 
                     self.logger.info(f"EasyOCR信頼度: {easyocr_score:.2f}")
@@ -979,7 +1014,9 @@ class SmartOCRProcessor:
         self,
         pdf_dir: Path,
         output_dir: Path = None,
-        dry_run: bool = False
+        dry_run: bool = False,
+        run_context=None,
+        profile_dir: Path = None
     ) -> List[SmartOCRResult]:
         """
         ディレクトリ内の全PDFをバッチ処理
@@ -988,6 +1025,8 @@ class SmartOCRProcessor:
             pdf_dir: PDFディレクトリ
             output_dir: 出力ディレクトリ
             dry_run: ドライラン（実際の処理をしない）
+            run_context: 証跡台帳の RunContext（PDFごとの stage_ms を追加）
+            profile_dir: PDFごとのプロファイル出力先（process() 参照）
 
         Returns:
             処理結果のリスト
@@ -1003,7 +1042,9 @@ class SmartOCRProcessor:
                 self.logger.info(f"[DRY-RUN] {pdf_path.name}")
                 continue
 
-            result = self.process(pdf_path, output_dir)
+            result = self.process(
+                pdf_path, output_dir, run_context=run_context, profile_dir=profile_dir
+            )
             results.append(result)
 
         # サマリー
@@ -1029,6 +1070,8 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="ドライラン")
     parser.add_argument("--gpu", action="store_true", help="GPU使用")
     parser.add_argument("--no-lite", action="store_true", help="フルモデル使用")
+    parser.add_argument("--profile", type=Path, metavar="DIR",
+                        help="PDFごとに <stem>.prof（cProfile）と <stem>.folded（段階別）を出力")
 
     args = parser.parse_args()
 
@@ -1044,7 +1087,7 @@ def main():
     if args.batch:
         # バッチ処理
         sample_dir = Path(r"C:\ProgramData\RK10\Robots\44PDF一般経費楽楽精算申請\docs\sample PDF")
-        results = processor.process_batch(sample_dir, dry_run=args.dry_run)
+        results = processor.process_batch(sample_dir, dry_run=args.dry_run, profile_dir=args.profile)
 
         print("\n=== バッチ処理結果 ===")
         for r in results:
@@ -1054,7 +1097,7 @@ def main():
 
     elif args.pdf:
         # 単一ファイル処理
-        result = processor.process(Path(args.pdf))
+        result = processor.process(Path(args.pdf), profile_dir=args.profile)
 
         print("\n=== スマートOCR結果 ===")
         print(f"取引先名: {result.vendor_name}")
@@ -1092,7 +1135,7 @@ def main():
                 continue
 
             print(f"\n--- {fname} ---")
-            result = processor.process(pdf_path)
+            result = processor.process(pdf_path, profile_dir=args.profile)
 
             status = "OK" if result.success else ("MANUAL" if result.requires_manual else "ERROR")
             print(f"  ステータス: {status}")
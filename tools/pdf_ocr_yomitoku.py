@@ -13,6 +13,7 @@ Usage:
     processor = YomiTokuOCRProcessor()
     result = processor.process_pdf("receipt.pdf")
 """
+import importlib.util
 import os
 import sys
 import re
@@ -21,13 +22,8 @@ from pathlib import Path
 from dataclasses import dataclass
 from typing import Optional
 
-# YomiToku
-try:
-    from yomitoku import DocumentAnalyzer
-    from yomitoku.data.functions import load_image
-    YOMITOKU_AVAILABLE = True
-except ImportError:
-    YOMITOKU_AVAILABLE = False
+# YomiToku（読み込みは common.ocr_server 側。ここでは有無だけ確認する）
+YOMITOKU_AVAILABLE = importlib.util.find_spec("yomitoku") is not None
 
 # PyMuPDF（PDF→画像変換用）
 try:
@@ -39,6 +35,7 @@ except ImportError:
 # 共通モジュール
 sys.path.insert(0, str(Path(__file__).parent))
 from common.logger import get_logger
+from common.ocr_server import get_yomitoku_analyzer, yomitoku_analyze
 from ocr_dictionary import correct_ocr_text
 
 
@@ -84,22 +81,11 @@ class YomiTokuOCRProcessor:
 
     @property
     def analyzer(self):
-        """DocumentAnalyzerの遅延初期化"""
+        """DocumentAnalyzerの遅延初期化（同じ設定のプロセッサ間で共有）"""
         if self._analyzer is None:
             device = "cuda" if self.use_gpu else "cpu"
             self.logger.info(f"YomiToku初期化: device={device}, lite={self.lite_mode}")
-
-            configs = {}
-            if self.lite_mode:
-                configs = {
-                    "ocr": {"model_name": "lite"},
-                    "layout_analyzer": {"model_name": "lite"},
-                }
-
-            self._analyzer = DocumentAnalyzer(
-                configs=configs,
-                device=device
-            )
+            self._analyzer = get_yomitoku_analyzer(lite_mode=self.lite_mode, gpu=self.use_gpu)
         return self._analyzer
 
     def pdf_to_image(self, pdf_path: Path, dpi: int = 300) -> Path:
@@ -119,9 +105,8 @@ class YomiTokuOCRProcessor:
         return temp_path
 
     def extract_text(self, image_path: Path) -> str:
-        """画像からテキストを抽出"""
-        img = load_image(str(image_path))
-        result, _, _ = self.analyzer(img)
+        """画像からテキストを抽出（OCR モデルサーバが起動していればそちらのモデルを使う）"""
+        result = yomitoku_analyze(str(image_path), lite_mode=self.lite_mode, gpu=self.use_gpu)
 
         # 全テキストを結合
         text_parts = []
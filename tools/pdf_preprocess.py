@@ -32,6 +32,7 @@ from PIL import Image
 import io
 
 from common.logger import get_logger
+from common.spans import timed
 from pdf_rotation_detect import PDFRotationDetector
 
 
@@ -76,6 +77,7 @@ class PDFPreprocessor:
         self.dpi = dpi
         self.logger = get_logger()
 
+    @timed("render")
     def pdf_to_image(self, pdf_path: Path) -> np.ndarray:
         """PDFを画像に変換"""
         doc = fitz.open(str(pdf_path))
@@ -96,6 +98,7 @@ class PDFPreprocessor:
         doc.close()
         return img
 
+    @timed("write_pdf")
     def image_to_pdf(self, img: np.ndarray, output_path: Path) -> Path:
         """画像をPDFに変換"""
         # numpy → PIL
@@ -106,6 +109,7 @@ class PDFPreprocessor:
 
         return output_path
 
+    @timed("rotation_detect")
     def detect_page_orientation(self, pdf_path: Path, force_4way: bool = True) -> Tuple[bool, int]:
         """
         ページの向きを検出（4方向全自動判定対応）
@@ -266,6 +270,7 @@ class PDFPreprocessor:
         # 中央値を使用（外れ値に強い）
         return np.median(angles)
 
+    @timed("skew_detect")
     def detect_skew_angle(self, img: np.ndarray) -> float:
         """
         傾き角度を検出（改善Hough法優先）
@@ -300,6 +305,7 @@ class PDFPreprocessor:
         # 両方とも0に近い → 傾きなし
         return 0.0
 
+    @timed("deskew")
     def deskew_image(self, img: np.ndarray, angle: float, threshold: float = SKEW_THRESHOLD_DEFAULT) -> np.ndarray:
         """
         画像の傾きを補正
@@ -342,6 +348,7 @@ class PDFPreprocessor:
 
         return rotated
 
+    @timed("enhance")
     def enhance_image(self, img: np.ndarray) -> np.ndarray:
         """
         OCR向けの画像強調
@@ -367,6 +374,7 @@ class PDFPreprocessor:
 
         return result
 
+    @timed("binarize")
     def adaptive_binarize_sauvola(self, img: np.ndarray, window_size: int = 25, k: float = 0.2) -> np.ndarray:
         """
         Sauvola法による適応的二値化（FAX画像に効果的）
@@ -403,6 +411,7 @@ class PDFPreprocessor:
         self.logger.debug(f"Sauvola二値化実行: window={window_size}, k={k}")
         return result
 
+    @timed("denoise")
     def denoise_bilateral(self, img: np.ndarray, d: int = 9, sigma_color: float = 75, sigma_space: float = 75) -> np.ndarray:
         """
         バイラテラルフィルタによるノイズ除去
@@ -422,6 +431,7 @@ class PDFPreprocessor:
         self.logger.debug(f"バイラテラルフィルタ実行: d={d}")
         return result
 
+    @timed("moire_removal")
     def remove_moire(self, img: np.ndarray, kernel_size: int = 3) -> np.ndarray:
         """
         モアレパターン除去
@@ -450,6 +460,7 @@ class PDFPreprocessor:
         self.logger.debug(f"モアレ除去実行: kernel={kernel_size}")
         return result
 
+    @timed("border")
     def add_border(self, img: np.ndarray, border_size: int = 10) -> np.ndarray:
         """
         画像に白ボーダーを追加（OCR認識向上）
@@ -471,6 +482,7 @@ class PDFPreprocessor:
         self.logger.debug(f"白ボーダー追加: {border_size}px")
         return result
 
+    @timed("thickness_adjust")
     def adjust_character_thickness(self, img: np.ndarray, mode: str = 'auto') -> np.ndarray:
         """
         文字の太さを調整（膨張/収縮）
@@ -519,6 +531,7 @@ class PDFPreprocessor:
         # RGBに戻す
         return cv2.cvtColor(processed, cv2.COLOR_GRAY2RGB)
 
+    @timed("sharpen")
     def sharpen_unsharp_mask(self, img: np.ndarray, sigma: float = 1.0, strength: float = 1.5) -> np.ndarray:
         """
         アンシャープマスクで文字エッジを強調
@@ -539,6 +552,7 @@ class PDFPreprocessor:
         self.logger.debug(f"アンシャープマスク実行: sigma={sigma}, strength={strength}")
         return result
 
+    @timed("stretch")
     def stretch_contrast(self, img: np.ndarray, percentile: tuple = (2, 98)) -> np.ndarray:
         """
         パーセンタイルベースのコントラストストレッチ
@@ -573,6 +587,7 @@ class PDFPreprocessor:
         # RGBに戻す
         return cv2.cvtColor(stretched, cv2.COLOR_GRAY2RGB)
 
+    @timed("upscale")
     def upscale_image(self, img: np.ndarray) -> np.ndarray:
         """
         低解像度画像をアップスケール
@@ -608,6 +623,7 @@ class PDFPreprocessor:
 
         return upscaled
 
+    @timed("shadow_detect")
     def detect_shadow(self, img: np.ndarray) -> bool:
         """
         影の存在を検出
@@ -644,6 +660,7 @@ class PDFPreprocessor:
 
         return has_shadow
 
+    @timed("shadow_removal")
     def remove_shadow(self, img: np.ndarray) -> np.ndarray:
         """
         影を除去
@@ -692,6 +709,7 @@ class PDFPreprocessor:
         self.logger.info("影除去処理を実行")
         return result
 
+    @timed("preprocess")
     def preprocess(
         self,
         pdf_path: Path,
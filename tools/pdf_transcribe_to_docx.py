@@ -11,19 +11,27 @@ Key behaviors:
   - Each PDF page starts on a new DOCX page (page break between pages)
   - Ruby (furigana) is detected by layout: small kana text positioned just above
     larger base text with horizontal overlap, then removed.
+  - --workers N parallelizes across PDFs (or across pages with --only); the DOCX
+    bytes are identical to a serial run.
 
 Usage:
   python tools/pdf_transcribe_to_docx.py ^
     --input-root "C:\\path\\to\\pdf_root" ^
-    --output-root "C:\\path\\to\\pdf_root\\docx_out"
+    --output-root "C:\\path\\to\\pdf_root\\docx_out" ^
+    --workers 4
 """
 
 from __future__ import annotations
 
 import argparse
+import bisect
+import io
+import math
 import re
 import sys
 import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable
@@ -94,6 +102,47 @@ def _overlap_ratio(a: TextSpan, b: TextSpan) -> float:
     return overlap / denom
 
 
+class _SpanGrid:
+    """
+    Spans bucketed by x into fixed-width columns; each column is sorted by y0.
+
+    A span is registered in every column its [x0, x1] touches, so any span with
+    positive horizontal overlap against a query range shares at least one column
+    with it. Column width follows the typical glyph width of the page.
+    """
+
+    def __init__(self, spans: list[TextSpan]) -> None:
+        widths = sorted(s.width for s in spans if s.width > 0)
+        median = widths[len(widths) // 2] if widths else 0.0
+        self.cell = max(1.0, median * 4.0)
+        columns: dict[int, list[TextSpan]] = {}
+        for s in spans:
+            for c in range(self._col(s.x0), self._col(s.x1) + 1):
+                columns.setdefault(c, []).append(s)
+        self._columns: dict[int, tuple[list[float], list[TextSpan]]] = {}
+        for c, col in columns.items():
+            col.sort(key=lambda s: (s.y0, s.x0))
+            self._columns[c] = ([s.y0 for s in col], col)
+
+    def _col(self, x: float) -> int:
+        return math.floor(x / self.cell)
+
+    def candidates(self, x0: float, x1: float, y_min: float, y_max: float) -> list[TextSpan]:
+        """Spans touching the columns of [x0, x1] with y_min <= y0 <= y_max."""
+        seen: set[int] = set()
+        out: list[TextSpan] = []
+        for c in range(self._col(x0), self._col(x1) + 1):
+            entry = self._columns.get(c)
+            if entry is None:
+                continue
+            ys, col = entry
+            for b in col[bisect.bisect_left(ys, y_min) : bisect.bisect_right(ys, y_max)]:
+                if b.span_id not in seen:
+                    seen.add(b.span_id)
+                    out.append(b)
+        return out
+
+
 def _detect_ruby_span_ids(spans: list[TextSpan]) -> set[int]:
     """
     Detect ruby spans by geometry.
@@ -102,23 +151,11 @@ def _detect_ruby_span_ids(spans: list[TextSpan]) -> set[int]:
       - span contains kana (ruby is typically kana)
       - there is a larger span immediately below it, with horizontal overlap,
         and very small vertical gap.
-    """
-    # Sort by y0 for searching base text below.
-    spans_by_y = sorted(spans, key=lambda s: (s.y0, s.x0))
-    y0_list = [s.y0 for s in spans_by_y]
-
-    # Simple binary search helpers (avoid importing bisect in tight loop)
-    def lower_bound(value: float) -> int:
-        lo = 0
-        hi = len(y0_list)
-        while lo < hi:
-            mid = (lo + hi) // 2
-            if y0_list[mid] < value:
-                lo = mid + 1
-            else:
-                hi = mid
-        return lo
 
+    Candidates are looked up through _SpanGrid (x buckets, each sorted by y0),
+    so only spans that share an x bucket with the ruby candidate are checked.
+    """
+    grid = _SpanGrid(spans)
     ruby_ids: set[int] = set()
 
     for s in spans:
@@ -137,15 +174,9 @@ def _detect_ruby_span_ids(spans: list[TextSpan]) -> set[int]:
         # Ruby-to-base gap is typically within ~1-2 ruby heights.
         search_y_max = s.y1 + max(8.0, s.height * 2.2)
 
-        start = lower_bound(search_y_min)
-        best_base: TextSpan | None = None
-        best_score: float | None = None
-
-        for b in spans_by_y[start:]:
+        for b in grid.candidates(s.x0, s.x1, search_y_min, search_y_max):
             if b.span_id == s.span_id:
                 continue
-            if b.y0 > search_y_max:
-                break
 
             # Base must be below or slightly overlapping.
             gap = b.y0 - s.y1
@@ -157,19 +188,11 @@ def _detect_ruby_span_ids(spans: list[TextSpan]) -> set[int]:
                 continue
 
             # Must overlap horizontally.
-            ov = _overlap_ratio(s, b)
-            if ov < 0.35:
+            if _overlap_ratio(s, b) < 0.35:
                 continue
 
-            # Prefer closest vertical match and strong overlap.
-            # Smaller score is better.
-            score = abs(gap) - (ov * 0.5)
-            if best_score is None or score < best_score:
-                best_score = score
-                best_base = b
-
-        if best_base is not None:
             ruby_ids.add(s.span_id)
+            break
 
     return ruby_ids
 
@@ -470,29 +493,87 @@ def _configure_doc_defaults(doc: Document) -> None:
     style.paragraph_format.line_spacing = 1.0
 
 
-def transcribe_pdf_to_docx(pdf_path: Path, output_docx_path: Path) -> None:
-    reiwa_year = _infer_reiwa_year_from_filename(pdf_path)
+# Fixed zip entry timestamp so identical content always gives identical bytes
+# (python-docx stamps every part with the current time).
+_DOCX_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
 
-    doc = Document()
-    _configure_doc_defaults(doc)
 
+def _extract_page_range(pdf_path: Path, start: int, stop: int, reiwa_year: int | None) -> list[list[str]]:
+    """Extract lines for pages [start, stop). Runs in worker processes (opens the PDF by path)."""
+    pdf = fitz.open(pdf_path)
+    try:
+        return [extract_page_text_lines(pdf[i], reiwa_year=reiwa_year) for i in range(start, stop)]
+    finally:
+        pdf.close()
+
+
+def extract_pdf_page_lines(pdf_path: Path, *, workers: int = 1) -> list[list[str]]:
+    """
+    Extract the text lines of every page, in page order.
+
+    workers > 1 splits the pages into contiguous ranges extracted by a process
+    pool; results are reassembled by page index, so the output matches serial mode.
+    """
+    reiwa_year = _infer_reiwa_year_from_filename(pdf_path)
     pdf = fitz.open(pdf_path)
     try:
-        for i, page in enumerate(pdf):
-            lines = extract_page_text_lines(page, reiwa_year=reiwa_year)
-            if not lines:
-                # Preserve page boundary even when text is empty.
-                doc.add_paragraph("")
-            else:
-                for line in lines:
-                    doc.add_paragraph(line)
-            if i != len(pdf) - 1:
-                doc.add_page_break()
+        page_count = len(pdf)
     finally:
         pdf.close()
 
+    workers = max(1, min(workers, page_count))
+    if workers == 1:
+        return _extract_page_range(pdf_path, 0, page_count, reiwa_year)
+
+    # A few ranges per worker keeps the pool busy when page cost is uneven.
+    chunk = max(1, -(-page_count // (workers * 4)))
+    ranges = [(i, min(i + chunk, page_count)) for i in range(0, page_count, chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_page_range, pdf_path, a, b, reiwa_year) for a, b in ranges]
+        return [lines for fut in futures for lines in fut.result()]
+
+
+def _save_docx(doc: Document, output_docx_path: Path) -> None:
+    buf = io.BytesIO()
+    doc.save(buf)
+    buf.seek(0)
     output_docx_path.parent.mkdir(parents=True, exist_ok=True)
-    doc.save(str(output_docx_path))
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(output_docx_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            fixed = zipfile.ZipInfo(info.filename, date_time=_DOCX_ZIP_DATE_TIME)
+            fixed.compress_type = zipfile.ZIP_DEFLATED
+            fixed.external_attr = info.external_attr
+            dst.writestr(fixed, src.read(info.filename))
+
+
+def write_docx(pages: list[list[str]], output_docx_path: Path) -> None:
+    doc = Document()
+    _configure_doc_defaults(doc)
+
+    for i, lines in enumerate(pages):
+        if not lines:
+            # Preserve page boundary even when text is empty.
+            doc.add_paragraph("")
+        else:
+            for line in lines:
+                doc.add_paragraph(line)
+        if i != len(pages) - 1:
+            doc.add_page_break()
+
+    _save_docx(doc, output_docx_path)
+
+
+def transcribe_pdf_to_docx(pdf_path: Path, output_docx_path: Path, *, workers: int = 1) -> None:
+    write_docx(extract_pdf_page_lines(pdf_path, workers=workers), output_docx_path)
+
+
+def _transcribe_one(pdf_path: Path, out_path: Path) -> str | None:
+    """Document-level worker: returns an error message instead of raising."""
+    try:
+        transcribe_pdf_to_docx(pdf_path, out_path)
+        return None
+    except Exception as e:
+        return str(e)
 
 
 def _iter_pdf_files(root: Path) -> Iterable[Path]:
@@ -511,6 +592,12 @@ def main(argv: list[str]) -> int:
         help="Process only this PDF (absolute path or path relative to --input-root).",
     )
     parser.add_argument("--skip-existing", action="store_true", help="Skip if output docx already exists.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes: across PDFs when there are several, across pages for a single PDF.",
+    )
     args = parser.parse_args(argv)
 
     input_root: Path = args.input_root
@@ -541,18 +628,37 @@ def main(argv: list[str]) -> int:
     skipped = 0
     failed = 0
 
+    jobs: list[tuple[Path, Path]] = []
     for pdf_path in pdf_paths:
         rel = pdf_path.relative_to(input_root)
         out_path = (output_root / rel).with_suffix(".docx")
         if args.skip_existing and out_path.exists():
             skipped += 1
             continue
-        try:
-            transcribe_pdf_to_docx(pdf_path, out_path)
+        jobs.append((pdf_path, out_path))
+
+    workers = max(1, args.workers)
+    if workers > 1 and len(jobs) > 1:
+        # Document-level: one PDF per worker; page extraction stays serial inside.
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(_transcribe_one, pdf_path, out_path) for pdf_path, out_path in jobs]
+            errors = [fut.result() for fut in futures]
+    else:
+        # A single PDF uses the workers for its pages instead.
+        errors = []
+        for pdf_path, out_path in jobs:
+            try:
+                transcribe_pdf_to_docx(pdf_path, out_path, workers=workers)
+                errors.append(None)
+            except Exception as e:
+                errors.append(str(e))
+
+    for (pdf_path, out_path), err in zip(jobs, errors):
+        if err is None:
             ok += 1
-        except Exception as e:
+        else:
             failed += 1
-            print(f"ERROR: failed: {pdf_path} -> {out_path}: {e}", file=sys.stderr)
+            print(f"ERROR: failed: {pdf_path} -> {out_path}: {err}", file=sys.stderr)
 
     print(f"Done. OK={ok} Skipped={skipped} Failed={failed}")
     return 0 if failed == 0 else 1
@@ -4,6 +4,10 @@
 
 PDFをアップロードしてOCR自動入力後、内容を確認・確定する
 
+explicit_waits=True（main_44_rk10 --run-all の一括処理）では固定 sleep の代わりに
+画面の準備完了条件（要素の表示・消滅、ネットワーク待ち）を待つ。register() は
+ログイン済みのコンテキストで 1 件ずつ登録し、工程ごとに span を記録する。
+
 Usage:
     python rakuraku_upload.py --pdf "取引先名_20251107_22803.pdf"
 """
@@ -12,7 +16,7 @@ import os
 import sys
 import time
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict
 from dataclasses import dataclass
 
 # 共通モジュールをインポートできるようにパス追加
@@ -21,6 +25,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from common.config_loader import load_config, get_env
 from common.credential_manager import get_credential, get_credential_value
 from common.logger import setup_logger, get_logger, LogContext
+from common.spans import span
 
 # Playwrightインポート
 try:
@@ -47,19 +52,60 @@ class ReceiptData:
 class RakurakuUploader:
     """楽楽精算アップローダー"""
 
-    def __init__(self, config: dict):
+    # explicit_waits 時の準備完了条件
+    LOGIN_FORM_SELECTOR = "input[name='loginId']"
+    UPLOAD_INPUT_SELECTOR = "input[type='file']"
+    OCR_READY_SELECTOR = "input[name='supplierName(0)']"
+    CONFIRM_BUTTON_SELECTOR = "button.accesskeyOk, button:has-text('確定')"
+
+    def __init__(self, config: dict, explicit_waits: bool = False):
         """
         Args:
             config: 設定辞書
+            explicit_waits: True なら固定 sleep の代わりに準備完了条件を待つ
         """
         self.config = config
         self.base_url = config.get("RAKURAKU_URL", "https://rsatonality.rakurakuseisan.jp/")
         self.credential_name = config.get("CREDENTIAL_RAKURAKU", "RK10_RakurakuSeisan")
+        self.explicit_waits = explicit_waits
+        self.ready_timeout_ms = int(config.get("RAKURAKU_READY_TIMEOUT_MS", 30000))
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
         self.logger = get_logger()
 
+    def _settle(self, seconds: float, ready: Optional[Callable[[], None]] = None):
+        """固定待機。explicit_waits 時は ready() が返るまで待つ（失敗は警告のみ）"""
+        if not self.explicit_waits:
+            time.sleep(seconds)
+            return
+        if ready is None:
+            return
+        try:
+            ready()
+        except Exception as e:
+            self.logger.warning(f"準備完了待ちタイムアウト: {e}")
+
+    @staticmethod
+    def _wait_until(condition: Callable[[], bool], timeout_s: float, interval_s: float = 0.1) -> bool:
+        """condition() が True になるまでポーリング（timeout_s で False）"""
+        deadline = time.monotonic() + timeout_s
+        while True:
+            try:
+                if condition():
+                    return True
+            except Exception:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval_s)
+
+    def _login_done(self) -> bool:
+        current_url = self.page.url
+        if "mainView" in current_url or "Top" in current_url:
+            return True
+        return self.page.locator(self.LOGIN_FORM_SELECTOR).count() == 0
+
     def _get_credentials(self) -> tuple:
         """資格情報を取得"""
         # 方法1: 統合資格情報
@@ -117,7 +163,8 @@ class RakurakuUploader:
             self.logger.info(f"アクセス: {self.base_url}")
             self.page.goto(self.base_url)
             self.page.wait_for_load_state("domcontentloaded")
-            time.sleep(3)
+            self._settle(3, lambda: self.page.locator("input[type='password']").first.wait_for(
+                state="visible", timeout=self.ready_timeout_ms))
 
             self.logger.info("ログイン情報入力...")
 
@@ -137,20 +184,20 @@ class RakurakuUploader:
 
             # ログイン完了待機
             self.logger.info("ログイン待機中...")
-            for i in range(15):
-                time.sleep(1)
-                current_url = self.page.url
-
-                if "mainView" in current_url or "Top" in current_url:
-                    self.logger.info("ログイン成功")
-                    break
-
-                login_form = self.page.locator("input[name='loginId']")
-                if login_form.count() == 0:
+            if self.explicit_waits:
+                if self._wait_until(self._login_done, 15):
                     self.logger.info("ログイン成功")
-                    break
+                else:
+                    raise RuntimeError("ログイン失敗: ログイン画面から遷移しません")
+            else:
+                for i in range(15):
+                    time.sleep(1)
+                    if self._login_done():
+                        self.logger.info("ログイン成功")
+                        break
 
-            time.sleep(3)
+            self._settle(3, lambda: self.page.wait_for_load_state(
+                "domcontentloaded", timeout=self.ready_timeout_ms))
 
     def navigate_to_receipt_form(self):
         """領収書/請求書新規登録画面へ移動"""
@@ -159,7 +206,8 @@ class RakurakuUploader:
             self.logger.info(f"アクセス: {receipt_url}")
             self.page.goto(receipt_url, timeout=90000)
             self.page.wait_for_load_state("domcontentloaded")
-            time.sleep(3)
+            self._settle(3, lambda: self.page.locator(self.UPLOAD_INPUT_SELECTOR).first.wait_for(
+                state="attached", timeout=self.ready_timeout_ms))
             self.logger.info(f"現在URL: {self.page.url}")
 
     def upload_pdf(self, pdf_path: str) -> bool:
@@ -192,9 +240,7 @@ class RakurakuUploader:
                 file_chooser.set_files(abs_path)
                 self.logger.info("アップロード完了（filechooser方式）")
 
-                # OCR処理待機
-                self.logger.info("OCR処理待機中（20秒）...")
-                time.sleep(20)
+                self._wait_ocr_done()
                 return True
 
             except Exception as e:
@@ -206,7 +252,7 @@ class RakurakuUploader:
                 if file_input.count() > 0:
                     file_input.first.set_input_files(abs_path)
                     self.logger.info("アップロード完了（input[type='file']方式）")
-                    time.sleep(20)
+                    self._wait_ocr_done()
                     return True
             except Exception as e:
                 self.logger.warning(f"input[type='file']方式失敗: {e}")
@@ -214,6 +260,21 @@ class RakurakuUploader:
             self.logger.error("アップロード失敗")
             return False
 
+    def _wait_ocr_done(self):
+        """OCR 自動入力の完了待ち（従来は固定 20 秒）"""
+        if not self.explicit_waits:
+            self.logger.info("OCR処理待機中（20秒）...")
+            time.sleep(20)
+            return
+        self.logger.info("OCR処理待機中（入力欄の表示・通信完了まで）...")
+
+        def ready():
+            self.page.locator(self.OCR_READY_SELECTOR).first.wait_for(
+                state="visible", timeout=self.ready_timeout_ms)
+            self.page.wait_for_load_state("networkidle", timeout=self.ready_timeout_ms)
+
+        self._settle(20, ready)
+
     def fill_form(self, data: ReceiptData):
         """フォームに入力
 
@@ -279,7 +340,8 @@ class RakurakuUploader:
                 except Exception as e:
                     self.logger.warning(f"金額入力失敗: {e}")
 
-            time.sleep(2)
+            self._settle(2, lambda: self.page.wait_for_load_state(
+                "networkidle", timeout=self.ready_timeout_ms))
 
     def _fill_date_fields(self, prefix: str, date_str: str):
         """日付フィールドに入力
@@ -336,16 +398,19 @@ class RakurakuUploader:
 
             try:
                 # 確定ボタンをクリック（classにkakuteiを含むボタン）
-                confirm_btn = self.page.locator("button.accesskeyOk, button:has-text('確定')").first
+                confirm_btn = self.page.locator(self.CONFIRM_BUTTON_SELECTOR).first
                 if confirm_btn.count() > 0:
                     confirm_btn.scroll_into_view_if_needed()
-                    time.sleep(1)
+                    self._settle(1)
                     confirm_btn.click()
                     self.logger.info("確定ボタンクリック")
                 else:
                     self.logger.warning("確定ボタンが見つかりません")
                     return False
 
+                if self.explicit_waits:
+                    return self._wait_submit_done(confirm_btn)
+
                 # 確認ダイアログ対応（事業者登録番号未入力時など）
                 time.sleep(3)
 
@@ -386,6 +451,52 @@ class RakurakuUploader:
                 self.logger.error(f"確定処理失敗: {e}")
                 return False
 
+    def _wait_submit_done(self, confirm_btn) -> bool:
+        """確定後の待機（explicit_waits）: 確認ダイアログ → 確定ボタン消滅まで"""
+        ok_btn = self.page.get_by_role("button", name="OK")
+
+        def dialog_or_done() -> bool:
+            return (ok_btn.count() > 0 and ok_btn.is_visible()) or not confirm_btn.is_visible()
+
+        # 確認ダイアログ（事業者登録番号未入力時など）が出るか、画面が遷移するまで
+        self._wait_until(dialog_or_done, 10)
+        if ok_btn.count() > 0 and ok_btn.is_visible():
+            ok_btn.click()
+            self.logger.info("ダイアログOKクリック成功")
+        else:
+            self.logger.info("ダイアログなし、または既に閉じている")
+
+        self.logger.info("処理待機中（確定ボタン消滅まで、最大30秒）...")
+        if not self._wait_until(lambda: not confirm_btn.is_visible(), 30):
+            self.logger.error("確定後も登録画面のままです")
+            return False
+        self._settle(0, lambda: self.page.wait_for_load_state(
+            "networkidle", timeout=self.ready_timeout_ms))
+        return True
+
+    def register(self, data: ReceiptData, dry_run: bool = False) -> bool:
+        """ログイン済みのコンテキストで 1 件登録（画面遷移→アップロード→入力→確定）
+
+        セッション切れでログイン画面に戻された場合は再ログインしてやり直す。
+        工程ごとに span（navigate / upload / fill / submit）を記録する。
+        """
+        with span("navigate"):
+            self.navigate_to_receipt_form()
+            if self.page.locator(self.LOGIN_FORM_SELECTOR).count() > 0:
+                self.logger.warning("セッション切れ: 再ログインします")
+                self.login()
+                self.navigate_to_receipt_form()
+
+        with span("upload"):
+            if not self.upload_pdf(data.pdf_path):
+                return False
+
+        with span("fill"):
+            self.fill_form(data)
+
+        with span("submit"):
+            return self.submit(dry_run=dry_run)
+
     def run(
         self,
         pdf_path: str,
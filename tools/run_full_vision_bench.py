@@ -2,42 +2,162 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
 import sys
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable
 
 from training_data import build_combined_attachment_context_map, normalize_attachment_name
-from vision_ocr import extract
+from vision_ocr import VisionOcrResult, extract
 
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 ARTIFACTS_DIR = ROOT_DIR / "artifacts"
 
+# vision_ocr.extract は内部で再試行した後、429 / rate limit を result.error に載せて返す
+RATE_LIMIT_MARKERS = ("429", "rate limit", "ratelimit", "rate_limit", "too many requests", "throttl", "resource_exhausted")
+
 
 def build_attachment_context_map() -> dict[str, dict[str, str]]:
     return build_combined_attachment_context_map(artifact_dir=ARTIFACTS_DIR)
 
 
-def load_jsonl_ids(path: Path) -> set[int]:
+def load_jsonl_rows(path: Path) -> dict[int, dict]:
+    """id ごとの最後の行（同じ id を再実行した行が後ろに追記される）。"""
     if not path.exists():
-        return set()
-    done: set[int] = set()
+        return {}
+    rows: dict[int, dict] = {}
     for line in path.read_text(encoding="utf-8").splitlines():
         if not line.strip():
             continue
         try:
             item = json.loads(line)
+            rows[int(item["id"])] = item
         except Exception:
             continue
-        item_id = item.get("id")
-        if item_id is None:
-            continue
-        try:
-            done.add(int(item_id))
-        except Exception:
-            continue
-    return done
+    return rows
+
+
+def load_completed_ids(path: Path) -> set[int]:
+    """再開時に飛ばす id。rate limit で終わった行は未完了として取り直す。"""
+    return {item_id for item_id, row in load_jsonl_rows(path).items() if not is_rate_limited(row.get("error"))}
+
+
+def is_rate_limited(error: str | None) -> bool:
+    if not error:
+        return False
+    text = error.lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS)
+
+
+def _ensure_trailing_newline(path: Path) -> None:
+    # 中断で書きかけになった最終行に次の行を続けて書かない
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with path.open("rb+") as fh:
+        fh.seek(-1, 2)
+        if fh.read(1) != b"\n":
+            fh.write(b"\n")
+
+
+class AdaptiveConcurrency:
+    """プロバイダごとの同時実行数（AIMD）。
+
+    rate limit を受けたら上限を半分にして cooldown_s 待つ（続けば待ち時間を倍に）。
+    上限と同じ回数だけ連続で成功したら 1 つ戻す（maximum まで）。
+    同時に飛んでいた呼び出しがまとめて rate limit を返しても、半減は 1 回だけ。
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        minimum: int = 1,
+        maximum: int | None = None,
+        cooldown_s: float = 5.0,
+        max_cooldown_s: float = 60.0,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(initial, maximum or initial)
+        self.limit = max(self.minimum, initial)
+        self.peak_active = 0
+        self.rate_limited = 0
+        self._active = 0
+        self._streak = 0
+        self._epoch = 0
+        self._base_cooldown_s = cooldown_s
+        self._cooldown_s = cooldown_s
+        self._max_cooldown_s = max_cooldown_s
+        self._resume_at = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """枠が空くまで待つ。release に渡す世代番号を返す。"""
+        with self._cond:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if wait <= 0 and self._active < self.limit:
+                    break
+                self._cond.wait(timeout=wait if wait > 0 else None)
+            self._active += 1
+            self.peak_active = max(self.peak_active, self._active)
+            return self._epoch
+
+    def release(self, epoch: int, *, rate_limited: bool) -> None:
+        with self._cond:
+            self._active -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self._streak = 0
+                if epoch == self._epoch:
+                    self._epoch += 1
+                    self.limit = max(self.minimum, self.limit // 2)
+                    self._resume_at = time.monotonic() + self._cooldown_s
+                    self._cooldown_s = min(self._cooldown_s * 2, self._max_cooldown_s)
+            else:
+                self._cooldown_s = self._base_cooldown_s
+                self._streak += 1
+                if self._streak >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._streak = 0
+            self._cond.notify_all()
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def summarize_provider(provider: str, rows: list[dict], wall_s: float, limiter: AdaptiveConcurrency) -> dict:
+    """今回の実行分の p50/p95 elapsed_s・docs/min・エラー率。"""
+    elapsed = [float(r["elapsed_s"]) for r in rows if r.get("elapsed_s") is not None]
+    errors = sum(1 for r in rows if r.get("error"))
+    p50 = _percentile(elapsed, 50)
+    p95 = _percentile(elapsed, 95)
+    return {
+        "provider": provider,
+        "docs": len(rows),
+        "errors": errors,
+        "error_rate": round(errors / len(rows), 4) if rows else 0.0,
+        "rate_limited": limiter.rate_limited,
+        "p50_elapsed_s": round(p50, 2) if p50 is not None else None,
+        "p95_elapsed_s": round(p95, 2) if p95 is not None else None,
+        "docs_per_min": round(len(rows) / wall_s * 60, 2) if wall_s > 0 else None,
+        "wall_s": round(wall_s, 2),
+        "final_concurrency": limiter.limit,
+        "peak_concurrency": limiter.peak_active,
+    }
+
+
+def provider_output_path(output_path: Path, provider: str, providers: list[str]) -> Path:
+    if len(providers) == 1:
+        return output_path
+    return output_path.with_name(f"{output_path.stem}_{provider}{output_path.suffix}")
 
 
 def run_one(
@@ -46,6 +166,7 @@ def run_one(
     provider: str,
     timeout_s: float,
     context_map: dict[str, dict[str, str]],
+    extract_fn: Callable[..., VisionOcrResult] = extract,
 ) -> dict:
     filename = str(entry["filename"])
     pdf_path = pdf_dir / filename
@@ -54,7 +175,7 @@ def run_one(
     subject = context.get("subject")
 
     try:
-        result = extract(
+        result = extract_fn(
             str(pdf_path),
             provider=provider,
             timeout_s=timeout_s,
@@ -100,6 +221,100 @@ def run_one(
         }
 
 
+def run_provider(
+    provider: str,
+    pending: list[dict],
+    output_path: Path,
+    *,
+    pdf_dir: Path,
+    timeout_s: float,
+    context_map: dict[str, dict[str, str]],
+    workers: int = 3,
+    max_workers: int | None = None,
+    rate_limit_retries: int = 3,
+    cooldown_s: float = 5.0,
+    extract_fn: Callable[..., VisionOcrResult] = extract,
+) -> dict:
+    """1 プロバイダ分を有界ワーカープールで実行し、行を追記して集計を返す。
+
+    同時実行数は workers から始めて AdaptiveConcurrency で max_workers まで増減する。
+    rate limit で終わった文書は待ってから rate_limit_retries 回まで取り直す。
+    """
+    limiter = AdaptiveConcurrency(workers, maximum=max_workers or workers * 2, cooldown_s=cooldown_s)
+
+    def attempt(entry: dict) -> dict:
+        for n in range(rate_limit_retries + 1):
+            epoch = limiter.acquire()
+            limited = False
+            try:
+                row = run_one(entry, pdf_dir, provider, timeout_s, context_map, extract_fn)
+                limited = is_rate_limited(row.get("error"))
+            finally:
+                limiter.release(epoch, rate_limited=limited)
+            if not limited:
+                break
+        row["attempts"] = n + 1
+        return row
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_trailing_newline(output_path)
+    rows: list[dict] = []
+    started = time.perf_counter()
+    with output_path.open("a", encoding="utf-8", newline="\n") as fh:
+        with ThreadPoolExecutor(max_workers=limiter.maximum, thread_name_prefix=f"bench-{provider}") as executor:
+            futures = [executor.submit(attempt, entry) for entry in pending]
+            for future in as_completed(futures):
+                row = future.result()
+                fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+                fh.flush()
+                rows.append(row)
+                print(
+                    json.dumps(
+                        {
+                            "provider": provider,
+                            "done": len(rows),
+                            "total": len(pending),
+                            "id": row.get("id"),
+                            "filename": row.get("filename"),
+                            "error": row.get("error"),
+                            "confidence": row.get("confidence"),
+                            "concurrency": limiter.limit,
+                        },
+                        ensure_ascii=False,
+                    ),
+                    flush=True,
+                )
+    return summarize_provider(provider, rows, time.perf_counter() - started, limiter)
+
+
+def run_bench(
+    golden: list[dict],
+    providers: list[str],
+    output_path: Path,
+    *,
+    resume: bool = True,
+    **kwargs,
+) -> dict[str, dict]:
+    """プロバイダを並行に実行する（出力はプロバイダごとのファイル）。"""
+    plans = []
+    for provider in providers:
+        path = provider_output_path(output_path, provider, providers)
+        completed_ids = load_completed_ids(path) if resume else set()
+        pending = [entry for entry in golden if int(entry["id"]) not in completed_ids]
+        plans.append((provider, path, pending))
+
+    summaries: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(plans))) as executor:
+        futures = {
+            executor.submit(run_provider, provider, pending, path, **kwargs): provider
+            for provider, path, pending in plans
+            if pending
+        }
+        for future in as_completed(futures):
+            summaries[futures[future]] = future.result()
+    return summaries
+
+
 def main() -> int:
     if hasattr(sys.stdout, "reconfigure"):
         sys.stdout.reconfigure(encoding="utf-8", errors="backslashreplace")
@@ -107,80 +322,66 @@ def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--golden", required=True)
     ap.add_argument("--pdf-dir", required=True)
-    ap.add_argument("--output", required=True)
-    ap.add_argument("--provider", default="openai")
+    ap.add_argument("--output", required=True, help="複数プロバイダ時は <stem>_<provider>.jsonl に分ける")
+    ap.add_argument("--provider", default="openai", help="カンマ区切りで複数指定可（並行実行）")
     ap.add_argument("--timeout-s", type=float, default=45.0)
-    ap.add_argument("--workers", type=int, default=3)
+    ap.add_argument("--workers", type=int, default=3, help="プロバイダごとの初期同時実行数")
+    ap.add_argument("--max-workers", type=int, default=None, help="同時実行数の上限（既定: workers の 2 倍）")
+    ap.add_argument("--rate-limit-retries", type=int, default=3)
+    ap.add_argument("--cooldown-s", type=float, default=5.0, help="rate limit 後の待ち時間（連続時は倍）")
+    ap.add_argument("--no-resume", action="store_true", help="出力済みの id も取り直す")
+    ap.add_argument("--summary", default=None, help="集計 JSON の出力先（既定: <output>.summary.json）")
     args = ap.parse_args()
 
     golden_path = Path(args.golden)
     pdf_dir = Path(args.pdf_dir)
     output_path = Path(args.output)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    providers = [p.strip() for p in args.provider.split(",") if p.strip()]
 
     golden = json.loads(golden_path.read_text(encoding="utf-8"))
     context_map = build_attachment_context_map()
-    completed_ids = load_jsonl_ids(output_path)
-    pending = [entry for entry in golden if int(entry["id"]) not in completed_ids]
 
     print(
         json.dumps(
             {
                 "golden_entries": len(golden),
-                "completed_ids": len(completed_ids),
-                "pending": len(pending),
+                "completed_ids": {
+                    p: 0 if args.no_resume else len(load_completed_ids(provider_output_path(output_path, p, providers)))
+                    for p in providers
+                },
                 "context_hits_total": sum(
                     1 for entry in golden if context_map.get(normalize_attachment_name(str(entry["filename"])))
                 ),
                 "output": str(output_path),
                 "workers": args.workers,
-                "provider": args.provider,
+                "providers": providers,
             },
             ensure_ascii=False,
         ),
         flush=True,
     )
 
-    if not pending:
+    summaries = run_bench(
+        golden,
+        providers,
+        output_path,
+        resume=not args.no_resume,
+        pdf_dir=pdf_dir,
+        timeout_s=args.timeout_s,
+        context_map=context_map,
+        workers=args.workers,
+        max_workers=args.max_workers,
+        rate_limit_retries=args.rate_limit_retries,
+        cooldown_s=args.cooldown_s,
+    )
+    if not summaries:
         return 0
 
-    write_lock = threading.Lock()
-    total = len(pending)
-    completed = 0
-
-    with output_path.open("a", encoding="utf-8", newline="\n") as fh:
-        with ThreadPoolExecutor(max_workers=args.workers) as executor:
-            futures = {
-                executor.submit(
-                    run_one,
-                    entry,
-                    pdf_dir,
-                    args.provider,
-                    args.timeout_s,
-                    context_map,
-                ): entry
-                for entry in pending
-            }
-            for future in as_completed(futures):
-                row = future.result()
-                with write_lock:
-                    fh.write(json.dumps(row, ensure_ascii=False) + "\n")
-                    fh.flush()
-                completed += 1
-                print(
-                    json.dumps(
-                        {
-                            "done": completed,
-                            "total": total,
-                            "id": row.get("id"),
-                            "filename": row.get("filename"),
-                            "error": row.get("error"),
-                            "confidence": row.get("confidence"),
-                        },
-                        ensure_ascii=False,
-                    ),
-                    flush=True,
-                )
+    summary_path = Path(args.summary) if args.summary else output_path.with_suffix(".summary.json")
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summaries, ensure_ascii=False, indent=2), encoding="utf-8")
+    for summary in summaries.values():
+        print(json.dumps({"summary": summary}, ensure_ascii=False), flush=True)
 
     return 0
 
@@ -1,6 +1,8 @@
 """Automated OCR benchmark scoring against golden dataset."""
 
 import argparse
+import bisect
+import hashlib
 import json
 import logging
 import re
@@ -294,90 +296,251 @@ def run_vision_ocr(provider: str, golden: list[dict], pdf_dir: Path | None) -> l
 # Scoring engine
 # ---------------------------------------------------------------------------
 
+def _normalize_filename(name: str) -> str:
+    return unicodedata.normalize("NFC", name)
+
+
+class ResultIndex:
+    """Filename index over result rows, built once per scoring run.
+
+    find() returns the same row as the former per-entry linear scan, in the
+    same priority: exact name, then either name a prefix of the other, then
+    either 30-char head contained in the other; within a tier, the result
+    filename seen first wins (the row is the last one with that filename).
+    Names are NFC-normalized on both sides.
+    """
+
+    def __init__(self, results: list[dict]):
+        self._by_name: dict[str, dict] = {}
+        for r in results:
+            fname = r.get("filename", "")
+            if fname:
+                self._by_name[_normalize_filename(fname)] = r
+        self._names = list(self._by_name)
+        self._order = {name: i for i, name in enumerate(self._names)}
+        self._sorted = sorted(self._names)
+        self._head30: dict[str, int] = {}
+        for i, name in enumerate(self._names):
+            self._head30.setdefault(name[:30], i)
+        self._head_lengths = sorted({len(h) for h in self._head30})
+        self._blob = "\n".join(self._names)
+        self._starts: list[int] = []
+        pos = 0
+        for name in self._names:
+            self._starts.append(pos)
+            pos += len(name) + 1
+
+    def _prefix_match(self, g: str) -> int | None:
+        best = None
+        # result name is a prefix of the golden name
+        for n in range(1, len(g) + 1):
+            i = self._order.get(g[:n])
+            if i is not None and (best is None or i < best):
+                best = i
+        # golden name is a prefix of the result name
+        k = bisect.bisect_left(self._sorted, g)
+        while k < len(self._sorted) and self._sorted[k].startswith(g):
+            i = self._order[self._sorted[k]]
+            if best is None or i < best:
+                best = i
+            k += 1
+        return best
+
+    def _substring_match(self, g: str) -> int | None:
+        best = None
+        # result head (<= 30 chars) occurs in the golden name
+        for n in self._head_lengths:
+            for start in range(len(g) - n + 1):
+                i = self._head30.get(g[start:start + n])
+                if i is not None and (best is None or i < best):
+                    best = i
+        # golden head occurs in a result name
+        head = g[:30]
+        if "\n" in head:
+            hits = (i for i, name in enumerate(self._names) if head in name)
+        else:
+            hits = self._blob_hits(head)
+        for i in hits:
+            if best is None or i < best:
+                best = i
+            break  # hits come in name order
+        return best
+
+    def _blob_hits(self, needle: str):
+        pos = self._blob.find(needle)
+        while pos >= 0:
+            i = bisect.bisect_right(self._starts, pos) - 1
+            if i < 0:
+                return
+            yield i
+            # next name (a name matches once)
+            pos = self._blob.find(needle, self._starts[i] + len(self._names[i]) + 1)
+
+    def find(self, golden_filename: str | None) -> dict:
+        if not self._names:
+            return {}
+        g = _normalize_filename(golden_filename or "")
+        if g in self._by_name:
+            return self._by_name[g]
+        for tier in (self._prefix_match, self._substring_match):
+            i = tier(g)
+            if i is not None:
+                return self._by_name[self._names[i]]
+        return {}
+
+
+def score_entry(g: dict, r: dict) -> dict:
+    """Score one golden entry against its matched result row ({} if none)."""
+    gid = str(g["id"])
+    row: dict = {"id": gid, "filename": g["filename"]}
+
+    # Vendor
+    if g.get("skip_vendor_scoring"):
+        v_ok, v_detail = None, "skipped"
+    else:
+        v_ok, v_detail = score_vendor(
+            r.get("vendor"),
+            g["vendor"],
+            sender=r.get("sender"),
+            subject=r.get("subject"),
+            filename=g["filename"],
+        )
+    row["vendor_ok"] = v_ok
+    row["vendor_detail"] = v_detail
+    row["vendor_pred"] = r.get("vendor", "")
+    row["vendor_exp"] = g["vendor"]
+
+    # Date
+    normalized_expected_date = normalize_bench_date(g.get("issue_date"))
+    if not normalized_expected_date:
+        row["date_ok"] = None  # skip
+        row["date_detail"] = "skipped(invalid)"
+    else:
+        d_ok, d_detail = score_date(r.get("date"), normalized_expected_date)
+        row["date_ok"] = d_ok
+        row["date_detail"] = d_detail
+    row["date_pred"] = r.get("date", "")
+    row["date_exp"] = normalized_expected_date or g.get("issue_date")
+
+    # Amount
+    a_ok, a_detail = score_amount(r.get("amount"), g["amount"], tolerance_ratio=0.0)
+    row["amount_ok"] = a_ok
+    row["amount_detail"] = a_detail
+    row["amount_pred"] = r.get("amount", "")
+    row["amount_exp"] = g["amount"]
+
+    # Amount approx (separate flag for +-10%)
+    a2_ok, _ = score_amount(r.get("amount"), g["amount"], tolerance_ratio=0.1)
+    row["amount_approx"] = a2_ok
+
+    # Error
+    row["error"] = r.get("error", "")
+
+    return row
+
+
 def score_all(golden: list[dict], results: list[dict]) -> list[dict]:
     """Score each result against golden dataset. Returns scored rows."""
-    # Index results by filename (partial match - result filename may be truncated)
-    result_by_filename: dict[str, dict] = {}
-    for r in results:
-        fname = r.get("filename", "")
-        if fname:
-            result_by_filename[fname] = r
-
-    def _find_result(golden_filename: str) -> dict:
-        """Find result matching golden filename. Supports partial/truncated matching."""
-        # Exact match
-        if golden_filename in result_by_filename:
-            return result_by_filename[golden_filename]
-        # Partial match (result filename may be truncated by markdown table)
-        for rfname, rdata in result_by_filename.items():
-            if golden_filename.startswith(rfname) or rfname.startswith(golden_filename):
-                return rdata
-        # Fallback: substring match
-        for rfname, rdata in result_by_filename.items():
-            if golden_filename[:30] in rfname or rfname[:30] in golden_filename:
-                return rdata
-        return {}
+    index = ResultIndex(results)
+    return [score_entry(g, index.find(g["filename"])) for g in golden]
 
-    scored = []
-    for g in golden:
-        gid = str(g["id"])
-        r = _find_result(g["filename"])
 
-        row: dict = {"id": gid, "filename": g["filename"]}
+# ---------------------------------------------------------------------------
+# Incremental scoring (snapshot of the previous run)
+# ---------------------------------------------------------------------------
 
-        # Vendor
-        if g.get("skip_vendor_scoring"):
-            v_ok, v_detail = None, "skipped"
-        else:
-            v_ok, v_detail = score_vendor(
-                r.get("vendor"),
-                g["vendor"],
-                sender=r.get("sender"),
-                subject=r.get("subject"),
-                filename=g["filename"],
-            )
-        row["vendor_ok"] = v_ok
-        row["vendor_detail"] = v_detail
-        row["vendor_pred"] = r.get("vendor", "")
-        row["vendor_exp"] = g["vendor"]
-
-        # Date
-        normalized_expected_date = normalize_bench_date(g.get("issue_date"))
-        if not normalized_expected_date:
-            row["date_ok"] = None  # skip
-            row["date_detail"] = "skipped(invalid)"
-        else:
-            d_ok, d_detail = score_date(r.get("date"), normalized_expected_date)
-            row["date_ok"] = d_ok
-            row["date_detail"] = d_detail
-        row["date_pred"] = r.get("date", "")
-        row["date_exp"] = normalized_expected_date or g.get("issue_date")
-
-        # Amount
-        a_ok, a_detail = score_amount(r.get("amount"), g["amount"], tolerance_ratio=0.0)
-        row["amount_ok"] = a_ok
-        row["amount_detail"] = a_detail
-        row["amount_pred"] = r.get("amount", "")
-        row["amount_exp"] = g["amount"]
-
-        # Amount approx (separate flag for +-10%)
-        a2_ok, _ = score_amount(r.get("amount"), g["amount"], tolerance_ratio=0.1)
-        row["amount_approx"] = a2_ok
-
-        # Error
-        row["error"] = r.get("error", "")
+DELTA_FIELDS = ("vendor_ok", "date_ok", "amount_ok", "amount_approx")
+
+
+def _fingerprint(obj) -> str:
+    data = json.dumps(obj, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _scorer_fingerprint() -> str:
+    """Changes when the scoring code or vendor matching rules change."""
+    import vendor_matching
+
+    h = hashlib.sha1()
+    for path in (Path(__file__), Path(vendor_matching.__file__)):
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def score_incremental(
+    golden: list[dict],
+    results: list[dict],
+    snapshot_path: Path,
+) -> tuple[list[dict], list[dict], int]:
+    """Score like score_all, rescoring only entries whose inputs changed.
 
+    The snapshot stores each entry's scored row keyed by a fingerprint of its
+    golden entry and matched result row. Returns (scored, deltas, rescored)
+    where deltas lists per-field changes vs the snapshot:
+    {"id", "filename", "field", "before", "after"}. The snapshot is rewritten.
+    """
+    scorer = _scorer_fingerprint()
+    previous: dict = {}
+    if snapshot_path.exists():
+        try:
+            snap = json.loads(snapshot_path.read_text(encoding="utf-8"))
+            if snap.get("scorer") == scorer:
+                previous = snap.get("entries", {})
+            else:
+                log.info("Scorer changed since %s; rescoring all entries", snapshot_path.name)
+        except (OSError, ValueError):
+            log.warning("Unreadable score snapshot (rescoring all): %s", snapshot_path)
+
+    index = ResultIndex(results)
+    scored: list[dict] = []
+    deltas: list[dict] = []
+    entries: dict = {}
+    rescored = 0
+    for g in golden:
+        r = index.find(g["filename"])
+        key = f"{g['id']}\t{g['filename']}"
+        fp = _fingerprint([g, r])
+        prev = previous.get(key)
+        if prev and prev["fp"] == fp:
+            row = prev["row"]
+        else:
+            row = score_entry(g, r)
+            rescored += 1
+            if prev:
+                for field in DELTA_FIELDS:
+                    if prev["row"].get(field) != row[field]:
+                        deltas.append({
+                            "id": row["id"],
+                            "filename": row["filename"],
+                            "field": field,
+                            "before": prev["row"].get(field),
+                            "after": row[field],
+                        })
+        entries[key] = {"fp": fp, "row": row}
         scored.append(row)
 
-    return scored
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = snapshot_path.with_suffix(snapshot_path.suffix + ".tmp")
+    tmp.write_text(
+        json.dumps({"scorer": scorer, "entries": entries}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    tmp.replace(snapshot_path)
+    log.info("Rescored %d/%d entries (%d field changes)", rescored, len(golden), len(deltas))
+    return scored, deltas, rescored
 
 
 # ---------------------------------------------------------------------------
 # Report generation
 # ---------------------------------------------------------------------------
 
-def generate_report(scored: list[dict], provider: str, golden_path: str) -> str:
-    """Generate markdown scoring report."""
+def generate_report(
+    scored: list[dict],
+    provider: str,
+    golden_path: str,
+    deltas: list[dict] | None = None,
+) -> str:
+    """Generate markdown scoring report (with a change section if deltas given)."""
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
     total = len(scored)
 
@@ -465,6 +628,25 @@ def generate_report(scored: list[dict], provider: str, golden_path: str) -> str:
     else:
         lines.append("No errors.")
 
+    if deltas is not None:
+        lines.append("")
+        lines.append("## Changes since last score")
+        if deltas:
+            for field in DELTA_FIELDS:
+                changed = [d for d in deltas if d["field"] == field]
+                if changed:
+                    fixed = sum(1 for d in changed if d["after"] and not d["before"])
+                    broke = sum(1 for d in changed if d["before"] and not d["after"])
+                    lines.append(f"- {field}: +{fixed} / -{broke} ({len(changed)} changed)")
+            lines.append("")
+            lines.append("| # | File | Field | Before | After |")
+            lines.append("|---|------|-------|--------|-------|")
+            for d in deltas:
+                short_file = d["filename"][:50] + "..." if len(d["filename"]) > 50 else d["filename"]
+                lines.append(f"| {d['id']} | {short_file} | {d['field']} | {d['before']} | {d['after']} |")
+        else:
+            lines.append("No changes.")
+
     return "\n".join(lines) + "\n"
 
 
@@ -496,6 +678,10 @@ def main():
         "--output",
         help="Output path for scoring report markdown (default: stdout)"
     )
+    parser.add_argument(
+        "--snapshot",
+        help="Score snapshot JSON: rescore only changed entries and report per-field changes"
+    )
     args = parser.parse_args()
 
     # Load golden dataset
@@ -525,11 +711,15 @@ def main():
         sys.exit(1)
 
     # Score
-    scored = score_all(golden, results)
+    deltas = None
+    if args.snapshot:
+        scored, deltas, _ = score_incremental(golden, results, Path(args.snapshot))
+    else:
+        scored = score_all(golden, results)
 
     # Generate report
     provider_label = args.provider if not args.results else Path(args.results).stem
-    report = generate_report(scored, provider_label, str(golden_path))
+    report = generate_report(scored, provider_label, str(golden_path), deltas)
 
     # Output
     if args.output:
@@ -13,18 +13,31 @@ Usage:
     python tools/session_briefing.py              # Full briefing
     python tools/session_briefing.py --compact    # One-screen summary
     python tools/session_briefing.py --json       # JSON output
+    python tools/session_briefing.py --max-latency 2   # Partial briefing after 2s
+    python tools/session_briefing.py --no-cache   # Recompute every section
+
+Collectors run concurrently in threads. Their outputs are cached in
+artifacts/cache/session_briefing.json keyed by their inputs (ledger month
+directory mtimes, wiki file mtimes, git HEAD + index mtime, handoff.md mtime),
+so unchanged sections are not recomputed.
 """
 from __future__ import annotations
 
 import argparse
+import copy
 import json
+import logging
 import os
 import re
 import subprocess
 import sys
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # Project root
@@ -332,6 +345,222 @@ def get_stale_decisions(days_threshold: int = 90) -> list[dict[str, Any]]:
     return sorted(stale, key=lambda x: -x["last_modified_days_ago"])
 
 
+# ---------------------------------------------------------------------------
+# Concurrent collection + cache
+# ---------------------------------------------------------------------------
+
+# Collector outputs keyed by their inputs; a stale key just means "recompute".
+CACHE_PATH = PROJECT_ROOT / "artifacts" / "cache" / "session_briefing.json"
+
+
+def _stat_sig(path: Path) -> list[Any]:
+    try:
+        st = path.stat()
+        return [str(path), st.st_mtime_ns, st.st_size]
+    except OSError:
+        return [str(path), None, None]
+
+
+def _git_head_key() -> list[Any]:
+    """HEAD commit + .git/index mtime (read from .git directly; falls back to rev-parse)."""
+    git_dir = PROJECT_ROOT / ".git"
+    head = ""
+    try:
+        ref = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        if ref.startswith("ref: "):
+            name = ref[5:]
+            ref_file = git_dir / name
+            if ref_file.exists():
+                head = ref_file.read_text(encoding="utf-8").strip()
+            else:
+                for line in (git_dir / "packed-refs").read_text(encoding="utf-8").splitlines():
+                    if line.endswith(" " + name):
+                        head = line.split(" ", 1)[0]
+                        break
+        else:
+            head = ref
+    except Exception:
+        pass
+    if not head:
+        try:
+            r = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True, text=True, encoding="utf-8", errors="replace",
+                cwd=str(PROJECT_ROOT), timeout=10,
+            )
+            head = r.stdout.strip()
+        except Exception:
+            pass
+    return [head, _stat_sig(git_dir / "index")[1]]
+
+
+def _ledger_key() -> list[Any]:
+    """Evidence Ledger: month directories change mtime whenever a run record is added."""
+    dirs: list[Any] = [_stat_sig(EVIDENCE_DIR)[1]]
+    try:
+        for d in sorted(EVIDENCE_DIR.iterdir()):
+            if d.is_dir():
+                dirs.append([d.name, d.stat().st_mtime_ns])
+    except OSError:
+        pass
+    return dirs
+
+
+def _wiki_files_key() -> list[Any]:
+    try:
+        sys.path.insert(0, str(PROJECT_ROOT))
+        from tools.wiki_lint import collect_files  # type: ignore[import]
+
+        files = [p for group in collect_files().values() for p in group]
+    except Exception:
+        return []
+    return [_stat_sig(p) for p in files]
+
+
+def _collectors() -> dict[str, tuple[Callable[[], Any], Callable[[], Any], Any]]:
+    """name -> (collector, cache key function, value used when it does not finish in time)."""
+    today = datetime.now().strftime("%Y-%m-%d")  # day-based windows / ages
+    return {
+        "recent_failures": (
+            lambda: get_recent_failures(days=7),
+            lambda: [today, _ledger_key()],
+            [],
+        ),
+        "run_summary": (
+            lambda: get_recent_runs_summary(days=7),
+            lambda: [today, _ledger_key()],
+            {},
+        ),
+        "wiki_health": (
+            get_wiki_health,
+            lambda: [today, _git_head_key(), _wiki_files_key()],
+            {"critical": [], "warnings": [], "avg_trust_score": None, "total_files": 0},
+        ),
+        "git_status": (
+            get_git_status,
+            None,  # working-tree state: never cached
+            {"branch": "unknown", "modified_files": [], "untracked_files": [], "recent_commits": []},
+        ),
+        "handoff": (
+            get_handoff_summary,
+            lambda: [_stat_sig(HANDOFF_PATH)],
+            {"pending_high": [], "pending_mid": [], "last_updated": "", "found": False},
+        ),
+        "stale_decisions": (
+            lambda: get_stale_decisions(days_threshold=90),
+            lambda: [today, _git_head_key(), [_stat_sig(p) for p in sorted(DECISIONS_DIR.glob("*.md"))]],
+            [],
+        ),
+    }
+
+
+class _BriefingCache:
+    """{name: {"key": ..., "value": ...}} in one JSON file (thread-safe writes)."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: dict[str, Any] = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if isinstance(data, dict):
+                    self._data = data
+            except Exception:
+                pass
+
+    def get(self, name: str, key: Any) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(name)
+        if isinstance(entry, dict) and entry.get("key") == key:
+            return True, entry.get("value")
+        return False, None
+
+    def put(self, name: str, key: Any, value: Any) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            self._data[name] = {"key": key, "value": value}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(self._data, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+            except Exception:
+                pass
+
+
+def collect_sections(
+    max_latency: float | None = None,
+    cache_path: Path | None = None,
+) -> tuple[dict[str, Any], list[str], dict[str, str]]:
+    """Run every collector concurrently (threads) and return (data, pending, failed).
+
+    - Cache hits (same key) skip the collector entirely. Caching is off unless
+      cache_path is given (main() passes CACHE_PATH).
+    - With max_latency (seconds), collectors still running at the deadline are
+      reported in `pending` and replaced by their empty value. They keep running
+      in daemon threads and still write the cache, so the next briefing is warm.
+    - A collector that raises is logged and reported in `failed` (name -> error),
+      not in `pending`, and is replaced by its empty value.
+    """
+    cache = _BriefingCache(cache_path)
+    collectors = _collectors()
+    results: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    lock = threading.Lock()
+
+    def run(name: str, fn: Callable[[], Any], key_fn: Callable[[], Any] | None) -> None:
+        key = None
+        if key_fn is not None and cache.path is not None:
+            try:
+                # JSON round trip so the key compares equal to the cached one
+                key = json.loads(json.dumps(key_fn(), ensure_ascii=False))
+                hit, value = cache.get(name, key)
+                if hit:
+                    with lock:
+                        results[name] = value
+                    return
+            except Exception:
+                key = None
+        try:
+            value = fn()
+        except Exception as e:
+            log.warning("briefing collector %s failed", name, exc_info=True)
+            with lock:
+                errors[name] = f"{type(e).__name__}: {e}"
+            return
+        with lock:
+            results[name] = value
+        if key is not None:
+            cache.put(name, key, value)
+
+    threads = []
+    for name, (fn, key_fn, _default) in collectors.items():
+        t = threading.Thread(target=run, args=(name, fn, key_fn), name=f"briefing-{name}", daemon=True)
+        t.start()
+        threads.append(t)
+
+    deadline = None if max_latency is None else time.monotonic() + max(0.0, max_latency)
+    for t in threads:
+        t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    data: dict[str, Any] = {}
+    pending: list[str] = []
+    failed: dict[str, str] = {}
+    with lock:
+        for name, (_fn, _key_fn, default) in collectors.items():
+            if name in results:
+                data[name] = results[name]
+                continue
+            if name in errors:
+                failed[name] = errors[name]
+            else:
+                pending.append(name)
+            data[name] = copy.deepcopy(default)
+    return data, pending, failed
+
+
 # ---------------------------------------------------------------------------
 # Briefing generator
 # ---------------------------------------------------------------------------
@@ -339,18 +568,23 @@ def get_stale_decisions(days_threshold: int = 90) -> list[dict[str, Any]]:
 _BORDER = "═" * 51
 
 
-def generate_briefing(compact: bool = False) -> str:
+def generate_briefing(
+    compact: bool = False,
+    max_latency: float | None = None,
+    cache_path: Path | None = None,
+) -> str:
     """Generate full or compact session briefing."""
 
     now_str = datetime.now().strftime("%Y-%m-%d %H:%M")
 
     # --- Collect data ---
-    failures = get_recent_failures(days=7)
-    wiki = get_wiki_health()
-    git = get_git_status()
-    handoff = get_handoff_summary()
-    stale_dec = get_stale_decisions(days_threshold=90)
-    run_summary = get_recent_runs_summary(days=7)
+    data, pending, failed = collect_sections(max_latency=max_latency, cache_path=cache_path)
+    failures = data["recent_failures"]
+    wiki = data["wiki_health"]
+    git = data["git_status"]
+    handoff = data["handoff"]
+    stale_dec = data["stale_decisions"]
+    run_summary = data["run_summary"]
 
     lines: list[str] = []
 
@@ -359,6 +593,13 @@ def generate_briefing(compact: bool = False) -> str:
     lines.append(_BORDER)
     lines.append("")
 
+    if pending and max_latency is not None:
+        lines.append(f"  [未取得 (--max-latency {max_latency:g}s 超過): {', '.join(pending)}]")
+    if failed:
+        lines.append(f"  [取得失敗: {', '.join(f'{n} ({err})' for n, err in failed.items())}]")
+    if failed or (pending and max_latency is not None):
+        lines.append("")
+
     # ■ URGENT
     urgent_items: list[str] = []
 
@@ -463,17 +704,10 @@ def generate_briefing(compact: bool = False) -> str:
 # ---------------------------------------------------------------------------
 
 
-def generate_json() -> str:
+def generate_json(max_latency: float | None = None, cache_path: Path | None = None) -> str:
     """Collect all data and return as JSON string."""
-    data = {
-        "generated_at": datetime.now().isoformat(),
-        "recent_failures": get_recent_failures(days=7),
-        "run_summary": get_recent_runs_summary(days=7),
-        "wiki_health": get_wiki_health(),
-        "git_status": get_git_status(),
-        "handoff": get_handoff_summary(),
-        "stale_decisions": get_stale_decisions(days_threshold=90),
-    }
+    sections, pending, failed = collect_sections(max_latency=max_latency, cache_path=cache_path)
+    data = {"generated_at": datetime.now().isoformat(), **sections, "pending": pending, "failed": failed}
     return json.dumps(data, ensure_ascii=False, indent=2)
 
 
@@ -493,12 +727,18 @@ def main() -> None:
         "--compact", action="store_true", help="One-screen summary (max 20 lines)"
     )
     parser.add_argument("--json", action="store_true", help="JSON output")
+    parser.add_argument(
+        "--max-latency", type=float, default=None,
+        help="Seconds to wait for collectors; unfinished sections are reported as pending",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every section (no cache read/write)")
     args = parser.parse_args()
 
+    cache_path = None if args.no_cache else CACHE_PATH
     if args.json:
-        print(generate_json())
+        print(generate_json(max_latency=args.max_latency, cache_path=cache_path))
     else:
-        print(generate_briefing(compact=args.compact))
+        print(generate_briefing(compact=args.compact, max_latency=args.max_latency, cache_path=cache_path))
 
 
 if __name__ == "__main__":
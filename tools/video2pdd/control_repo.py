@@ -0,0 +1,317 @@
+"""
+control_repo.py - Streaming reader for PAD ControlRepository JSON.
+
+A ControlRepository export embeds every control's screenshot as a base64
+string, so json.load() costs memory and time in proportion to the whole
+repository. This module scans the file incrementally instead:
+
+  scan_control_repo()   one pass over the bytes; returns control name ->
+                        byte span of its screenshot string (never decoded)
+  extract_screenshot()  decodes one span into a content-addressed cache
+                        file (<sha256>.png), reading the span in chunks
+
+phase1_robin only extracts the screenshots of controls the Robin script
+actually references.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+# Same key priority as the former json.load() based lookup
+NAME_KEYS = ("Name", "name", "DisplayName")
+IMAGE_KEYS = ("Screenshot", "screenshot", "Image")
+
+DEFAULT_SCREENSHOT_DIR = (
+    Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "video2pdd" / "screenshots"
+)
+
+READ_CHUNK = 1 << 16
+MAX_CAPTURE = 1 << 16  # longer names/keys are skipped, not materialized
+
+_WS = b" \t\r\n"
+_SCALAR_END = b",}] \t\r\n"
+
+
+@dataclass(frozen=True)
+class ScreenshotRef:
+    """Byte span [start, end) of a screenshot string's contents in the file."""
+    start: int
+    end: int
+    order: int  # pre-order position of the owning object (later wins)
+
+
+class _Frame:
+    __slots__ = ("is_obj", "order", "key", "names", "images")
+
+    def __init__(self, is_obj: bool, order: int) -> None:
+        self.is_obj = is_obj
+        self.order = order
+        self.key: str | None = None
+        self.names: dict[str, str] = {}
+        self.images: dict[str, tuple[int, int]] = {}
+
+
+class _Scanner:
+    """Byte-level JSON tokenizer over a file with absolute offsets."""
+
+    def __init__(self, f: BinaryIO) -> None:
+        self.f = f
+        self.buf = b""
+        self.pos = 0
+        self.base = 0  # file offset of buf[0]
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(READ_CHUNK)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.base += self.pos
+        self.pos = 0
+        return True
+
+    def _error(self, msg: str) -> ValueError:
+        return ValueError(f"{msg} at byte {self.base + self.pos}")
+
+    def next_nonws(self) -> bytes:
+        """Consume and return the next non-whitespace byte (b"" at EOF)."""
+        while True:
+            while self.pos < len(self.buf):
+                c = self.buf[self.pos:self.pos + 1]
+                self.pos += 1
+                if c not in _WS:
+                    return c
+            if not self._fill():
+                return b""
+
+    def expect(self, char: bytes) -> None:
+        if self.next_nonws() != char:
+            raise self._error(f"expected {char.decode()!r}")
+
+    def read_string(self, capture: bool) -> tuple[str | None, int, int]:
+        """Read a string whose opening quote was consumed.
+
+        Returns (value or None, start, end) with file offsets of the contents.
+        Uncaptured strings are skipped without being kept in memory.
+        """
+        start = self.base + self.pos
+        search = self.pos
+        while True:
+            i = self.buf.find(b'"', search)
+            if i < 0:
+                if capture and len(self.buf) - self.pos > MAX_CAPTURE:
+                    capture = False
+                if capture:
+                    search = len(self.buf) - self.pos  # buf is rebased on pos by _fill
+                else:
+                    # drop what was scanned but keep a trailing backslash run:
+                    # it may escape the quote at the start of the next chunk
+                    drop = len(self.buf.rstrip(b"\\"))
+                    self.base += drop
+                    self.buf = self.buf[drop:]
+                    self.pos = 0
+                    search = 0
+                if not self._fill():
+                    raise self._error("unterminated string")
+                continue
+            slashes = 0
+            j = i - 1
+            while j >= 0 and self.buf[j] == 0x5C:
+                slashes += 1
+                j -= 1
+            if slashes % 2:
+                search = i + 1
+                continue
+            end = self.base + i
+            value = None
+            if capture:
+                raw = self.buf[self.pos:i]
+                value = json.loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode("utf-8")
+            self.pos = i + 1
+            return value, start, end
+
+    def skip_scalar(self, first: bytes) -> None:
+        """Skip a number / true / false / null whose first byte was consumed."""
+        if first not in b"-0123456789tfn":
+            raise self._error(f"unexpected {first!r}")
+        while True:
+            while self.pos < len(self.buf):
+                if self.buf[self.pos:self.pos + 1] in _SCALAR_END:
+                    return
+                self.pos += 1
+            if not self._fill():
+                return
+
+
+def _finish(frame: _Frame, index: dict[str, ScreenshotRef]) -> None:
+    name = next((frame.names[k] for k in NAME_KEYS if frame.names.get(k)), None)
+    span = next(
+        (frame.images[k] for k in IMAGE_KEYS if k in frame.images and frame.images[k][1] > frame.images[k][0]),
+        None,
+    )
+    if name and span:
+        prev = index.get(name)
+        if prev is None or prev.order < frame.order:
+            index[name] = ScreenshotRef(span[0], span[1], frame.order)
+
+
+def scan_control_repo(path: str | Path) -> dict[str, ScreenshotRef]:
+    """Index control name -> screenshot span in one streaming pass.
+
+    Any object carrying a name key and a string image key counts as a control,
+    at any depth; for duplicate names the object later in document order wins.
+    Raises ValueError on malformed JSON.
+    """
+    index: dict[str, ScreenshotRef] = {}
+    stack: list[_Frame] = []
+    order = 0
+
+    with open(path, "rb") as f:
+        sc = _Scanner(f)
+        sc._fill()
+        if sc.buf.startswith(b"\xef\xbb\xbf"):
+            sc.pos = 3
+
+        def read_key(top: _Frame) -> None:
+            key, _, _ = sc.read_string(capture=True)
+            sc.expect(b":")
+            top.key = key
+
+        value_expected = True
+        while True:
+            if value_expected:
+                c = sc.next_nonws()
+                top = stack[-1] if stack else None
+                key = top.key if top is not None and top.is_obj else None
+                if c == b"{":
+                    stack.append(_Frame(True, order))
+                    order += 1
+                    c = sc.next_nonws()
+                    if c == b"}":
+                        _finish(stack.pop(), index)
+                    elif c == b'"':
+                        read_key(stack[-1])
+                        continue
+                    else:
+                        raise sc._error("expected key")
+                elif c == b"[":
+                    stack.append(_Frame(False, order))
+                    c = sc.next_nonws()
+                    if c == b"]":
+                        stack.pop()
+                    elif c == b"":
+                        raise sc._error("unexpected end of data")
+                    else:
+                        sc.pos -= 1  # first element: leave it for the value branch
+                        continue
+                elif c == b'"':
+                    value, start, end = sc.read_string(capture=key in NAME_KEYS)
+                    if key in NAME_KEYS and value is not None:
+                        top.names[key] = value
+                    elif key in IMAGE_KEYS:
+                        top.images[key] = (start, end)
+                elif c == b"":
+                    raise sc._error("unexpected end of data")
+                else:
+                    sc.skip_scalar(c)
+                value_expected = False
+                continue
+
+            c = sc.next_nonws()
+            if not stack:
+                if c != b"":
+                    raise sc._error("extra data")
+                return index
+            top = stack[-1]
+            if c == b",":
+                if top.is_obj:
+                    sc.expect(b'"')
+                    read_key(top)
+                value_expected = True
+            elif c == (b"}" if top.is_obj else b"]"):
+                frame = stack.pop()
+                if frame.is_obj:
+                    _finish(frame, index)
+            else:
+                raise sc._error("expected ',' or closing bracket")
+
+
+def _image_suffix(head: bytes) -> str:
+    if head.startswith(b"\x89PNG"):
+        return ".png"
+    if head.startswith(b"\xff\xd8"):
+        return ".jpg"
+    if head.startswith(b"BM"):
+        return ".bmp"
+    return ".bin"
+
+
+def extract_screenshot(
+    repo_path: str | Path,
+    ref: ScreenshotRef,
+    cache_dir: str | Path | None = None,
+) -> Path:
+    """Decode one screenshot span to <cache_dir>/<sha256><ext> and return the path.
+
+    The span is read and base64-decoded in chunks; identical images share one
+    file. Raises ValueError if the span is not base64.
+    """
+    out_dir = Path(cache_dir) if cache_dir else DEFAULT_SCREENSHOT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    head = b""
+    fd, tmp_name = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    try:
+        with open(repo_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            src.seek(ref.start)
+            remaining = ref.end - ref.start
+            pending = b""  # cleaned base64 not decoded yet (length % 4)
+            first = True
+            while remaining > 0:
+                raw = src.read(min(READ_CHUNK, remaining))
+                if not raw:
+                    raise ValueError("screenshot span is truncated")
+                remaining -= len(raw)
+                data = pending + raw
+                if first:
+                    first = False
+                    comma = data.find(b",", 0, 256)
+                    if data.startswith(b"data:") and comma > 0:
+                        data = data[comma + 1:]  # data URL prefix
+                tail = b""
+                if remaining > 0 and (len(data) - len(data.rstrip(b"\\"))) % 2:
+                    data, tail = data[:-1], b"\\"  # escape split across chunks
+                # JSON escapes that appear in base64 strings: "\/" and line breaks
+                data = data.replace(b"\\/", b"/").replace(b"\\n", b"").replace(b"\\r", b"")
+                data = bytes(b for b in data if b not in _WS) if any(b in data for b in _WS) else data
+                if b"\\" in data:
+                    raise ValueError("unexpected escape in screenshot data")
+                cut = len(data) // 4 * 4 if remaining > 0 else len(data)
+                block, pending = data[:cut], data[cut:] + tail
+                if remaining == 0:
+                    block += b"=" * (-len(block) % 4)
+                try:
+                    decoded = base64.b64decode(block, validate=True)
+                except binascii.Error as e:
+                    raise ValueError(f"screenshot is not base64: {e}") from e
+                if len(head) < 8:
+                    head += decoded[:8 - len(head)]
+                digest.update(decoded)
+                dst.write(decoded)
+        final = out_dir / f"{digest.hexdigest()}{_image_suffix(head)}"
+        if final.exists():
+            os.unlink(tmp_name)
+        else:
+            os.replace(tmp_name, final)
+        return final
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
@@ -69,11 +69,10 @@ def _validate_control_repo(path: str) -> None:
     if not os.path.exists(path):
         raise FileNotFoundError(f"ControlRepository not found: {path}")
 
-    import json
+    from .control_repo import scan_control_repo
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            json.load(f)
-    except json.JSONDecodeError as e:
+        scan_control_repo(path)
+    except (ValueError, UnicodeDecodeError) as e:
         raise ValueError(f"ControlRepository is not valid JSON: {e}")
 
 
@@ -142,6 +141,8 @@ def _run_video_pipeline(
     with_audio: bool = False,
     skip_codegen: bool = False,
     stop_after: str | None = None,
+    segment_sec: float | None = None,
+    use_cache: bool = True,
 ) -> None:
     """Run the video analysis pipeline (v3)."""
     from .phase1_video import analyze_video, gemini_to_event_log_steps
@@ -156,7 +157,10 @@ def _run_video_pipeline(
 
         mark_phase_started(event_log, PHASE_VIDEO_ANALYSIS)
         try:
-            gemini_data = analyze_video(video_file, with_audio=with_audio)
+            gemini_data = analyze_video(
+                video_file, with_audio=with_audio,
+                segment_sec=segment_sec, use_cache=use_cache,
+            )
             steps, flow_phases, unresolved = gemini_to_event_log_steps(gemini_data)
 
             event_log["steps"] = steps
@@ -312,6 +316,16 @@ def main() -> None:
         action="store_true",
         help="Use audio-aware Gemini prompt (video mode only)",
     )
+    parser.add_argument(
+        "--segment-sec",
+        type=float,
+        help="Analyze the video in segments of about N seconds (video mode, needs ffmpeg)",
+    )
+    parser.add_argument(
+        "--no-analysis-cache",
+        action="store_true",
+        help="Ignore cached Gemini analysis results (uploads are still reused)",
+    )
     parser.add_argument(
         "--skip-codegen",
         action="store_true",
@@ -359,6 +373,8 @@ def main() -> None:
                     with_audio=rm["input_files"].get("with_audio", False),
                     skip_codegen=args.skip_codegen,
                     stop_after=args.stop_after,
+                    segment_sec=args.segment_sec,
+                    use_cache=not args.no_analysis_cache,
                 )
             else:
                 robin_file = rm["input_files"]["robin_script"]
@@ -404,6 +420,8 @@ def main() -> None:
                 with_audio=args.with_audio,
                 skip_codegen=args.skip_codegen,
                 stop_after=args.stop_after,
+                segment_sec=args.segment_sec,
+                use_cache=not args.no_analysis_cache,
             )
 
         else:
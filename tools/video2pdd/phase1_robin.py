@@ -12,11 +12,11 @@ Supported Robin actions:
 """
 from __future__ import annotations
 
-import json
 import re
 from pathlib import Path
 from typing import Any
 
+from .control_repo import extract_screenshot, scan_control_repo
 from .event_log import (
     CATEGORY_ELEMENT_AMBIGUOUS,
     CATEGORY_KEYBOARD_COMPLEX,
@@ -302,11 +302,13 @@ def run_phase1(
     event_log: dict[str, Any],
     robin_script_path: str,
     control_repo_path: str | None = None,
+    screenshot_dir: str | Path | None = None,
 ) -> dict[str, Any]:
     """Execute Phase 1: Robin script parsing.
 
     Populates event_log["steps"] and event_log["unresolved_items"].
-    Optionally links ControlRepository screenshots to steps.
+    Optionally links ControlRepository screenshots to steps (decoded into
+    screenshot_dir, default artifacts/cache/video2pdd/screenshots).
 
     Returns:
         Summary dict with step counts and gap statistics.
@@ -324,7 +326,7 @@ def run_phase1(
 
         # ControlRepository → element thumbnails
         if control_repo_path:
-            _link_control_repo(event_log, control_repo_path)
+            _link_control_repo(event_log, control_repo_path, screenshot_dir)
 
         # Generate unresolved items for provisional steps
         for step in steps:
@@ -366,40 +368,41 @@ def run_phase1(
 #  ControlRepository helper
 # ------------------------------------------------------------------ #
 
-def _link_control_repo(event_log: dict, control_repo_path: str) -> None:
-    """Match ControlRepository element screenshots to steps."""
+def _link_control_repo(
+    event_log: dict,
+    control_repo_path: str,
+    screenshot_dir: str | Path | None = None,
+) -> None:
+    """Match ControlRepository element screenshots to steps.
+
+    The repository is scanned without loading it (control_repo), and only the
+    screenshots of elements used by the steps are decoded, into a
+    content-addressed cache; step["screenshot_path"] gets the image file path.
+    """
     repo_path = Path(control_repo_path)
     if not repo_path.exists():
         return
 
     try:
-        with open(repo_path, "r", encoding="utf-8") as f:
-            repo = json.load(f)
-    except (json.JSONDecodeError, UnicodeDecodeError):
+        index = scan_control_repo(repo_path)
+    except (ValueError, UnicodeDecodeError):
         # Truncated or corrupt file - skip silently
         return
 
-    screenshots: dict[str, str] = {}
-    _collect_screenshots(repo, screenshots)
-
+    extracted: dict[str, str | None] = {}
     for step in event_log["steps"]:
         element = step.get("target_element")
-        if element and element in screenshots:
-            step["screenshot_path"] = screenshots[element]
-
-
-def _collect_screenshots(obj: Any, result: dict[str, str]) -> None:
-    """Recursively collect element name -> base64 screenshot mappings."""
-    if isinstance(obj, dict):
-        name = obj.get("Name") or obj.get("name") or obj.get("DisplayName")
-        img = obj.get("Screenshot") or obj.get("screenshot") or obj.get("Image")
-        if name and img and isinstance(img, str):
-            result[name] = img
-        for value in obj.values():
-            _collect_screenshots(value, result)
-    elif isinstance(obj, list):
-        for item in obj:
-            _collect_screenshots(item, result)
+        if not element or element not in index:
+            continue
+        if element not in extracted:
+            try:
+                extracted[element] = str(
+                    extract_screenshot(repo_path, index[element], screenshot_dir)
+                )
+            except ValueError:
+                extracted[element] = None
+        if extracted[element]:
+            step["screenshot_path"] = extracted[element]
 
 
 def _gap_to_category(flag: str) -> str:
@@ -5,25 +5,42 @@ Uploads a video file to Gemini and extracts structured step data via
 the google-genai Python SDK (multimodal prompting).
 Returns parsed JSON compatible with event_log v3 schema.
 
+The provider sits behind VideoBackend (GeminiBackend, or LocalBackend for
+offline runs: VIDEO2PDD_BACKEND=local). Uploaded file handles and raw outputs
+are cached by content hash (AnalysisCache), so retries and reruns do not
+upload the recording again. Long recordings can be cut into time-range
+segments (segment_sec, needs ffmpeg) that are uploaded and analysed one by
+one, then merged with timestamps shifted back to the full timeline.
+
 Requires: pip install google-genai
 Auth: Set GEMINI_API_KEY environment variable (get from https://aistudio.google.com/apikey)
 """
 from __future__ import annotations
 
+import csv
+import hashlib
 import json
 import logging
 import os
 import re
+import shutil
+import subprocess
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Protocol
 
 from . import event_log as el
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
-RETRY_DELAY_SEC = 5
+RETRY_DELAY_SEC = 5  # doubled per retry
+POLL_INITIAL_SEC = 1.0
+POLL_MAX_SEC = 30.0
+POLL_TIMEOUT_SEC = 600.0
+UPLOAD_TTL_SEC = 47 * 3600  # provider keeps uploads for 48h
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "artifacts" / "cache" / "video2pdd"
 SUPPORTED_FORMATS = {".mp4", ".avi", ".mkv", ".webm", ".mov"}
 MAX_VIDEO_SIZE_MB = 500
 GEMINI_MODEL = "gemini-2.5-flash"
@@ -36,6 +53,11 @@ GAP_DUPLICATE_ACTION = "duplicate_action"
 CONFIDENCE_THRESHOLD_WARN = 0.7
 CONFIDENCE_THRESHOLD_FLAG = 0.9
 
+# Remote file states
+STATE_PROCESSING = "PROCESSING"
+STATE_ACTIVE = "ACTIVE"
+STATE_FAILED = "FAILED"
+
 # MIME type mapping
 MIME_TYPES = {
     ".mp4": "video/mp4",
@@ -82,97 +104,428 @@ def _get_api_key() -> str:
     return key
 
 
-def _call_gemini(
-    video_path: str,
-    prompt_text: str,
-) -> str:
-    """Call Gemini API with video file and return raw text output."""
-    from google import genai
-    from google.genai import types
+# ------------------------------------------------------------------ #
+#  Provider backends
+# ------------------------------------------------------------------ #
 
-    api_key = _get_api_key()
-    client = genai.Client(api_key=api_key)
+@dataclass
+class RemoteFile:
+    """Handle of an uploaded video on the provider side."""
+    name: str
+    uri: str
+    state: str  # STATE_PROCESSING / STATE_ACTIVE / STATE_FAILED
 
-    video_file = Path(video_path)
-    mime_type = MIME_TYPES.get(video_file.suffix.lower(), "video/mp4")
 
-    for attempt in range(1, MAX_RETRIES + 1):
-        logger.info(
-            "Gemini API call attempt %d/%d...", attempt, MAX_RETRIES,
+class VideoBackend(Protocol):
+    """Provider interface used by analyze_video (Gemini, local stand-in)."""
+    name: str
+    model: str
+
+    def upload(self, path: Path, mime_type: str) -> RemoteFile: ...
+
+    def get(self, name: str) -> RemoteFile: ...
+
+    def generate(self, remote: RemoteFile, mime_type: str, prompt: str) -> str: ...
+
+
+def _normalize_state(state: Any) -> str:
+    text = str(state).upper() if state else ""
+    if "ACTIVE" in text:
+        return STATE_ACTIVE
+    if "FAILED" in text:
+        return STATE_FAILED
+    return STATE_PROCESSING
+
+
+class GeminiBackend:
+    """google-genai Files API + generate_content."""
+    name = "gemini"
+
+    def __init__(self, api_key: str | None = None, model: str = GEMINI_MODEL) -> None:
+        from google import genai
+        from google.genai import types
+
+        self._types = types
+        self._client = genai.Client(api_key=api_key or _get_api_key())
+        self.model = model
+
+    def _remote(self, f: Any) -> RemoteFile:
+        return RemoteFile(name=f.name, uri=f.uri, state=_normalize_state(f.state))
+
+    def upload(self, path: Path, mime_type: str) -> RemoteFile:
+        uploaded = self._client.files.upload(
+            file=str(path.resolve()),
+            config=self._types.UploadFileConfig(mime_type=mime_type),
         )
+        return self._remote(uploaded)
+
+    def get(self, name: str) -> RemoteFile:
+        return self._remote(self._client.files.get(name=name))
+
+    def generate(self, remote: RemoteFile, mime_type: str, prompt: str) -> str:
+        response = self._client.models.generate_content(
+            model=self.model,
+            contents=[
+                self._types.Part.from_uri(file_uri=remote.uri, mime_type=mime_type),
+                prompt,
+            ],
+        )
+        return response.text.strip() if response.text else ""
+
+
+def _default_local_response(path: Path, prompt: str) -> str:
+    return json.dumps({
+        "steps": [{
+            "num": 1,
+            "timestamp": "00:00",
+            "application": "local",
+            "app_type": "desktop",
+            "action": "Wait",
+            "target": path.name,
+            "confidence": 1.0,
+            "selector_hint": "N/A",
+            "notes": "local backend (offline stand-in)",
+        }],
+        "flow_phases": [],
+        "ambiguities": [],
+    }, ensure_ascii=False)
+
+
+class LocalBackend:
+    """Offline stand-in for the provider (tests, dry runs without an API key).
+
+    Uploads are kept in memory and turn ACTIVE after ``processing_polls``
+    get() calls; generate() returns ``responder(local_path, prompt)``.
+    """
+    name = "local"
+    model = "local"
+
+    def __init__(
+        self,
+        responder: Callable[[Path, str], str] | None = None,
+        processing_polls: int = 1,
+    ) -> None:
+        self.responder = responder or _default_local_response
+        self.processing_polls = processing_polls
+        self.files: dict[str, dict[str, Any]] = {}
+        self.uploads: list[Path] = []
+        self.generate_calls = 0
+
+    def upload(self, path: Path, mime_type: str) -> RemoteFile:
+        name = f"files/local-{len(self.uploads) + 1}"
+        self.uploads.append(Path(path))
+        self.files[name] = {"path": Path(path), "polls": 0}
+        state = STATE_ACTIVE if self.processing_polls <= 0 else STATE_PROCESSING
+        return RemoteFile(name=name, uri=f"local://{name}", state=state)
+
+    def get(self, name: str) -> RemoteFile:
+        entry = self.files.get(name)
+        if entry is None:
+            raise KeyError(f"unknown file: {name}")
+        entry["polls"] += 1
+        state = STATE_ACTIVE if entry["polls"] >= self.processing_polls else STATE_PROCESSING
+        return RemoteFile(name=name, uri=f"local://{name}", state=state)
+
+    def generate(self, remote: RemoteFile, mime_type: str, prompt: str) -> str:
+        self.generate_calls += 1
+        return self.responder(self.files[remote.name]["path"], prompt)
+
+
+def get_backend(name: str | None = None) -> VideoBackend:
+    """Backend by name (default: VIDEO2PDD_BACKEND env, else "gemini")."""
+    name = (name or os.environ.get("VIDEO2PDD_BACKEND") or "gemini").lower()
+    if name == "gemini":
+        return GeminiBackend()
+    if name == "local":
+        return LocalBackend()
+    raise ValueError(f"Unknown video backend: {name} (expected gemini or local)")
+
+
+# ------------------------------------------------------------------ #
+#  Upload / analysis cache (content-hash keyed)
+# ------------------------------------------------------------------ #
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """Uploaded file handles and raw model outputs under one directory.
+
+    uploads.json maps "<backend>:<sha256>" to the provider file handle, so a
+    retry or a rerun reuses the upload until UPLOAD_TTL_SEC (the provider
+    deletes files after 48h). analysis/<key>.txt holds the raw output per
+    (backend, model, video segment, prompt).
+    """
+
+    def __init__(self, cache_dir: Path | str | None = None) -> None:
+        self.dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self._uploads_path = self.dir / "uploads.json"
         try:
-            # Upload video file
-            logger.info("Uploading video file: %s", video_file.name)
-            uploaded = client.files.upload(
-                file=str(video_file.resolve()),
-                config=types.UploadFileConfig(
-                    mime_type=mime_type,
-                ),
-            )
-            logger.info(
-                "Upload complete: %s (state=%s)",
-                uploaded.name, uploaded.state,
-            )
+            self._uploads: dict[str, dict] = json.loads(self._uploads_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._uploads = {}
+
+    def _save_uploads(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._uploads_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._uploads, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self._uploads_path)
+
+    def get_upload(self, backend: str, sha: str) -> RemoteFile | None:
+        entry = self._uploads.get(f"{backend}:{sha}")
+        if not entry or time.time() - entry.get("uploaded_at", 0) > UPLOAD_TTL_SEC:
+            return None
+        return RemoteFile(name=entry["name"], uri=entry["uri"], state=STATE_ACTIVE)
+
+    def put_upload(self, backend: str, sha: str, remote: RemoteFile) -> None:
+        self._uploads[f"{backend}:{sha}"] = {
+            "name": remote.name, "uri": remote.uri, "uploaded_at": time.time(),
+        }
+        self._save_uploads()
+
+    def drop_upload(self, backend: str, sha: str) -> None:
+        if self._uploads.pop(f"{backend}:{sha}", None) is not None:
+            self._save_uploads()
+
+    def _analysis_path(self, key: str) -> Path:
+        return self.dir / "analysis" / f"{key}.txt"
+
+    def get_analysis(self, key: str) -> str | None:
+        try:
+            return self._analysis_path(key).read_text(encoding="utf-8")
+        except OSError:
+            return None
 
-            # Wait until file is ACTIVE (ready for use)
-            wait_count = 0
-            while uploaded.state is None or "ACTIVE" not in str(uploaded.state).upper():
-                state_str = str(uploaded.state).upper() if uploaded.state else "UNKNOWN"
-                if "FAILED" in state_str:
-                    raise RuntimeError(f"Video processing failed: {uploaded.state}")
-                if wait_count > 60:
-                    raise RuntimeError(
-                        f"Video processing timed out (>60 polls). "
-                        f"Last state: {uploaded.state}"
-                    )
-                wait_count += 1
-                logger.info(
-                    "Waiting for processing... (%d) state=%s",
-                    wait_count, uploaded.state,
-                )
-                time.sleep(5)
-                uploaded = client.files.get(name=uploaded.name)
-
-            logger.info("File ready: state=%s", uploaded.state)
-
-            # Generate content with video + prompt
-            response = client.models.generate_content(
-                model=GEMINI_MODEL,
-                contents=[
-                    types.Part.from_uri(
-                        file_uri=uploaded.uri,
-                        mime_type=mime_type,
-                    ),
-                    prompt_text,
-                ],
-            )
+    def put_analysis(self, key: str, text: str) -> None:
+        path = self._analysis_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
 
-            text = response.text.strip() if response.text else ""
-            if text:
-                # Clean up uploaded file
-                try:
-                    client.files.delete(name=uploaded.name)
-                except Exception:
-                    pass  # Non-critical
-                return text
+    def drop_analysis(self, key: str) -> None:
+        try:
+            self._analysis_path(key).unlink()
+        except OSError:
+            pass
 
-            logger.warning(
-                "Gemini attempt %d returned empty response", attempt,
+
+def _analysis_key(backend: VideoBackend, segment_sha: str, prompt_text: str) -> str:
+    prompt_sha = hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()
+    raw = f"{backend.name}|{backend.model}|{segment_sha}|{prompt_sha}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ------------------------------------------------------------------ #
+#  Segmentation (ffmpeg, stream copy)
+# ------------------------------------------------------------------ #
+
+@dataclass
+class VideoSegment:
+    path: Path
+    start_sec: float
+
+
+def split_video(video_path: Path, segment_sec: float, out_dir: Path) -> list[VideoSegment]:
+    """Cut a video into ~segment_sec pieces with ffmpeg (-c copy, keyframe cuts).
+
+    Segments are reused when out_dir already holds a segment list. Without
+    ffmpeg the whole file is returned as one segment.
+    """
+    list_path = out_dir / "segments.csv"
+    if not list_path.exists():
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            logger.warning("ffmpeg not found; uploading %s as one segment", video_path.name)
+            return [VideoSegment(video_path, 0.0)]
+        out_dir.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            [
+                ffmpeg, "-hide_banner", "-loglevel", "error", "-y",
+                "-i", str(video_path), "-map", "0", "-c", "copy",
+                "-f", "segment", "-segment_time", str(segment_sec),
+                "-reset_timestamps", "1",
+                "-segment_list", str(list_path.with_suffix(".tmp")),
+                "-segment_list_type", "csv",
+                str(out_dir / f"seg_%03d{video_path.suffix.lower()}"),
+            ],
+            check=True,
+        )
+        os.replace(list_path.with_suffix(".tmp"), list_path)
+
+    segments: list[VideoSegment] = []
+    with open(list_path, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if row:
+                segments.append(VideoSegment(out_dir / row[0], float(row[1])))
+    return segments or [VideoSegment(video_path, 0.0)]
+
+
+def _parse_timestamp(ts: str) -> float | None:
+    parts = str(ts).strip().split(":")
+    try:
+        values = [float(p) for p in parts]
+    except ValueError:
+        return None
+    if len(values) == 2:
+        return values[0] * 60 + values[1]
+    if len(values) == 3:
+        return values[0] * 3600 + values[1] * 60 + values[2]
+    return None
+
+
+def _format_timestamp(seconds: float) -> str:
+    total = int(round(seconds))
+    h, rest = divmod(total, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+def _merge_segment_outputs(parts: list[tuple[float, dict[str, Any]]]) -> dict[str, Any]:
+    """Join per-segment outputs: renumber steps, shift timestamps by segment start."""
+    if len(parts) == 1:
+        return parts[0][1]
+    merged: dict[str, Any] = {"steps": [], "flow_phases": [], "ambiguities": []}
+    for start_sec, data in parts:
+        offset = len(merged["steps"])
+        renumber: dict[Any, int] = {}
+        for i, step in enumerate(data.get("steps") or [], start=1):
+            step = dict(step)
+            renumber[step.get("num", i)] = offset + i
+            step["num"] = offset + i
+            seconds = _parse_timestamp(step.get("timestamp", ""))
+            if seconds is not None:
+                step["timestamp"] = _format_timestamp(seconds + start_sec)
+            merged["steps"].append(step)
+        for phase in data.get("flow_phases") or []:
+            phase = dict(phase)
+            lo, hi = (phase.get("step_range") or [1, 1])[:2]
+            phase["step_range"] = [renumber.get(lo, offset + lo), renumber.get(hi, offset + hi)]
+            merged["flow_phases"].append(phase)
+        for amb in data.get("ambiguities") or []:
+            amb = dict(amb)
+            if isinstance(amb.get("step_num"), int):
+                amb["step_num"] = renumber.get(amb["step_num"], offset + amb["step_num"])
+            merged["ambiguities"].append(amb)
+    return merged
+
+
+# ------------------------------------------------------------------ #
+#  Upload + generate
+# ------------------------------------------------------------------ #
+
+def _wait_until_active(
+    backend: VideoBackend,
+    remote: RemoteFile,
+    *,
+    sleep: Callable[[float], None] = time.sleep,
+) -> RemoteFile:
+    """Poll with exponential backoff (POLL_INITIAL_SEC x2 up to POLL_MAX_SEC)."""
+    delay = POLL_INITIAL_SEC
+    waited = 0.0
+    polls = 0
+    while remote.state != STATE_ACTIVE:
+        if remote.state == STATE_FAILED:
+            raise RuntimeError(f"Video processing failed: {remote.name}")
+        if waited >= POLL_TIMEOUT_SEC:
+            raise RuntimeError(
+                f"Video processing timed out (>{POLL_TIMEOUT_SEC:.0f}s, {polls} polls). "
+                f"Last state: {remote.state}"
             )
+        polls += 1
+        logger.info("Waiting for processing... (%d) state=%s, next poll in %.1fs", polls, remote.state, delay)
+        sleep(delay)
+        waited += delay
+        delay = min(delay * 2, POLL_MAX_SEC)
+        remote = backend.get(remote.name)
+    return remote
+
+
+def _ensure_uploaded(
+    backend: VideoBackend,
+    cache: AnalysisCache,
+    segment: Path,
+    sha: str,
+    mime_type: str,
+    *,
+    sleep: Callable[[float], None] = time.sleep,
+) -> RemoteFile:
+    """Cached handle if the provider still has it, else upload and wait for ACTIVE."""
+    cached = cache.get_upload(backend.name, sha)
+    if cached is not None:
+        try:
+            remote = backend.get(cached.name)
+            if remote.state != STATE_FAILED:
+                logger.info("Reusing uploaded file: %s (%s)", remote.name, segment.name)
+                return _wait_until_active(backend, remote, sleep=sleep)
+        except Exception as e:
+            logger.info("Cached upload %s is gone (%s); uploading again", cached.name, str(e)[:100])
+        cache.drop_upload(backend.name, sha)
 
+    logger.info("Uploading video file: %s", segment.name)
+    remote = backend.upload(segment, mime_type)
+    logger.info("Upload complete: %s (state=%s)", remote.name, remote.state)
+    cache.put_upload(backend.name, sha, remote)
+    try:
+        remote = _wait_until_active(backend, remote, sleep=sleep)
+    except RuntimeError:
+        cache.drop_upload(backend.name, sha)
+        raise
+    logger.info("File ready: state=%s", remote.state)
+    return remote
+
+
+def _analyze_segment(
+    backend: VideoBackend,
+    cache: AnalysisCache,
+    segment: Path,
+    prompt_text: str,
+    *,
+    use_cache: bool = True,
+    sleep: Callable[[float], None] = time.sleep,
+) -> str:
+    """Raw model output for one segment (uploads at most once across retries).
+
+    Only output that _extract_json accepts is cached, so a refusal or prose
+    reply is asked again on the next run instead of failing from the cache.
+    """
+    sha = _file_sha256(segment)
+    key = _analysis_key(backend, sha, prompt_text)
+    if use_cache:
+        cached = cache.get_analysis(key)
+        if cached and _parses_as_json(cached):
+            logger.info("Analysis cache hit: %s", segment.name)
+            return cached
+        if cached:
+            logger.warning("Dropping unparseable cached analysis: %s", segment.name)
+            cache.drop_analysis(key)
+
+    mime_type = MIME_TYPES.get(segment.suffix.lower(), "video/mp4")
+    for attempt in range(1, MAX_RETRIES + 1):
+        logger.info("%s API call attempt %d/%d (%s)...", backend.name, attempt, MAX_RETRIES, segment.name)
+        try:
+            remote = _ensure_uploaded(backend, cache, segment, sha, mime_type, sleep=sleep)
+            text = backend.generate(remote, mime_type, prompt_text)
+            if text:
+                if _parses_as_json(text):
+                    cache.put_analysis(key, text)
+                return text
+            logger.warning("%s attempt %d returned empty response", backend.name, attempt)
         except RuntimeError:
             raise
         except Exception as e:
-            logger.warning(
-                "Gemini attempt %d failed: %s", attempt, str(e)[:200],
-            )
+            logger.warning("%s attempt %d failed: %s", backend.name, attempt, str(e)[:200])
 
         if attempt < MAX_RETRIES:
-            logger.info("Retrying in %d seconds...", RETRY_DELAY_SEC)
-            time.sleep(RETRY_DELAY_SEC)
+            delay = RETRY_DELAY_SEC * 2 ** (attempt - 1)
+            logger.info("Retrying in %d seconds...", delay)
+            sleep(delay)
 
     raise RuntimeError(
-        f"Gemini API failed after {MAX_RETRIES} attempts. "
+        f"{backend.name} API failed after {MAX_RETRIES} attempts. "
         "Check your API key and network connection."
     )
 
@@ -207,6 +560,14 @@ def _extract_json(raw_output: str) -> dict[str, Any]:
     )
 
 
+def _parses_as_json(raw_output: str) -> bool:
+    try:
+        _extract_json(raw_output)
+    except ValueError:
+        return False
+    return True
+
+
 def _validate_gemini_output(data: dict[str, Any]) -> list[str]:
     """Validate Gemini JSON output structure. Returns list of errors."""
     errors: list[str] = []
@@ -272,6 +633,12 @@ def analyze_video(
     video_path: str,
     with_audio: bool = False,
     prompts_dir: str | None = None,
+    *,
+    backend: VideoBackend | None = None,
+    cache_dir: str | Path | None = None,
+    segment_sec: float | None = None,
+    use_cache: bool = True,
+    sleep: Callable[[float], None] = time.sleep,
 ) -> dict[str, Any]:
     """Analyze a video file using Gemini and return structured step data.
 
@@ -280,6 +647,12 @@ def analyze_video(
         with_audio: If True, use audio-aware prompt.
         prompts_dir: Directory containing prompt files. Defaults to
             tools/video2pdd/prompts/.
+        backend: Provider backend. Defaults to get_backend().
+        cache_dir: Upload/analysis cache. Defaults to artifacts/cache/video2pdd.
+        segment_sec: Cut the video into segments of about this many seconds
+            and analyse them one by one (None/0: whole file).
+        use_cache: If False, ignore cached analysis results (uploads are
+            still reused).
 
     Returns:
         Parsed Gemini JSON output with gap flags applied.
@@ -302,8 +675,24 @@ def analyze_video(
         Path(video_path).name, with_audio,
     )
 
-    raw_output = _call_gemini(video_path, prompt_text)
-    data = _extract_json(raw_output)
+    backend = backend or get_backend()
+    cache = AnalysisCache(cache_dir)
+    video = Path(video_path)
+    if segment_sec and segment_sec > 0:
+        seg_dir = cache.dir / "segments" / f"{_file_sha256(video)[:16]}_{int(segment_sec)}s"
+        segments = split_video(video, segment_sec, seg_dir)
+    else:
+        segments = [VideoSegment(video, 0.0)]
+    if len(segments) > 1:
+        logger.info("Analyzing %d segments of ~%ds", len(segments), int(segment_sec or 0))
+
+    parts: list[tuple[float, dict[str, Any]]] = []
+    for seg in segments:
+        raw_output = _analyze_segment(
+            backend, cache, seg.path, prompt_text, use_cache=use_cache, sleep=sleep,
+        )
+        parts.append((seg.start_sec, _extract_json(raw_output)))
+    data = _merge_segment_outputs(parts)
 
     errors = _validate_gemini_output(data)
     if errors:
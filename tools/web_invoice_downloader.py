@@ -2,28 +2,45 @@
 """
 Web Invoice Portal PDF Downloader
 Playwright-based download for 楽楽明細, BtoB Infomart, ダイオーHS Newfile portals.
-Integrates with outlook_save_pdf_and_batch_print.py via dispatch_web_download().
+Integrates with outlook_save_pdf_and_batch_print.py via submit_web_download().
+
+Downloads run on a WebDownloadService:
+    - one event-loop thread, one Playwright instance, one Chromium process
+    - one BrowserContext per tenant (vendor.target_name); its storage_state is
+      saved to WebDownloadConfig.state_dir so later runs skip the login form
+    - at most WebDownloadConfig.workers downloads in flight (same tenant: serial)
+    - contexts idle for idle_timeout_s are saved and closed
 
 Usage:
     from web_invoice_downloader import (
-        WebDownloadConfig, VendorWebConfig, dispatch_web_download, cleanup_web_sessions,
+        WebDownloadConfig, VendorWebConfig, submit_web_download, cleanup_web_sessions,
     )
 
+    fut = submit_web_download(cfg=cfg, sender=..., urls=..., ...)  # returns at once
+    ...                                                            # keep reading mail
+    result = fut.result()                                          # WebDownloadResult
+    cleanup_web_sessions()
+
+    dispatch_web_download(...) is the blocking form (submit + result).
+
 Tested flows:
     - 楽楽明細: C:\\tmp\\kyowa_pdf_flow.py
     - BtoB Infomart: C:\\tmp\\btob_pdf_v2.py
 """
 from __future__ import annotations
 
+import asyncio
 import ctypes
 import ctypes.wintypes
 import re
+import threading
 import time
 import zipfile
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Sequence
+from typing import Any, Awaitable, Callable, Sequence
 
 
 # ---------------------------------------------------------------------------
@@ -47,6 +64,9 @@ class WebDownloadConfig:
     headless: bool = True
     download_timeout_ms: int = 30000
     vendors: tuple = ()       # tuple[VendorWebConfig, ...]
+    workers: int = 2          # concurrent downloads (one browser, one context per tenant)
+    idle_timeout_s: float = 300.0  # close tenant contexts idle this long
+    state_dir: str = ""       # storage_state per tenant ("" = do not persist logins)
 
 
 @dataclass
@@ -60,7 +80,7 @@ class WebDownloadResult:
 # Credential helper (Windows Credential Manager via ctypes)
 # ---------------------------------------------------------------------------
 
-_advapi32 = ctypes.windll.advapi32
+_advapi32 = ctypes.windll.advapi32 if hasattr(ctypes, "windll") else None
 _CRED_TYPE_GENERIC = 1
 
 
@@ -93,6 +113,8 @@ def _get_credential(target_name: str) -> tuple[str, str]:
     Raises:
         RuntimeError: If CredReadW fails (target not found, etc.).
     """
+    if _advapi32 is None:
+        raise RuntimeError("Windows Credential Manager is not available on this platform")
     cred_ptr = _PCREDENTIAL()
     ok = _advapi32.CredReadW(target_name, _CRED_TYPE_GENERIC, 0, ctypes.byref(cred_ptr))
     if not ok:
@@ -107,59 +129,232 @@ def _get_credential(target_name: str) -> tuple[str, str]:
 
 
 # ---------------------------------------------------------------------------
-# Browser session cache
+# Download service (one browser, one context per tenant, bounded workers)
 # ---------------------------------------------------------------------------
 
-_pw_instance = None  # Single shared Playwright instance
-_browser_cache: dict[str, dict] = {}  # cache_key (target_name) -> {"browser", "context", "page"}
+async def _launch_chromium(headless: bool) -> tuple[Any, Any]:
+    """Start Playwright and one Chromium. Returns (playwright, browser)."""
+    from playwright.async_api import async_playwright
 
+    pw = await async_playwright().start()
+    try:
+        browser = await pw.chromium.launch(headless=headless)
+    except Exception:
+        await pw.stop()
+        raise
+    return pw, browser
 
-def _get_or_create_session(cache_key: str, headless: bool) -> dict:
-    """Get or create a Playwright browser session.
-
-    Sessions are cached by cache_key (typically vendor.target_name) so each
-    vendor gets its own isolated browser instance. This prevents cookie/login
-    state leaking between tenants that share the same handler_id.
-    A single shared Playwright instance is used across all sessions.
-    """
-    global _pw_instance
-
-    if cache_key in _browser_cache:
-        return _browser_cache[cache_key]
 
-    if _pw_instance is None:
-        from playwright.sync_api import sync_playwright
-        _pw_instance = sync_playwright().start()
+def _state_file_name(tenant: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", tenant) + ".json"
 
-    browser = _pw_instance.chromium.launch(headless=headless)
-    ctx = browser.new_context(
-        accept_downloads=True,
-        viewport={"width": 1920, "height": 1080},
-    )
-    page = ctx.new_page()
-    _browser_cache[cache_key] = {
-        "browser": browser,
-        "context": ctx,
-        "page": page,
-    }
-    return _browser_cache[cache_key]
 
+@dataclass
+class _Tenant:
+    """BrowserContext + page for one tenant (vendor.target_name)."""
+    context: Any
+    page: Any
+    lock: asyncio.Lock
+    last_used: float
+    active: int = 0
+
+
+class WebDownloadService:
+    """Runs portal downloads concurrently on one browser.
+
+    All Playwright objects live on the service's event-loop thread; callers
+    only see concurrent.futures.Future objects, so the Outlook COM thread never
+    touches the browser. Tenants never share a context (cookie/login state
+    cannot leak between them) and each tenant runs one download at a time.
+    """
 
-def cleanup_web_sessions() -> None:
-    """Close all cached browser sessions. Call after mail loop ends."""
-    global _pw_instance
-    for hid, session in list(_browser_cache.items()):
+    def __init__(
+        self,
+        *,
+        headless: bool = True,
+        workers: int = 2,
+        idle_timeout_s: float = 300.0,
+        state_dir: Path | None = None,
+        launch: Callable[[bool], Awaitable[tuple[Any, Any]]] | None = None,
+    ) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1: {workers}")
+        self.headless = headless
+        self.workers = int(workers)
+        self.idle_timeout_s = float(idle_timeout_s)
+        self.state_dir = Path(state_dir) if state_dir else None
+        self._launch = launch or _launch_chromium
+        self._pw: Any = None
+        self._browser: Any = None
+        self._tenants: dict[str, _Tenant] = {}
+        self._pending: set[Future] = set()
+        self._closed = False
+        self.evicted: list[str] = []
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="web-download-service", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    # -- loop thread ----------------------------------------------------------
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._tenants_lock = asyncio.Lock()
+        self._janitor = self._loop.create_task(self._evict_idle_forever())
+        self._loop.call_soon(self._ready.set)
+        self._loop.run_forever()
+
+    def _state_path(self, tenant: str) -> Path | None:
+        return self.state_dir / _state_file_name(tenant) if self.state_dir else None
+
+    async def _tenant(self, key: str) -> _Tenant:
+        async with self._tenants_lock:
+            tenant = self._tenants.get(key)
+            if tenant is not None:
+                return tenant
+            if self._browser is None:
+                self._pw, self._browser = await self._launch(self.headless)
+            state = self._state_path(key)
+            ctx = await self._browser.new_context(
+                accept_downloads=True,
+                viewport={"width": 1920, "height": 1080},
+                storage_state=str(state) if state is not None and state.exists() else None,
+            )
+            page = await ctx.new_page()
+            tenant = _Tenant(context=ctx, page=page, lock=asyncio.Lock(), last_used=time.monotonic())
+            self._tenants[key] = tenant
+        return tenant
+
+    async def _save_state(self, key: str, tenant: _Tenant) -> None:
+        state = self._state_path(key)
+        if state is None:
+            return
         try:
-            session["browser"].close()
+            state.parent.mkdir(parents=True, exist_ok=True)
+            await tenant.context.storage_state(path=str(state))
         except Exception:
             pass
-    _browser_cache.clear()
-    if _pw_instance is not None:
+
+    async def _close_tenant(self, key: str) -> None:
+        tenant = self._tenants.pop(key, None)
+        if tenant is None:
+            return
+        await self._save_state(key, tenant)
         try:
-            _pw_instance.stop()
+            await tenant.context.close()
         except Exception:
             pass
-        _pw_instance = None
+
+    async def _run(self, tenant_key: str, job: Callable[[dict], Awaitable[Any]]) -> Any:
+        tenant = await self._tenant(tenant_key)
+        tenant.active += 1  # no await since _tenant(): eviction cannot slip in
+        try:
+            # Same tenant: one download at a time (shared page). Worker slot is
+            # taken only once the tenant is free, so waiting tasks do not hold one.
+            async with tenant.lock:
+                async with self._slots:
+                    value = await job({"context": tenant.context, "page": tenant.page})
+                    await self._save_state(tenant_key, tenant)
+                    return value
+        finally:
+            tenant.active -= 1
+            tenant.last_used = time.monotonic()
+
+    async def evict_idle(self) -> list[str]:
+        """Save and close contexts idle for idle_timeout_s (runs periodically)."""
+        now = time.monotonic()
+        idle = [
+            k for k, t in self._tenants.items()
+            if t.active == 0 and now - t.last_used >= self.idle_timeout_s
+        ]
+        for key in idle:
+            await self._close_tenant(key)
+            self.evicted.append(key)
+        return idle
+
+    async def _evict_idle_forever(self) -> None:
+        interval = max(0.05, min(30.0, self.idle_timeout_s / 2))
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle()
+
+    async def _shutdown(self) -> None:
+        self._janitor.cancel()
+        for key in list(self._tenants):
+            await self._close_tenant(key)
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._pw is not None:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+        self._browser = None
+        self._pw = None
+
+    # -- caller side ------------------------------------------------------------
+
+    def submit(self, tenant_key: str, job: Callable[[dict], Awaitable[Any]]) -> Future:
+        """Run job(session) in tenant_key's context. session = {"context", "page"}."""
+        if self._closed:
+            raise RuntimeError("WebDownloadService is closed")
+        fut = asyncio.run_coroutine_threadsafe(self._run(tenant_key, job), self._loop)
+        self._pending.add(fut)
+        fut.add_done_callback(self._pending.discard)
+        return fut
+
+    def tenants(self) -> list[str]:
+        return asyncio.run_coroutine_threadsafe(self._list_tenants(), self._loop).result()
+
+    async def _list_tenants(self) -> list[str]:
+        return list(self._tenants)
+
+    def close(self) -> None:
+        """Wait for in-flight downloads, save logins, close the browser."""
+        if self._closed:
+            return
+        self._closed = True
+        for fut in list(self._pending):
+            try:
+                fut.result()
+            except Exception:
+                pass
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+
+_service: WebDownloadService | None = None
+_service_lock = threading.Lock()
+_inflight: set[Path] = set()  # marker paths of downloads not finished yet
+
+
+def get_web_download_service(cfg: WebDownloadConfig) -> WebDownloadService:
+    """Shared service for this process (created on first use)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = WebDownloadService(
+                headless=cfg.headless,
+                workers=cfg.workers,
+                idle_timeout_s=cfg.idle_timeout_s,
+                state_dir=Path(cfg.state_dir) if cfg.state_dir else None,
+            )
+        return _service
+
+
+def cleanup_web_sessions() -> None:
+    """Wait for pending downloads and close the browser. Call after mail loop ends."""
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.close()
 
 
 # ---------------------------------------------------------------------------
@@ -185,10 +380,13 @@ def _match_vendor(
 # Logging helper
 # ---------------------------------------------------------------------------
 
+_log_lock = threading.Lock()
+
+
 def _append_log(log_path: Path, msg: str) -> None:
-    """Append a timestamped log line."""
+    """Append a timestamped log line (safe from the service thread)."""
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with log_path.open("a", encoding="utf-8") as f:
+    with _log_lock, log_path.open("a", encoding="utf-8") as f:
         f.write(f"[{ts}] {msg}\n")
 
 
@@ -241,11 +439,20 @@ def _extract_pdfs_from_zip(zip_path: Path, extract_dir: Path, log_path: Path) ->
     return pdfs
 
 
+# ---------------------------------------------------------------------------
+# Login helper
+# ---------------------------------------------------------------------------
+
+async def _login_form_shown(page: Any, selector: str) -> bool:
+    """True when the login form is on the page (False: storage_state kept us logged in)."""
+    return await page.locator(selector).count() > 0
+
+
 # ---------------------------------------------------------------------------
 # Handler: 楽楽明細 (rakuraku_meisai)
 # ---------------------------------------------------------------------------
 
-def _handle_rakuraku_meisai(
+async def _handle_rakuraku_meisai(
     *,
     session: dict,
     vendor: VendorWebConfig,
@@ -260,7 +467,8 @@ def _handle_rakuraku_meisai(
     """Download PDF from 楽楽明細 portal.
 
     Flow (from tested kyowa_pdf_flow.py):
-        Login (#loginId, #password, button[type="submit"])
+        Login (#loginId, #password, button[type="submit"]) unless the saved
+        storage_state is still logged in
         → Top page → Find links with invoice keywords
         → Navigate to invoice list
         → Find PDF download link/button
@@ -278,17 +486,20 @@ def _handle_rakuraku_meisai(
 
     # Step 1: Login
     _append_log(log_path, f"[rakuraku] Navigating to login: {login_url}")
-    page.goto(login_url, wait_until="networkidle", timeout=30000)
-    page.fill("#loginId", username)
-    page.fill("#password", password)
-    page.click('button[type="submit"]')
-    page.wait_for_load_state("networkidle", timeout=30000)
-    time.sleep(2)
-    _append_log(log_path, f"[rakuraku] Logged in. URL: {page.url}")
+    await page.goto(login_url, wait_until="networkidle", timeout=30000)
+    if await _login_form_shown(page, "#loginId"):
+        await page.fill("#loginId", username)
+        await page.fill("#password", password)
+        await page.click('button[type="submit"]')
+        await page.wait_for_load_state("networkidle", timeout=30000)
+        await asyncio.sleep(2)
+        _append_log(log_path, f"[rakuraku] Logged in. URL: {page.url}")
+    else:
+        _append_log(log_path, f"[rakuraku] Session reused (no login form). URL: {page.url}")
 
     # Step 2: Find invoice list links
     invoice_kw = ["請求", "明細", "PDF", "ダウンロード", "帳票", "書類", "一覧"]
-    links = page.evaluate(
+    links = await page.evaluate(
         """() => Array.from(document.querySelectorAll('a')).map(a => ({
             text: a.innerText.trim().substring(0, 80),
             href: a.href
@@ -314,11 +525,11 @@ def _handle_rakuraku_meisai(
 
     target = invoice_links[0]
     _append_log(log_path, f"[rakuraku] Navigating to invoice list: {target['text']} -> {target['href']}")
-    page.goto(target["href"], wait_until="networkidle", timeout=30000)
-    time.sleep(2)
+    await page.goto(target["href"], wait_until="networkidle", timeout=30000)
+    await asyncio.sleep(2)
 
     # Step 3: Find PDF download candidates
-    dl_candidates = page.evaluate(
+    dl_candidates = await page.evaluate(
         """() => {
             const r = [];
             document.querySelectorAll('a').forEach(a => {
@@ -352,15 +563,15 @@ def _handle_rakuraku_meisai(
     )
 
     c = dl_candidates[0]
-    with page.expect_download(timeout=download_timeout_ms) as dl_info:
+    async with page.expect_download(timeout=download_timeout_ms) as dl_info:
         if c["tag"] == "a":
-            page.click(f"text={c['text'][:30]}")
+            await page.click(f"text={c['text'][:30]}")
         else:
-            page.click(f"button:has-text('{c['text'][:30]}')")
+            await page.click(f"button:has-text('{c['text'][:30]}')")
 
-    dl = dl_info.value
+    dl = await dl_info.value
     save_path = download_dir / dl.suggested_filename
-    dl.save_as(str(save_path))
+    await dl.save_as(str(save_path))
     _append_log(log_path, f"[rakuraku] Downloaded: {save_path}")
 
     # Handle ZIP files (楽楽明細 returns ZIP from 一括ダウンロード)
@@ -381,7 +592,7 @@ def _handle_rakuraku_meisai(
 # Handler: BtoB Infomart (btob_infomart)
 # ---------------------------------------------------------------------------
 
-def _handle_btob_infomart(
+async def _handle_btob_infomart(
     *,
     session: dict,
     vendor: VendorWebConfig,
@@ -397,6 +608,7 @@ def _handle_btob_infomart(
 
     Flow (from tested btob_pdf_v2.py):
         Login (input[name="UID"], input[name="PWD"], input[name="Logon"])
+        unless the saved storage_state is still logged in
         → /buyer/invoicelist/every/list.page
         → Click amount link (金額リンク: regex /^[0-9,]+$/ and length > 3)
         → Detail page
@@ -421,22 +633,25 @@ def _handle_btob_infomart(
 
     # Step 1: Login
     _append_log(log_path, f"[btob] Navigating to login: {login_url}")
-    page.goto(login_url, wait_until="domcontentloaded", timeout=30000)
-    time.sleep(2)
-    page.fill('input[name="UID"]', username)
-    page.fill('input[name="PWD"]', password)
-    page.click('input[name="Logon"]')
-    page.wait_for_load_state("domcontentloaded", timeout=30000)
-    time.sleep(3)
-    _append_log(log_path, f"[btob] Logged in. URL: {page.url}")
+    await page.goto(login_url, wait_until="domcontentloaded", timeout=30000)
+    await asyncio.sleep(2)
+    if await _login_form_shown(page, 'input[name="UID"]'):
+        await page.fill('input[name="UID"]', username)
+        await page.fill('input[name="PWD"]', password)
+        await page.click('input[name="Logon"]')
+        await page.wait_for_load_state("domcontentloaded", timeout=30000)
+        await asyncio.sleep(3)
+        _append_log(log_path, f"[btob] Logged in. URL: {page.url}")
+    else:
+        _append_log(log_path, f"[btob] Session reused (no login form). URL: {page.url}")
 
     # Step 2: Navigate to invoice list
     _append_log(log_path, f"[btob] Navigating to invoice list: {list_url}")
-    page.goto(list_url, wait_until="domcontentloaded", timeout=30000)
-    time.sleep(3)
+    await page.goto(list_url, wait_until="domcontentloaded", timeout=30000)
+    await asyncio.sleep(3)
 
     # Find amount links in the invoice list
-    amount_links = page.evaluate(
+    amount_links = await page.evaluate(
         """() => {
             const r = [];
             document.querySelectorAll('a').forEach(a => {
@@ -463,29 +678,29 @@ def _handle_btob_infomart(
     target_text = target_link["text"]
 
     _append_log(log_path, f"[btob] Clicking amount link: {target_text}")
-    page.click(f"a:has-text('{target_text}')")
-    page.wait_for_load_state("domcontentloaded", timeout=30000)
-    time.sleep(3)
+    await page.click(f"a:has-text('{target_text}')")
+    await page.wait_for_load_state("domcontentloaded", timeout=30000)
+    await asyncio.sleep(3)
     _append_log(log_path, f"[btob] Detail page: {page.url}")
 
     # Step 3: Open print dropdown and download PDF
-    page.click("#aPrint")
-    time.sleep(1)
+    await page.click("#aPrint")
+    await asyncio.sleep(1)
 
     # Verify dropdown is open
-    disp = page.evaluate(
+    disp = await page.evaluate(
         "window.getComputedStyle(document.getElementById('bt-opt-nv-print-box')).display"
     )
     _append_log(log_path, f"[btob] Print dropdown display: {disp}")
 
     # CRITICAL: Use expect_download, NOT expect_popup
     _append_log(log_path, "[btob] Clicking #subLayoutPrintTop with expect_download...")
-    with page.expect_download(timeout=download_timeout_ms) as dl_info:
-        page.click("#subLayoutPrintTop", timeout=5000)
+    async with page.expect_download(timeout=download_timeout_ms) as dl_info:
+        await page.click("#subLayoutPrintTop", timeout=5000)
 
-    dl = dl_info.value
+    dl = await dl_info.value
     save_path = download_dir / dl.suggested_filename
-    dl.save_as(str(save_path))
+    await dl.save_as(str(save_path))
     downloaded.append(save_path)
     _append_log(log_path, f"[btob] Downloaded: {save_path}")
 
@@ -519,7 +734,7 @@ def _btob_match_invoice(
 # Handler: ダイオーHS Newfile (daiohs_newfile)
 # ---------------------------------------------------------------------------
 
-def _handle_daiohs_newfile(
+async def _handle_daiohs_newfile(
     *,
     session: dict,
     vendor: VendorWebConfig,
@@ -534,11 +749,15 @@ def _handle_daiohs_newfile(
     """Download PDF from Newfile portal (newfile.jp).
 
     Flow:
-        Login (#loginId, #password, button[name="doLogin"])
+        Login (#loginId, #password, button[name="doLogin"]) unless the saved
+        storage_state is still logged in
         → Navigate to invoice list: /upfile/mypage/eform/invoice.html
         → Find <a> links with href containing viewer.html?uri=mypage/eform/file/{ID}
         → Extract file URI, construct direct download URL: /upfile/mypage/eform/file/{ID}
-        → page.expect_download() + page.goto(direct_url) → save PDF
+        → page.expect_download() + click on a temporary link → save PDF
+
+    Options:
+        invoice_list_url / file_base_url override the newfile.jp defaults.
 
     Returns:
         List of downloaded PDF paths (single latest invoice).
@@ -549,26 +768,32 @@ def _handle_daiohs_newfile(
     login_url = vendor.options.get("login_url", "")
     if not login_url:
         raise ValueError("daiohs_newfile requires options.login_url")
+    invoice_list_url = vendor.options.get(
+        "invoice_list_url", "https://newfile.jp/upfile/mypage/eform/invoice.html"
+    )
+    file_base_url = vendor.options.get("file_base_url", "https://newfile.jp/upfile/")
 
     # Step 1: Login
     _append_log(log_path, f"[newfile] Navigating to login: {login_url}")
-    page.goto(login_url, wait_until="networkidle", timeout=30000)
-    page.fill("#loginId", username)
-    page.fill("#password", password)
-    page.click('button[name="doLogin"]')
-    page.wait_for_load_state("networkidle", timeout=30000)
-    time.sleep(2)
-    _append_log(log_path, f"[newfile] Logged in. URL: {page.url}")
+    await page.goto(login_url, wait_until="networkidle", timeout=30000)
+    if await _login_form_shown(page, "#loginId"):
+        await page.fill("#loginId", username)
+        await page.fill("#password", password)
+        await page.click('button[name="doLogin"]')
+        await page.wait_for_load_state("networkidle", timeout=30000)
+        await asyncio.sleep(2)
+        _append_log(log_path, f"[newfile] Logged in. URL: {page.url}")
+    else:
+        _append_log(log_path, f"[newfile] Session reused (no login form). URL: {page.url}")
 
     # Step 2: Navigate to invoice list page
-    invoice_list_url = "https://newfile.jp/upfile/mypage/eform/invoice.html"
     _append_log(log_path, f"[newfile] Navigating to invoice list: {invoice_list_url}")
-    page.goto(invoice_list_url, wait_until="networkidle", timeout=30000)
-    time.sleep(2)
+    await page.goto(invoice_list_url, wait_until="networkidle", timeout=30000)
+    await asyncio.sleep(2)
     _append_log(log_path, f"[newfile] Invoice list loaded. URL: {page.url}")
 
     # Step 3: Find all links whose href contains viewer.html?uri=mypage/eform/file/
-    file_links = page.evaluate(
+    file_links = await page.evaluate(
         """() => {
             const r = [];
             document.querySelectorAll('a').forEach(a => {
@@ -602,9 +827,9 @@ def _handle_daiohs_newfile(
 
     # Step 4: Download the FIRST (latest) invoice PDF via direct URL
     latest = file_links[0]
-    # Direct download URL: https://newfile.jp/upfile/ + uri_value
+    # Direct download URL: file_base_url + uri_value
     # uri_value is e.g. "mypage/eform/file/479735"
-    direct_url = f"https://newfile.jp/upfile/{latest['uri']}"
+    direct_url = file_base_url.rstrip("/") + "/" + latest["uri"]
     filename = latest["text"] if latest["text"] else "invoice.pdf"
     # Ensure filename ends with .pdf
     if not filename.lower().endswith(".pdf"):
@@ -615,10 +840,10 @@ def _handle_daiohs_newfile(
         f"[newfile] Downloading latest invoice: {filename} from {direct_url}",
     )
 
-    with page.expect_download(timeout=download_timeout_ms) as dl_info:
+    async with page.expect_download(timeout=download_timeout_ms) as dl_info:
         # Use JavaScript to create and click a temporary link instead of page.goto(),
         # because goto() throws "Download is starting" error on direct PDF URLs.
-        page.evaluate(
+        await page.evaluate(
             f"""() => {{
                 const a = document.createElement('a');
                 a.href = '{direct_url}';
@@ -629,9 +854,9 @@ def _handle_daiohs_newfile(
             }}"""
         )
 
-    dl = dl_info.value
+    dl = await dl_info.value
     save_path = download_dir / filename
-    dl.save_as(str(save_path))
+    await dl.save_as(str(save_path))
     downloaded.append(save_path)
     _append_log(log_path, f"[newfile] Downloaded: {save_path}")
 
@@ -642,7 +867,7 @@ def _handle_daiohs_newfile(
 # Handler registry
 # ---------------------------------------------------------------------------
 
-_HANDLER_REGISTRY: dict[str, Callable] = {
+_HANDLER_REGISTRY: dict[str, Callable[..., Awaitable[list[Path]]]] = {
     "rakuraku_meisai": _handle_rakuraku_meisai,
     "btob_infomart": _handle_btob_infomart,
     "daiohs_newfile": _handle_daiohs_newfile,
@@ -653,7 +878,13 @@ _HANDLER_REGISTRY: dict[str, Callable] = {
 # Public API
 # ---------------------------------------------------------------------------
 
-def dispatch_web_download(
+def _done(result: WebDownloadResult) -> Future:
+    fut: Future = Future()
+    fut.set_result(result)
+    return fut
+
+
+def submit_web_download(
     *,
     cfg: WebDownloadConfig,
     sender: str,
@@ -664,26 +895,27 @@ def dispatch_web_download(
     log_path: Path,
     dry_run: bool,
     scan_only: bool,
-) -> WebDownloadResult:
-    """Download PDFs from matched web vendor portal.
-
-    Returns:
-        WebDownloadResult with pdfs and errors.
-
-    Never raises — all exceptions caught and added to result.errors.
-    On dry_run or scan_only: log match info only, no browser launch.
+    service: WebDownloadService | None = None,
+) -> Future:
+    """Queue a portal download and return Future[WebDownloadResult] at once.
+
+    Vendor matching, dry-run, the marker check and credential lookup run on the
+    calling thread; only the browser work goes to the download service. The
+    Future never raises — all exceptions end up in result.errors. A second
+    request for the same vendor/month while the first is still running is
+    skipped (same as an existing marker).
     """
     result = WebDownloadResult()
 
     # Check if web download is enabled at config level
     if not cfg.enabled:
-        return result
+        return _done(result)
 
     try:
         # 1. Match vendor
         vendor = _match_vendor(cfg, sender, urls)
         if vendor is None:
-            return result
+            return _done(result)
 
         _append_log(
             log_path,
@@ -698,16 +930,17 @@ def dispatch_web_download(
                 f"[DRY] Would download from {vendor.handler_id} "
                 f"(target={vendor.target_name})",
             )
-            return result
+            return _done(result)
 
-        # 3. Duplicate check
+        # 3. Duplicate check (finished or still downloading)
+        marker = _marker_path(download_dir, vendor.target_name, received_dt)
         if _is_already_downloaded(download_dir, vendor.target_name, received_dt):
             _append_log(
                 log_path,
                 f"[SKIP] Already downloaded: {vendor.handler_id} "
                 f"for {received_dt.strftime('%Y-%m')}",
             )
-            return result
+            return _done(result)
 
         # 4. Get credential
         try:
@@ -716,47 +949,115 @@ def dispatch_web_download(
             msg = f"[WARN] Credential failed for '{vendor.target_name}': {e}"
             _append_log(log_path, msg)
             result.errors.append(msg)
-            return result
+            return _done(result)
 
-        # 5. Get/create browser session
+        # 5. Resolve handler
         handler_fn = _HANDLER_REGISTRY.get(vendor.handler_id)
         if handler_fn is None:
             msg = f"[ERROR] Unknown handler_id: {vendor.handler_id}"
             _append_log(log_path, msg)
             result.errors.append(msg)
-            return result
-
-        session = _get_or_create_session(vendor.target_name, cfg.headless)
+            return _done(result)
 
         # 6. Ensure download_dir exists
         download_dir.mkdir(parents=True, exist_ok=True)
 
-        # 7. Dispatch to handler
-        pdfs = handler_fn(
-            session=session,
-            vendor=vendor,
-            username=username,
-            password=password,
-            subject=subject,
-            received_dt=received_dt,
-            download_dir=download_dir,
-            download_timeout_ms=cfg.download_timeout_ms,
-            log_path=log_path,
-        )
-
-        result.pdfs.extend(pdfs)
+        # 7. Queue the handler on the vendor's browser context
+        async def job(session: dict) -> WebDownloadResult:
+            try:
+                pdfs = await handler_fn(
+                    session=session,
+                    vendor=vendor,
+                    username=username,
+                    password=password,
+                    subject=subject,
+                    received_dt=received_dt,
+                    download_dir=download_dir,
+                    download_timeout_ms=cfg.download_timeout_ms,
+                    log_path=log_path,
+                )
+                result.pdfs.extend(pdfs)
+
+                # 8. Write marker to prevent re-download
+                if pdfs:
+                    _write_marker(download_dir, vendor.target_name, received_dt, pdfs)
+                    _append_log(
+                        log_path,
+                        f"[web] Success: {vendor.handler_id} downloaded {len(pdfs)} PDF(s)",
+                    )
+            except Exception as e:
+                msg = f"[ERROR] Web download failed: {e}"
+                _append_log(log_path, msg)
+                result.errors.append(msg)
+            return result
 
-        # 8. Write marker to prevent re-download
-        if pdfs:
-            _write_marker(download_dir, vendor.target_name, received_dt, pdfs)
-            _append_log(
-                log_path,
-                f"[web] Success: {vendor.handler_id} downloaded {len(pdfs)} PDF(s)",
-            )
+        svc = service or get_web_download_service(cfg)
+        with _service_lock:
+            if marker in _inflight:
+                _append_log(
+                    log_path,
+                    f"[SKIP] Download in progress: {vendor.handler_id} "
+                    f"for {received_dt.strftime('%Y-%m')}",
+                )
+                return _done(result)
+            _inflight.add(marker)
+        try:
+            inner = svc.submit(vendor.target_name, job)
+        except Exception:
+            with _service_lock:
+                _inflight.discard(marker)
+            raise
 
     except Exception as e:
         msg = f"[ERROR] Web download failed: {e}"
         _append_log(log_path, msg)
         result.errors.append(msg)
+        return _done(result)
+
+    outer: Future = Future()
+
+    def _finish(f: Future) -> None:
+        with _service_lock:
+            _inflight.discard(marker)
+        exc = f.exception()
+        if exc is not None:  # browser launch / context creation failed
+            msg = f"[ERROR] Web download failed: {exc}"
+            _append_log(log_path, msg)
+            result.errors.append(msg)
+        outer.set_result(result)
+
+    inner.add_done_callback(_finish)
+    return outer
 
-    return result
+
+def dispatch_web_download(
+    *,
+    cfg: WebDownloadConfig,
+    sender: str,
+    urls: list[str],
+    subject: str,
+    received_dt: datetime,
+    download_dir: Path,
+    log_path: Path,
+    dry_run: bool,
+    scan_only: bool,
+) -> WebDownloadResult:
+    """Download PDFs from matched web vendor portal (blocks until done).
+
+    Returns:
+        WebDownloadResult with pdfs and errors.
+
+    Never raises — all exceptions caught and added to result.errors.
+    On dry_run or scan_only: log match info only, no browser launch.
+    """
+    return submit_web_download(
+        cfg=cfg,
+        sender=sender,
+        urls=urls,
+        subject=subject,
+        received_dt=received_dt,
+        download_dir=download_dir,
+        log_path=log_path,
+        dry_run=dry_run,
+        scan_only=scan_only,
+    ).result()
@@ -8,6 +8,11 @@ Usage:
     python tools/wiki_lint.py                  # Full report
     python tools/wiki_lint.py --json           # JSON output
     python tools/wiki_lint.py --critical-only  # Only trust < 50
+    python tools/wiki_lint.py --no-cache       # Rescan every file
+
+Each file is read once per run; its line count, topic hits, path references and
+MEMORY.md links are cached in artifacts/cache/wiki_lint.json keyed by
+(mtime_ns, size), so a re-lint only rescans files that changed.
 """
 
 from __future__ import annotations
@@ -18,7 +23,7 @@ import os
 import re
 import subprocess
 import sys
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
@@ -32,6 +37,7 @@ MEMORY_DIR = Path("C:/Users/owner/.claude/projects/c--ProgramData-Generative-AI-
 DECISIONS_DIR = REPO_ROOT / "plans" / "decisions" / "projects"
 SKILLS_DIR = REPO_ROOT / ".claude" / "skills"
 AGENTS_MD = REPO_ROOT / "AGENTS.md"
+LINT_CACHE_PATH = REPO_ROOT / "artifacts" / "cache" / "wiki_lint.json"
 
 STALE_DAYS = 90
 WARNING_DAYS = 60
@@ -49,6 +55,40 @@ CONTRADICTION_TOPICS: dict[str, list[str]] = {
     "bank holiday": [r"12/31", r"12/30", r"末日"],
 }
 
+
+def compile_topic_regex(topics: dict[str, list[str]]) -> tuple[re.Pattern[str], dict[str, str]]:
+    """
+    Compile all topics into one alternation with a named group per topic.
+
+    The alternation sits inside a lookahead, so matches are zero-width and
+    finditer() tries every position once: a hit for one topic never hides an
+    overlapping hit for another topic that starts at a later position.
+    Returns (pattern, {group_name: topic}).
+    """
+    groups: dict[str, str] = {}
+    parts: list[str] = []
+    for i, (topic, patterns) in enumerate(topics.items()):
+        name = f"t{i}"
+        groups[name] = topic
+        parts.append(f"(?P<{name}>" + "|".join(f"(?:{p})" for p in patterns) + ")")
+    return re.compile("(?=" + "|".join(parts) + ")", re.IGNORECASE), groups
+
+
+TOPIC_RE, TOPIC_GROUPS = compile_topic_regex(CONTRADICTION_TOPICS)
+
+FILE_REF_RE = re.compile(
+    r"[`\"]?"
+    r"([A-Za-z]:[\\\/][^\s`\"'\]]+\.\w{2,6}"     # Windows absolute
+    r"|[\/][^\s`\"'\]]+\.\w{2,6}"                  # Unix absolute
+    r"|[A-Za-z0-9_\-\.\/\\]+\.[a-z]{2,6})"         # Relative
+    r"[`\"]?",
+    re.MULTILINE,
+)
+MEMORY_LINK_RE = re.compile(r"\[.*?\]\(([^)]+\.md)\)")
+
+# Cached scans are only valid for the patterns that produced them
+_SCAN_PATTERNS = "\n".join([TOPIC_RE.pattern, FILE_REF_RE.pattern, MEMORY_LINK_RE.pattern])
+
 # ---------------------------------------------------------------------------
 # Data classes
 # ---------------------------------------------------------------------------
@@ -72,6 +112,15 @@ class ContradictionHit:
     snippet_b: str
 
 
+@dataclass
+class FileScan:
+    """Everything the checks need from one file's content (cacheable by mtime)."""
+    line_count: int = 0
+    topic_hits: list[tuple[str, int, str]] = field(default_factory=list)  # (topic, line_num, snippet)
+    file_refs: list[str] = field(default_factory=list)
+    memory_links: list[str] = field(default_factory=list)
+
+
 @dataclass
 class FileLintResult:
     path: str            # Absolute path as string
@@ -131,14 +180,6 @@ def get_file_age_days(file_path: Path) -> Optional[int]:
         return None
 
 
-def count_lines(file_path: Path) -> int:
-    try:
-        with open(file_path, encoding="utf-8", errors="replace") as f:
-            return sum(1 for _ in f)
-    except Exception:
-        return 0
-
-
 def read_lines(file_path: Path) -> list[str]:
     try:
         with open(file_path, encoding="utf-8", errors="replace") as f:
@@ -151,16 +192,8 @@ def extract_file_references(lines: list[str]) -> list[str]:
     """Extract file path-like patterns from text."""
     refs: list[str] = []
     # Match patterns like C:\...\file.py, /path/to/file, relative/path.md
-    pattern = re.compile(
-        r"[`\"]?"
-        r"([A-Za-z]:[\\\/][^\s`\"'\]]+\.\w{2,6}"     # Windows absolute
-        r"|[\/][^\s`\"'\]]+\.\w{2,6}"                  # Unix absolute
-        r"|[A-Za-z0-9_\-\.\/\\]+\.[a-z]{2,6})"         # Relative
-        r"[`\"]?",
-        re.MULTILINE,
-    )
     for line in lines:
-        for m in pattern.finditer(line):
+        for m in FILE_REF_RE.finditer(line):
             ref = m.group(1).strip("`\"'")
             # Filter noise
             if len(ref) > 4 and not ref.startswith("http"):
@@ -168,6 +201,109 @@ def extract_file_references(lines: list[str]) -> list[str]:
     return refs
 
 
+def scan_topics(lines: list[str]) -> list[tuple[str, int, str]]:
+    """Return (topic, line_num, snippet) per line and topic, scanning each line once."""
+    hits: list[tuple[str, int, str]] = []
+    for lno, line in enumerate(lines, start=1):
+        seen = {m.lastgroup for m in TOPIC_RE.finditer(line)}
+        if seen:
+            snippet = line.strip()[:80]
+            # Report topics in CONTRADICTION_TOPICS order (one match per line per topic)
+            for name in TOPIC_GROUPS:
+                if name in seen:
+                    hits.append((TOPIC_GROUPS[name], lno, snippet))
+    return hits
+
+
+def scan_lines(lines: list[str]) -> FileScan:
+    return FileScan(
+        line_count=len(lines),
+        topic_hits=scan_topics(lines),
+        file_refs=extract_file_references(lines),
+        memory_links=[m.group(1) for line in lines for m in MEMORY_LINK_RE.finditer(line)],
+    )
+
+
+class LintCache:
+    """
+    Per-file FileScan cache keyed by (mtime_ns, size).
+
+    Within a run every check shares one FileScan per file (one read). With a
+    cache_path the scans persist across runs; entries are dropped when the
+    topic patterns change.
+    """
+
+    def __init__(self, cache_path: Optional[Path] = None) -> None:
+        self.cache_path = cache_path
+        self._entries: dict[str, dict] = {}
+        self._scans: dict[str, FileScan] = {}
+        self._dirty = False
+        self.rescanned: list[str] = []
+        if cache_path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            payload = json.loads(self.cache_path.read_text(encoding="utf-8"))  # type: ignore[union-attr]
+        except Exception:
+            return
+        if payload.get("patterns") != _SCAN_PATTERNS:
+            return
+        entries = payload.get("files")
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    def get(self, file_path: Path) -> FileScan:
+        key = str(file_path)
+        scan = self._scans.get(key)
+        if scan is not None:
+            return scan
+        try:
+            st = file_path.stat()
+            sig = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            sig = None
+        entry = self._entries.get(key)
+        if sig is not None and entry is not None and entry.get("sig") == sig:
+            try:
+                data = entry["scan"]
+                scan = FileScan(
+                    line_count=int(data["line_count"]),
+                    topic_hits=[(str(t), int(n), str(sn)) for t, n, sn in data["topic_hits"]],
+                    file_refs=[str(r) for r in data["file_refs"]],
+                    memory_links=[str(r) for r in data["memory_links"]],
+                )
+            except Exception:
+                scan = None
+        if scan is None:
+            scan = scan_lines(read_lines(file_path))
+            self.rescanned.append(key)
+            if sig is not None:
+                self._entries[key] = {"sig": sig, "scan": asdict(scan)}
+                self._dirty = True
+        self._scans[key] = scan
+        return scan
+
+    def save(self) -> None:
+        if self.cache_path is None or not self._dirty:
+            return
+        # Forget files that were not part of this run (deleted / moved)
+        entries = {k: v for k, v in self._entries.items() if k in self._scans}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"patterns": _SCAN_PATTERNS, "files": entries}
+            self.cache_path.write_text(json.dumps(payload, ensure_ascii=False) + "\n", encoding="utf-8")
+            self._dirty = False
+        except OSError:
+            pass
+
+
+def scan_file(file_path: Path, cache: Optional[LintCache] = None) -> FileScan:
+    if cache is None:
+        return scan_lines(read_lines(file_path))
+    return cache.get(file_path)
+
+
 def path_exists(ref: str, base_dir: Path) -> bool:
     """Check if a referenced path exists (absolute or relative to repo root)."""
     p = Path(ref)
@@ -222,19 +358,12 @@ def check_staleness(result: FileLintResult, file_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def load_memory_index(memory_md: Path) -> set[str]:
+def load_memory_index(memory_md: Path, cache: Optional[LintCache] = None) -> set[str]:
     """Parse MEMORY.md and return set of referenced filenames (stem only)."""
-    referenced: set[str] = set()
     if not memory_md.exists():
-        return referenced
-    lines = read_lines(memory_md)
-    # Match markdown links like [label](filename.md)
-    link_pattern = re.compile(r"\[.*?\]\(([^)]+\.md)\)")
-    for line in lines:
-        for m in link_pattern.finditer(line):
-            fname = Path(m.group(1)).name
-            referenced.add(fname)
-    return referenced
+        return set()
+    # Markdown links like [label](filename.md)
+    return {Path(link).name for link in scan_file(memory_md, cache).memory_links}
 
 
 def check_orphan(result: FileLintResult, file_path: Path, memory_index: set[str]) -> None:
@@ -249,20 +378,11 @@ def check_orphan(result: FileLintResult, file_path: Path, memory_index: set[str]
         ))
 
 
-def find_broken_memory_links(memory_md: Path, memory_dir: Path) -> list[str]:
+def find_broken_memory_links(memory_md: Path, memory_dir: Path, cache: Optional[LintCache] = None) -> list[str]:
     """Return list of filenames referenced in MEMORY.md but missing on disk."""
-    broken: list[str] = []
     if not memory_md.exists():
-        return broken
-    lines = read_lines(memory_md)
-    link_pattern = re.compile(r"\[.*?\]\(([^)]+\.md)\)")
-    for line in lines:
-        for m in link_pattern.finditer(line):
-            fname = m.group(1)
-            target = memory_dir / fname
-            if not target.exists():
-                broken.append(fname)
-    return broken
+        return []
+    return [fname for fname in scan_file(memory_md, cache).memory_links if not (memory_dir / fname).exists()]
 
 
 # ---------------------------------------------------------------------------
@@ -270,10 +390,9 @@ def find_broken_memory_links(memory_md: Path, memory_dir: Path) -> list[str]:
 # ---------------------------------------------------------------------------
 
 
-def check_source_references(result: FileLintResult, file_path: Path) -> None:
+def check_source_references(result: FileLintResult, file_path: Path, cache: Optional[LintCache] = None) -> None:
     """Check that file paths referenced in the document actually exist."""
-    lines = read_lines(file_path)
-    refs = extract_file_references(lines)
+    refs = scan_file(file_path, cache).file_refs
     checked: set[str] = set()
     for ref in refs:
         if ref in checked:
@@ -298,8 +417,13 @@ def check_source_references(result: FileLintResult, file_path: Path) -> None:
 # ---------------------------------------------------------------------------
 
 
-def check_size(result: FileLintResult, file_path: Path, is_decisions: bool = False) -> None:
-    n = count_lines(file_path)
+def check_size(
+    result: FileLintResult,
+    file_path: Path,
+    is_decisions: bool = False,
+    cache: Optional[LintCache] = None,
+) -> None:
+    n = scan_file(file_path, cache).line_count
     result.line_count = n
     threshold = BLOAT_LINES_DECISIONS if is_decisions else BLOAT_LINES_GENERAL
     if n >= threshold:
@@ -315,7 +439,10 @@ def check_size(result: FileLintResult, file_path: Path, is_decisions: bool = Fal
 # ---------------------------------------------------------------------------
 
 
-def build_topic_index(all_files: list[Path]) -> dict[str, list[tuple[str, int, str]]]:
+def build_topic_index(
+    all_files: list[Path],
+    cache: Optional[LintCache] = None,
+) -> dict[str, list[tuple[str, int, str]]]:
     """
     For each contradiction topic, find all (file, line_num, snippet) matches.
     Returns: {topic: [(display_path, line_num, snippet), ...]}
@@ -323,16 +450,9 @@ def build_topic_index(all_files: list[Path]) -> dict[str, list[tuple[str, int, s
     topic_hits: dict[str, list[tuple[str, int, str]]] = {t: [] for t in CONTRADICTION_TOPICS}
 
     for file_path in all_files:
-        lines = read_lines(file_path)
         display = short_path(file_path)
-        for topic, patterns in CONTRADICTION_TOPICS.items():
-            for lno, line in enumerate(lines, start=1):
-                for pat in patterns:
-                    m = re.search(pat, line, re.IGNORECASE)
-                    if m:
-                        snippet = line.strip()[:80]
-                        topic_hits[topic].append((display, lno, snippet))
-                        break  # one match per line per topic
+        for topic, lno, snippet in scan_file(file_path, cache).topic_hits:
+            topic_hits[topic].append((display, lno, snippet))
 
     return topic_hits
 
@@ -411,15 +531,20 @@ def collect_files() -> dict[str, list[Path]]:
 # ---------------------------------------------------------------------------
 
 
-def lint_all(verbose_source_check: bool = False) -> tuple[list[FileLintResult], list[ContradictionHit], list[str]]:
+def lint_all(
+    verbose_source_check: bool = False,
+    cache_path: Optional[Path] = LINT_CACHE_PATH,
+) -> tuple[list[FileLintResult], list[ContradictionHit], list[str]]:
+    """Run every check. cache_path=None keeps the per-file scans in memory only."""
+    cache = LintCache(cache_path)
     groups = collect_files()
     all_files: list[Path] = []
     for files in groups.values():
         all_files.extend(files)
 
     memory_md = MEMORY_DIR / "MEMORY.md"
-    memory_index = load_memory_index(memory_md)
-    broken_links = find_broken_memory_links(memory_md, MEMORY_DIR)
+    memory_index = load_memory_index(memory_md, cache)
+    broken_links = find_broken_memory_links(memory_md, MEMORY_DIR, cache)
 
     results: list[FileLintResult] = []
 
@@ -435,7 +560,7 @@ def lint_all(verbose_source_check: bool = False) -> tuple[list[FileLintResult],
 
             # Size
             is_decisions = category == "decisions"
-            check_size(result, fp, is_decisions=is_decisions)
+            check_size(result, fp, is_decisions=is_decisions, cache=cache)
 
             # Orphan check (memory files only)
             if category == "memory":
@@ -443,14 +568,15 @@ def lint_all(verbose_source_check: bool = False) -> tuple[list[FileLintResult],
 
             # Source verification (skip AGENTS.md for now — too many false positives)
             if category in ("decisions", "skills") and verbose_source_check:
-                check_source_references(result, fp)
+                check_source_references(result, fp, cache)
 
             result.compute_trust()
             results.append(result)
 
     # Contradiction detection across all files
-    topic_hits = build_topic_index(all_files)
+    topic_hits = build_topic_index(all_files, cache)
     contradictions = find_contradictions(topic_hits)
+    cache.save()
 
     # Apply contradiction penalty to results
     mentioned_files: dict[str, set[str]] = {}  # display_path -> set of topics
@@ -620,9 +746,13 @@ def main() -> None:
     parser.add_argument("--json", action="store_true", help="Output JSON instead of text")
     parser.add_argument("--critical-only", action="store_true", help="Show only critical issues (trust < 50)")
     parser.add_argument("--source-check", action="store_true", help="Enable source reference existence checks (slow)")
+    parser.add_argument("--no-cache", action="store_true", help="Rescan every file (ignore and do not write the scan cache)")
     args = parser.parse_args()
 
-    results, contradictions, broken_links = lint_all(verbose_source_check=args.source_check)
+    results, contradictions, broken_links = lint_all(
+        verbose_source_check=args.source_check,
+        cache_path=None if args.no_cache else LINT_CACHE_PATH,
+    )
 
     if args.json:
         print(render_json_report(results, contradictions, broken_links))